@@ -5,9 +5,10 @@ from datetime import datetime
 from typing import Dict, List, Optional
 
 import google.generativeai as genai
-import requests
 
 from config import CONTACT_SUPPORT, TRADING_CHANNEL
+from functions.async_client import run_blocking
+from functions.price_oracle import price_oracle
 
 logger = logging.getLogger(__name__)
 
@@ -23,10 +24,9 @@ except Exception as e:
 
 
 class MarketDataFetcher:
-    """Fetches cryptocurrency market data from CoinGecko API"""
+    """Market data for supported cryptocurrencies, from the shared price oracle"""
 
     def __init__(self):
-        self.base_url = "https://api.coingecko.com/api/v3"
         self.supported_coins = {
             "bitcoin": "BTC",
             "ethereum": "ETH",
@@ -41,20 +41,18 @@ class MarketDataFetcher:
     async def get_market_data(self) -> Dict:
         """Fetch current market data for supported cryptocurrencies"""
         try:
-            # Get price data for all supported coins
-            coin_ids = ",".join(self.supported_coins.keys())
-            url = f"{self.base_url}/simple/price"
-            params = {
-                "ids": coin_ids,
-                "vs_currencies": "usd",
-                "include_24hr_change": "true",
-                "include_market_cap": "true",
+            quotes = await run_blocking(
+                price_oracle.get_quotes, self.supported_coins.values()
+            )
+            if not quotes:
+                raise ValueError("no prices available")
+
+            # Same shape as a CoinGecko /simple/price response
+            raw_data = {
+                coin_id: quotes[symbol]
+                for coin_id, symbol in self.supported_coins.items()
+                if symbol in quotes
             }
-
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            raw_data = response.json()
-
             return self._format_market_data(raw_data)
 
         except Exception as e:
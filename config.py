@@ -41,7 +41,6 @@ except ImportError:
 from datetime import datetime
 from typing import Optional
 
-import cryptocompare
 import emoji
 import requests
 from dotenv import load_dotenv
@@ -81,6 +80,113 @@ BTCPAY_STORE_ID = os.getenv("BTCPAY_STORE_ID")
 DATABASE_URL = os.getenv("DATABASE_URL", "mongodb://localhost:27017/")
 DATABASE_NAME = os.getenv("DATABASE_NAME", "escrow_bot_db")
 
+# Worker threads used to run blocking database calls off the event loop
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", "16"))
+
+# Apply pending index migrations when the bot starts via main.py
+RUN_MIGRATIONS = os.getenv("RUN_MIGRATIONS", "True").lower() == "true"
+
+# In-process trade document cache (read-through, invalidated on every write)
+TRADE_CACHE_ENABLED = os.getenv("TRADE_CACHE_ENABLED", "True").lower() == "true"
+TRADE_CACHE_SIZE = int(os.getenv("TRADE_CACHE_SIZE", "2048"))
+TRADE_CACHE_TTL = int(os.getenv("TRADE_CACHE_TTL", "60"))  # seconds
+
+# In-process user profile cache used by UserClient.get_user
+USER_CACHE_ENABLED = os.getenv("USER_CACHE_ENABLED", "True").lower() == "true"
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "300"))  # seconds
+
+# Ethereum JSON-RPC endpoints shared by the provider registry. ETH_RPC_URL (if
+# set) is tried first; ETH_FALLBACK_RPC_URLS is a comma-separated list.
+ETH_FALLBACK_RPC_URLS = [
+    url.strip()
+    for url in os.getenv(
+        "ETH_FALLBACK_RPC_URLS",
+        "https://eth.llamarpc.com,https://rpc.ankr.com/eth,"
+        "https://ethereum.publicnode.com,https://cloudflare-eth.com",
+    ).split(",")
+    if url.strip()
+]
+WEB3_RPC_TIMEOUT = float(os.getenv("WEB3_RPC_TIMEOUT", "10"))  # seconds
+WEB3_CIRCUIT_FAILURES = int(os.getenv("WEB3_CIRCUIT_FAILURES", "3"))
+WEB3_CIRCUIT_COOLDOWN = float(os.getenv("WEB3_CIRCUIT_COOLDOWN", "30"))  # seconds
+# Balances packed into one Multicall3 aggregate3 call
+EVM_BALANCE_BATCH_SIZE = int(os.getenv("EVM_BALANCE_BATCH_SIZE", "500"))
+
+# Wallet balance refresh: coins fetched in parallel, and the per-coin deadline
+WALLET_REFRESH_CONCURRENCY = int(os.getenv("WALLET_REFRESH_CONCURRENCY", "4"))
+WALLET_REFRESH_TIMEOUT = float(os.getenv("WALLET_REFRESH_TIMEOUT", "15"))  # seconds
+
+# On-chain balance cache. BALANCE_CACHE_TTL is the oldest balance ever served;
+# deposit checks accept balances up to DEPOSIT_BALANCE_MAX_AGE seconds old.
+BALANCE_CACHE_ENABLED = os.getenv("BALANCE_CACHE_ENABLED", "True").lower() == "true"
+BALANCE_CACHE_SIZE = int(os.getenv("BALANCE_CACHE_SIZE", "10000"))
+BALANCE_CACHE_TTL = int(os.getenv("BALANCE_CACHE_TTL", "60"))  # seconds
+DEPOSIT_BALANCE_MAX_AGE = int(os.getenv("DEPOSIT_BALANCE_MAX_AGE", "20"))  # seconds
+
+# Background deposit watcher: how often it runs, how deep a deposit must be
+# buried, and the widest block range searched for token Transfer logs
+DEPOSIT_WATCH_ENABLED = os.getenv("DEPOSIT_WATCH_ENABLED", "True").lower() == "true"
+DEPOSIT_WATCH_INTERVAL = int(os.getenv("DEPOSIT_WATCH_INTERVAL", "15"))  # seconds
+DEPOSIT_CONFIRMATIONS = int(os.getenv("DEPOSIT_CONFIRMATIONS", "3"))  # blocks
+DEPOSIT_LOG_BLOCK_RANGE = int(os.getenv("DEPOSIT_LOG_BLOCK_RANGE", "2000"))  # blocks
+
+# EIP-1559 gas oracle: blocks sampled from eth_feeHistory, the refresh
+# interval, the oldest snapshot quoted, and the pause between failed refreshes
+GAS_ORACLE_BLOCKS = int(os.getenv("GAS_ORACLE_BLOCKS", "20"))
+GAS_ORACLE_REFRESH_INTERVAL = int(os.getenv("GAS_ORACLE_REFRESH_INTERVAL", "12"))
+GAS_ORACLE_MAX_AGE = float(os.getenv("GAS_ORACLE_MAX_AGE", "60"))  # seconds
+GAS_ORACLE_RETRY_DELAY = float(os.getenv("GAS_ORACLE_RETRY_DELAY", "10"))  # seconds
+
+# How long the fee quote shown to a seller stays valid before it is recomputed
+FEE_QUOTE_TTL = int(os.getenv("FEE_QUOTE_TTL", "1800"))  # seconds
+
+# Outbound transactions: how often a hot wallet's nonce counter is checked
+# against the node, how often pending receipts are polled, and when an
+# unconfirmed transaction is given up on
+NONCE_RESYNC_INTERVAL = float(os.getenv("NONCE_RESYNC_INTERVAL", "60"))  # seconds
+TX_RECEIPT_POLL_INTERVAL = int(os.getenv("TX_RECEIPT_POLL_INTERVAL", "15"))
+TX_RECEIPT_TIMEOUT = int(os.getenv("TX_RECEIPT_TIMEOUT", "1800"))  # seconds
+
+# Pool of pre-generated, unassigned wallets handed out by /wallet create: how
+# many to keep ready, the worker processes deriving them, and the refill interval
+WALLET_POOL_ENABLED = os.getenv("WALLET_POOL_ENABLED", "True").lower() == "true"
+WALLET_POOL_SIZE = int(os.getenv("WALLET_POOL_SIZE", "20"))
+WALLET_POOL_WORKERS = int(os.getenv("WALLET_POOL_WORKERS", "2"))
+WALLET_POOL_REFILL_INTERVAL = int(os.getenv("WALLET_POOL_REFILL_INTERVAL", "60"))
+
+# USD price oracle: quotes are served fresh for PRICE_CACHE_TTL seconds, then
+# served stale while refreshing in the background up to PRICE_STALE_TTL
+PRICE_CACHE_TTL = float(os.getenv("PRICE_CACHE_TTL", "60"))  # seconds
+PRICE_STALE_TTL = float(os.getenv("PRICE_STALE_TTL", "600"))  # seconds
+PRICE_REFRESH_INTERVAL = int(os.getenv("PRICE_REFRESH_INTERVAL", "60"))  # seconds
+PRICE_RETRY_DELAY = float(os.getenv("PRICE_RETRY_DELAY", "30"))  # seconds
+
+# USD valuation of custody balances: how often it runs and the coin addresses
+# valued and written back per batch
+CUSTODY_VALUATION_INTERVAL = int(os.getenv("CUSTODY_VALUATION_INTERVAL", "300"))
+CUSTODY_VALUATION_BATCH_SIZE = int(os.getenv("CUSTODY_VALUATION_BATCH_SIZE", "1000"))
+
+# BlockCypher balance reads (BTC, LTC, DOGE): the optional API token, addresses
+# packed into one request, the plan's per-second and hourly limits (every batched
+# address counts), the share of both kept for single lookups made while a user
+# waits, retries of a rate-limited request, and how often balances are reconciled
+BLOCKCYPHER_API_TOKEN = os.getenv("BLOCK_CYPHER_API_TOKEN")
+BLOCKCYPHER_BATCH_SIZE = int(os.getenv("BLOCKCYPHER_BATCH_SIZE", "100"))
+BLOCKCYPHER_RATE_LIMIT = float(os.getenv("BLOCKCYPHER_RATE_LIMIT", "3"))  # per second
+BLOCKCYPHER_HOURLY_LIMIT = int(os.getenv("BLOCKCYPHER_HOURLY_LIMIT", "200"))
+BLOCKCYPHER_PRIORITY_SHARE = float(os.getenv("BLOCKCYPHER_PRIORITY_SHARE", "0.2"))
+BLOCKCYPHER_MAX_RETRIES = int(os.getenv("BLOCKCYPHER_MAX_RETRIES", "3"))
+UTXO_RECONCILE_INTERVAL = int(os.getenv("UTXO_RECONCILE_INTERVAL", "900"))  # seconds
+
+# Solana JSON-RPC: the endpoint shared by balance reads and senders, the request
+# timeout, accounts per getMultipleAccounts call (the RPC accepts at most 100)
+# and how long a fetched recent blockhash is reused for new transactions
+SOL_RPC_URL = os.getenv("SOL_RPC_URL", "https://api.mainnet-beta.solana.com")
+SOL_RPC_TIMEOUT = float(os.getenv("SOL_RPC_TIMEOUT", "10"))  # seconds
+SOL_BALANCE_BATCH_SIZE = int(os.getenv("SOL_BALANCE_BATCH_SIZE", "100"))
+SOL_BLOCKHASH_TTL = float(os.getenv("SOL_BLOCKHASH_TTL", "20"))  # seconds
+
 REVIEW_CHANNEL = os.getenv("REVIEW_CHANNEL", "trusted_escrow_bot_reviews")
 CONTACT_SUPPORT = os.getenv("CONTACT_SUPPORT", "trusted_escrow_bot_support")
 TRADING_CHANNEL = os.getenv("TRADING_CHANNEL", "trusted_escrow_bot_trading")
@@ -218,46 +324,5 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# ---------------------------------------------------------------------------
-# Ensure critical MongoDB indexes exist (idempotent)
-# These calls run at import-time, so every process verifies the indexes once.
-# If they already exist, MongoDB is a no-op.
-# ---------------------------------------------------------------------------
-
-
-def _ensure_db_indexes():
-    try:
-        # Trades collection indexes
-        # Use partial unique index for invoice_id to allow multiple null values
-        db.trades.create_index(
-            [("invoice_id", 1)],
-            name="invoice_id_partial_unique",
-            unique=True,
-            background=True,
-            partialFilterExpression={
-                "invoice_id": {"$exists": True, "$type": "string"}
-            },
-        )
-        db.trades.create_index(
-            [("is_active", 1), ("updated_at", -1)],
-            name="active_updated_idx",
-            background=True,
-        )
-        db.trades.create_index([("seller_id", 1)], name="seller_idx", background=True)
-        db.trades.create_index([("buyer_id", 1)], name="buyer_idx", background=True)
-
-        # Users collection indexes (ensure fast look-ups by affiliate etc.)
-        db.users.create_index(
-            [("affiliate_code", 1)],
-            name="affiliate_code_idx",
-            background=True,
-            unique=False,
-        )
-
-        logger.info("MongoDB indexes ensured ✅")
-    except Exception as e:
-        logger.error("Failed to create MongoDB indexes: %s", e)
-
-
-# Invoke immediately
-_ensure_db_indexes()
+# Indexes are managed by versioned migrations (database/migrations.py), applied
+# by entrypoint.sh / `make migrate` rather than on every import.
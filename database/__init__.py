@@ -1 +1,2 @@
+from .numeric import to_decimal, to_decimal128
 from .types import *
@@ -0,0 +1,150 @@
+"""
+Benchmark deposit-check lookups on ``coin_addresses`` with and without indexes.
+
+Seeds a scratch database with synthetic coin addresses at each size, times
+the ``{address, coin_symbol}`` lookup used by balance and deposit checks
+(plus the ``{wallet_id, coin_symbol}`` lookup), then creates the indexes
+declared in ``database.migrations`` and times the same queries again.
+
+Requires a real MongoDB (mongomock has no query planner). The scratch
+collection is reset for each size and the database is dropped at the end.
+
+Usage:
+    python -m database.benchmark_wallet_indexes
+    python -m database.benchmark_wallet_indexes --sizes 10000 100000 --queries 500
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+from pymongo import InsertOne, MongoClient
+
+from database.migrations import get_index_specs
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+COINS = ["BTC", "ETH", "USDT", "LTC", "DOGE", "BNB", "TRX", "SOL"]
+BATCH_SIZE = 10_000
+
+
+def _address(i: int) -> str:
+    return f"0x{i:040x}"
+
+
+def seed(collection, size: int) -> None:
+    """Insert ``size`` coin addresses, one per (wallet, coin) pair"""
+    batch = []
+    for i in range(size):
+        batch.append(
+            InsertOne(
+                {
+                    "_id": f"CA{i}",
+                    "wallet_id": f"W{i // len(COINS)}",
+                    "coin_symbol": COINS[i % len(COINS)],
+                    "address": _address(i),
+                    "balance": "0.0",
+                    "is_default": False,
+                }
+            )
+        )
+        if len(batch) == BATCH_SIZE:
+            collection.bulk_write(batch, ordered=False)
+            batch = []
+    if batch:
+        collection.bulk_write(batch, ordered=False)
+
+
+def time_lookups(collection, filters: list) -> dict:
+    """Run each filter as a find_one and return latency stats in ms"""
+    timings = []
+    for query in filters:
+        start = time.perf_counter()
+        collection.find_one(query)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    plan = collection.find(filters[0]).explain()
+    return {
+        "median_ms": statistics.median(timings),
+        "p95_ms": timings[int(len(timings) * 0.95) - 1],
+        "docs_examined": plan.get("executionStats", {}).get("totalDocsExamined"),
+    }
+
+
+def create_indexes(collection) -> None:
+    """Create the migration-declared coin_addresses indexes"""
+    for spec in get_index_specs()["coin_addresses"]:
+        options = {k: v for k, v in spec.items() if k != "keys"}
+        collection.create_index(spec["keys"], **options)
+
+
+def run(uri: str, db_name: str, sizes: list, queries: int) -> list:
+    """Benchmark each size and return one result row per (size, query, indexed)"""
+    client = MongoClient(uri)
+    db = client[db_name]
+    rows = []
+
+    try:
+        for size in sizes:
+            db.drop_collection("coin_addresses")
+            collection = db.coin_addresses
+            seed(collection, size)
+
+            picks = [random.randrange(size) for _ in range(queries)]
+            lookups = {
+                "address+coin": [
+                    {"address": _address(i), "coin_symbol": COINS[i % len(COINS)]}
+                    for i in picks
+                ],
+                "wallet+coin": [
+                    {
+                        "wallet_id": f"W{i // len(COINS)}",
+                        "coin_symbol": COINS[i % len(COINS)],
+                    }
+                    for i in picks
+                ],
+            }
+
+            for indexed in (False, True):
+                if indexed:
+                    create_indexes(collection)
+                for name, filters in lookups.items():
+                    stats = time_lookups(collection, filters)
+                    rows.append(
+                        {"size": size, "query": name, "indexed": indexed, **stats}
+                    )
+    finally:
+        client.drop_database(db_name)
+        client.close()
+
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark wallet index lookups")
+    parser.add_argument(
+        "--uri", default=os.getenv("DATABASE_URL", "mongodb://localhost:27017")
+    )
+    parser.add_argument("--db", default="escrow_bot_benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'addresses':>10}  {'query':<13} {'indexed':<8} "
+        f"{'median ms':>10} {'p95 ms':>9} {'examined':>9}"
+    )
+    for row in run(args.uri, args.db, args.sizes, args.queries):
+        print(
+            f"{row['size']:>10}  {row['query']:<13} {str(row['indexed']):<8} "
+            f"{row['median_ms']:>10.3f} {row['p95_ms']:>9.3f} "
+            f"{row['docs_examined']!s:>9}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
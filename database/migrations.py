@@ -0,0 +1,563 @@
+"""
+Versioned MongoDB index migrations.
+
+Indexes are declared per collection inside numbered migrations; a migration
+may also name a ``data`` step, run once after its indexes. Applied
+versions are recorded in the ``schema_migrations`` collection, so each
+process only does work when a new version ships. Migrations run as an
+explicit step (entrypoint / ``make migrate``), not at import time.
+
+Before a unique index is built, the collection is checked for documents
+that would violate it. Duplicates are not removed automatically (picking
+the survivor needs a human); the migration stops with a report of the
+clashing documents, and startup fails until they are resolved.
+
+Usage:
+    python -m database.migrations migrate   # apply pending migrations
+    python -m database.migrations status    # list applied / pending versions
+    python -m database.migrations explain   # flag COLLSCANs on known queries
+    python -m database.migrations balances  # convert string balances to Decimal128
+    python -m database.migrations duplicates  # list documents blocking unique indexes
+"""
+
+import argparse
+import logging
+import sys
+from datetime import datetime
+
+from bson.decimal128 import Decimal128
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from database.numeric import to_decimal, to_decimal128
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_COLLECTION = "schema_migrations"
+
+# Duplicate key groups reported per unique index
+DUPLICATE_REPORT_LIMIT = 20
+
+
+class DuplicateKeysError(Exception):
+    """Existing documents would violate a unique index a migration creates
+
+    Attributes:
+        duplicates: [{"collection", "index", "key", "count", "ids"}, ...]
+    """
+
+    def __init__(self, duplicates: list):
+        self.duplicates = duplicates
+        lines = [
+            f"{d['collection']}.{d['index']} {d['key']}: {d['count']} documents "
+            f"{d['ids']}"
+            for d in duplicates
+        ]
+        super().__init__(
+            "Resolve duplicate documents before the unique index can be built:\n"
+            + "\n".join(lines)
+        )
+
+
+# Ordered list of migrations. Never edit a released version; add a new one.
+# Each index spec is {"keys": [(field, direction), ...], "name": str, **options}
+# and "data" optionally names a function in this module taking the db
+MIGRATIONS = [
+    {
+        "version": 1,
+        "description": "Baseline trade, user and dispute indexes",
+        "indexes": {
+            "trades": [
+                {
+                    "keys": [("invoice_id", 1)],
+                    "name": "invoice_id_partial_unique",
+                    "unique": True,
+                    # Partial so the many trades without an invoice don't clash
+                    "partialFilterExpression": {
+                        "invoice_id": {"$exists": True, "$type": "string"}
+                    },
+                },
+                {
+                    "keys": [("is_active", 1), ("updated_at", -1)],
+                    "name": "active_updated_idx",
+                },
+                {"keys": [("seller_id", 1)], "name": "seller_idx"},
+                {"keys": [("buyer_id", 1)], "name": "buyer_idx"},
+                {
+                    "keys": [("seller_id", 1), ("created_at", -1), ("_id", -1)],
+                    "name": "seller_history_idx",
+                },
+                {
+                    "keys": [("buyer_id", 1), ("created_at", -1), ("_id", -1)],
+                    "name": "buyer_history_idx",
+                },
+            ],
+            "users": [
+                {"keys": [("affiliate_code", 1)], "name": "affiliate_code_idx"},
+            ],
+            "disputes": [
+                {"keys": [("trade_id", 1)], "name": "dispute_trade_idx"},
+            ],
+        },
+    },
+    {
+        "version": 2,
+        "description": "Broker, broker rating and community post indexes",
+        "indexes": {
+            "brokers": [
+                {"keys": [("user_id", 1)], "name": "broker_user_idx"},
+                {
+                    "keys": [
+                        ("is_verified", 1),
+                        ("is_active", 1),
+                        ("rating", -1),
+                        ("total_trades", -1),
+                    ],
+                    "name": "broker_verified_rating_idx",
+                },
+            ],
+            "broker_ratings": [
+                {
+                    "keys": [("broker_id", 1), ("created_at", -1)],
+                    "name": "rating_broker_created_idx",
+                },
+            ],
+            "community_posts": [
+                {"keys": [("timestamp", -1)], "name": "post_timestamp_idx"},
+            ],
+        },
+    },
+    {
+        "version": 3,
+        "description": "Wallet, coin address and wallet transaction indexes",
+        "indexes": {
+            "wallets": [
+                {"keys": [("user_id", 1), ("is_active", 1)], "name": "wallet_user_idx"},
+            ],
+            "coin_addresses": [
+                # Deposit checks and balance lookups resolve by on-chain address.
+                # Not unique: the non-web3 fallback derives every wallet from
+                # the same test mnemonic, so addresses repeat across wallets
+                {
+                    "keys": [("address", 1), ("coin_symbol", 1)],
+                    "name": "coin_address_lookup_idx",
+                },
+                # add_coin_to_wallet already allows one address per coin
+                {
+                    "keys": [("wallet_id", 1), ("coin_symbol", 1)],
+                    "name": "coin_wallet_symbol_unique",
+                    "unique": True,
+                },
+            ],
+            "wallet_transactions": [
+                {
+                    "keys": [("wallet_id", 1), ("created_at", -1)],
+                    "name": "wallet_tx_wallet_created_idx",
+                },
+            ],
+        },
+    },
+    {
+        "version": 4,
+        "description": "Pending wallet transaction index for the receipt tracker",
+        "indexes": {
+            "wallet_transactions": [
+                {
+                    "keys": [("status", 1), ("created_at", 1)],
+                    "name": "wallet_tx_status_created_idx",
+                },
+            ],
+        },
+    },
+    {
+        "version": 5,
+        "description": "Partial index over unassigned wallets in the wallet pool",
+        "indexes": {
+            "wallets": [
+                {
+                    "keys": [("is_pooled", 1), ("created_at", 1)],
+                    "name": "wallet_pool_idx",
+                    "partialFilterExpression": {"is_pooled": True},
+                },
+            ],
+        },
+    },
+    {
+        "version": 6,
+        "description": "Decimal128 coin address balances and a balance threshold index",
+        "indexes": {
+            "coin_addresses": [
+                {
+                    "keys": [("coin_symbol", 1), ("balance", -1)],
+                    "name": "coin_balance_idx",
+                },
+            ],
+        },
+        "data": "migrate_numeric_balances",
+    },
+]
+
+# Query shapes the application issues, used by the explain check.
+# Values are placeholders; only the shape matters to the planner.
+KNOWN_QUERIES = [
+    {"collection": "trades", "filter": {"invoice_id": "x"}},
+    {
+        "collection": "trades",
+        "filter": {"$or": [{"seller_id": "x"}, {"buyer_id": "x"}]},
+        "sort": [("created_at", -1), ("_id", -1)],
+    },
+    {
+        "collection": "trades",
+        "filter": {"is_active": True},
+        "sort": [("updated_at", -1)],
+    },
+    {"collection": "users", "filter": {"affiliate_code": "x"}},
+    {"collection": "disputes", "filter": {"trade_id": {"$in": ["x", "y"]}}},
+    {"collection": "brokers", "filter": {"user_id": "x"}},
+    {
+        "collection": "brokers",
+        "filter": {"is_verified": True, "is_active": True},
+        "sort": [("rating", -1), ("total_trades", -1)],
+    },
+    {
+        "collection": "broker_ratings",
+        "filter": {"broker_id": "x"},
+        "sort": [("created_at", -1)],
+    },
+    {
+        "collection": "community_posts",
+        "filter": {"timestamp": {"$gte": datetime(1970, 1, 1)}},
+        "sort": [("timestamp", -1)],
+    },
+    {"collection": "wallets", "filter": {"user_id": "x", "is_active": True}},
+    {
+        "collection": "wallets",
+        "filter": {"is_pooled": True, "user_id": None},
+        "sort": [("created_at", 1)],
+    },
+    {"collection": "coin_addresses", "filter": {"wallet_id": "x", "coin_symbol": "x"}},
+    {"collection": "coin_addresses", "filter": {"address": "x", "coin_symbol": "x"}},
+    {
+        "collection": "coin_addresses",
+        "filter": {"coin_symbol": "x", "balance": {"$gte": Decimal128("0")}},
+        "sort": [("balance", -1)],
+    },
+    {
+        "collection": "wallet_transactions",
+        "filter": {"wallet_id": "x"},
+        "sort": [("created_at", -1)],
+    },
+    {
+        "collection": "wallet_transactions",
+        "filter": {"status": "pending", "tx_hash": {"$nin": [None, ""]}},
+        "sort": [("created_at", 1)],
+    },
+]
+
+
+def _get_db(db=None):
+    if db is not None:
+        return db
+    import config
+
+    return config.db
+
+
+def get_index_specs() -> dict:
+    """Return the full declarative index set, merged across all migrations"""
+    specs = {}
+    for migration in MIGRATIONS:
+        for collection, indexes in migration["indexes"].items():
+            specs.setdefault(collection, []).extend(indexes)
+    return specs
+
+
+def get_applied_versions(db=None) -> set:
+    """Versions already recorded in schema_migrations"""
+    db = _get_db(db)
+    return {doc["_id"] for doc in db[MIGRATIONS_COLLECTION].find({}, {"_id": 1})}
+
+
+def find_duplicates(
+    collection, spec: dict, limit: int = DUPLICATE_REPORT_LIMIT
+) -> list:
+    """
+    Groups of documents sharing a key of a unique index spec (limited to
+    those its partial filter covers).
+
+    Returns:
+        list: {"key": dict, "count": int, "ids": list} per clashing key
+    """
+    fields = [field for field, _ in spec["keys"]]
+    pipeline = [
+        {"$match": spec.get("partialFilterExpression", {})},
+        {
+            "$group": {
+                "_id": {field.replace(".", "_"): f"${field}" for field in fields},
+                "count": {"$sum": 1},
+                "ids": {"$push": "$_id"},
+            }
+        },
+        {"$match": {"count": {"$gt": 1}}},
+        {"$limit": limit},
+    ]
+    return [
+        {"key": group["_id"], "count": group["count"], "ids": group["ids"]}
+        for group in collection.aggregate(pipeline, allowDiskUse=True)
+    ]
+
+
+def check_unique_indexes(migration: dict, db=None) -> list:
+    """Duplicates that would stop a migration's unique indexes from building"""
+    db = _get_db(db)
+    duplicates = []
+    for collection, indexes in migration["indexes"].items():
+        for spec in indexes:
+            if not spec.get("unique"):
+                continue
+            for group in find_duplicates(db[collection], spec):
+                duplicates.append(
+                    {"collection": collection, "index": spec["name"], **group}
+                )
+    return duplicates
+
+
+def apply_migration(migration: dict, db=None) -> None:
+    """
+    Create every index in a migration, run its data step and record its
+    version.
+
+    Raises:
+        DuplicateKeysError: Existing documents violate one of its unique
+            indexes; nothing is created and the version stays pending
+    """
+    db = _get_db(db)
+    duplicates = check_unique_indexes(migration, db)
+    if duplicates:
+        raise DuplicateKeysError(duplicates)
+
+    names = []
+
+    for collection, indexes in migration["indexes"].items():
+        for spec in indexes:
+            options = {k: v for k, v in spec.items() if k != "keys"}
+            db[collection].create_index(spec["keys"], background=True, **options)
+            names.append(f"{collection}.{spec['name']}")
+
+    if migration.get("data"):
+        globals()[migration["data"]](db)
+
+    try:
+        db[MIGRATIONS_COLLECTION].insert_one(
+            {
+                "_id": migration["version"],
+                "description": migration["description"],
+                "indexes": names,
+                "applied_at": datetime.now(),
+            }
+        )
+    except DuplicateKeyError:
+        # Another process applied the same version concurrently
+        pass
+
+    logger.info(f"Applied migration {migration['version']}: {migration['description']}")
+
+
+def run_migrations(db=None) -> list:
+    """
+    Apply all pending migrations in version order.
+
+    Returns:
+        list: Versions applied by this call
+    """
+    db = _get_db(db)
+    applied = get_applied_versions(db)
+    newly_applied = []
+
+    for migration in sorted(MIGRATIONS, key=lambda m: m["version"]):
+        if migration["version"] in applied:
+            continue
+        apply_migration(migration, db)
+        newly_applied.append(migration["version"])
+
+    if newly_applied:
+        logger.info(f"MongoDB migrations applied: {newly_applied} ✅")
+    else:
+        logger.info("MongoDB schema up to date ✅")
+    return newly_applied
+
+
+def migration_status(db=None) -> list:
+    """Return [(version, description, applied)] for every known migration"""
+    applied = get_applied_versions(db)
+    return [
+        (m["version"], m["description"], m["version"] in applied)
+        for m in sorted(MIGRATIONS, key=lambda m: m["version"])
+    ]
+
+
+def pending_duplicates(db=None) -> list:
+    """Duplicates blocking the unique indexes of every pending migration"""
+    db = _get_db(db)
+    applied = get_applied_versions(db)
+    duplicates = []
+    for migration in sorted(MIGRATIONS, key=lambda m: m["version"]):
+        if migration["version"] not in applied:
+            duplicates.extend(check_unique_indexes(migration, db))
+    return duplicates
+
+
+def migrate_numeric_balances(db=None, batch_size: int = 1000) -> dict:
+    """
+    Convert string ``balance`` / ``balance_usd`` fields on coin addresses
+    to Decimal128.
+
+    Documents are streamed and rewritten with one bulk_write per batch.
+    Each update is conditional on the old string still being there, so a
+    balance written concurrently is not overwritten. Safe to re-run.
+
+    Returns:
+        dict: {"converted": int, "invalid": int}
+    """
+    db = _get_db(db)
+    fields = ("balance", "balance_usd")
+    cursor = db.coin_addresses.find(
+        {"$or": [{field: {"$type": "string"}} for field in fields]},
+        {field: 1 for field in fields},
+    ).batch_size(batch_size)
+
+    totals = {"converted": 0, "invalid": 0}
+
+    def flush(batch):
+        operations = []
+        for doc in batch:
+            match, update = {"_id": doc["_id"]}, {}
+            for field in fields:
+                value = doc.get(field)
+                if not isinstance(value, str):
+                    continue
+                number = to_decimal(value)
+                if number is None:
+                    totals["invalid"] += 1
+                    logger.warning(f"Invalid {field} on {doc['_id']}: {value!r}")
+                    number = to_decimal(0)
+                match[field] = value
+                update[field] = to_decimal128(number)
+            if update:
+                operations.append(UpdateOne(match, {"$set": update}))
+        if operations:
+            result = db.coin_addresses.bulk_write(operations, ordered=False)
+            totals["converted"] += result.modified_count
+
+    batch = []
+    for doc in cursor:
+        batch.append(doc)
+        if len(batch) == batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    logger.info(
+        f"Numeric balance migration: {totals['converted']} converted, "
+        f"{totals['invalid']} invalid"
+    )
+    return totals
+
+
+def _plan_stages(plan: dict) -> list:
+    """Flatten an explain plan tree into its list of stage names"""
+    stages = [plan.get("stage")]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages.extend(_plan_stages(plan[key]))
+    for child in plan.get("inputStages", []):
+        stages.extend(_plan_stages(child))
+    return [s for s in stages if s]
+
+
+def explain_known_queries(db=None) -> list:
+    """
+    Explain every query in KNOWN_QUERIES and report its winning plan.
+
+    Returns:
+        list: One dict per query with collection, filter, stages and a
+        ``collscan`` flag set when the planner falls back to a full scan.
+    """
+    db = _get_db(db)
+    results = []
+
+    for query in KNOWN_QUERIES:
+        cursor = db[query["collection"]].find(query["filter"])
+        if query.get("sort"):
+            cursor = cursor.sort(query["sort"])
+
+        plan = cursor.explain().get("queryPlanner", {}).get("winningPlan", {})
+        stages = _plan_stages(plan)
+        results.append(
+            {
+                "collection": query["collection"],
+                "filter": query["filter"],
+                "sort": query.get("sort"),
+                "stages": stages,
+                "collscan": "COLLSCAN" in stages,
+            }
+        )
+
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="MongoDB index migrations")
+    parser.add_argument(
+        "command", choices=["migrate", "status", "explain", "balances", "duplicates"]
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        try:
+            applied = run_migrations()
+        except DuplicateKeysError as e:
+            print(f"Migration failed. {e}", file=sys.stderr)
+            return 1
+        print(f"Applied migrations: {applied or 'none'}")
+        return 0
+
+    if args.command == "duplicates":
+        duplicates = pending_duplicates()
+        for d in duplicates:
+            print(
+                f"{d['collection']}.{d['index']} {d['key']}: "
+                f"{d['count']} documents {d['ids']}"
+            )
+        print(f"{len(duplicates)} duplicate key group(s) block pending migrations")
+        return 1 if duplicates else 0
+
+    if args.command == "balances":
+        totals = migrate_numeric_balances(batch_size=args.batch_size)
+        print(
+            f"Converted {totals['converted']} coin addresses "
+            f"({totals['invalid']} invalid values stored as 0)"
+        )
+        return 0
+
+    if args.command == "status":
+        for version, description, applied in migration_status():
+            mark = "applied" if applied else "pending"
+            print(f"{version:>4}  {mark:<8} {description}")
+        return 0
+
+    collscans = 0
+    for result in explain_known_queries():
+        flag = "COLLSCAN" if result["collscan"] else "ok"
+        collscans += result["collscan"]
+        print(
+            f"{flag:<9} {result['collection']:<20} {result['filter']} "
+            f"sort={result['sort']} stages={result['stages']}"
+        )
+    return 1 if collscans else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
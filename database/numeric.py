@@ -0,0 +1,48 @@
+"""
+Numeric amounts stored in MongoDB.
+
+Coin address balances (and their USD values) are stored as Decimal128, so
+totals and thresholds can be computed server-side with ``$group`` and
+``$match``. Integer base units were ruled out: an ETH balance in wei
+overflows a 64-bit integer above ~9.2 ETH.
+
+Documents written before the switch may still hold strings; ``to_decimal``
+reads either form.
+"""
+
+import decimal
+from decimal import Decimal, InvalidOperation
+from typing import Optional
+
+from bson.decimal128 import Decimal128, create_decimal128_context
+
+_DECIMAL128_CONTEXT = create_decimal128_context()
+
+
+def to_decimal(value, default: Optional[Decimal] = None) -> Optional[Decimal]:
+    """Read a stored amount (Decimal128, string or number) as a Decimal
+
+    Returns:
+        The amount, or ``default`` if it isn't a finite number
+    """
+    if isinstance(value, Decimal128):
+        value = value.to_decimal()
+    try:
+        number = Decimal(str(value))
+    except (InvalidOperation, TypeError, ValueError):
+        return default
+    return number if number.is_finite() else default
+
+
+def to_decimal128(value) -> Decimal128:
+    """Convert an amount to Decimal128 for storage
+
+    Floats go through their shortest repr, so 0.1 is stored as 0.1 rather
+    than its binary expansion. Values are rounded to Decimal128's 34
+    significant digits.
+    """
+    if isinstance(value, Decimal128):
+        return value
+    number = value if isinstance(value, Decimal) else Decimal(str(value))
+    with decimal.localcontext(_DECIMAL128_CONTEXT) as context:
+        return Decimal128(context.create_decimal(number))
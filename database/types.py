@@ -1,3 +1,6 @@
+from bson.decimal128 import Decimal128
+
+
 class UserType:
     _id = str
     name = str
@@ -61,6 +64,19 @@ class TradeType:
     buyer_broker_rating: int  # Buyer's rating of broker (1-5)
     broker_notes: str  # Broker's notes on the trade
 
+    stats_events: list  # Lifecycle events already counted in user_trade_stats
+
+
+class UserTradeStatsType:
+    _id: str  # User ID
+    sales: int  # Trades created as seller
+    purchases: int  # Trades joined as buyer
+    paid: int  # Trades where payment was confirmed
+    completed: int
+    cancelled: int
+    disputed: int
+    updated_at: str
+
 
 class DisputeType:
     _id: str
@@ -91,8 +107,8 @@ class CoinAddressType:
     private_key_encrypted: str  # Encrypted private key for this coin
     derivation_path: str  # HD wallet derivation path
     is_default: bool  # Whether this is a default coin for all wallets
-    balance: str  # Current balance (cached)
-    balance_usd: str  # USD equivalent (cached)
+    balance: Decimal128  # Current balance (cached)
+    balance_usd: Decimal128  # USD equivalent (cached)
     last_balance_update: str  # Last balance update timestamp
     created_at: str  # Creation timestamp
 
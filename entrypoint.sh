@@ -28,6 +28,17 @@ if [ -z "$WEBHOOK_URL" ]; then
   exit 1
 fi
 
+# Apply pending MongoDB index migrations (set RUN_MIGRATIONS=false to skip)
+if [ "${RUN_MIGRATIONS:-true}" = "true" ]; then
+  echo "Applying database migrations..."
+  # A failed migration (e.g. duplicates blocking a unique index) stops startup;
+  # run `python -m database.migrations duplicates` to list the offenders
+  if ! python -m database.migrations migrate; then
+    echo "ERROR: database migrations failed. Exiting."
+    exit 1
+  fi
+fi
+
 # Setup Hypercorn environment variables if not already set
 export HYPERCORN_WORKERS=${HYPERCORN_WORKERS:-1}
 export HYPERCORN_ACCESSLOG=${HYPERCORN_ACCESSLOG:--}
@@ -1,3 +1,4 @@
+from .async_client import AsyncClient, run_blocking
 from .broker import BrokerClient
 from .trade import TradeClient
 from .user import *
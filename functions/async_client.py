@@ -0,0 +1,64 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from config import DB_EXECUTOR_WORKERS
+
+logger = logging.getLogger(__name__)
+
+# Dedicated pool for blocking pymongo/RPC calls made from async handlers.
+# Sized independently of the loop's default executor so a burst of slow
+# queries cannot starve other run_in_executor users.
+_executor = ThreadPoolExecutor(
+    max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db-worker"
+)
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking callable on the data-access pool and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _executor, functools.partial(func, *args, **kwargs)
+    )
+
+
+class AsyncClient:
+    """
+    Async facade over the synchronous data-access clients.
+
+    Wraps TradeClient, UserClient, BrokerClient (or an instance such as
+    ``trades_db``) and exposes the same method surface, except every public
+    method returns an awaitable that runs the original call on a worker thread:
+
+        trade = await AsyncClient(TradeClient).get_trade(trade_id)
+
+    Methods are resolved on the wrapped client at call time, so patches applied
+    to the underlying class are honoured. Methods that are already coroutines
+    are returned untouched. The synchronous clients are not modified, so
+    schedulers, scripts and tests can keep calling them directly.
+    """
+
+    __slots__ = ("_client",)
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._client, name)
+
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        if asyncio.iscoroutinefunction(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def wrapper(*args, **kwargs):
+            return await run_blocking(attr, *args, **kwargs)
+
+        return wrapper
+
+    def __repr__(self) -> str:
+        return f"AsyncClient({self._client!r})"
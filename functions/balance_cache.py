@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+from config import BALANCE_CACHE_ENABLED, BALANCE_CACHE_SIZE, BALANCE_CACHE_TTL
+
+from .async_client import run_blocking
+from .cache import LRUCache
+
+
+class BalanceCache:
+    """
+    On-chain balances keyed by (address, coin symbol), with single-flight fetches.
+
+    Entries remember when they were fetched so each caller can choose how old
+    a balance it will accept (``max_age``); entries older than the cache TTL
+    are dropped regardless. When several callers miss on the same key at
+    once, only the first runs the fetch and the others wait for its result,
+    whether they are coroutines or worker threads.
+
+    Args:
+        max_size: Maximum number of addresses kept
+        ttl: Seconds after which an entry is never served
+        enabled: When False nothing is cached, but fetches are still shared
+    """
+
+    def __init__(
+        self, max_size: int = 10000, ttl: float = 60, enabled: bool = True
+    ) -> None:
+        self._cache = LRUCache(
+            "Balance Cache", max_size=max_size, ttl=ttl, enabled=enabled
+        )
+        self._inflight: dict = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self, address: str, coin_symbol: str, max_age: Optional[float] = None
+    ) -> Optional[float]:
+        """Cached balance no older than ``max_age`` seconds, or None"""
+        entry = self._cache.get((address, coin_symbol))
+        if entry is None:
+            return None
+
+        balance, fetched_at = entry
+        if max_age is not None and time.monotonic() - fetched_at > max_age:
+            return None
+        return balance
+
+    def set(self, address: str, coin_symbol: str, balance: float) -> None:
+        """Record a balance fetched just now"""
+        self._cache.set((address, coin_symbol), (balance, time.monotonic()))
+
+    def invalidate(self, address: str, coin_symbol: str) -> None:
+        """Forget an address, e.g. after funds were moved from it"""
+        self._cache.invalidate((address, coin_symbol))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return {**self._cache.stats(), "in_flight": len(self._inflight)}
+
+    def _claim(self, key: tuple) -> tuple:
+        """Return the in-flight future for key and whether the caller must fill it"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, False
+            future = self._inflight[key] = Future()
+            return future, True
+
+    def _fill(self, key: tuple, future: Future, fetch: Callable[[], float]) -> None:
+        try:
+            balance = fetch()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            return
+
+        self.set(*key, balance)
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_result(balance)
+
+    async def get_or_fetch(
+        self,
+        address: str,
+        coin_symbol: str,
+        fetch: Callable[[], float],
+        max_age: Optional[float] = None,
+    ) -> float:
+        """
+        Cached balance, or the result of the blocking ``fetch`` run on a
+        worker thread. Errors raised by ``fetch`` propagate to every waiter
+        and nothing is cached.
+        """
+        balance = self.get(address, coin_symbol, max_age)
+        if balance is not None:
+            return balance
+
+        key = (address, coin_symbol)
+        future, leader = self._claim(key)
+        if leader:
+            await run_blocking(self._fill, key, future, fetch)
+        return await asyncio.wrap_future(future)
+
+    def get_or_fetch_sync(
+        self,
+        address: str,
+        coin_symbol: str,
+        fetch: Callable[[], float],
+        max_age: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ) -> float:
+        """Blocking counterpart of ``get_or_fetch``; the leader fetches inline"""
+        balance = self.get(address, coin_symbol, max_age)
+        if balance is not None:
+            return balance
+
+        key = (address, coin_symbol)
+        future, leader = self._claim(key)
+        if leader:
+            self._fill(key, future, fetch)
+        return future.result(timeout)
+
+
+balance_cache = BalanceCache(
+    max_size=BALANCE_CACHE_SIZE, ttl=BALANCE_CACHE_TTL, enabled=BALANCE_CACHE_ENABLED
+)
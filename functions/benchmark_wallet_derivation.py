@@ -0,0 +1,111 @@
+"""
+Benchmark HD key derivation for wallet creation and add-coin.
+
+Times creating every default coin address for a fresh wallet, and adding
+one coin to an existing wallet (decrypting its mnemonic first), in two
+modes:
+
+- per-coin: each address is derived from the mnemonic on its own, so the
+  BIP39 seed (2048 PBKDF2 rounds) is recomputed for every coin, as
+  address creation used to work
+- shared: one DerivationContext per operation, so the seed and BIP32
+  master node are derived once
+
+Nothing is written to the database.
+
+Usage:
+    python -m functions.benchmark_wallet_derivation
+    python -m functions.benchmark_wallet_derivation --rounds 50
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+from cryptography.fernet import Fernet
+from mnemonic import Mnemonic
+
+from functions.wallet import DerivationContext, WalletManager
+
+
+def _manager() -> WalletManager:
+    """A WalletManager with a throw-away key, independent of the environment"""
+    manager = WalletManager.__new__(WalletManager)
+    manager.encryption_key = Fernet.generate_key()
+    manager.fernet = Fernet(manager.encryption_key)
+    return manager
+
+
+def create_wallet(manager: WalletManager, mnemonic: str, shared: bool) -> list:
+    """Derive every default coin address for one wallet"""
+    source = DerivationContext(mnemonic) if shared else mnemonic
+    return [
+        manager._create_coin_address("W1", coin_symbol, source)
+        for coin_symbol in WalletManager.DEFAULT_COINS
+    ]
+
+
+def add_coin(manager: WalletManager, encrypted: str, shared: bool) -> dict:
+    """Decrypt a wallet's mnemonic and derive one more coin address"""
+    mnemonic = manager._decrypt_data(encrypted)
+    source = DerivationContext(mnemonic) if shared else mnemonic
+    return manager._create_coin_address("W1", "ETH", source)
+
+
+def time_calls(func, rounds: int) -> dict:
+    """Call ``func`` ``rounds`` times and return latency stats in ms"""
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    return {
+        "median_ms": statistics.median(timings),
+        "p95_ms": timings[max(int(len(timings) * 0.95) - 1, 0)],
+    }
+
+
+def run(rounds: int) -> list:
+    """Benchmark each operation in both modes and return one row per pair"""
+    manager = _manager()
+    mnemonic = Mnemonic("english").generate(strength=128)
+    encrypted = manager._encrypt_data(mnemonic)
+
+    operations = {
+        "create wallet": lambda shared: create_wallet(manager, mnemonic, shared),
+        "add coin": lambda shared: add_coin(manager, encrypted, shared),
+    }
+
+    rows = []
+    for name, operation in operations.items():
+        for shared in (False, True):
+            stats = time_calls(lambda: operation(shared), rounds)
+            rows.append(
+                {
+                    "operation": name,
+                    "mode": "shared" if shared else "per-coin",
+                    **stats,
+                }
+            )
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark wallet key derivation")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    print(f"{'operation':<14} {'mode':<9} {'median ms':>10} {'p95 ms':>9}")
+    for row in run(args.rounds):
+        print(
+            f"{row['operation']:<14} {row['mode']:<9} "
+            f"{row['median_ms']:>10.3f} {row['p95_ms']:>9.3f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """
+    Thread-safe bounded LRU cache with an optional per-entry TTL.
+
+    Values are deep-copied on the way in and out so callers can mutate the
+    documents they receive without corrupting the cached copy. Hit, miss and
+    eviction counters are kept for the admin stats view.
+
+    Read-through callers should take ``generation(key)`` before loading a
+    value and pass it to ``set``. If the key was invalidated in between, the
+    load may predate the write behind the invalidation, and ``set`` drops it
+    instead of caching a stale value.
+
+    Args:
+        name: Label used in logs and stats
+        max_size: Maximum number of entries before the least recently used
+            one is evicted
+        ttl: Seconds an entry stays valid; 0 disables expiry
+        enabled: When False every lookup is a miss and nothing is stored
+    """
+
+    def __init__(
+        self, name: str, max_size: int = 1024, ttl: float = 0, enabled: bool = True
+    ):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.enabled = enabled
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        # key -> counter value at its last invalidation; keys that aren't
+        # tracked (never invalidated, or pruned) share _generation_floor
+        self._generations: OrderedDict = OrderedDict()
+        self._generation_counter = 0
+        self._generation_floor = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a copy of the cached value, or None on a miss"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at and expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(value)
+
+    def generation(self, key: Hashable) -> int:
+        """Token that changes whenever ``key`` is invalidated or the cache
+        cleared"""
+        with self._lock:
+            return self._generations.get(key, self._generation_floor)
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """
+        Store a copy of value under key, evicting the oldest entry if full.
+
+        Args:
+            generation: ``generation(key)`` taken before the value was
+                loaded; the value is not stored if it has changed since
+        """
+        if not self.enabled or value is None:
+            return
+
+        expires_at = time.monotonic() + self.ttl if self.ttl else 0
+        with self._lock:
+            current = self._generations.get(key, self._generation_floor)
+            if generation is not None and generation != current:
+                return
+            self._data[key] = (copy.deepcopy(value), expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry"""
+        with self._lock:
+            self._data.pop(key, None)
+            self._generation_counter += 1
+            self._generations[key] = self._generation_counter
+            self._generations.move_to_end(key)
+            # Pruning raises the floor, which only makes in-flight loads of
+            # untracked keys skip the cache once
+            while len(self._generations) > self.max_size:
+                _, pruned = self._generations.popitem(last=False)
+                self._generation_floor = max(self._generation_floor, pruned)
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._data.clear()
+            self._generation_counter += 1
+            self._generations.clear()
+            self._generation_floor = self._generation_counter
+
+    def reset_stats(self) -> None:
+        """Zero the hit/miss/eviction counters"""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict:
+        """Return cache size and hit-rate metrics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "enabled": self.enabled,
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
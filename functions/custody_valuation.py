@@ -0,0 +1,170 @@
+"""
+USD valuation of every custody balance.
+
+``coin_addresses.balance_usd`` used to stay at its "0.00" default. A
+scheduled job (see main.py) now values all balances in one pass: coin
+addresses are streamed through a single projected cursor and each batch is
+converted with Decimal arithmetic against one price snapshot from the
+price oracle. Changed values are written back with one ``bulk_write`` per
+batch. The pass also produces per-coin and per-wallet totals, kept on the
+valuation for the admin views, so those never price rows one by one.
+
+Addresses whose coin has no price are skipped and keep their previous
+``balance_usd``.
+"""
+
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, List, Optional
+
+from pymongo import UpdateOne
+
+from config import CUSTODY_VALUATION_BATCH_SIZE, db
+from database.numeric import to_decimal, to_decimal128
+
+from .async_client import run_blocking
+from .price_oracle import price_oracle
+from .wallet import WalletManager
+
+logger = logging.getLogger(__name__)
+
+CENT = Decimal("0.01")
+
+
+def usd_values(
+    balances: List, symbols: List[str], prices: Dict[str, Decimal]
+) -> List[Optional[Decimal]]:
+    """
+    Value a batch of balances against one price snapshot.
+
+    Args:
+        balances: Stored balances (Decimal128, strings or numbers)
+        symbols: Coin symbol of each balance
+        prices: Symbol -> USD price
+
+    Returns:
+        list: USD value of each balance rounded to cents, None where the
+            balance isn't a number or the coin has no price
+    """
+    values = []
+    for balance, symbol in zip(balances, symbols):
+        amount = to_decimal(balance)
+        price = prices.get(symbol)
+        if amount is None or price is None:
+            values.append(None)
+        else:
+            values.append((amount * price).quantize(CENT, rounding=ROUND_HALF_UP))
+    return values
+
+
+class CustodyValuation:
+    """
+    Values every custody balance in USD and keeps the latest totals.
+
+    Args:
+        batch_size: Coin addresses valued and written per batch
+    """
+
+    def __init__(self, batch_size: int = CUSTODY_VALUATION_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.last: Optional[dict] = None
+        self._lock = threading.Lock()
+
+    def run(self) -> Optional[dict]:
+        """
+        Value every coin address and store its ``balance_usd`` (blocking).
+
+        Returns:
+            dict: {"addresses", "updated", "unpriced", "total_usd",
+                "coins": {symbol: {"balance", "usd", "addresses"}},
+                "wallets": {wallet_id: usd}, "valued_at"}, with amounts as
+                Decimal; None when no prices are available
+        """
+        with self._lock:
+            snapshot = price_oracle.get_prices(WalletManager.SUPPORTED_COINS)
+            if not snapshot:
+                logger.warning("Custody valuation skipped: no prices available")
+                return None
+            prices = {s: Decimal(str(p)) for s, p in snapshot.items()}
+
+            cursor = db.coin_addresses.find(
+                {}, {"wallet_id": 1, "coin_symbol": 1, "balance": 1, "balance_usd": 1}
+            ).batch_size(self.batch_size)
+
+            coins = defaultdict(
+                lambda: {"balance": Decimal(0), "usd": Decimal(0), "addresses": 0}
+            )
+            wallets = defaultdict(Decimal)
+            counts = {"addresses": 0, "updated": 0, "unpriced": 0}
+            valued_at = datetime.now()
+
+            def flush(batch):
+                values = usd_values(
+                    [doc.get("balance", 0) for doc in batch],
+                    [doc.get("coin_symbol") for doc in batch],
+                    prices,
+                )
+                operations = []
+                for doc, value in zip(batch, values):
+                    counts["addresses"] += 1
+                    if value is None:
+                        counts["unpriced"] += 1
+                        continue
+
+                    coin = coins[doc["coin_symbol"]]
+                    coin["balance"] += to_decimal(doc.get("balance", 0))
+                    coin["usd"] += value
+                    coin["addresses"] += 1
+                    wallets[doc.get("wallet_id")] += value
+
+                    if to_decimal(doc.get("balance_usd")) != value:
+                        operations.append(
+                            UpdateOne(
+                                {"_id": doc["_id"]},
+                                {
+                                    "$set": {
+                                        "balance_usd": to_decimal128(value),
+                                        "balance_usd_updated_at": valued_at.isoformat(),
+                                    }
+                                },
+                            )
+                        )
+                if operations:
+                    db.coin_addresses.bulk_write(operations, ordered=False)
+                    counts["updated"] += len(operations)
+
+            batch = []
+            for doc in cursor:
+                batch.append(doc)
+                if len(batch) == self.batch_size:
+                    flush(batch)
+                    batch = []
+            if batch:
+                flush(batch)
+
+            self.last = {
+                **counts,
+                "total_usd": sum((c["usd"] for c in coins.values()), Decimal(0)),
+                "coins": dict(coins),
+                "wallets": dict(wallets),
+                "valued_at": valued_at,
+            }
+            logger.info(
+                f"Custody valuation: {counts['addresses']} addresses, "
+                f"{counts['updated']} updated, {counts['unpriced']} unpriced, "
+                f"${self.last['total_usd']:,.2f} total"
+            )
+            return self.last
+
+    async def tick(self) -> None:
+        """Scheduled valuation (see main.py)"""
+        try:
+            await run_blocking(self.run)
+        except Exception as e:
+            logger.error(f"Custody valuation failed: {e}")
+
+
+custody_valuation = CustodyValuation()
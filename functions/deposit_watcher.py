@@ -0,0 +1,365 @@
+"""
+Background deposit watcher.
+
+Tracks the receiving address of every wallet trade still waiting for the
+seller's deposit and confirms the deposit as soon as it lands, instead of
+waiting for the seller to press "check deposit".
+
+Ethereum (ETH, USDT) is followed block by block, ``DEPOSIT_CONFIRMATIONS``
+behind the head, and balances are read at that confirmed block with batched
+multicalls:
+
+- USDT addresses are only re-read when an ERC-20 ``Transfer`` log to them
+  shows up in the new blocks.
+- ETH addresses are re-read on every new block, because ETH can arrive
+  through internal transactions that leave no log. The same applies to
+  the gas address of a USDT trade whose token deposit is already complete.
+
+BTC, LTC and DOGE addresses are polled with one batched BlockCypher request
+per chain and tick, and SOL addresses with ``getMultipleAccounts`` calls of
+up to ``SOL_BALANCE_BATCH_SIZE`` addresses. The balances are shared with
+manual checks through the balance cache. Any other chain goes through
+``WalletManager.get_balance``.
+
+A funded trade goes through ``TradeClient.mark_deposited``, which records
+the deposit and the "deposited" status in one conditional transition. The
+watcher and a manual check can therefore race safely; the watcher only
+notifies the seller when its own transition wins.
+"""
+
+import asyncio
+import functools
+import logging
+from datetime import datetime
+from typing import Callable, Optional
+
+from config import (
+    DEPOSIT_BALANCE_MAX_AGE,
+    DEPOSIT_CONFIRMATIONS,
+    DEPOSIT_LOG_BLOCK_RANGE,
+    db,
+)
+from database.types import TradeType
+
+from .async_client import run_blocking
+from .balance_cache import balance_cache
+from .evm_balances import read_balances
+from .solana_rpc import get_solana_rpc
+from .trade import TradeClient
+from .trade_state import OPEN_STATUSES
+from .utxo_balances import BLOCKCYPHER_CHAINS, blockcypher
+from .wallet import WalletManager
+
+logger = logging.getLogger(__name__)
+
+# keccak("Transfer(address,address,uint256)")
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+
+EVM_CURRENCIES = ("ETH", "USDT")
+
+# Recipient topics per eth_getLogs request
+LOG_TOPIC_BATCH = 100
+
+
+class DepositWatcher:
+    """
+    Confirms wallet-trade deposits in the background.
+
+    Call ``tick()`` periodically (see main.py); ticks must not overlap.
+
+    Args:
+        bot: Telegram bot used to notify sellers (optional)
+        confirmations: Blocks a deposit must be buried under before it counts
+        max_log_range: Largest block range searched for Transfer logs in one
+            tick; after a longer gap every watched address is simply re-read
+    """
+
+    def __init__(
+        self,
+        bot=None,
+        confirmations: int = DEPOSIT_CONFIRMATIONS,
+        max_log_range: int = DEPOSIT_LOG_BLOCK_RANGE,
+    ):
+        self.bot = bot
+        self.confirmations = confirmations
+        self.max_log_range = max_log_range
+        self.last_block: Optional[int] = None
+        self._watches: dict = {}
+
+    async def tick(self) -> dict:
+        """
+        Run one watch cycle.
+
+        Returns:
+            dict: {"watched": int, "confirmed": int}
+        """
+        try:
+            new_ids = await run_blocking(self._refresh_watches)
+            watches = list(self._watches.values())
+
+            evm = [w for w in watches if w["currency"] in EVM_CURRENCIES]
+            others = [w for w in watches if w["currency"] not in EVM_CURRENCIES]
+            if evm:
+                await run_blocking(self._scan_evm, evm, new_ids)
+            if others:
+                await self._poll_balances(others)
+
+            confirmed = 0
+            for watch in watches:
+                if not self._is_funded(watch):
+                    continue
+                trade = await run_blocking(self._confirm, watch)
+                if trade:
+                    confirmed += 1
+                    await self._notify(trade)
+
+            if confirmed:
+                logger.info(f"Deposit watcher confirmed {confirmed} deposit(s)")
+            return {"watched": len(watches), "confirmed": confirmed}
+
+        except Exception as e:
+            logger.error(f"Deposit watcher tick failed: {e}")
+            return {"watched": len(self._watches), "confirmed": 0, "error": str(e)}
+
+    def _refresh_watches(self) -> set:
+        """Sync the watch list with the trades awaiting a deposit; return new ids"""
+        trades = db.trades.find(
+            {
+                "receiving_address": {"$nin": [None, ""]},
+                "is_crypto_deposited": {"$ne": True},
+                "is_cancelled": {"$ne": True},
+                "status": {"$in": list(OPEN_STATUSES)},
+            }
+        )
+
+        now = datetime.now()
+        watches, new_ids = {}, set()
+        for trade in trades:
+            watch = self._watches.get(trade["_id"])
+            # A re-quoted trade may expect a different amount
+            if watch is None or watch["quote_expires_at"] <= now:
+                watch = self._new_watch(trade)
+                new_ids.add(trade["_id"])
+            if watch:
+                watches[trade["_id"]] = watch
+
+        self._watches = watches
+        return new_ids
+
+    @staticmethod
+    def _new_watch(trade: TradeType) -> Optional[dict]:
+        """Deposit requirements from the trade's fee quote, as the manual check uses"""
+        currency = trade.get("currency")
+        fee_data = TradeClient.get_fee_quote(trade)
+        if not fee_data or fee_data["total_deposit_required"] <= 0:
+            return None
+
+        watch = {
+            "trade_id": trade["_id"],
+            "currency": currency,
+            "address": trade["receiving_address"],
+            "expected": fee_data["total_deposit_required"],
+            "balance": None,
+            "gas_address": None,
+            "gas_required": 0.0,
+            "gas_balance": None,
+            "quote_expires_at": fee_data["expires_at"],
+        }
+
+        # USDT payouts are paid for with ETH from the seller's wallet
+        if currency == "USDT" and trade.get("seller_wallet_id"):
+            eth_address = WalletManager.get_wallet_coin_address(
+                trade["seller_wallet_id"], "ETH"
+            )
+            if eth_address:
+                watch["gas_address"] = eth_address["address"]
+                watch["gas_required"] = fee_data["total_gas_fees"]
+
+        return watch
+
+    @staticmethod
+    def _is_funded(watch: dict) -> bool:
+        if watch["balance"] is None or watch["balance"] < watch["expected"]:
+            return False
+        if watch["gas_address"]:
+            return (
+                watch["gas_balance"] is not None
+                and watch["gas_balance"] >= watch["gas_required"]
+            )
+        return True
+
+    def _scan_evm(self, watches: list, new_ids: set) -> None:
+        """Read the balances that may have changed since the last scanned block"""
+        registry = WalletManager._get_eth_registry(WalletManager.SUPPORTED_COINS["ETH"])
+        safe_block = registry.call(lambda web3: web3.eth.block_number)
+        safe_block -= self.confirmations
+
+        new_block = self.last_block is None or safe_block > self.last_block
+        rescan_all = (
+            self.last_block is None or safe_block - self.last_block > self.max_log_range
+        )
+
+        token_hits = set()
+        usdt = WalletManager.SUPPORTED_COINS["USDT"]
+        if new_block and not rescan_all:
+            token_hits = self._token_recipients(
+                registry,
+                usdt["contract_address"],
+                [w["address"] for w in watches if w["currency"] == "USDT"],
+                self.last_block + 1,
+                safe_block,
+            )
+
+        # (watch, field, address, coin) for every balance to re-read
+        reads = []
+        for watch in watches:
+            fresh = rescan_all or watch["trade_id"] in new_ids
+            if watch["currency"] == "ETH":
+                if fresh or new_block:
+                    reads.append((watch, "balance", watch["address"], "ETH"))
+                continue
+
+            hit = fresh or watch["address"].lower() in token_hits
+            if hit:
+                reads.append((watch, "balance", watch["address"], "USDT"))
+            token_met = watch["balance"] is not None and (
+                watch["balance"] >= watch["expected"]
+            )
+            if watch["gas_address"] and (hit or (new_block and token_met)):
+                reads.append((watch, "gas_balance", watch["gas_address"], "ETH"))
+
+        if reads:
+            queries = [
+                (address, usdt["contract_address"] if coin == "USDT" else None)
+                for _, _, address, coin in reads
+            ]
+            raw_balances = read_balances(registry, queries, block_identifier=safe_block)
+            for (watch, field, address, coin), raw in zip(reads, raw_balances):
+                if raw is None:
+                    continue
+                balance = raw / 10 ** WalletManager.SUPPORTED_COINS[coin]["decimals"]
+                watch[field] = balance
+                balance_cache.set(address, coin, balance)
+
+        if new_block:
+            self.last_block = safe_block
+
+    @staticmethod
+    def _token_recipients(
+        registry, token_address: str, addresses: list, from_block: int, to_block: int
+    ) -> set:
+        """Lower-cased watched addresses that received the token in the range"""
+        from web3 import Web3
+
+        recipients = {"0x" + "0" * 24 + a[2:].lower(): a.lower() for a in addresses}
+        topics = list(recipients)
+        token = Web3.to_checksum_address(token_address)
+
+        hits = set()
+        for start in range(0, len(topics), LOG_TOPIC_BATCH):
+            log_filter = {
+                "fromBlock": from_block,
+                "toBlock": to_block,
+                "address": token,
+                "topics": [
+                    TRANSFER_TOPIC,
+                    None,
+                    topics[start : start + LOG_TOPIC_BATCH],
+                ],
+            }
+            logs = registry.call(lambda web3: web3.eth.get_logs(log_filter))
+            for log in logs:
+                hits.add(recipients.get(Web3.to_hex(log["topics"][2]).lower()))
+
+        hits.discard(None)
+        return hits
+
+    async def _poll_balances(self, watches: list) -> None:
+        """
+        Poll non-EVM deposit addresses, with one batched request per chain
+        for BTC, LTC, DOGE and SOL. Balances read within
+        ``DEPOSIT_BALANCE_MAX_AGE`` are reused from the balance cache, and
+        fresh ones are written back to it.
+        """
+        by_currency: dict = {}
+        for watch in watches:
+            cached = balance_cache.get(
+                watch["address"], watch["currency"], max_age=DEPOSIT_BALANCE_MAX_AGE
+            )
+            if cached is not None:
+                watch["balance"] = cached
+            else:
+                by_currency.setdefault(watch["currency"], []).append(watch)
+
+        singles = []
+        for currency, group in by_currency.items():
+            read_batch = self._batch_reader(currency)
+            if read_batch is None:
+                singles.extend(group)
+                continue
+            try:
+                balances = await run_blocking(read_batch, [w["address"] for w in group])
+            except Exception as e:
+                logger.error(f"Deposit watcher {currency} balance poll failed: {e}")
+                continue
+            for watch in group:
+                balance = balances.get(watch["address"])
+                if balance is not None:
+                    watch["balance"] = balance
+                    balance_cache.set(watch["address"], currency, balance)
+
+        if singles:
+            wallet_manager = WalletManager()
+            balances = await asyncio.gather(
+                *(
+                    wallet_manager.get_balance(
+                        watch["address"],
+                        watch["currency"],
+                        max_age=DEPOSIT_BALANCE_MAX_AGE,
+                    )
+                    for watch in singles
+                )
+            )
+            for watch, balance in zip(singles, balances):
+                watch["balance"] = balance
+
+    @staticmethod
+    def _batch_reader(currency: str) -> Optional[Callable[[list], dict]]:
+        """Blocking lookup of many balances of ``currency``, if it has one"""
+        if currency in BLOCKCYPHER_CHAINS:
+            return functools.partial(blockcypher.get_balances, currency)
+        if currency == "SOL":
+            rpc_url = WalletManager.SUPPORTED_COINS["SOL"]["rpc_url"]
+            return get_solana_rpc(rpc_url).get_sol_balances
+        return None
+
+    def _confirm(self, watch: dict) -> Optional[TradeType]:
+        """Record the deposit; returns the trade only if this call moved it"""
+        trade_id = watch["trade_id"]
+        self._watches.pop(trade_id, None)
+        trade = TradeClient.mark_deposited(trade_id)
+        if trade:
+            logger.info(
+                f"Deposit for trade {trade_id} confirmed automatically "
+                f"({watch['balance']} {watch['currency']})"
+            )
+        return trade
+
+    async def _notify(self, trade: TradeType) -> None:
+        if not self.bot:
+            return
+
+        from utils.messages import Messages
+
+        try:
+            await self.bot.send_message(
+                chat_id=int(trade["seller_id"]),
+                text=Messages.deposit_confirmed_seller(trade),
+                parse_mode="HTML",
+                reply_markup=Messages.deposit_confirmed_seller_keyboard(trade),
+            )
+        except Exception as e:
+            logger.error(f"Could not notify seller of trade {trade['_id']}: {e}")
+
+    def stats(self) -> dict:
+        return {"watched": len(self._watches), "last_block": self.last_block}
@@ -0,0 +1,202 @@
+"""
+Batched ETH and ERC-20 balance reads through Multicall3.
+
+Instead of one ``eth_getBalance``/``balanceOf`` round trip per address,
+balances are packed into Multicall3 ``aggregate3`` calls of up to
+``EVM_BALANCE_BATCH_SIZE`` entries each, so a batch of ETH and token
+balances costs a single ``eth_call``. Each entry is allowed to fail on its
+own; a failed entry comes back as None rather than failing the batch.
+
+Contract objects are built once per (Web3 instance, contract address) and
+reused, which pairs with the long-lived instances kept by
+``functions.web3_providers``.
+"""
+
+import logging
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+from config import EVM_BALANCE_BATCH_SIZE
+
+try:
+    from web3 import Web3
+
+    WEB3_AVAILABLE = True
+except ImportError:
+    WEB3_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Deployed at the same address on Ethereum mainnet and most EVM chains
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"name": "target", "type": "address"},
+                    {"name": "allowFailure", "type": "bool"},
+                    {"name": "callData", "type": "bytes"},
+                ],
+                "name": "calls",
+                "type": "tuple[]",
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"name": "success", "type": "bool"},
+                    {"name": "returnData", "type": "bytes"},
+                ],
+                "name": "returnData",
+                "type": "tuple[]",
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function",
+    },
+    {
+        "inputs": [{"name": "addr", "type": "address"}],
+        "name": "getEthBalance",
+        "outputs": [{"name": "balance", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function",
+    },
+]
+
+# The ERC-20 subset used for balances and transfers
+ERC20_ABI = [
+    {
+        "constant": True,
+        "inputs": [{"name": "_owner", "type": "address"}],
+        "name": "balanceOf",
+        "outputs": [{"name": "balance", "type": "uint256"}],
+        "payable": False,
+        "stateMutability": "view",
+        "type": "function",
+    },
+    {
+        "constant": False,
+        "inputs": [
+            {"name": "_to", "type": "address"},
+            {"name": "_value", "type": "uint256"},
+        ],
+        "name": "transfer",
+        "outputs": [{"name": "", "type": "bool"}],
+        "payable": False,
+        "stateMutability": "nonpayable",
+        "type": "function",
+    },
+    {
+        "constant": True,
+        "inputs": [],
+        "name": "decimals",
+        "outputs": [{"name": "", "type": "uint8"}],
+        "payable": False,
+        "stateMutability": "view",
+        "type": "function",
+    },
+]
+
+
+@lru_cache(maxsize=64)
+def token_contract(web3, token_address: str):
+    """ERC-20 contract object for ``token_address``, built once per Web3 instance"""
+    return web3.eth.contract(
+        address=Web3.to_checksum_address(token_address), abi=ERC20_ABI
+    )
+
+
+@lru_cache(maxsize=16)
+def multicall_contract(web3):
+    """Multicall3 contract object, built once per Web3 instance"""
+    return web3.eth.contract(address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI)
+
+
+def _decode_uint(success: bool, data: bytes) -> Optional[int]:
+    if not success or len(data) < 32:
+        return None
+    return int.from_bytes(data[:32], "big")
+
+
+def read_balances_chunk(
+    web3, queries: List[Tuple[str, Optional[str]]], block_identifier="latest"
+) -> list:
+    """
+    Read up to one batch of balances with a single ``aggregate3`` call.
+
+    Args:
+        web3: Web3 instance to call through
+        queries: (owner address, token contract address or None for ETH)
+        block_identifier: Block to read the balances at
+
+    Returns:
+        Raw balances (wei or token base units) in query order; None for
+        invalid addresses and for entries whose call failed
+    """
+    multicall = multicall_contract(web3)
+    calls, positions = [], []
+
+    for i, (owner, token_address) in enumerate(queries):
+        if not Web3.is_address(owner):
+            continue
+        owner = Web3.to_checksum_address(owner)
+        if token_address:
+            target = token_contract(web3, token_address)
+            call_data = target.encode_abi("balanceOf", args=[owner])
+        else:
+            target = multicall
+            call_data = multicall.encode_abi("getEthBalance", args=[owner])
+        calls.append((target.address, True, Web3.to_bytes(hexstr=call_data)))
+        positions.append(i)
+
+    balances = [None] * len(queries)
+    if not calls:
+        return balances
+
+    results = multicall.functions.aggregate3(calls).call(
+        block_identifier=block_identifier
+    )
+    for i, (success, data) in zip(positions, results):
+        balances[i] = _decode_uint(success, data)
+    return balances
+
+
+def read_balances(
+    registry,
+    queries: Iterable[Tuple[str, Optional[str]]],
+    batch_size: int = EVM_BALANCE_BATCH_SIZE,
+    block_identifier="latest",
+) -> list:
+    """
+    Read ETH and ERC-20 balances for many addresses in as few RPC calls as
+    possible, failing over between providers per batch.
+
+    Args:
+        registry: ``Web3ProviderRegistry`` for the network
+        queries: (owner address, token contract address or None for ETH)
+        batch_size: Maximum entries per ``aggregate3`` call
+        block_identifier: Block to read the balances at
+
+    Returns:
+        Raw balances in query order, None where a balance couldn't be read
+
+    Raises:
+        The provider error if a whole batch could not be sent
+    """
+    queries = list(queries)
+    balances = []
+    for start in range(0, len(queries), batch_size):
+        chunk = queries[start : start + batch_size]
+        balances.extend(
+            registry.call(
+                lambda web3: read_balances_chunk(web3, chunk, block_identifier)
+            )
+        )
+    logger.debug(
+        f"Read {len(queries)} EVM balances in "
+        f"{-(-len(queries) // batch_size)} multicall batch(es)"
+    )
+    return balances
@@ -0,0 +1,192 @@
+"""
+Cached EIP-1559 gas price oracle.
+
+Fee quotes used to cost an ``eth_gasPrice`` round trip every time a deposit
+screen was rendered or checked. The oracle instead keeps one snapshot of
+the next block's base fee and of the priority fees recently paid, built
+from ``eth_feeHistory`` over the last ``GAS_ORACLE_BLOCKS`` blocks and
+refreshed by a scheduled job (see main.py). Quotes are served from that
+snapshot while it is younger than ``GAS_ORACLE_MAX_AGE``; an older one is
+refreshed inline once, and if that fails callers get None and fall back to
+their conservative defaults.
+
+Priority fees come in three tiers, the median over the sampled blocks of
+each block's 10th, 50th and 90th reward percentile.
+"""
+
+import logging
+import statistics
+import threading
+import time
+from typing import Optional
+
+from config import GAS_ORACLE_BLOCKS, GAS_ORACLE_MAX_AGE, GAS_ORACLE_RETRY_DELAY
+
+from .async_client import run_blocking
+
+logger = logging.getLogger(__name__)
+
+# Tier -> reward percentile requested from eth_feeHistory
+TIERS = {"slow": 10, "normal": 50, "fast": 90}
+
+GWEI = 10**9
+
+
+class GasOracle:
+    """
+    In-memory EIP-1559 fee snapshot for Ethereum mainnet.
+
+    Args:
+        registry_factory: Returns the provider registry to query; defaults
+            to the shared Ethereum registry
+        blocks: Number of recent blocks sampled per refresh
+        max_age: Seconds a snapshot may be served without refreshing
+        retry_delay: Minimum seconds between inline refresh attempts, so an
+            unreachable node isn't retried on every quote
+    """
+
+    def __init__(
+        self,
+        registry_factory=None,
+        blocks: int = GAS_ORACLE_BLOCKS,
+        max_age: float = GAS_ORACLE_MAX_AGE,
+        retry_delay: float = GAS_ORACLE_RETRY_DELAY,
+    ):
+        self._registry_factory = registry_factory
+        self.blocks = blocks
+        self.max_age = max_age
+        self.retry_delay = retry_delay
+        self._snapshot: Optional[dict] = None
+        self._last_attempt: Optional[float] = None
+        self._lock = threading.Lock()
+        self.refreshes = 0
+        self.failures = 0
+
+    def _registry(self):
+        if self._registry_factory:
+            return self._registry_factory()
+        from functions.wallet import WalletManager
+
+        return WalletManager._get_eth_registry(WalletManager.SUPPORTED_COINS["ETH"])
+
+    def refresh(self) -> Optional[dict]:
+        """
+        Fetch fee history and replace the snapshot.
+
+        Concurrent callers wait for the refresh already running instead of
+        sending their own request.
+
+        Returns:
+            The new snapshot, or None if the request failed (the previous
+            snapshot is kept)
+        """
+        requested_at = time.monotonic()
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot and snapshot["fetched_at"] >= requested_at:
+                return snapshot
+
+            self._last_attempt = time.monotonic()
+            try:
+                history = self._registry().call(
+                    lambda web3: web3.eth.fee_history(
+                        self.blocks, "latest", list(TIERS.values())
+                    )
+                )
+                self._snapshot = self._snapshot_from(history)
+                self.refreshes += 1
+                return self._snapshot
+            except Exception as e:
+                self.failures += 1
+                logger.warning(f"Could not refresh gas fee history: {e}")
+                return None
+
+    @staticmethod
+    def _snapshot_from(history) -> dict:
+        """Reduce an ``eth_feeHistory`` response to base fee and tier tips"""
+        # baseFeePerGas has one more entry than the range: the next block's
+        base_fee = int(history["baseFeePerGas"][-1])
+        rewards = [block for block in history.get("reward") or [] if block]
+
+        priority_fees = {}
+        for i, tier in enumerate(TIERS):
+            samples = [int(block[i]) for block in rewards]
+            priority_fees[tier] = int(statistics.median(samples)) if samples else 0
+
+        return {
+            "base_fee": base_fee,
+            "priority_fees": priority_fees,
+            "block": int(history["oldestBlock"]) + len(history["gasUsedRatio"]) - 1,
+            "fetched_at": time.monotonic(),
+        }
+
+    def quote(
+        self, tier: str = "normal", max_age: Optional[float] = None
+    ) -> Optional[dict]:
+        """
+        Fee quote for the next block.
+
+        Args:
+            tier: "slow", "normal" or "fast"
+            max_age: Oldest snapshot accepted, in seconds (defaults to the
+                oracle's ``max_age``)
+
+        Returns:
+            dict: {"tier", "base_fee", "max_priority_fee_per_gas",
+                "max_fee_per_gas", "gas_price", "age"}, all fees in wei;
+                ``gas_price`` is the expected effective price (base fee plus
+                tip) and ``max_fee_per_gas`` allows the base fee to double.
+                None when no snapshot fresh enough could be obtained.
+        """
+        if tier not in TIERS:
+            raise ValueError(f"Unknown gas tier: {tier}")
+        max_age = self.max_age if max_age is None else max_age
+
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - snapshot["fetched_at"] > max_age:
+            retry_due = (
+                self._last_attempt is None
+                or time.monotonic() - self._last_attempt >= self.retry_delay
+            )
+            snapshot = self.refresh() if retry_due else None
+            if snapshot is None:
+                return None
+
+        base_fee = snapshot["base_fee"]
+        priority_fee = snapshot["priority_fees"][tier]
+        return {
+            "tier": tier,
+            "base_fee": base_fee,
+            "max_priority_fee_per_gas": priority_fee,
+            "max_fee_per_gas": 2 * base_fee + priority_fee,
+            "gas_price": base_fee + priority_fee,
+            "age": time.monotonic() - snapshot["fetched_at"],
+        }
+
+    async def tick(self) -> None:
+        """Scheduled refresh (see main.py)"""
+        await run_blocking(self.refresh)
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        stats = {
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "block": None,
+            "age": None,
+            "base_fee_gwei": None,
+            "priority_fees_gwei": {},
+        }
+        if snapshot:
+            stats.update(
+                block=snapshot["block"],
+                age=time.monotonic() - snapshot["fetched_at"],
+                base_fee_gwei=snapshot["base_fee"] / GWEI,
+                priority_fees_gwei={
+                    tier: fee / GWEI for tier, fee in snapshot["priority_fees"].items()
+                },
+            )
+        return stats
+
+
+gas_oracle = GasOracle()
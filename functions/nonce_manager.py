@@ -0,0 +1,96 @@
+"""
+Per-address nonce allocation for outbound Ethereum transactions.
+
+Reading ``eth_getTransactionCount`` before every send is a round trip, and
+it hands out the same nonce to two sends from one hot wallet when the
+first is still in flight (or has only reached another provider's mempool).
+The manager keeps the next nonce per sending address in memory, so sends
+can be broadcast back to back without waiting for receipts. The counter is
+re-read from the node's pending count every ``NONCE_RESYNC_INTERVAL``
+seconds, and after any failed send, so transactions made outside the bot
+are picked up.
+
+A node reporting a pending count below the counter usually just hasn't seen
+the latest sends yet, so a resync only moves the counter back once no nonce
+has been handed out for a full resync interval. By then every earlier
+broadcast should be in the node's pool; a lower count means a transaction
+went missing, and keeping the counter ahead would stall every later payout
+behind the gap. ``reset()`` forgets the counter outright, for failed
+broadcasts and transactions the receipt tracker finds dropped.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from config import NONCE_RESYNC_INTERVAL
+
+
+class NonceManager:
+    """
+    Hands out consecutive nonces per sending address.
+
+    Args:
+        resync_interval: Seconds after which the counter is checked against
+            the node's pending transaction count again
+    """
+
+    def __init__(self, resync_interval: float = NONCE_RESYNC_INTERVAL):
+        self.resync_interval = resync_interval
+        self._next: dict = {}  # address -> (next nonce, synced_at, used_at)
+        self._locks: dict = {}
+        self._guard = threading.Lock()
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    @contextmanager
+    def reserve(self, web3, address: str):
+        """
+        Hold the next nonce for ``address`` while a transaction is signed and
+        broadcast.
+
+        Sends from the same address are serialized for the duration of the
+        block only, which doesn't include waiting for a receipt. The nonce is
+        consumed when the block exits cleanly. After an error the counter is
+        dropped and re-read next time, since a failed broadcast may still
+        have reached the mempool.
+
+        On a resync the node's pending count wins if it is higher, or if it
+        is lower and no nonce was used for ``resync_interval`` seconds.
+
+        Yields:
+            int: Nonce to sign the transaction with
+        """
+        key = address.lower()
+        with self._lock_for(key):
+            nonce, synced_at, used_at = self._next.get(key, (None, None, None))
+            now = time.monotonic()
+            if nonce is None or now - synced_at >= self.resync_interval:
+                pending = web3.eth.get_transaction_count(address, "pending")
+                quiet = used_at is None or now - used_at >= self.resync_interval
+                if nonce is None or pending > nonce or quiet:
+                    nonce = pending
+                synced_at = now
+
+            try:
+                yield nonce
+            except BaseException:
+                self._next.pop(key, None)
+                raise
+            self._next[key] = (nonce + 1, synced_at, time.monotonic())
+
+    def reset(self, address: str | None = None) -> None:
+        """Forget the counter for ``address``, or for every address"""
+        with self._guard:
+            if address is None:
+                self._next.clear()
+            else:
+                self._next.pop(address.lower(), None)
+
+    def stats(self) -> dict:
+        return {"addresses": len(self._next)}
+
+
+nonce_manager = NonceManager()
@@ -0,0 +1,250 @@
+"""
+Cached USD price oracle.
+
+Prices used to be fetched ad hoc, one blocking CoinGecko request per
+lookup, from several modules. The oracle keeps one in-memory snapshot of
+USD quotes (price, 24h change and market cap) for every tracked symbol,
+fetched in a single batched ``/simple/price`` request and refreshed by a
+scheduled job (see main.py).
+
+Quotes younger than ``PRICE_CACHE_TTL`` are served as they are. Quotes up
+to ``PRICE_STALE_TTL`` old are still served, while a background refresh
+runs (stale-while-revalidate). Anything older, or never fetched, is
+fetched inline once; if that fails callers get None, and an unreachable
+API is retried at most every ``PRICE_RETRY_DELAY`` seconds.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from config import PRICE_CACHE_TTL, PRICE_RETRY_DELAY, PRICE_STALE_TTL
+
+from .async_client import run_blocking
+
+logger = logging.getLogger(__name__)
+
+COINGECKO_PRICE_URL = "https://api.coingecko.com/api/v3/simple/price"
+
+# Symbol -> CoinGecko id
+COINGECKO_IDS = {
+    "BTC": "bitcoin",
+    "ETH": "ethereum",
+    "USDT": "tether",
+    "LTC": "litecoin",
+    "DOGE": "dogecoin",
+    "BNB": "binancecoin",
+    "SOL": "solana",
+    "TRX": "tron",
+}
+
+
+def fetch_coingecko_quotes(symbols: List[str], timeout: float = 10) -> dict:
+    """
+    Fetch USD quotes for ``symbols`` in one CoinGecko request.
+
+    Returns:
+        dict: symbol -> {"usd", "usd_24h_change", "usd_market_cap"}; symbols
+            CoinGecko didn't price are left out
+    """
+    ids = {COINGECKO_IDS[symbol]: symbol for symbol in symbols}
+    response = requests.get(
+        COINGECKO_PRICE_URL,
+        params={
+            "ids": ",".join(ids),
+            "vs_currencies": "usd",
+            "include_24hr_change": "true",
+            "include_market_cap": "true",
+        },
+        timeout=timeout,
+    )
+    response.raise_for_status()
+    data = response.json()
+
+    quotes = {}
+    for coin_id, symbol in ids.items():
+        quote = data.get(coin_id) or {}
+        if quote.get("usd") is not None:
+            quotes[symbol] = {
+                "usd": float(quote["usd"]),
+                "usd_24h_change": quote.get("usd_24h_change"),
+                "usd_market_cap": quote.get("usd_market_cap"),
+            }
+    return quotes
+
+
+class PriceOracle:
+    """
+    In-memory USD quotes for the supported coins.
+
+    Args:
+        fetcher: Callable taking a list of symbols and returning their
+            quotes; defaults to CoinGecko
+        ttl: Seconds a quote is served without refreshing
+        stale_ttl: Seconds a quote may still be served while it is refreshed
+            in the background
+        retry_delay: Minimum seconds between inline fetch attempts
+    """
+
+    def __init__(
+        self,
+        fetcher=None,
+        ttl: float = PRICE_CACHE_TTL,
+        stale_ttl: float = PRICE_STALE_TTL,
+        retry_delay: float = PRICE_RETRY_DELAY,
+    ):
+        self._fetcher = fetcher or fetch_coingecko_quotes
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.retry_delay = retry_delay
+        self._quotes: Dict[str, dict] = {}
+        self._last_attempt: Optional[float] = None
+        self._lock = threading.Lock()
+        self._revalidating = False
+        self.fetches = 0
+        self.failures = 0
+
+    def refresh(self, symbols: Optional[Iterable[str]] = None) -> Dict[str, dict]:
+        """
+        Fetch quotes for ``symbols`` (default: every supported symbol) in one
+        request and merge them into the snapshot.
+
+        Concurrent callers wait for the fetch already running instead of
+        sending their own request.
+
+        Returns:
+            The quotes fetched, or {} if the request failed (the previous
+            quotes are kept)
+        """
+        symbols = sorted(
+            {s.upper() for s in (symbols or COINGECKO_IDS)} & set(COINGECKO_IDS)
+        )
+        requested_at = time.monotonic()
+        with self._lock:
+            current = {s: self._quotes.get(s) for s in symbols}
+            if all(q and q["fetched_at"] >= requested_at for q in current.values()):
+                return current
+
+            self._last_attempt = time.monotonic()
+            try:
+                fetched = self._fetcher(symbols)
+                fetched_at = time.monotonic()
+                for symbol, quote in fetched.items():
+                    self._quotes[symbol] = {**quote, "fetched_at": fetched_at}
+                self.fetches += 1
+                return {s: self._quotes[s] for s in fetched}
+            except Exception as e:
+                self.failures += 1
+                logger.warning(f"Could not refresh prices for {symbols}: {e}")
+                return {}
+
+    def _revalidate(self, symbols: List[str]) -> None:
+        """Refresh ``symbols`` on a background thread, one refresh at a time"""
+        with self._lock:
+            if self._revalidating:
+                return
+            self._revalidating = True
+
+        def run():
+            try:
+                self.refresh(symbols)
+            finally:
+                self._revalidating = False
+
+        threading.Thread(target=run, name="price-revalidate", daemon=True).start()
+
+    def get_quotes(self, symbols: Iterable[str]) -> Dict[str, dict]:
+        """
+        Quotes for ``symbols``, served from the snapshot where possible.
+
+        Returns:
+            dict: symbol -> {"usd", "usd_24h_change", "usd_market_cap", "age"};
+                symbols with no usable quote are left out
+        """
+        symbols = {s.upper() for s in symbols if s}
+        now = time.monotonic()
+        quotes, stale, missing = {}, [], []
+
+        for symbol in symbols:
+            quote = self._quotes.get(symbol)
+            age = now - quote["fetched_at"] if quote else None
+            if quote and age <= self.stale_ttl:
+                quotes[symbol] = {**quote, "age": age}
+                if age > self.ttl:
+                    stale.append(symbol)
+            elif symbol in COINGECKO_IDS:
+                missing.append(symbol)
+
+        if missing:
+            retry_due = (
+                self._last_attempt is None
+                or time.monotonic() - self._last_attempt >= self.retry_delay
+            )
+            fetched = self.refresh(missing + stale) if retry_due else {}
+            for symbol, quote in fetched.items():
+                quotes[symbol] = {
+                    **quote,
+                    "age": time.monotonic() - quote["fetched_at"],
+                }
+        elif stale:
+            self._revalidate(stale)
+
+        for quote in quotes.values():
+            quote.pop("fetched_at", None)
+        return quotes
+
+    def get_prices(self, symbols: Iterable[str]) -> Dict[str, float]:
+        """USD price per symbol; symbols with no usable quote are left out"""
+        return {s: q["usd"] for s, q in self.get_quotes(symbols).items()}
+
+    def get_price(self, symbol: str) -> Optional[float]:
+        """USD price of one symbol, or None if it is unavailable"""
+        return self.get_prices([symbol]).get(symbol.upper())
+
+    def to_usd(self, holdings: Iterable[Tuple[float, str]]) -> List[Optional[float]]:
+        """
+        Convert many (amount, symbol) pairs to USD against one snapshot.
+
+        Each distinct symbol is looked up once, however many pairs use it.
+
+        Returns:
+            list: USD value per pair, in order; None where the symbol has no
+                price or the amount isn't a number
+        """
+        holdings = list(holdings)
+        prices = self.get_prices({symbol for _, symbol in holdings if symbol})
+
+        values = []
+        for amount, symbol in holdings:
+            price = prices.get((symbol or "").upper())
+            try:
+                values.append(None if price is None else float(amount) * price)
+            except (TypeError, ValueError):
+                values.append(None)
+        return values
+
+    async def tick(self) -> None:
+        """Scheduled refresh of every supported symbol (see main.py)"""
+        await run_blocking(self.refresh)
+
+    def clear(self) -> None:
+        """Drop every quote, so the next lookup fetches"""
+        with self._lock:
+            self._quotes.clear()
+            self._last_attempt = None
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        ages = [now - q["fetched_at"] for q in self._quotes.values()]
+        return {
+            "symbols": len(self._quotes),
+            "fetches": self.fetches,
+            "failures": self.failures,
+            "oldest_age": max(ages) if ages else None,
+        }
+
+
+price_oracle = PriceOracle()
@@ -0,0 +1,205 @@
+"""
+Background confirmation of outbound transactions.
+
+Transfers return as soon as they are broadcast and are recorded in
+``wallet_transactions`` with status "pending". The tracker polls their
+receipts on a schedule (see main.py) and settles each one exactly once:
+
+- "completed": mined successfully; the real gas cost is recorded and, for
+  a trade release, the trade is completed and both parties are notified.
+- "failed": mined but reverted.
+- "dropped": no receipt within ``TX_RECEIPT_TIMEOUT`` seconds and the
+  sender's nonce still unused on chain. A transaction whose nonce has been
+  used is only slow to show its receipt and stays "pending".
+
+Failed and dropped releases leave the trade in "crypto_released" with its
+release_tx_status set, for support to resolve, and notify both parties. A
+dropped transaction resets the sender's nonce counter, and is still checked
+for another ``TX_RECEIPT_TIMEOUT`` seconds in case it is mined late; a late
+receipt settles it and its trade like any other.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from config import ADMIN_ID, TX_RECEIPT_TIMEOUT, db
+
+from .async_client import run_blocking
+from .balance_cache import balance_cache
+from .nonce_manager import nonce_manager
+from .trade import TradeClient, trade_cache
+from .wallet import WalletManager
+
+logger = logging.getLogger(__name__)
+
+# Oldest pending transactions checked per tick
+RECEIPT_BATCH = 100
+
+
+class ReceiptTracker:
+    """
+    Settles pending outbound transactions from their receipts.
+
+    Call ``tick()`` periodically (see main.py); ticks must not overlap.
+
+    Args:
+        bot: Telegram bot used to notify users (optional)
+        timeout: Seconds without a receipt after which a transaction is
+            marked "dropped", and for which a dropped one is still checked
+    """
+
+    def __init__(self, bot=None, timeout: int = TX_RECEIPT_TIMEOUT):
+        self.bot = bot
+        self.timeout = timeout
+
+    async def tick(self) -> dict:
+        """
+        Check every pending transaction once.
+
+        Returns:
+            dict: {"pending": int, "completed": int, "failed": int, "dropped": int}
+        """
+        counts = {"pending": 0, "completed": 0, "failed": 0, "dropped": 0}
+        try:
+            pending = await run_blocking(self._pending_transactions)
+            counts["pending"] = len(pending)
+            for tx in pending:
+                settled = await run_blocking(self._settle, tx)
+                if settled:
+                    counts[settled["status"]] += 1
+                    await self._notify(settled)
+            return counts
+
+        except Exception as e:
+            logger.error(f"Receipt tracker tick failed: {e}")
+            return {**counts, "error": str(e)}
+
+    def _pending_transactions(self) -> list:
+        recently = (datetime.now() - timedelta(seconds=self.timeout)).isoformat()
+        return list(
+            db.wallet_transactions.find(
+                {
+                    "$or": [
+                        {"status": "pending"},
+                        {"status": "dropped", "confirmed_at": {"$gte": recently}},
+                    ],
+                    "tx_hash": {"$nin": [None, ""]},
+                }
+            )
+            .sort("created_at", 1)
+            .limit(RECEIPT_BATCH)
+        )
+
+    def _settle(self, tx: dict) -> Optional[dict]:
+        """Record the outcome of a mined or expired transaction
+
+        Returns:
+            The updated transaction if this call settled it, else None
+        """
+        coin_config = WalletManager.SUPPORTED_COINS.get(tx["coin_symbol"], {})
+        if coin_config.get("network_type") != "ethereum":
+            return None
+
+        receipt = self._get_receipt(coin_config, tx["tx_hash"])
+        now = datetime.now()
+        if receipt is None:
+            if tx["status"] == "dropped":
+                return None
+            age = (now - datetime.fromisoformat(tx["created_at"])).total_seconds()
+            if age < self.timeout or self._nonce_used(coin_config, tx):
+                return None
+            update = {"status": "dropped"}
+        else:
+            gas_used = receipt["gasUsed"]
+            gas_price = receipt.get("effectiveGasPrice") or 0
+            update = {
+                "status": "completed" if receipt["status"] == 1 else "failed",
+                "block_number": receipt["blockNumber"],
+                "gas_used": gas_used,
+                "gas_fee_eth": gas_used * gas_price / 10**18,
+            }
+        update["confirmed_at"] = now.isoformat()
+
+        # Conditional on the status read so a transaction is settled only once
+        result = db.wallet_transactions.update_one(
+            {"_id": tx["_id"], "status": tx["status"]}, {"$set": update}
+        )
+        if result.modified_count == 0:
+            return None
+
+        if update["status"] == "dropped":
+            nonce_manager.reset(tx["from_address"])
+
+        balance_cache.invalidate(tx["from_address"], tx["coin_symbol"])
+        balance_cache.invalidate(tx["from_address"], "ETH")
+        log = logger.info if update["status"] == "completed" else logger.error
+        log(f"Transaction {tx['tx_hash']} {update['status']}")
+
+        settled = {**tx, **update}
+        if tx.get("trade_id"):
+            self._settle_trade(settled)
+        return settled
+
+    @staticmethod
+    def _get_receipt(coin_config: dict, tx_hash: str) -> Optional[dict]:
+        from web3.exceptions import TransactionNotFound
+
+        registry = WalletManager._get_eth_registry(coin_config)
+        try:
+            return registry.call(lambda web3: web3.eth.get_transaction_receipt(tx_hash))
+        except TransactionNotFound:
+            return None
+
+    @staticmethod
+    def _nonce_used(coin_config: dict, tx: dict) -> bool:
+        """Whether a transaction from the sender has been mined at the
+        transaction's nonce (unknown nonces count as unused)"""
+        if tx.get("nonce") is None:
+            return False
+
+        registry = WalletManager._get_eth_registry(coin_config)
+        mined = registry.call(
+            lambda web3: web3.eth.get_transaction_count(
+                web3.to_checksum_address(tx["from_address"]), "latest"
+            )
+        )
+        return mined > tx["nonce"]
+
+    @staticmethod
+    def _settle_trade(tx: dict) -> None:
+        trade_id = tx["trade_id"]
+        db.trades.update_one(
+            {"_id": trade_id, "release_tx_hash": tx["tx_hash"]},
+            {"$set": {"release_tx_status": tx["status"], "updated_at": datetime.now()}},
+        )
+        trade_cache.invalidate(trade_id)
+        if tx["status"] == "completed":
+            TradeClient.complete_trade(trade_id)
+
+    async def _notify(self, tx: dict) -> None:
+        if not self.bot or not tx.get("trade_id"):
+            return
+
+        from utils.messages import Messages
+
+        trade = await run_blocking(TradeClient.get_trade, tx["trade_id"])
+        if not trade:
+            return
+
+        if tx["status"] == "completed":
+            text = Messages.release_confirmed(trade, tx)
+            recipients = [trade.get("buyer_id"), trade.get("seller_id")]
+        else:
+            text = Messages.release_failed(trade, tx)
+            recipients = [trade.get("buyer_id"), trade.get("seller_id"), ADMIN_ID]
+
+        for chat_id in recipients:
+            if not chat_id:
+                continue
+            try:
+                await self.bot.send_message(
+                    chat_id=int(chat_id), text=text, parse_mode="HTML"
+                )
+            except Exception as e:
+                logger.error(f"Could not notify {chat_id} of {tx['tx_hash']}: {e}")
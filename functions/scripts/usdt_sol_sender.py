@@ -4,10 +4,8 @@ import traceback
 from decimal import Decimal
 
 import base58
-import requests
 from globalState import GlobalState
 from imports.utils import log_message
-from solana.rpc.api import Client
 from solana.rpc.commitment import Finalized, Processed
 from solana.rpc.types import TxOpts
 from solathon import keypair as solkeypair
@@ -27,25 +25,15 @@ from spl.token.instructions import (
 )
 from spl.token.instructions import transfer_checked
 
+from functions.solana_rpc import get_solana_rpc
+
 
 def get_latest_blockhash(log_file):
-    url = "https://api.mainnet-beta.solana.com"
-    headers = {"Content-Type": "application/json"}
-    payload = {
-        "id": 1,
-        "jsonrpc": "2.0",
-        "method": "getLatestBlockhash",
-    }
-
-    response = requests.post(url, headers=headers, data=json.dumps(payload))
-    response_json = response.json()
-
-    if "result" in response_json:
-        blockhash = response_json["result"]["value"]["blockhash"]
-        return blockhash
-    else:
-        log_message("Failed to fetch the latest blockhash", log_file)
-        log_message(response_json, log_file)
+    # Shared with every sender on the endpoint and reused for SOL_BLOCKHASH_TTL
+    try:
+        return get_solana_rpc().get_latest_blockhash()
+    except Exception as e:
+        log_message(f"Failed to fetch the latest blockhash: {e}", log_file)
     # try:
     #     transaction_json = json.loads(transaction_json_str)
     # except json.JSONDecodeError as e:
@@ -91,8 +79,9 @@ def send_transaction(
     brokerAddress=None,
 ):
     try:
-        # Connect to Solana client
-        client = Client("https://api.mainnet-beta.solana.com")
+        # Pooled Solana client for SOL_RPC_URL
+        rpc = get_solana_rpc()
+        client = rpc.client()
 
         # Escrow Wallet
 
@@ -150,11 +139,16 @@ def send_transaction(
 
         spl_creation_fee = int(Decimal(0.39) * Decimal(1_000_000))
 
+        # Which USDT accounts already exist, in one getMultipleAccounts call
+        token_addresses = [recipient_token_address, fee_payer_token_address]
+        if tradeDetails["broker_fee"] > 0:
+            token_addresses.append(broker_token_address)
+        token_accounts = rpc.get_multiple_accounts([str(a) for a in token_addresses])
+
         # Recepient's USDT account creation
-        account_info = client.get_account_info(recipient_token_address)
         instruction = []
 
-        if account_info.value is None:
+        if token_accounts[0] is None:
             log_message(
                 "Token account does not exist. Creating token account for receiver wallet...",
                 log_file,
@@ -171,8 +165,7 @@ def send_transaction(
                 )
             )
         # Dev's USDT account creation
-        account_info = client.get_account_info(fee_payer_token_address)
-        if account_info.value is None:
+        if token_accounts[1] is None:
             log_message(
                 "Token account does not exist. Creating token account for fee payer wallet...",
                 log_file,
@@ -187,8 +180,7 @@ def send_transaction(
             )
         # Broker's USDT account creation
         if tradeDetails["broker_fee"] > 0:
-            account_info = client.get_account_info(broker_token_address)
-            if account_info.value is None:
+            if token_accounts[2] is None:
                 log_message(
                     "Token account does not exist. Creating token account for broker wallet...",
                     log_file,
@@ -259,27 +259,17 @@ def private_key_to_bsc_address(private_key):
 
 
 def get_trx_price():
-    url = "https://api.coingecko.com/api/v3/simple/price"
-    params = {"ids": "tron", "vs_currencies": "usd"}
-    try:
-        resp = requests.get(url, params=params)
-        data = resp.json()
-        print(data)
-        return data.get("tron", {}).get("usd", False)
-    except requests.RequestException as e:
-        return False
+    """Current TRX price in USD from the price oracle, or False"""
+    from functions.price_oracle import price_oracle
+
+    return price_oracle.get_price("TRX") or False
 
 
 def get_eth_price():
-    """Get current ETH price in USD from CoinGecko API"""
-    url = "https://api.coingecko.com/api/v3/simple/price"
-    params = {"ids": "ethereum", "vs_currencies": "usd"}
-    try:
-        resp = requests.get(url, params=params)
-        data = resp.json()
-        return data.get("ethereum", {}).get("usd", None)
-    except requests.RequestException as e:
-        return None
+    """Current ETH price in USD from the price oracle"""
+    from functions.price_oracle import price_oracle
+
+    return price_oracle.get_price("ETH")
 
 
 def get_estimated_energy_cost():
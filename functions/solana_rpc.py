@@ -0,0 +1,245 @@
+"""
+Pooled Solana JSON-RPC clients with batched balance reads.
+
+Balance lookups and senders used to build a fresh ``solana.rpc.api.Client``
+for every call, always against the public mainnet endpoint. Here each
+endpoint gets one long-lived client backed by a keep-alive
+``requests.Session``; ``get_solana_rpc()`` returns it, defaulting to
+``SOL_RPC_URL``.
+
+SOL and SPL token balances are read with ``getMultipleAccounts``, up to
+``SOL_BALANCE_BATCH_SIZE`` accounts per call. A token balance is read from
+the owner's associated token account for the mint (USDT by default); an
+account that doesn't exist yet holds nothing and reads as 0.
+
+Senders take their recent blockhash from ``get_latest_blockhash()``, which
+reuses a fetched blockhash for ``SOL_BLOCKHASH_TTL`` seconds. A blockhash
+stays valid for about 150 slots (roughly a minute), so the TTL leaves ample
+time for the transaction to land.
+"""
+
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import (
+    SOL_BALANCE_BATCH_SIZE,
+    SOL_BLOCKHASH_TTL,
+    SOL_RPC_TIMEOUT,
+    SOL_RPC_URL,
+)
+
+logger = logging.getLogger(__name__)
+
+USDT_MINT_ADDRESS = "Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB"
+
+LAMPORTS_PER_SOL = 10**9
+
+# Keep-alive connections held per endpoint
+POOL_MAXSIZE = 10
+
+
+class SolanaRPCError(Exception):
+    """The node answered a JSON-RPC request with an error"""
+
+
+@lru_cache(maxsize=4096)
+def associated_token_address(owner: str, mint: str) -> str:
+    """Associated token account of ``owner`` for ``mint`` (both base58)"""
+    import base58
+    from solders.pubkey import Pubkey
+    from spl.token.instructions import get_associated_token_address
+
+    return str(
+        get_associated_token_address(
+            Pubkey(base58.b58decode(owner)), Pubkey(base58.b58decode(mint))
+        )
+    )
+
+
+class SolanaRPC:
+    """
+    Long-lived JSON-RPC client for one Solana endpoint.
+
+    Args:
+        url: JSON-RPC endpoint
+        timeout: Seconds allowed per request
+        batch_size: Accounts per ``getMultipleAccounts`` call
+        blockhash_ttl: Seconds a fetched recent blockhash is reused
+        session: HTTP session, reused across requests
+    """
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = SOL_RPC_TIMEOUT,
+        batch_size: int = SOL_BALANCE_BATCH_SIZE,
+        blockhash_ttl: float = SOL_BLOCKHASH_TTL,
+        session: Optional[requests.Session] = None,
+    ):
+        self.url = url
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.blockhash_ttl = blockhash_ttl
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+        self.requests = 0
+        self.blockhash_hits = 0
+
+        self._blockhash: Optional[str] = None
+        self._blockhash_at = 0.0
+        self._blockhash_lock = threading.Lock()
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    def call(self, method: str, params: Optional[list] = None):
+        """
+        Send one JSON-RPC request (blocking).
+
+        Raises:
+            SolanaRPCError: The node returned an error
+            requests.RequestException: The request itself failed
+        """
+        response = self.session.post(
+            self.url,
+            json={"jsonrpc": "2.0", "id": 1, "method": method, "params": params or []},
+            timeout=self.timeout,
+        )
+        self.requests += 1
+        response.raise_for_status()
+        data = response.json()
+        if data.get("error"):
+            raise SolanaRPCError(f"{method}: {data['error']}")
+        return data["result"]
+
+    def get_multiple_accounts(
+        self, addresses: Iterable[str], commitment: str = "finalized"
+    ) -> List[Optional[dict]]:
+        """
+        Account info of many addresses, one ``getMultipleAccounts`` call per
+        ``batch_size`` addresses (blocking).
+
+        Returns:
+            jsonParsed account info in input order; None for accounts that
+            don't exist
+        """
+        addresses = list(addresses)
+        accounts = []
+        for start in range(0, len(addresses), self.batch_size):
+            batch = addresses[start : start + self.batch_size]
+            result = self.call(
+                "getMultipleAccounts",
+                [batch, {"encoding": "jsonParsed", "commitment": commitment}],
+            )
+            accounts.extend(result["value"])
+        return accounts
+
+    def get_sol_balances(
+        self, addresses: Iterable[str], commitment: str = "finalized"
+    ) -> Dict[str, float]:
+        """
+        SOL balances of many addresses (blocking).
+
+        Returns:
+            dict: address -> balance in SOL; accounts that don't exist read as 0
+        """
+        addresses = list(dict.fromkeys(addresses))
+        accounts = self.get_multiple_accounts(addresses, commitment)
+        return {
+            address: (account["lamports"] if account else 0) / LAMPORTS_PER_SOL
+            for address, account in zip(addresses, accounts)
+        }
+
+    def get_token_balances(
+        self,
+        owners: Iterable[str],
+        mint: str = USDT_MINT_ADDRESS,
+        commitment: str = "finalized",
+    ) -> Dict[str, float]:
+        """
+        SPL token balances of many wallets, read from their associated token
+        accounts for ``mint`` (blocking).
+
+        Returns:
+            dict: owner -> balance in whole tokens; owners without a token
+                account read as 0, invalid addresses are left out
+        """
+        token_accounts = {}
+        for owner in dict.fromkeys(owners):
+            try:
+                token_accounts[owner] = associated_token_address(owner, mint)
+            except ValueError as e:
+                logger.warning(f"Invalid Solana address {owner}: {e}")
+
+        accounts = self.get_multiple_accounts(token_accounts.values(), commitment)
+        balances = {}
+        for owner, account in zip(token_accounts, accounts):
+            if account is None:
+                balances[owner] = 0.0
+                continue
+            try:
+                amount = account["data"]["parsed"]["info"]["tokenAmount"]
+            except (KeyError, TypeError):
+                logger.warning(f"{token_accounts[owner]} is not a token account")
+                continue
+            balances[owner] = int(amount["amount"]) / 10 ** amount["decimals"]
+        return balances
+
+    def get_latest_blockhash(self, commitment: str = "finalized") -> str:
+        """Recent blockhash for new transactions, reused for ``blockhash_ttl``"""
+        with self._blockhash_lock:
+            now = time.monotonic()
+            if self._blockhash and now - self._blockhash_at < self.blockhash_ttl:
+                self.blockhash_hits += 1
+                return self._blockhash
+
+            result = self.call("getLatestBlockhash", [{"commitment": commitment}])
+            self._blockhash = result["value"]["blockhash"]
+            self._blockhash_at = now
+            return self._blockhash
+
+    def client(self):
+        """``solana.rpc.api.Client`` for the same endpoint, built once, for
+        calls not covered here such as sending transactions"""
+        with self._client_lock:
+            if self._client is None:
+                from solana.rpc.api import Client
+
+                self._client = Client(self.url, timeout=self.timeout)
+            return self._client
+
+    def stats(self) -> dict:
+        return {
+            "url": self.url,
+            "requests": self.requests,
+            "blockhash_hits": self.blockhash_hits,
+        }
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_solana_rpc(url: Optional[str] = None) -> SolanaRPC:
+    """Process-wide client for ``url`` (default ``SOL_RPC_URL``), created on
+    first use"""
+    url = url or SOL_RPC_URL
+    with _clients_lock:
+        if url not in _clients:
+            _clients[url] = SolanaRPC(url)
+        return _clients[url]
+
+
+def reset_solana_clients() -> None:
+    """Drop every client (tests, or after changing endpoint config)"""
+    with _clients_lock:
+        _clients.clear()
@@ -0,0 +1,254 @@
+import argparse
+import logging
+from collections import defaultdict
+from datetime import datetime
+
+from pymongo import ReplaceOne, UpdateOne
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Counter fields kept per user in db.user_trade_stats
+STATS_FIELDS = ("sales", "purchases", "paid", "completed", "cancelled", "disputed")
+
+# Trade event -> (counter to increment, which participants it applies to)
+TRADE_EVENTS = {
+    "created": ("sales", "seller"),
+    "joined": ("purchases", "buyer"),
+    "paid": ("paid", "both"),
+    "completed": ("completed", "both"),
+    "cancelled": ("cancelled", "both"),
+    "disputed": ("disputed", "both"),
+}
+
+# Trade status -> event counted when update_trade_status moves a trade into it
+STATUS_EVENTS = {
+    "completed": "completed",
+    "cancelled": "cancelled",
+    "disputed": "disputed",
+}
+
+
+class TradeStatsClient:
+    """
+    Maintains the user_trade_stats collection: one small document per user
+    with lifetime trade counters, so profile and history screens never scan
+    db.trades.
+
+    Counters are bumped with $inc as trades move through their lifecycle.
+    Each trade records the events already counted in its ``stats_events``
+    array, which makes recording idempotent when a transition is repeated.
+
+    The database handle is looked up on config at call time so stats writes
+    always follow the application's active connection.
+    """
+
+    @staticmethod
+    def _participants(trade: dict, role: str) -> list:
+        seller_id = str(trade.get("seller_id") or "")
+        buyer_id = str(trade.get("buyer_id") or "")
+
+        if role == "seller":
+            ids = [seller_id]
+        elif role == "buyer":
+            ids = [buyer_id]
+        else:
+            ids = [seller_id, buyer_id]
+
+        return list(dict.fromkeys(i for i in ids if i))
+
+    @staticmethod
+    def record_trade_event(trade_id: str, event: str) -> bool:
+        """
+        Count a trade lifecycle event against the trade's participants.
+
+        Returns True if counters were incremented, False if the event was
+        already counted for this trade, the trade is missing or on error.
+        """
+        if event not in TRADE_EVENTS:
+            raise ValueError(f"Unknown trade stats event: {event}")
+
+        try:
+            # Claim the event on the trade first so it is only counted once
+            trade = config.db.trades.find_one_and_update(
+                {"_id": trade_id, "stats_events": {"$ne": event}},
+                {"$addToSet": {"stats_events": event}},
+                projection={"seller_id": 1, "buyer_id": 1},
+            )
+            if not isinstance(trade, dict):
+                return False
+
+            field, role = TRADE_EVENTS[event]
+            user_ids = TradeStatsClient._participants(trade, role)
+            return TradeStatsClient.increment(user_ids, field)
+        except Exception as e:
+            logger.error(f"Error recording {event} stats for trade {trade_id}: {e}")
+            return False
+
+    @staticmethod
+    def increment(user_ids: list, field: str) -> bool:
+        """
+        $inc a counter for each user. Callers are responsible for recording
+        the matching event in the trade's stats_events.
+        """
+        if not user_ids:
+            return False
+
+        try:
+            now = datetime.now()
+            config.db.user_trade_stats.bulk_write(
+                [
+                    UpdateOne(
+                        {"_id": str(user_id)},
+                        {"$inc": {field: 1}, "$set": {"updated_at": now}},
+                        upsert=True,
+                    )
+                    for user_id in user_ids
+                ],
+                ordered=False,
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Error incrementing {field} stats for {user_ids}: {e}")
+            return False
+
+    @staticmethod
+    def get_user_stats(user_id: str) -> dict:
+        """Return the user's trade counters, zero-filled if none recorded"""
+        stats = {field: 0 for field in STATS_FIELDS}
+        try:
+            doc = config.db.user_trade_stats.find_one({"_id": str(user_id)})
+            if doc:
+                stats.update({k: doc.get(k, 0) for k in STATS_FIELDS})
+        except Exception as e:
+            logger.error(f"Error getting trade stats for user {user_id}: {e}")
+
+        stats["trades"] = stats["sales"] + stats["purchases"]
+        return stats
+
+    @staticmethod
+    def _derive_events(trade: dict) -> set:
+        """Events implied by a trade's current state"""
+        events = {"created"}
+        status = str(trade.get("status") or "").lower()
+
+        if trade.get("buyer_id"):
+            events.add("joined")
+        if trade.get("is_fiat_paid") or trade.get("is_paid"):
+            events.add("paid")
+        if trade.get("is_completed") or status == "completed":
+            events.add("completed")
+        if trade.get("is_cancelled") or status == "cancelled":
+            events.add("cancelled")
+        if status == "disputed":
+            events.add("disputed")
+        return events
+
+    @staticmethod
+    def rebuild_user_stats(user_ids: list | None = None) -> int:
+        """
+        Recompute user_trade_stats from db.trades.
+
+        Rebuilds every user when user_ids is None, otherwise only the given
+        users. Events implied by trade state are written back to each trade's
+        stats_events so later transitions are not counted twice.
+
+        A partial rebuild only repairs trades whose participants are all
+        being rebuilt. On a trade shared with anyone else, only the events
+        already in stats_events are counted, and nothing is written back:
+        recording a missing event there would leave it permanently
+        uncounted for the counterparty.
+
+        Returns:
+            int: Number of user stats documents written
+        """
+        query = {}
+        if user_ids is not None:
+            user_ids = [str(u) for u in user_ids]
+            query = {
+                "$or": [
+                    {"seller_id": {"$in": user_ids}},
+                    {"buyer_id": {"$in": user_ids}},
+                ]
+            }
+
+        projection = {
+            "seller_id": 1,
+            "buyer_id": 1,
+            "status": 1,
+            "is_paid": 1,
+            "is_fiat_paid": 1,
+            "is_completed": 1,
+            "is_cancelled": 1,
+            "stats_events": 1,
+        }
+
+        counters = defaultdict(lambda: {field: 0 for field in STATS_FIELDS})
+        trade_updates = []
+
+        for trade in config.db.trades.find(query, projection):
+            recorded = set(trade.get("stats_events") or [])
+            events = recorded | TradeStatsClient._derive_events(trade)
+            if user_ids is not None and not all(
+                user_id in user_ids
+                for user_id in TradeStatsClient._participants(trade, "both")
+            ):
+                events = recorded
+
+            for event in events & TRADE_EVENTS.keys():
+                field, role = TRADE_EVENTS[event]
+                for user_id in TradeStatsClient._participants(trade, role):
+                    if user_ids is None or user_id in user_ids:
+                        counters[user_id][field] += 1
+
+            missing = events - recorded
+            if missing:
+                trade_updates.append(
+                    UpdateOne(
+                        {"_id": trade["_id"]},
+                        {"$addToSet": {"stats_events": {"$each": sorted(missing)}}},
+                    )
+                )
+
+            if len(trade_updates) >= 1000:
+                config.db.trades.bulk_write(trade_updates, ordered=False)
+                trade_updates = []
+
+        if trade_updates:
+            config.db.trades.bulk_write(trade_updates, ordered=False)
+
+        now = datetime.now()
+        targets = user_ids if user_ids is not None else list(counters)
+        replacements = [
+            ReplaceOne(
+                {"_id": user_id},
+                {**counters[user_id], "updated_at": now},
+                upsert=True,
+            )
+            for user_id in targets
+        ]
+        if replacements:
+            config.db.user_trade_stats.bulk_write(replacements, ordered=False)
+
+        if user_ids is None:
+            # Users whose trades were all deleted
+            config.db.user_trade_stats.delete_many({"_id": {"$nin": list(counters)}})
+
+        logger.info(f"Rebuilt trade stats for {len(replacements)} users")
+        return len(replacements)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage user trade statistics")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument(
+        "--user",
+        action="append",
+        dest="user_ids",
+        help="Only rebuild these user ids (repeatable)",
+    )
+    args = parser.parse_args()
+
+    count = TradeStatsClient.rebuild_user_stats(args.user_ids)
+    print(f"Rebuilt trade stats for {count} users")
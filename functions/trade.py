@@ -1,11 +1,17 @@
 import logging
+from datetime import timedelta
 from typing import Optional
 
+from pymongo import ReturnDocument
+
 from config import *
 from database import *
 from functions import *
 from payments import BtcPayAPI
 
+from .cache import LRUCache
+from .stats import STATUS_EVENTS, TradeStatsClient
+from .trade_state import RELEASING_STATUS, TERMINAL_STATUSES, transition_filter
 from .user import UserClient
 from .utils import generate_id
 from .wallet import WalletManager
@@ -14,48 +20,118 @@ logger = logging.getLogger(__name__)
 
 client = BtcPayAPI()
 
-
-class TradeClient:
+# Trade history list view: page size, fields it renders and cursor epoch
+HISTORY_PAGE_SIZE = 5
+HISTORY_PROJECTION = {
+    "price": 1,
+    "currency": 1,
+    "trade_type": 1,
+    "status": 1,
+    "is_active": 1,
+    "is_paid": 1,
+    "is_completed": 1,
+    "created_at": 1,
+}
+HISTORY_EPOCH = datetime(1970, 1, 1)
+
+# Read-through cache of trade documents keyed by _id. Every TradeClient write
+# drops the affected entry; the TTL bounds staleness from writes made by other
+# processes or directly against db.trades.
+trade_cache = LRUCache(
+    "trades",
+    max_size=TRADE_CACHE_SIZE,
+    ttl=TRADE_CACHE_TTL,
+    enabled=TRADE_CACHE_ENABLED,
+)
+
+
+# Currencies paid into the seller's own wallet rather than a BTCPay invoice
+WALLET_TRADE_CURRENCIES = ["ETH", "USDT"]
+
+
+class TradeBuilder:
     """
-    Handles all trade-related database operations and business logic.
-
-    This class manages the complete lifecycle of escrow trades including:
-    - Trade creation and management
-    - Payment processing and verification
-    - Crypto deposit/release operations
-    - Broker integration
-    - Fee calculations
+    Assembles a complete trade document so it can be stored with one insert.
+
+    Setters only record what the trade should contain. Anything that needs
+    a lookup (broker validation, seller wallet address, BTCPay invoice) is
+    resolved in ``build()``, which ``TradeClient.create_trade`` calls right
+    before inserting.
+
+    Example:
+        builder = (
+            TradeBuilder(user["_id"], currency="USDT", trade_type="CryptoToFiat")
+            .with_terms("Selling 150 USDT")
+            .with_price(150)
+            .with_broker(broker_id)
+            .with_payment()
+        )
+        trade = TradeClient.create_trade(builder)
+        url = builder.payment_url
     """
 
-    @staticmethod
-    def open_new_trade(
-        msg,
+    def __init__(
+        self,
+        seller_id: str,
         currency: str = "USD",
-        chat: str | None = None,
         trade_type: str = "CryptoToCrypto",
-    ) -> TradeType:
-        """
-        Returns a new trade without Agent
+        chat: str | None = None,
+    ):
+        self.seller_id = seller_id
+        self.currency = currency
+        self.trade_type = trade_type
+        self.chat = chat
+        self.terms = None
+        self.price = 0
+        self.broker_id = None
+        self.include_payment = False
+
+        # Filled in by build()
+        self.broker = None
+        self.broker_error = None
+        self.payment_url = None
+
+    def with_terms(self, terms: str) -> "TradeBuilder":
+        self.terms = terms
+        return self
+
+    def with_price(self, price: float) -> "TradeBuilder":
+        self.price = price
+        return self
+
+    def with_broker(self, broker_id: str | None) -> "TradeBuilder":
+        """Attach a broker; an invalid broker is dropped, not fatal"""
+        self.broker_id = broker_id
+        return self
+
+    def with_payment(self) -> "TradeBuilder":
+        """Resolve the seller's receiving address or a BTCPay invoice"""
+        self.include_payment = True
+        return self
+
+    def build(self) -> TradeType:
         """
-        user: UserType = UserClient.get_user(msg)
-        logger.debug(
-            f"open_new_trade for user {user.get('_id')} with keys: {list(user.keys())}"
-        )
+        Return the trade document, resolving broker and payment details.
 
+        Raises:
+            ValueError: If payment details were requested but could not be
+            resolved; nothing has been written in that case.
+        """
+        now = datetime.now()
         trade: TradeType = {
             "_id": generate_id(),
-            "seller_id": user["_id"],
+            "seller_id": self.seller_id,
             "buyer_id": "",
-            "currency": currency,
+            "currency": self.currency,
             "is_active": False,
             "is_paid": False,
-            "price": 0,
+            "price": self.price,
             "invoice_id": None,
             "is_completed": False,
-            "chat": chat,
-            "trade_type": trade_type,
-            "created_at": datetime.now(),
-            "updated_at": datetime.now(),
+            "chat": self.chat,
+            "trade_type": self.trade_type,
+            "created_at": now,
+            "updated_at": now,
             # Initialize wallet fields
             "receiving_address": "",
             "seller_wallet_id": "",
@@ -69,9 +145,114 @@ class TradeClient:
             "seller_broker_rating": 0,
             "buyer_broker_rating": 0,
             "broker_notes": "",
+            # Lifecycle events already counted in user_trade_stats
+            "stats_events": ["created"],
         }
+        if self.terms is not None:
+            trade["terms"] = self.terms
+
+        if self.broker_id:
+            self._apply_broker(trade)
+
+        if self.include_payment:
+            self._apply_payment(trade)
+
+        return trade
+
+    def _apply_broker(self, trade: TradeType) -> None:
+        from .broker import BrokerClient
+
+        validation = BrokerClient.validate_broker_for_trade(
+            self.broker_id, self.trade_type, self.seller_id
+        )
+        if not validation.get("valid"):
+            self.broker_error = validation.get("reason")
+            logger.error(f"Broker validation failed: {self.broker_error}")
+            return
+
+        self.broker = validation.get("broker")
+        trade.update(
+            {
+                "broker_id": self.broker_id,
+                "broker_enabled": True,
+                "broker_commission": self.broker.get("commission_rate", 1.0),
+            }
+        )
+
+    def _apply_payment(self, trade: TradeType) -> None:
+        if self.currency in WALLET_TRADE_CURRENCIES:
+            wallet, coin_address = TradeClient._get_seller_receiving_address(
+                self.seller_id, self.currency
+            )
+            if not coin_address:
+                raise ValueError(
+                    f"No {self.currency} receiving address for seller {self.seller_id}"
+                )
+            trade.update(
+                {
+                    "receiving_address": coin_address["address"],
+                    "seller_wallet_id": wallet["_id"],
+                    "is_wallet_trade": True,
+                }
+            )
+            self.payment_url = coin_address["address"]
+            return
+
+        url, invoice_id = client.create_invoice(trade)
+        if url is None or not invoice_id:
+            raise ValueError(f"Could not create invoice for trade {trade['_id']}")
+        trade["invoice_id"] = str(invoice_id)
+        self.payment_url = url
+
+
+class TradeClient:
+    """
+    Handles all trade-related database operations and business logic.
+
+    This class manages the complete lifecycle of escrow trades including:
+    - Trade creation and management
+    - Payment processing and verification
+    - Crypto deposit/release operations
+    - Broker integration
+    - Fee calculations
+    """
+
+    @staticmethod
+    def open_new_trade(
+        msg,
+        currency: str = "USD",
+        chat: str | None = None,
+        trade_type: str = "CryptoToCrypto",
+    ) -> TradeType:
+        """
+        Returns a new trade without Agent
+        """
+        user: UserType = UserClient.get_user(msg)
+        logger.debug(
+            f"open_new_trade for user {user.get('_id')} with keys: {list(user.keys())}"
+        )
+        return TradeClient.create_trade(
+            TradeBuilder(user["_id"], currency, trade_type, chat)
+        )
+
+    @staticmethod
+    def create_trade(builder: TradeBuilder) -> TradeType | None:
+        """
+        Build and store a trade in a single insert.
+
+        Returns:
+            TradeType | None: The stored trade, or None if it could not be
+            built or inserted
+        """
+        try:
+            trade = builder.build()
+        except Exception as e:
+            logger.error(f"Error building trade for seller {builder.seller_id}: {e}")
+            return None
 
         db.trades.insert_one(trade)
+        trade_cache.set(trade["_id"], trade)
+        TradeStatsClient.increment([trade["seller_id"]], "sales")
         return trade
 
     @staticmethod
@@ -117,10 +298,31 @@ class TradeClient:
 
     @staticmethod
     def get_trade(id: str) -> TradeType or None:  # type: ignore
-        trade: TradeType = db.trades.find_one({"_id": id})
+        trade: TradeType = trade_cache.get(id)
+        if trade is not None:
+            return trade
+
+        # A write that invalidates the trade during the read wins
+        generation = trade_cache.generation(id)
+        trade = db.trades.find_one({"_id": id})
         logger.debug(f"Fetched trade in get_trade: {trade}")
+        if isinstance(trade, dict):
+            trade_cache.set(id, trade, generation=generation)
         return trade
 
+    @staticmethod
+    def invalidate_trade(trade_id: str | None = None) -> None:
+        """Drop a trade from the cache, or every trade when no id is given"""
+        if trade_id is None:
+            trade_cache.clear()
+        else:
+            trade_cache.invalidate(trade_id)
+
+    @staticmethod
+    def get_cache_stats() -> dict:
+        """Hit/miss counters for the trade cache"""
+        return trade_cache.stats()
+
     @staticmethod
     def get_trade_by_invoice_id(id: str) -> TradeType or None:  # type: ignore
         trade: TradeType = db.trades.find_one({"invoice_id": id})
@@ -144,6 +346,7 @@ class TradeClient:
                 {"_id": trade["_id"]},
                 {"$set": {"price": price, "updated_at": datetime.now()}},
             )
+            trade_cache.invalidate(trade["_id"])
             return TradeClient.get_trade(trade["_id"])  # Return fresh trade data
         return None
 
@@ -168,6 +371,7 @@ class TradeClient:
                 {"_id": trade["_id"]},
                 {"$set": {"terms": terms, "updated_at": datetime.now()}},
             )
+            trade_cache.invalidate(trade["_id"])
             return TradeClient.get_trade(trade["_id"])  # Return fresh trade data
         return None
 
@@ -184,6 +388,7 @@ class TradeClient:
         db.trades.update_one(
             {"_id": trade["_id"]}, {"$set": {"invoice_id": invoice_id}}
         )
+        trade_cache.invalidate(trade["_id"])
         return trade
 
     @staticmethod
@@ -193,6 +398,8 @@ class TradeClient:
             {"_id": trade["_id"]},
             {"$set": {"buyer_id": buyer_id, "updated_at": datetime.now()}},
         )
+        trade_cache.invalidate(trade["_id"])
+        TradeStatsClient.record_trade_event(trade["_id"], "joined")
         return trade
 
     @staticmethod
@@ -209,7 +416,7 @@ class TradeClient:
         active_trade: TradeType = db.trades.find_one({"_id": trade["_id"]})
 
         # Determine if this is a wallet-based trade (ETH/USDT)
-        is_wallet_currency = active_trade.get("currency") in ["ETH", "USDT"]
+        is_wallet_currency = active_trade.get("currency") in WALLET_TRADE_CURRENCIES
 
         if is_wallet_currency:
             # Handle ETH/USDT trades with wallet integration
@@ -231,6 +438,39 @@ class TradeClient:
 
             return None
 
+    @staticmethod
+    def _get_seller_receiving_address(seller_id: str, coin_symbol: str) -> tuple:
+        """
+        Find (or create) the seller's wallet and its address for a coin.
+
+        Returns:
+            tuple: (wallet, coin_address), with None in place of whatever
+            could not be found
+        """
+        # Get seller's wallet or create one if it doesn't exist
+        seller_wallet = WalletManager.get_user_wallet(seller_id)
+        if not seller_wallet:
+            logger.info(f"Creating new wallet for seller {seller_id}")
+            seller_wallet = WalletManager.create_wallet_for_user(seller_id)
+            if not seller_wallet:
+                logger.error(f"Failed to create wallet for seller {seller_id}")
+                return None, None
+
+        logger.info(
+            f"Found/created wallet {seller_wallet['_id']} for seller {seller_id}"
+        )
+
+        coin_address = WalletManager.get_wallet_coin_address(
+            seller_wallet["_id"], coin_symbol
+        )
+        if not coin_address:
+            logger.error(
+                f"No {coin_symbol} address found for seller's wallet {seller_wallet['_id']}"
+            )
+            return seller_wallet, None
+
+        return seller_wallet, coin_address
+
     @staticmethod
     def _get_wallet_based_payment_info(trade: TradeType) -> str:
         """Generate wallet-based payment info for ETH/USDT trades"""
@@ -239,33 +479,13 @@ class TradeClient:
                 f"Generating wallet payment info for trade {trade['_id']} with currency {trade['currency']}"
             )
 
-            # Get seller's wallet or create one if it doesn't exist
-            seller_wallet = WalletManager.get_user_wallet(trade["seller_id"])
-            if not seller_wallet:
-                logger.info(f"Creating new wallet for seller {trade['seller_id']}")
-                seller_wallet = WalletManager.create_wallet_for_user(trade["seller_id"])
-                if not seller_wallet:
-                    logger.error(
-                        f"Failed to create wallet for seller {trade['seller_id']}"
-                    )
-                    return None
-
-            logger.info(
-                f"Found/created wallet {seller_wallet['_id']} for seller {trade['seller_id']}"
-            )
-
-            # Get the appropriate address for the trade currency
-            coin_symbol = trade["currency"]
-            coin_address = WalletManager.get_wallet_coin_address(
-                seller_wallet["_id"], coin_symbol
+            seller_wallet, coin_address = TradeClient._get_seller_receiving_address(
+                trade["seller_id"], trade["currency"]
             )
-
             if not coin_address:
-                logger.error(
-                    f"No {coin_symbol} address found for seller's wallet {seller_wallet['_id']}"
-                )
                 return None
 
+            coin_symbol = trade["currency"]
             logger.info(f"Found {coin_symbol} address: {coin_address['address']}")
 
             # Update trade with wallet information
@@ -280,6 +500,7 @@ class TradeClient:
                     }
                 },
             )
+            trade_cache.invalidate(trade["_id"])
 
             logger.info(f"Updated trade {trade['_id']} with wallet info")
 
@@ -318,11 +539,91 @@ class TradeClient:
         sells = list(sells_cursor)
         buys = list(buys_cursor)
 
-        logger.info(f"Sells: {sells}")
-        logger.info(f"Buys: {buys}")
+        logger.debug(f"Loaded {len(sells)} sells and {len(buys)} buys for {user_id}")
 
         return sells + buys
 
+    @staticmethod
+    def encode_history_cursor(trade: TradeType) -> str:
+        """Compact (created_at, _id) cursor that fits in Telegram callback data"""
+        created_at = trade.get("created_at") or HISTORY_EPOCH
+        micros = (created_at - HISTORY_EPOCH) // timedelta(microseconds=1)
+        return f"{micros}.{trade['_id']}"
+
+    @staticmethod
+    def decode_history_cursor(cursor: str) -> tuple[datetime, str]:
+        """Inverse of encode_history_cursor"""
+        micros, trade_id = cursor.split(".", 1)
+        return HISTORY_EPOCH + timedelta(microseconds=int(micros)), trade_id
+
+    @staticmethod
+    def get_trades_page(
+        user_id: str,
+        limit: int = HISTORY_PAGE_SIZE,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+    ) -> dict:
+        """
+        Return one page of the user's trades, newest first.
+
+        Keyset-paginated on (created_at, _id) so each page costs the same
+        regardless of how many trades the user has. Pass ``after`` (a page's
+        next_cursor) for older trades or ``before`` (its prev_cursor) for newer.
+
+        Returns:
+            dict: {"trades": [...], "next_cursor": str|None, "prev_cursor": str|None}
+        """
+        user_id = str(user_id)
+        query = {"$or": [{"seller_id": user_id}, {"buyer_id": user_id}]}
+        descending = before is None
+
+        cursor = after or before
+        if cursor:
+            created_at, trade_id = TradeClient.decode_history_cursor(cursor)
+            op = "$lt" if descending else "$gt"
+            query = {
+                "$and": [
+                    query,
+                    {
+                        "$or": [
+                            {"created_at": {op: created_at}},
+                            {"created_at": created_at, "_id": {op: trade_id}},
+                        ]
+                    },
+                ]
+            }
+
+        direction = -1 if descending else 1
+        trades = list(
+            db.trades.find(query, HISTORY_PROJECTION)
+            .sort([("created_at", direction), ("_id", direction)])
+            .limit(limit + 1)
+        )
+
+        has_more = len(trades) > limit
+        trades = trades[:limit]
+        if not descending:
+            trades.reverse()
+
+        # Moving backwards always leaves older trades behind us, and moving
+        # forwards from a cursor always leaves newer ones.
+        has_older = has_more if descending else True
+        has_newer = bool(after) if descending else has_more
+
+        return {
+            "trades": trades,
+            "next_cursor": (
+                TradeClient.encode_history_cursor(trades[-1])
+                if trades and has_older
+                else None
+            ),
+            "prev_cursor": (
+                TradeClient.encode_history_cursor(trades[0])
+                if trades and has_newer
+                else None
+            ),
+        }
+
     @staticmethod
     def get_trades_report(sells: list, buys: list):
         "Return aggregated data of trades"
@@ -335,15 +636,70 @@ class TradeClient:
 
         trades = purchases + sales
 
-        # r_buys = [i for i in buys if i["dispute"] != []]
-        # r_sells = [i for i in sells if i["dispute"] != []]
-        # reports = len(r_buys) + len(r_sells)
-        reports = []
-        for trade in buys + sells:
-            trade_report = db.disputes.find({"trade_id": trade["_id"]})
-            [reports.append(i) for i in trade_report]
+        # One count over every trade id instead of a find per trade
+        trade_ids = [trade["_id"] for trade in buys + sells]
+        reports = (
+            db.disputes.count_documents({"trade_id": {"$in": trade_ids}})
+            if trade_ids
+            else 0
+        )
+
+        return purchases, sales, trades, active, reports
+
+    @staticmethod
+    def get_user_trades_report(user_id: str):
+        """
+        Same figures as get_trades_report, computed server-side in a single
+        aggregation without loading the user's trades or disputes.
+
+        Returns:
+            tuple: (purchases, sales, trades, active, reports)
+        """
+        user_id = str(user_id)
+        is_buyer = {"$eq": ["$buyer_id", user_id]}
+        is_seller = {"$eq": ["$seller_id", user_id]}
+        is_active = {"$eq": ["$is_active", True]}
+
+        pipeline = [
+            {"$match": {"$or": [{"seller_id": user_id}, {"buyer_id": user_id}]}},
+            {"$project": {"seller_id": 1, "buyer_id": 1, "is_active": 1}},
+            {
+                "$lookup": {
+                    "from": "disputes",
+                    "localField": "_id",
+                    "foreignField": "trade_id",
+                    "as": "disputes",
+                }
+            },
+            {
+                "$group": {
+                    "_id": None,
+                    "purchases": {"$sum": {"$cond": [is_buyer, 1, 0]}},
+                    "sales": {"$sum": {"$cond": [is_seller, 1, 0]}},
+                    "active_buys": {
+                        "$sum": {"$cond": [{"$and": [is_buyer, is_active]}, 1, 0]}
+                    },
+                    "active_sells": {
+                        "$sum": {"$cond": [{"$and": [is_seller, is_active]}, 1, 0]}
+                    },
+                    "reports": {"$sum": {"$size": "$disputes"}},
+                }
+            },
+        ]
+
+        try:
+            result = next(db.trades.aggregate(pipeline), None)
+        except Exception as e:
+            logger.error(f"Error building trades report for {user_id}: {e}")
+            result = None
+
+        if not result:
+            return 0, 0, 0, 0, 0
 
-        return purchases, sales, trades, active, len(reports)
+        purchases = result["purchases"]
+        sales = result["sales"]
+        active = result["active_buys"] + result["active_sells"]
+        return purchases, sales, purchases + sales, active, result["reports"]
 
     @staticmethod
     def delete_trade(trade_id: str):
@@ -354,6 +710,10 @@ class TradeClient:
             return "Not Found!"
         else:
             db.trades.delete_one({"_id": trade_id})
+            trade_cache.invalidate(trade_id)
+            TradeStatsClient.rebuild_user_stats(
+                [uid for uid in (trade.get("seller_id"), trade.get("buyer_id")) if uid]
+            )
             return "Complete!"
 
     @staticmethod
@@ -383,6 +743,8 @@ class TradeClient:
         if trade is not None:
             trade_id = trade["_id"]
             db.trades.update_one({"_id": trade_id}, {"$set": {"is_paid": True}})
+            trade_cache.invalidate(trade_id)
+            TradeStatsClient.record_trade_event(trade_id, "paid")
             return True
         return False
 
@@ -394,6 +756,7 @@ class TradeClient:
             db.trades.update_one(
                 {"_id": trade_id}, {"$set": {"is_paid": False, "is_active": False}}
             )
+            trade_cache.invalidate(trade_id)
             return True
         return False
 
@@ -407,6 +770,7 @@ class TradeClient:
             {"is_active": True},
             {"$set": {"is_active": False, "updated_at": datetime.now()}},
         )
+        trade_cache.clear()
         return result.modified_count
 
     @staticmethod
@@ -437,32 +801,73 @@ class TradeClient:
         return trade
 
     @staticmethod
-    def update_trade_status(trade_id: str, status: str) -> bool:
-        """Update trade status and deactivate if terminal status"""
-        try:
-            # Define terminal statuses that should deactivate the trade
-            terminal_statuses = [
-                "completed",
-                "cancelled",
-                "expired",
-                "failed",
-                "crypto_released",
-            ]
+    def _transition(
+        trade_id: str,
+        status: str,
+        where: dict | None = None,
+        fields: dict | None = None,
+    ) -> TradeType | None:
+        """
+        Move a trade into ``status`` in one atomic find_one_and_update.
 
-            update_data = {"status": status, "updated_at": datetime.now()}
+        The filter only matches while the trade is in a status allowed by
+        TRANSITIONS (plus any extra ``where`` preconditions), so concurrent
+        or repeated requests for the same transition succeed at most once.
 
-            # If it's a terminal status, also deactivate the trade
-            if status.lower() in terminal_statuses:
-                update_data["is_active"] = False
-                logger.info(
-                    f"Deactivating trade {trade_id} due to terminal status: {status}"
-                )
+        Returns:
+            TradeType | None: The updated trade, or None if the trade does
+            not exist or the transition is not allowed from its status
+        """
+        update_data = {"status": status, "updated_at": datetime.now(), **(fields or {})}
 
-            db.trades.update_one({"_id": trade_id}, {"$set": update_data})
-            return True
+        # Entering a terminal status also deactivates the trade
+        if status in TERMINAL_STATUSES:
+            update_data["is_active"] = False
+            logger.info(
+                f"Deactivating trade {trade_id} due to terminal status: {status}"
+            )
+
+        trade = db.trades.find_one_and_update(
+            transition_filter(trade_id, status, where),
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER,
+        )
+        if not trade:
+            logger.warning(f"Trade {trade_id} cannot move to {status}")
+            trade_cache.invalidate(trade_id)
+            return None
+
+        if isinstance(trade, dict):
+            trade_cache.set(trade_id, trade)
+        else:
+            trade_cache.invalidate(trade_id)
+
+        event = STATUS_EVENTS.get(status)
+        if event:
+            TradeStatsClient.record_trade_event(trade_id, event)
+        return trade
+
+    @staticmethod
+    def update_trade_status(
+        trade_id: str, status: str, fields: dict | None = None
+    ) -> TradeType | None:
+        """
+        Move a trade into ``status`` if the transition table allows it.
+
+        Args:
+            trade_id: Trade to update
+            status: Target status, a key of trade_state.TRANSITIONS
+            fields: Extra fields to set in the same write
+
+        Returns:
+            TradeType | None: The updated trade, or None if the transition
+            was rejected or failed
+        """
+        try:
+            return TradeClient._transition(trade_id, status.lower(), fields=fields)
         except Exception as e:
             logger.error(f"Error updating trade status: {e}")
-            return False
+            return None
 
     @staticmethod
     def confirm_crypto_deposit(trade_id: str) -> bool:
@@ -478,29 +883,52 @@ class TradeClient:
                     }
                 },
             )
+            trade_cache.invalidate(trade_id)
             return True
         except Exception as e:
             logger.error(f"Error confirming crypto deposit: {e}")
             return False
 
     @staticmethod
-    def confirm_fiat_payment(trade_id: str) -> bool:
-        """Confirm fiat payment for a trade"""
+    def mark_deposited(trade_id: str) -> TradeType | None:
+        """
+        Record the seller's crypto deposit and open the trade to buyers, as
+        one conditional "deposited" transition.
+
+        Returns:
+            TradeType | None: The updated trade, or None if the trade was
+            already deposited, or cancelled, by the time this ran
+        """
+        now = datetime.now()
+        return TradeClient.update_trade_status(
+            trade_id,
+            "deposited",
+            fields={
+                "is_active": True,
+                "is_crypto_deposited": True,
+                "crypto_deposit_time": now,
+            },
+        )
+
+    @staticmethod
+    def confirm_fiat_payment(
+        trade_id: str, buyer_id: str | None = None
+    ) -> TradeType | None:
+        """Confirm fiat payment for a trade, optionally checking the buyer"""
         try:
-            db.trades.update_one(
-                {"_id": trade_id},
-                {
-                    "$set": {
-                        "is_fiat_paid": True,
-                        "fiat_payment_time": datetime.now(),
-                        "updated_at": datetime.now(),
-                    }
-                },
+            now = datetime.now()
+            trade = TradeClient._transition(
+                trade_id,
+                "fiat_paid",
+                where={"buyer_id": str(buyer_id)} if buyer_id else None,
+                fields={"is_fiat_paid": True, "fiat_payment_time": now},
             )
-            return True
+            if trade:
+                TradeStatsClient.record_trade_event(trade_id, "paid")
+            return trade
         except Exception as e:
             logger.error(f"Error confirming fiat payment: {e}")
-            return False
+            return None
 
     @staticmethod
     def add_fiat_payment_proof(
@@ -522,73 +950,68 @@ class TradeClient:
                     }
                 },
             )
+            trade_cache.invalidate(trade_id)
             return True
         except Exception as e:
             logger.error(f"Error adding fiat payment proof: {e}")
             return False
 
     @staticmethod
-    def approve_fiat_payment(trade_id: str, seller_id: str) -> bool:
+    def approve_fiat_payment(trade_id: str, seller_id: str) -> TradeType | None:
         """Approve fiat payment and mark trade as ready for crypto release"""
         try:
-            db.trades.update_one(
-                {"_id": trade_id},
-                {
-                    "$set": {
-                        "is_fiat_paid": True,
-                        "fiat_payment_approved": True,
-                        "fiat_approved_by": seller_id,
-                        "fiat_approved_at": datetime.now(),
-                        "status": "fiat_approved",
-                        "updated_at": datetime.now(),
-                    }
+            now = datetime.now()
+            return TradeClient._transition(
+                trade_id,
+                "fiat_approved",
+                where={"seller_id": str(seller_id)},
+                fields={
+                    "is_fiat_paid": True,
+                    "fiat_payment_approved": True,
+                    "fiat_approved_by": seller_id,
+                    "fiat_approved_at": now,
                 },
             )
-            return True
         except Exception as e:
             logger.error(f"Error approving fiat payment: {e}")
-            return False
+            return None
 
     @staticmethod
-    def reject_fiat_payment(trade_id: str, seller_id: str, reason: str = None) -> bool:
+    def reject_fiat_payment(
+        trade_id: str, seller_id: str, reason: str = None
+    ) -> TradeType | None:
         """Reject fiat payment proof"""
         try:
             update_data = {
                 "fiat_payment_rejected": True,
                 "fiat_rejected_by": seller_id,
                 "fiat_rejected_at": datetime.now(),
-                "status": "fiat_rejected",
-                "updated_at": datetime.now(),
             }
             if reason:
                 update_data["fiat_rejection_reason"] = reason
 
-            db.trades.update_one({"_id": trade_id}, {"$set": update_data})
-            return True
+            return TradeClient._transition(
+                trade_id,
+                "fiat_rejected",
+                where={"seller_id": str(seller_id)},
+                fields=update_data,
+            )
         except Exception as e:
             logger.error(f"Error rejecting fiat payment: {e}")
-            return False
+            return None
 
     @staticmethod
-    def complete_trade(trade_id: str) -> bool:
+    def complete_trade(trade_id: str) -> TradeType | None:
         """Mark trade as completed and deactivate it"""
         try:
-            db.trades.update_one(
-                {"_id": trade_id},
-                {
-                    "$set": {
-                        "is_completed": True,
-                        "is_active": False,  # Deactivate the trade when completed
-                        "status": "completed",
-                        "completed_at": datetime.now(),
-                        "updated_at": datetime.now(),
-                    }
-                },
+            return TradeClient._transition(
+                trade_id,
+                "completed",
+                fields={"is_completed": True, "completed_at": datetime.now()},
             )
-            return True
         except Exception as e:
             logger.error(f"Error completing trade: {e}")
-            return False
+            return None
 
     @staticmethod
     def calculate_trade_fee(amount: float) -> tuple[float, float]:
@@ -666,6 +1089,73 @@ class TradeClient:
             },
         }
 
+    @staticmethod
+    def get_fee_quote(trade: TradeType | str, refresh: bool = False) -> dict | None:
+        """Fee breakdown locked to a trade
+
+        The first call stores ``calculate_trade_fee_with_gas`` on the trade as
+        ``fee_quote``, valid for FEE_QUOTE_TTL seconds, and later calls reuse
+        it. An expired quote is replaced only while the deposit is still
+        outstanding: once the deposit is confirmed, the quote the seller
+        funded stays fixed through release.
+
+        Args:
+            trade: Trade document or id
+            refresh: Replace the stored quote even if it is still valid
+
+        Returns:
+            dict | None: The ``calculate_trade_fee_with_gas`` fields plus
+                'quote_id', 'amount', 'currency', 'quoted_at' and
+                'expires_at', or None if the trade doesn't exist
+        """
+        if isinstance(trade, str):
+            trade = TradeClient.get_trade(trade)
+        if not trade:
+            return None
+
+        amount = float(trade.get("price", 0))
+        currency = trade.get("currency")
+        now = datetime.now()
+
+        current = trade.get("fee_quote")
+        if current and not refresh:
+            same_terms = (
+                current.get("amount") == amount and current.get("currency") == currency
+            )
+            if same_terms and (
+                trade.get("is_crypto_deposited") or current["expires_at"] > now
+            ):
+                return current
+
+        quote = {
+            **TradeClient.calculate_trade_fee_with_gas(amount, currency),
+            "quote_id": generate_id(),
+            "amount": amount,
+            "currency": currency,
+            "quoted_at": now,
+            "expires_at": now + timedelta(seconds=FEE_QUOTE_TTL),
+        }
+
+        # Only replace the quote this call read, so concurrent re-quotes
+        # settle on one stored value
+        if current:
+            unchanged = {"fee_quote.quote_id": current.get("quote_id")}
+        else:
+            unchanged = {"fee_quote": {"$exists": False}}
+        try:
+            stored = db.trades.find_one_and_update(
+                {"_id": trade["_id"], **unchanged},
+                {"$set": {"fee_quote": quote}},
+                return_document=ReturnDocument.AFTER,
+            )
+            trade_cache.invalidate(trade["_id"])
+            if stored is None:
+                stored = db.trades.find_one({"_id": trade["_id"]}, {"fee_quote": 1})
+            return (stored or {}).get("fee_quote") or quote
+        except Exception as e:
+            logger.error(f"Error storing fee quote for trade {trade['_id']}: {e}")
+            return quote
+
     @staticmethod
     def _estimate_gas_fees(currency: str) -> dict:
         """Estimate gas fees for both user and bot payouts
@@ -676,17 +1166,13 @@ class TradeClient:
         try:
             from web3 import Web3
 
-            from functions.wallet import WalletManager
+            from functions.gas_oracle import gas_oracle
 
-            # Get current gas price from network
+            # Current gas price from the oracle's in-memory fee snapshot
             if currency in ["ETH", "USDT"]:
-                web3 = WalletManager._get_web3_connection(
-                    WalletManager.SUPPORTED_COINS.get(
-                        currency, WalletManager.SUPPORTED_COINS["ETH"]
-                    )
-                )
-                if web3:
-                    current_gas_price = web3.eth.gas_price
+                quote = gas_oracle.quote("normal")
+                current_gas_price = quote["gas_price"] if quote else None
+                if current_gas_price:
 
                     if currency == "ETH":
                         # ETH transfers: 21,000 gas each
@@ -699,12 +1185,12 @@ class TradeClient:
 
                     # Convert to ETH with 20% buffer for price fluctuations
                     user_payout_fee = float(
-                        web3.from_wei(
+                        Web3.from_wei(
                             user_payout_gas * current_gas_price * 1.2, "ether"
                         )
                     )
                     bot_payout_fee = float(
-                        web3.from_wei(bot_payout_gas * current_gas_price * 1.2, "ether")
+                        Web3.from_wei(bot_payout_gas * current_gas_price * 1.2, "ether")
                     )
 
                     return {
@@ -754,21 +1240,42 @@ class TradeClient:
     def set_buyer_address(
         trade_id: str, buyer_address: str, network: str = None
     ) -> bool:
-        """Set buyer's crypto address for receiving funds"""
+        """Set buyer's crypto address for receiving funds
+
+        Only while the trade is still waiting for the release, so the address
+        can't change once the payout has been claimed.
+        """
         try:
             update_data = {"buyer_address": buyer_address, "updated_at": datetime.now()}
             if network:
                 update_data["buyer_network"] = network
 
-            db.trades.update_one({"_id": trade_id}, {"$set": update_data})
-            return True
+            result = db.trades.update_one(
+                {
+                    "_id": trade_id,
+                    "status": {"$in": ["fiat_approved", "awaiting_buyer_address"]},
+                },
+                {"$set": update_data},
+            )
+            trade_cache.invalidate(trade_id)
+            return result.matched_count > 0
         except Exception as e:
             logger.error(f"Error setting buyer address: {e}")
             return False
 
     @staticmethod
     def initiate_crypto_release(trade_id: str) -> bool:
-        """Initiate crypto release process - transfer from seller wallet to buyer"""
+        """Initiate crypto release process - transfer from seller wallet to buyer
+
+        Returns once the transfer is broadcast. The trade's release_tx_status
+        stays "pending" until the receipt tracker confirms the transaction
+        and completes the trade.
+
+        The trade is first claimed by moving it into "releasing", conditional
+        on its status and buyer address, so concurrent or repeated calls
+        broadcast at most one payout. A transfer that fails before anything
+        is broadcast hands the trade back to "awaiting_buyer_address".
+        """
         try:
             trade = TradeClient.get_trade(trade_id)
             if not trade:
@@ -791,9 +1298,7 @@ class TradeClient:
 
             # Use gas-inclusive calculation for wallet-based trades
             if trade.get("is_wallet_trade"):
-                fee_data = TradeClient.calculate_trade_fee_with_gas(
-                    original_amount, currency
-                )
+                fee_data = TradeClient.get_fee_quote(trade)
                 fee_amount = fee_data["bot_fee"]
                 total_gas_fees = fee_data["total_gas_fees"]
                 logger.info(
@@ -820,8 +1325,20 @@ class TradeClient:
                     logger.error(f"Trade {trade_id} missing seller wallet ID")
                     return False
 
+                claimed = TradeClient._transition(
+                    trade_id,
+                    RELEASING_STATUS,
+                    where={
+                        "buyer_address": buyer_address,
+                        "fiat_payment_approved": True,
+                    },
+                )
+                if not claimed:
+                    logger.warning(f"Trade {trade_id} release already claimed")
+                    return False
+
                 # Transfer the original amount to buyer (seller deposited original + fee)
-                success = WalletManager.transfer_crypto(
+                transfer = WalletManager.transfer_crypto(
                     from_wallet_id=seller_wallet_id,
                     to_address=buyer_address,
                     amount=original_amount,  # Buyer gets the original amount
@@ -829,15 +1346,16 @@ class TradeClient:
                     trade_id=trade_id,
                 )
 
-                if success:
+                if transfer:
                     # Update trade with release information including gas fee accounting
                     update_data = {
                         "crypto_released": True,
+                        "release_tx_hash": transfer["tx_hash"],
+                        # "pending" until the receipt tracker sees it mined
+                        "release_tx_status": transfer["status"],
                         "crypto_release_amount": original_amount,  # Record what was sent to buyer
                         "bot_fee_amount": available_for_bot,  # Bot fee after gas accounting
                         "crypto_release_time": datetime.now(),
-                        "status": "crypto_released",
-                        "updated_at": datetime.now(),
                     }
 
                     # Add gas fee information for wallet-based trades
@@ -855,13 +1373,19 @@ class TradeClient:
                             }
                         )
 
-                    db.trades.update_one({"_id": trade_id}, {"$set": update_data})
+                    TradeClient._transition(
+                        trade_id, "crypto_released", fields=update_data
+                    )
                     logger.info(
                         f"Crypto released for trade {trade_id}: {original_amount} {currency} to {buyer_address}"
                     )
                     return True
                 else:
                     logger.error(f"Failed to transfer crypto for trade {trade_id}")
+                    # Hand the trade back only if nothing was broadcast for it;
+                    # otherwise it stays "releasing" for support to resolve
+                    if not db.wallet_transactions.find_one({"trade_id": trade_id}):
+                        TradeClient._transition(trade_id, "awaiting_buyer_address")
                     return False
             else:
                 # For BTCPay trades, handle differently (if needed)
@@ -875,112 +1399,72 @@ class TradeClient:
             return False
 
     @staticmethod
-    def request_buyer_address(trade_id: str) -> bool:
+    def request_buyer_address(trade_id: str) -> TradeType | None:
         """Mark trade as waiting for buyer address"""
         try:
-            db.trades.update_one(
-                {"_id": trade_id},
-                {
-                    "$set": {
-                        "status": "awaiting_buyer_address",
-                        "updated_at": datetime.now(),
-                    }
-                },
-            )
-            return True
+            return TradeClient._transition(trade_id, "awaiting_buyer_address")
         except Exception as e:
             logger.error(f"Error requesting buyer address: {e}")
-            return False
+            return None
 
     @staticmethod
-    def cancel_trade(trade_id: str, user_id: str) -> bool:
-        """Cancel a trade"""
+    def cancel_trade(trade_id: str, user_id: str) -> TradeType | None:
+        """Cancel a trade on behalf of its seller or buyer"""
         try:
-            # Get the trade to verify it exists and user has permission
-            trade = TradeClient.get_trade(trade_id)
-            if not trade:
-                logger.error(f"Trade {trade_id} not found for cancellation")
-                return False
-
-            # Check if user is authorized (seller or buyer)
-            seller_id = str(trade.get("seller_id", ""))
-            buyer_id = str(trade.get("buyer_id", ""))
-
-            if user_id not in [seller_id, buyer_id]:
-                logger.error(
-                    f"User {user_id} not authorized to cancel trade {trade_id}"
-                )
-                return False
-
-            # Update trade to cancelled status
-            result = db.trades.update_one(
-                {"_id": trade_id},
-                {
-                    "$set": {
-                        "is_active": False,
-                        "is_cancelled": True,
-                        "cancelled_by": user_id,
-                        "cancelled_at": datetime.now(),
-                        "updated_at": datetime.now(),
-                    }
+            trade = TradeClient._transition(
+                trade_id,
+                "cancelled",
+                # Only participants may cancel, and only once
+                where={
+                    "$or": [{"seller_id": user_id}, {"buyer_id": user_id}],
+                    "is_cancelled": {"$ne": True},
+                },
+                fields={
+                    "is_cancelled": True,
+                    "cancelled_by": user_id,
+                    "cancelled_at": datetime.now(),
                 },
             )
 
-            if result.modified_count > 0:
+            if trade:
                 logger.info(
                     f"Trade {trade_id} cancelled successfully by user {user_id}"
                 )
-                return True
             else:
-                logger.error(f"Failed to update trade {trade_id} to cancelled status")
-                return False
+                logger.error(f"User {user_id} could not cancel trade {trade_id}")
+            return trade
 
         except Exception as e:
             logger.error(f"Error cancelling trade {trade_id}: {e}")
-            return False
+            return None
 
     @staticmethod
-    def join_trade(trade_id: str, user_id: str) -> bool:
+    def join_trade(trade_id: str, user_id: str) -> TradeType | None:
         """Allow a buyer to join an active trade"""
         try:
-            # Get the trade to verify it exists and is available
-            trade = TradeClient.get_trade(trade_id)
-            if not trade:
-                logger.error(f"Trade {trade_id} not found for joining")
-                return False
-
-            # Check if trade is active and available for joining
-            if not trade.get("is_active", False):
-                logger.error(f"Trade {trade_id} is not active")
-                return False
-
-            # Check if trade already has a buyer
-            if trade.get("buyer_id") and trade.get("buyer_id") != "":
-                logger.error(f"Trade {trade_id} already has a buyer")
-                return False
-
-            # Check if user is not the seller
-            seller_id = str(trade.get("seller_id", ""))
-            if str(user_id) == seller_id:
-                logger.error(f"User {user_id} cannot join their own trade {trade_id}")
-                return False
-
-            # Add the buyer to the trade
-            result = db.trades.update_one(
-                {"_id": trade_id},
-                {"$set": {"buyer_id": str(user_id), "updated_at": datetime.now()}},
+            user_id = str(user_id)
+            trade = TradeClient._transition(
+                trade_id,
+                "buyer_joined",
+                # Active, no buyer yet, and not the seller's own trade
+                where={
+                    "is_active": True,
+                    "buyer_id": {"$in": ["", None]},
+                    "seller_id": {"$ne": user_id},
+                },
+                fields={"buyer_id": user_id},
             )
 
-            if result.modified_count > 0:
+            if trade:
+                TradeStatsClient.record_trade_event(trade_id, "joined")
                 logger.info(f"User {user_id} successfully joined trade {trade_id}")
-                return True
             else:
-                logger.error(f"Failed to add user {user_id} to trade {trade_id}")
-                return False
+                logger.error(f"User {user_id} could not join trade {trade_id}")
+            return trade
 
         except Exception as e:
             logger.error(f"Error joining trade {trade_id}: {e}")
-            return False
+            return None
 
     # ========== BROKER-RELATED METHODS ==========
 
@@ -1020,6 +1504,7 @@ class TradeClient:
                     }
                 },
             )
+            trade_cache.invalidate(trade_id)
 
             if result.modified_count > 0:
                 logger.info(f"Broker {broker_id} added to trade {trade_id}")
@@ -1052,6 +1537,7 @@ class TradeClient:
                 update_data["broker_notes"] = notes
 
             result = db.trades.update_one({"_id": trade_id}, {"$set": update_data})
+            trade_cache.invalidate(trade_id)
 
             if result.modified_count > 0:
                 logger.info(
@@ -1106,6 +1592,7 @@ class TradeClient:
                 {"_id": trade_id},
                 {"$set": {field_name: rating, "updated_at": datetime.now()}},
             )
+            trade_cache.invalidate(trade_id)
 
             if result.modified_count > 0:
                 # Update broker's overall rating
@@ -1210,13 +1697,17 @@ class TradeClient:
             seven_days_ago = now - timedelta(days=7)
 
             # Cleanup 1: Cancel trades with no buyer after 48 hours
+            no_buyer_query = {
+                "is_active": True,
+                "buyer_id": {"$in": ["", None]},
+                "created_at": {"$lt": forty_eight_hours_ago},
+                "is_cancelled": {"$ne": True},
+            }
+            no_buyer_ids = [
+                t["_id"] for t in db.trades.find(no_buyer_query, {"_id": 1})
+            ]
             no_buyer_result = db.trades.update_many(
-                {
-                    "is_active": True,
-                    "buyer_id": {"$in": ["", None]},
-                    "created_at": {"$lt": forty_eight_hours_ago},
-                    "is_cancelled": {"$ne": True},
-                },
+                {"_id": {"$in": no_buyer_ids}, **no_buyer_query},
                 {
                     "$set": {
                         "is_active": False,
@@ -1228,6 +1719,9 @@ class TradeClient:
                     }
                 },
             )
+            trade_cache.clear()
+            for trade_id in no_buyer_ids:
+                TradeStatsClient.record_trade_event(trade_id, "cancelled")
 
             no_buyer_cancelled = no_buyer_result.modified_count
             logger.info(
@@ -1235,16 +1729,16 @@ class TradeClient:
             )
 
             # Cleanup 2: Expire trades stuck in pending status for 7 days
+            pending_query = {
+                "is_active": True,
+                "status": {"$in": ["pending", "awaiting_deposit", "awaiting_payment"]},
+                "created_at": {"$lt": seven_days_ago},
+                "is_completed": {"$ne": True},
+                "is_cancelled": {"$ne": True},
+            }
+            pending_ids = [t["_id"] for t in db.trades.find(pending_query, {"_id": 1})]
             pending_result = db.trades.update_many(
-                {
-                    "is_active": True,
-                    "status": {
-                        "$in": ["pending", "awaiting_deposit", "awaiting_payment"]
-                    },
-                    "created_at": {"$lt": seven_days_ago},
-                    "is_completed": {"$ne": True},
-                    "is_cancelled": {"$ne": True},
-                },
+                {"_id": {"$in": pending_ids}, **pending_query},
                 {
                     "$set": {
                         "is_active": False,
@@ -1256,6 +1750,9 @@ class TradeClient:
                     }
                 },
             )
+            trade_cache.clear()
+            for trade_id in pending_ids:
+                TradeStatsClient.record_trade_event(trade_id, "cancelled")
 
             pending_expired = pending_result.modified_count
             logger.info(
@@ -1391,6 +1888,7 @@ class TradeClient:
                             }
                         },
                     )
+                    trade_cache.invalidate(trade_id)
 
                     warnings_sent += 1
                     logger.info(
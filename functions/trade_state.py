@@ -0,0 +1,81 @@
+"""
+Trade status state machine.
+
+``TRANSITIONS`` maps every status a trade can move into to the statuses it
+may be entered from. ``TradeClient`` turns an entry into the filter of a
+single ``find_one_and_update``, so the precondition check and the write are
+one atomic round trip and a repeated click simply fails to match.
+"""
+
+# Statuses before the seller's deposit is confirmed. None covers trades
+# created without a status field.
+OPEN_STATUSES = (None, "", "created", "pending", "awaiting_deposit", "awaiting_payment")
+
+# Statuses of a funded trade moving through the fiat payment steps
+IN_PROGRESS_STATUSES = (
+    "deposited",
+    "buyer_joined",
+    "fiat_paid",
+    "proof_submitted",
+    "fiat_approved",
+    "fiat_rejected",
+    "awaiting_buyer_address",
+)
+
+# Statuses that deactivate the trade when entered
+TERMINAL_STATUSES = ("completed", "cancelled", "expired", "failed", "crypto_released")
+
+NON_TERMINAL_STATUSES = OPEN_STATUSES + IN_PROGRESS_STATUSES + ("disputed",)
+
+# Status held while a payout is being broadcast. It is claimed atomically
+# before the transfer so a release can't be sent twice, and it is not
+# non-terminal: a trade whose funds may be on the move can't be cancelled,
+# expired or disputed.
+RELEASING_STATUS = "releasing"
+
+# Target status -> statuses it may be entered from
+TRANSITIONS = {
+    "deposited": OPEN_STATUSES,
+    "buyer_joined": OPEN_STATUSES + ("deposited",),
+    # "deposited" covers buyers added without the join transition (add_buyer)
+    "fiat_paid": ("deposited", "buyer_joined", "fiat_rejected"),
+    "proof_submitted": ("deposited", "buyer_joined", "fiat_paid", "fiat_rejected"),
+    "fiat_approved": ("fiat_paid", "proof_submitted"),
+    "fiat_rejected": ("fiat_paid", "proof_submitted"),
+    # "releasing" hands the trade back when the payout could not be sent
+    "awaiting_buyer_address": ("fiat_approved", RELEASING_STATUS),
+    RELEASING_STATUS: ("fiat_approved", "awaiting_buyer_address"),
+    "crypto_released": (RELEASING_STATUS,),
+    "disputed": OPEN_STATUSES + IN_PROGRESS_STATUSES,
+    "completed": NON_TERMINAL_STATUSES + ("crypto_released",),
+    "cancelled": NON_TERMINAL_STATUSES,
+    "expired": NON_TERMINAL_STATUSES,
+    "failed": NON_TERMINAL_STATUSES,
+}
+
+
+def allowed_sources(status: str) -> tuple:
+    """
+    Statuses a trade may hold before moving into ``status``.
+
+    Raises:
+        ValueError: If ``status`` is not a known target status
+    """
+    try:
+        return TRANSITIONS[status]
+    except KeyError:
+        raise ValueError(f"Unknown trade status: {status}") from None
+
+
+def can_transition(current: str | None, status: str) -> bool:
+    """Whether a trade in ``current`` may move into ``status``"""
+    return status in TRANSITIONS and current in TRANSITIONS[status]
+
+
+def transition_filter(trade_id: str, status: str, where: dict | None = None) -> dict:
+    """Filter matching the trade only while the transition is still allowed"""
+    return {
+        "_id": trade_id,
+        "status": {"$in": list(allowed_sources(status))},
+        **(where or {}),
+    }
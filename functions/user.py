@@ -1,12 +1,24 @@
 import logging
 
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
 from config import *
 from database import *
 
+from .cache import LRUCache
 from .utils import *
 
 logger = logging.getLogger(__name__)
 
+# Profiles are read on nearly every update; keep recent ones in memory
+user_cache = LRUCache(
+    "users",
+    max_size=USER_CACHE_SIZE,
+    ttl=USER_CACHE_TTL,
+    enabled=USER_CACHE_ENABLED,
+)
+
 
 def get_msg_id(msg) -> int:
     "Returns the message id"
@@ -31,18 +43,15 @@ class UserClient:
         "Returns or creates a new user"
         id = str(msg.from_user.id)
 
+        user: UserType = user_cache.get(id)
+        if user is not None:
+            return user
+
         try:
             chat = msg.chat
         except:
             chat = msg.message.chat
 
-        # Query for the user
-        user: UserType = db.users.find_one({"_id": str(id)})
-
-        if user:
-            return user
-
-        # If user not found, create a new user
         new_user: UserType = {
             "_id": id,
             "name": msg.from_user.first_name,
@@ -52,18 +61,40 @@ class UserClient:
             "disabled": False,
             "created_at": datetime.now(),
         }
-        logger.info(f"Created new user document: {new_user}")
 
-        db.users.insert_one(new_user)
-        return new_user
+        # Fetch-or-create in a single round trip. $setOnInsert leaves existing
+        # users untouched; the pre-image tells us whether one already existed.
+        try:
+            user = db.users.find_one_and_update(
+                {"_id": id},
+                {"$setOnInsert": {k: v for k, v in new_user.items() if k != "_id"}},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE,
+            )
+        except DuplicateKeyError:
+            # Lost an upsert race with a concurrent request for the same user
+            user = db.users.find_one({"_id": id})
+
+        if user is None:
+            logger.info(f"Created new user document: {new_user}")
+            user = new_user
+
+        if isinstance(user, dict):
+            user_cache.set(id, user)
+        return user
 
     @staticmethod
     def get_user_by_id(id: str) -> UserType | None:
         "Returns or creates a new user"
+        user: UserType = user_cache.get(str(id))
+        if user is not None:
+            return user
+
         # Query for the user
-        user: UserType = db.users.find_one({"_id": str(id)})
+        user = db.users.find_one({"_id": str(id)})
 
         if user:
+            user_cache.set(str(id), user)
             return user
         else:
             return None
@@ -74,5 +105,19 @@ class UserClient:
         user = UserClient.get_user_by_id(user_id)
         if user is not None:
             db.users.update_one({"_id": user_id}, {"$set": {"wallet": address}})
+            UserClient.invalidate_user(user_id)
             return user
         return None
+
+    @staticmethod
+    def invalidate_user(user_id: str | None = None) -> None:
+        """Drop a user from the cache, or every user when no id is given"""
+        if user_id is None:
+            user_cache.clear()
+        else:
+            user_cache.invalidate(str(user_id))
+
+    @staticmethod
+    def get_cache_stats() -> dict:
+        """Hit/miss counters for the user cache"""
+        return user_cache.stats()
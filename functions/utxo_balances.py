@@ -0,0 +1,262 @@
+"""
+Batched BTC, LTC and DOGE balance reads through BlockCypher.
+
+Balances used to be read one address per request, and LTC and DOGE went
+through ``/addrs/{address}/full``, which downloads the address's
+transaction list just to look at its latest output. The client here reads
+the lightweight ``/addrs/{a;b;c}/balance`` endpoint, packing up to
+``BLOCKCYPHER_BATCH_SIZE`` semicolon-separated addresses into one request.
+
+BlockCypher counts every address in a batch against its limits, so
+requests are paced by a token bucket refilled at ``BLOCKCYPHER_RATE_LIMIT``
+addresses per second, and a batch is split so that no request costs more
+than the bucket holds. The plan's ``BLOCKCYPHER_HOURLY_LIMIT`` is tracked
+over a rolling hour; once it is used up requests fail with
+``QuotaExceeded`` rather than waiting. ``BLOCKCYPHER_PRIORITY_SHARE`` of
+both budgets is held back for single-address lookups made while a user
+waits, so background reconciliation can't starve them. A 429 response is
+retried after its ``Retry-After`` delay, up to ``BLOCKCYPHER_MAX_RETRIES``
+times.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, Optional
+
+import requests
+
+from config import (
+    BLOCKCYPHER_API_TOKEN,
+    BLOCKCYPHER_BATCH_SIZE,
+    BLOCKCYPHER_HOURLY_LIMIT,
+    BLOCKCYPHER_MAX_RETRIES,
+    BLOCKCYPHER_PRIORITY_SHARE,
+    BLOCKCYPHER_RATE_LIMIT,
+    WALLET_REFRESH_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+BLOCKCYPHER_API_URL = "https://api.blockcypher.com/v1"
+
+# Symbol -> BlockCypher chain path
+BLOCKCYPHER_CHAINS = {
+    "BTC": "btc/main",
+    "LTC": "ltc/main",
+    "DOGE": "doge/main",
+}
+
+# Base units per coin (satoshis and their LTC/DOGE equivalents)
+BASE_UNITS = 10**8
+
+# Window of the hourly quota, in seconds
+QUOTA_WINDOW = 3600
+
+
+class QuotaExceeded(Exception):
+    """The hourly BlockCypher quota is used up"""
+
+
+class RateLimiter:
+    """
+    Token bucket plus rolling hourly quota, shared by every request of a
+    client.
+
+    Priority acquisitions may use the whole of both budgets; the others
+    leave ``priority_share`` of each untouched.
+
+    Args:
+        rate: Tokens added per second; also the bucket's capacity
+        hourly_limit: Tokens spent per rolling hour (0 for no limit)
+        priority_share: Fraction of both budgets kept for priority callers
+    """
+
+    def __init__(self, rate: float, hourly_limit: int = 0, priority_share: float = 0.0):
+        self.rate = rate
+        self.hourly_limit = hourly_limit
+        self.priority_share = priority_share
+        self._tokens = rate
+        self._updated = time.monotonic()
+        self._spent = deque()  # (monotonic time, cost) within the quota window
+        self._spent_total = 0
+        self._lock = threading.Lock()
+
+    def max_cost(self, priority: bool = False) -> int:
+        """Largest cost a single acquisition may ask for"""
+        share = 0.0 if priority else self.priority_share
+        return max(1, int(self.rate * (1 - share)))
+
+    def _check_quota(self, cost: float, priority: bool, now: float) -> None:
+        if not self.hourly_limit:
+            return
+        while self._spent and now - self._spent[0][0] >= QUOTA_WINDOW:
+            self._spent_total -= self._spent.popleft()[1]
+        share = 0.0 if priority else self.priority_share
+        if self._spent_total + cost > self.hourly_limit * (1 - share):
+            raise QuotaExceeded(
+                f"{self._spent_total} of {self.hourly_limit} hourly requests used"
+            )
+
+    def acquire(self, cost: float = 1, priority: bool = False) -> float:
+        """
+        Block until ``cost`` tokens can be spent. The lock is not held while
+        waiting, so a priority caller can go ahead of a waiting one.
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            ValueError: ``cost`` is above ``max_cost(priority)``
+            QuotaExceeded: The hourly quota can't cover ``cost``
+        """
+        if cost > self.max_cost(priority):
+            raise ValueError(f"Cost {cost} exceeds the bucket; split the batch")
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.rate, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                self._check_quota(cost, priority, now)
+
+                floor = 0.0 if priority else self.rate * self.priority_share
+                floor = min(floor, self.rate - cost)
+                if self._tokens - cost >= floor:
+                    self._tokens -= cost
+                    if self.hourly_limit:
+                        self._spent.append((now, cost))
+                        self._spent_total += cost
+                    return waited
+                delay = (cost + floor - self._tokens) / self.rate
+
+            time.sleep(delay)
+            waited += delay
+
+    def stats(self) -> dict:
+        return {"tokens": self._tokens, "spent_last_hour": self._spent_total}
+
+
+class BlockCypherClient:
+    """
+    Reads confirmed BTC, LTC and DOGE balances in batches.
+
+    Args:
+        token: BlockCypher API token (optional; raises the rate limits)
+        batch_size: Addresses per request
+        rate_limit: Addresses per second allowed by the plan
+        hourly_limit: Addresses per hour allowed by the plan (0 for none)
+        priority_share: Fraction of both limits kept for single lookups
+        max_retries: Retries of a rate-limited request
+        session: HTTP session, reused across requests
+    """
+
+    def __init__(
+        self,
+        token: Optional[str] = BLOCKCYPHER_API_TOKEN,
+        batch_size: int = BLOCKCYPHER_BATCH_SIZE,
+        rate_limit: float = BLOCKCYPHER_RATE_LIMIT,
+        hourly_limit: int = BLOCKCYPHER_HOURLY_LIMIT,
+        priority_share: float = BLOCKCYPHER_PRIORITY_SHARE,
+        max_retries: int = BLOCKCYPHER_MAX_RETRIES,
+        session: Optional[requests.Session] = None,
+    ):
+        self.token = token
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.limiter = RateLimiter(rate_limit, hourly_limit, priority_share)
+        self.session = session or requests.Session()
+        self.requests = 0
+        self.throttled = 0
+
+    def _get(self, path: str, cost: int, priority: bool = False):
+        """GET a BlockCypher path, pacing and retrying rate-limited requests"""
+        params = {"token": self.token} if self.token else None
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(cost, priority)
+            response = self.session.get(
+                f"{BLOCKCYPHER_API_URL}/{path}",
+                params=params,
+                timeout=WALLET_REFRESH_TIMEOUT,
+            )
+            self.requests += 1
+            if response.status_code != 429 or attempt == self.max_retries:
+                break
+
+            self.throttled += 1
+            try:
+                delay = float(response.headers.get("Retry-After", 1))
+            except ValueError:
+                delay = 1.0
+            logger.warning(f"BlockCypher rate limit hit, retrying in {delay}s")
+            time.sleep(delay)
+
+        response.raise_for_status()
+        return response.json()
+
+    def get_balances(
+        self, coin_symbol: str, addresses: Iterable[str], priority: bool = False
+    ) -> Dict[str, float]:
+        """
+        Confirmed balances of many addresses on one chain, one request per
+        ``batch_size`` addresses, or fewer if the rate limit's bucket is
+        smaller (blocking).
+
+        Returns:
+            dict: address -> balance in whole coins; addresses BlockCypher
+                returned an error for are left out
+
+        Raises:
+            ValueError: ``coin_symbol`` isn't a BlockCypher chain
+            QuotaExceeded: The hourly quota is used up
+            requests.RequestException: A batch request failed
+        """
+        chain = BLOCKCYPHER_CHAINS.get(coin_symbol)
+        if not chain:
+            raise ValueError(f"No BlockCypher chain for {coin_symbol}")
+
+        addresses = list(dict.fromkeys(addresses))
+        batch_size = min(self.batch_size, self.limiter.max_cost(priority))
+        balances = {}
+        for start in range(0, len(addresses), batch_size):
+            batch = addresses[start : start + batch_size]
+            data = self._get(
+                f"{chain}/addrs/{';'.join(batch)}/balance", len(batch), priority
+            )
+            # A single address comes back as an object, a batch as a list
+            for entry in data if isinstance(data, list) else [data]:
+                if "error" in entry or "address" not in entry:
+                    logger.warning(
+                        f"BlockCypher {coin_symbol} balance error: "
+                        f"{entry.get('error', entry)}"
+                    )
+                    continue
+                balances[entry["address"]] = entry.get("balance", 0) / BASE_UNITS
+        return balances
+
+    def get_balance(self, coin_symbol: str, address: str) -> float:
+        """
+        Confirmed balance of one address (blocking). Made while a user
+        waits, so it may use the share of the limits kept for priority.
+
+        Raises:
+            ValueError: BlockCypher returned no balance for the address
+        """
+        balances = self.get_balances(coin_symbol, [address], priority=True)
+        if address not in balances:
+            raise ValueError(f"No {coin_symbol} balance returned for {address}")
+        return balances[address]
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "throttled": self.throttled,
+            **self.limiter.stats(),
+        }
+
+
+blockcypher = BlockCypherClient()
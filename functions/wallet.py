@@ -4,14 +4,23 @@ import logging
 import os
 import secrets
 from datetime import datetime
+from decimal import Decimal
 from typing import Any, Dict, List, Optional
 
 import base58
 from cryptography.fernet import Fernet
+from pymongo import UpdateOne
 
 from config import *
 from database import *
+from functions.async_client import run_blocking
+from functions.balance_cache import balance_cache
+from functions.evm_balances import read_balances, token_contract
+from functions.gas_oracle import gas_oracle
+from functions.nonce_manager import nonce_manager
+from functions.solana_rpc import USDT_MINT_ADDRESS, get_solana_rpc
 from functions.utils import generate_id
+from functions.utxo_balances import BLOCKCYPHER_CHAINS, blockcypher
 
 # Import handler functions for testing compatibility
 try:
@@ -30,6 +39,11 @@ try:
     import hashlib
 
     from eth_account import Account
+    from eth_account.hdaccount.deterministic import (
+        Node,
+        derive_child_key,
+        hmac_sha512,
+    )
     from mnemonic import Mnemonic
     from web3 import Web3
 
@@ -43,6 +57,52 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+class DerivationContext:
+    """
+    BIP39 seed and BIP32 key tree of one mnemonic, each derived at most once.
+
+    Turning a mnemonic into a seed is 2048 rounds of PBKDF2-HMAC-SHA512, by
+    far the most expensive step of creating an address. A wallet operation
+    creates one context and derives every coin address from it, so the seed
+    and master node are computed once however many coins are involved.
+    Intermediate nodes are cached too, so sibling paths share their parents.
+
+    Contexts hold key material in memory: keep them local to one operation.
+    """
+
+    def __init__(self, mnemonic: str):
+        self.mnemonic = mnemonic
+        self._seed: Optional[bytes] = None
+        self._nodes: Dict[str, tuple] = {}  # path -> (private key, chain code)
+
+    @classmethod
+    def of(cls, mnemonic) -> "DerivationContext":
+        """Return ``mnemonic`` if it is already a context, else wrap it"""
+        return mnemonic if isinstance(mnemonic, cls) else cls(mnemonic)
+
+    @property
+    def seed(self) -> bytes:
+        if self._seed is None:
+            self._seed = Mnemonic("english").to_seed(self.mnemonic)
+        return self._seed
+
+    def _node(self, path: str) -> tuple:
+        node = self._nodes.get(path)
+        if node is None:
+            if path == "m":
+                master = hmac_sha512(b"Bitcoin seed", self.seed)
+                node = (master[:32], master[32:])
+            else:
+                parent, _, index = path.rpartition("/")
+                node = derive_child_key(*self._node(parent), Node.decode(index))
+            self._nodes[path] = node
+        return node
+
+    def private_key(self, path: str) -> bytes:
+        """BIP32 private key at ``path``, e.g. "m/44'/60'/0'/0/0\" """
+        return self._node(path)[0]
+
+
 class WalletManager:
     """
     Handles multi-currency wallet operations for users.
@@ -102,7 +162,7 @@ class WalletManager:
             "decimals": 9,
             "network": "solana",
             "network_type": "solana",
-            "rpc_url": os.getenv("SOL_RPC_URL", "https://api.mainnet-beta.solana.com"),
+            "rpc_url": SOL_RPC_URL,
             "is_token": False,
         },
         "USDT": {
@@ -193,7 +253,12 @@ class WalletManager:
     def create_wallet_for_user(
         user_id: str, wallet_name: str = "My Wallet"
     ) -> Optional[WalletType]:
-        """Create a new multi-currency wallet for a user"""
+        """Create a new multi-currency wallet for a user
+
+        A pre-generated wallet is taken from the wallet pool when one is
+        available (one database round trip); otherwise the wallet is
+        derived inline.
+        """
         try:
             # Check if user already has a wallet
             existing_wallet = WalletManager.get_user_wallet(user_id)
@@ -201,26 +266,19 @@ class WalletManager:
                 logger.warning(f"User {user_id} already has a wallet")
                 return existing_wallet
 
-            wallet_manager = WalletManager()
+            if WALLET_POOL_ENABLED:
+                from functions.wallet_pool import wallet_pool
 
-            # Generate master mnemonic for the wallet
-            if WEB3_AVAILABLE:
-                mnemo = Mnemonic("english")
-                master_mnemonic = mnemo.generate(strength=128)
-            else:
-                # Fallback to simple random generation for testing
-                master_mnemonic = "test abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+                wallet = wallet_pool.assign(user_id, wallet_name)
+                if wallet:
+                    return wallet
 
-            # Create wallet record
-            wallet: WalletType = {
-                "_id": generate_id(),
-                "user_id": user_id,
-                "wallet_name": wallet_name,
-                "mnemonic_encrypted": wallet_manager._encrypt_data(master_mnemonic),
-                "is_active": True,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat(),
-            }
+            wallet, coin_addresses = WalletManager().build_wallet()
+            wallet.update(user_id=user_id, wallet_name=wallet_name, is_active=True)
+
+            # Save all coin addresses
+            if coin_addresses:
+                db.coin_addresses.insert_many(coin_addresses)
 
             # Save wallet to database
             wallet_result = db.wallets.insert_one(wallet)
@@ -228,32 +286,66 @@ class WalletManager:
                 logger.error(f"Failed to save wallet to database for user {user_id}")
                 return None
 
-            # Create default coin addresses for the wallet
-            coin_addresses = []
-            for coin_symbol in WalletManager.DEFAULT_COINS:
-                coin_address = wallet_manager._create_coin_address(
-                    wallet["_id"], coin_symbol, master_mnemonic
-                )
-                if coin_address:
-                    coin_addresses.append(coin_address)
-
-            # Save all coin addresses
-            if coin_addresses:
-                db.coin_addresses.insert_many(coin_addresses)
-                logger.info(
-                    f"Created wallet {wallet['_id']} with {len(coin_addresses)} coin addresses for user {user_id}"
-                )
-
+            logger.info(
+                f"Created wallet {wallet['_id']} with {len(coin_addresses)} coin addresses for user {user_id}"
+            )
             return wallet
 
         except Exception as e:
             logger.error(f"Error creating wallet for user {user_id}: {e}")
             return None
 
+    def build_wallet(self) -> tuple[WalletType, List[CoinAddressType]]:
+        """Derive an unassigned wallet and its default coin addresses
+
+        Nothing is written to the database. The wallet has no owner and is
+        inactive until it is given to a user.
+
+        Returns:
+            tuple: (wallet record, coin address records)
+        """
+        # Generate master mnemonic for the wallet
+        if WEB3_AVAILABLE:
+            mnemo = Mnemonic("english")
+            master_mnemonic = mnemo.generate(strength=128)
+        else:
+            # Fallback to simple random generation for testing
+            master_mnemonic = "test abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+
+        now = datetime.now().isoformat()
+        wallet: WalletType = {
+            "_id": generate_id(),
+            "user_id": None,
+            "wallet_name": None,
+            "mnemonic_encrypted": self._encrypt_data(master_mnemonic),
+            "is_active": False,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+        # Create default coin addresses for the wallet, all from one seed
+        context = DerivationContext(master_mnemonic)
+        coin_addresses = []
+        for coin_symbol in WalletManager.DEFAULT_COINS:
+            coin_address = self._create_coin_address(
+                wallet["_id"], coin_symbol, context
+            )
+            if coin_address:
+                coin_addresses.append(coin_address)
+
+        return wallet, coin_addresses
+
     def _create_coin_address(
-        self, wallet_id: str, coin_symbol: str, master_mnemonic: str
+        self,
+        wallet_id: str,
+        coin_symbol: str,
+        master_mnemonic: "str | DerivationContext",
     ) -> Optional[CoinAddressType]:
-        """Create a coin address within a wallet"""
+        """Create a coin address within a wallet
+
+        Pass a DerivationContext rather than the mnemonic when creating
+        several addresses for one wallet, so the seed is derived once.
+        """
         try:
             coin_config = self.SUPPORTED_COINS.get(coin_symbol)
             if not coin_config:
@@ -289,8 +381,8 @@ class WalletManager:
                 ),
                 "derivation_path": address_data.get("derivation_path", ""),
                 "is_default": coin_symbol in self.DEFAULT_COINS,
-                "balance": "0",
-                "balance_usd": "0.00",
+                "balance": to_decimal128(0),
+                "balance_usd": to_decimal128("0.00"),
                 "last_balance_update": datetime.now().isoformat(),
                 "created_at": datetime.now().isoformat(),
             }
@@ -302,14 +394,12 @@ class WalletManager:
             return None
 
     def _create_bitcoin_like_address(
-        self, coin_symbol: str, master_mnemonic: str
+        self, coin_symbol: str, master_mnemonic: "str | DerivationContext"
     ) -> Optional[Dict[str, str]]:
         """Create Bitcoin-like address (BTC, LTC, DOGE)"""
         try:
             if WEB3_AVAILABLE:
-                # Generate seed from mnemonic
-                mnemo = Mnemonic("english")
-                seed = mnemo.to_seed(master_mnemonic)
+                seed = DerivationContext.of(master_mnemonic).seed
 
                 # Create derivation path based on coin
                 if coin_symbol == "BTC":
@@ -350,16 +440,14 @@ class WalletManager:
             return None
 
     def _create_ethereum_address(
-        self, master_mnemonic: str
+        self, master_mnemonic: "str | DerivationContext"
     ) -> Optional[Dict[str, str]]:
         """Create Ethereum address (also used for ERC-20 tokens)"""
         try:
             if WEB3_AVAILABLE:
-                # Generate account from mnemonic
-                Account.enable_unaudited_hdwallet_features()
-                account = Account.from_mnemonic(
-                    master_mnemonic, account_path="m/44'/60'/0'/0/0"
-                )
+                # Same key as Account.from_mnemonic, from the cached key tree
+                context = DerivationContext.of(master_mnemonic)
+                account = Account.from_key(context.private_key("m/44'/60'/0'/0/0"))
 
                 return {
                     "address": account.address,
@@ -378,7 +466,9 @@ class WalletManager:
             logger.error(f"Error creating Ethereum address: {e}")
             return None
 
-    def _create_solana_address(self, master_mnemonic: str) -> Optional[Dict[str, str]]:
+    def _create_solana_address(
+        self, master_mnemonic: "str | DerivationContext"
+    ) -> Optional[Dict[str, str]]:
         """Create Solana address"""
         try:
             # Create a valid Solana address format for testing/development
@@ -444,316 +534,629 @@ class WalletManager:
             )
             return None
 
-    def get_balance(self, address: str, coin_symbol: str) -> float:
-        """Get current balance for a specific address and coin"""
+    async def get_balance(
+        self,
+        address: str,
+        coin_symbol: str,
+        max_age: Optional[float] = BALANCE_CACHE_TTL,
+    ) -> float:
+        """
+        Get the current balance for a specific address and coin.
+
+        A cached balance no older than ``max_age`` seconds is returned as is;
+        otherwise the blockchain is queried on a worker thread and the result
+        stored. Concurrent calls for the same address share one lookup. If the
+        lookup fails the stored balance is returned.
+        """
         try:
-            # Find the coin address record
-            coin_address = db.coin_addresses.find_one(
-                {"address": address, "coin_symbol": coin_symbol}
-            )
+            balance = balance_cache.get(address, coin_symbol, max_age)
+            if balance is not None:
+                return balance
 
+            coin_address = await run_blocking(
+                db.coin_addresses.find_one,
+                {"address": address, "coin_symbol": coin_symbol},
+            )
             if not coin_address:
                 logger.warning(
                     f"No coin address record found for {address} ({coin_symbol})"
                 )
                 return 0.0
 
-            # Use the refresh paradigm to get fresh balance data
-            import asyncio
-
-            # Create event loop if none exists (for synchronous calls)
             try:
-                loop = asyncio.get_event_loop()
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                if not asyncio.get_running_loop():
-                    asyncio.set_event_loop(loop)
-
-            # Refresh the balance using the existing paradigm
-            refresh_success = loop.run_until_complete(
-                self._refresh_coin_balance(coin_address)
-            )
+                return await asyncio.wait_for(
+                    balance_cache.get_or_fetch(
+                        address,
+                        coin_symbol,
+                        lambda: self._fetch_and_store_balance(coin_address),
+                        max_age,
+                    ),
+                    timeout=WALLET_REFRESH_TIMEOUT,
+                )
+            except Exception as e:
+                logger.error(
+                    f"Failed to refresh balance for {address} ({coin_symbol}): {e!r}"
+                )
+                return WalletManager._stored_balance(coin_address)
+
+        except Exception as e:
+            logger.error(f"Error getting balance for {address} ({coin_symbol}): {e}")
+            return 0.0
 
-            if refresh_success:
-                # Get the updated balance from database after refresh
-                updated_coin_address = db.coin_addresses.find_one(
-                    {"address": address, "coin_symbol": coin_symbol}
+    def get_balance_sync(
+        self,
+        address: str,
+        coin_symbol: str,
+        max_age: Optional[float] = BALANCE_CACHE_TTL,
+    ) -> float:
+        """Blocking variant of get_balance for worker threads and scripts"""
+        try:
+            balance = balance_cache.get(address, coin_symbol, max_age)
+            if balance is not None:
+                return balance
+
+            coin_address = db.coin_addresses.find_one(
+                {"address": address, "coin_symbol": coin_symbol}
+            )
+            if not coin_address:
+                logger.warning(
+                    f"No coin address record found for {address} ({coin_symbol})"
                 )
+                return 0.0
 
-                if updated_coin_address:
-                    balance_str = updated_coin_address.get("balance", "0.0")
-                    try:
-                        balance = float(balance_str)
-                        logger.info(
-                            f"Refreshed and retrieved balance for {address} ({coin_symbol}): {balance}"
-                        )
-                        return balance
-                    except ValueError:
-                        logger.error(
-                            f"Invalid balance format after refresh: {balance_str}"
-                        )
-                        return 0.0
-                else:
-                    logger.error(f"Could not find updated coin address after refresh")
-                    return 0.0
-            else:
-                logger.error(f"Failed to refresh balance for {address} ({coin_symbol})")
-                # Fallback to stored balance if refresh fails
-                balance_str = coin_address.get("balance", "0.0")
-                try:
-                    balance = float(balance_str)
-                    logger.warning(
-                        f"Using stale balance for {address} ({coin_symbol}): {balance}"
-                    )
-                    return balance
-                except ValueError:
-                    logger.error(f"Invalid balance format in database: {balance_str}")
-                    return 0.0
+            try:
+                return balance_cache.get_or_fetch_sync(
+                    address,
+                    coin_symbol,
+                    lambda: self._fetch_and_store_balance(coin_address),
+                    max_age,
+                    timeout=WALLET_REFRESH_TIMEOUT,
+                )
+            except Exception as e:
+                logger.error(
+                    f"Failed to refresh balance for {address} ({coin_symbol}): {e!r}"
+                )
+                return WalletManager._stored_balance(coin_address)
 
         except Exception as e:
             logger.error(f"Error getting balance for {address} ({coin_symbol}): {e}")
             return 0.0
 
+    @staticmethod
+    def get_balance_cache_stats() -> dict:
+        """Hit/miss counters for the balance cache"""
+        return balance_cache.stats()
+
+    @staticmethod
+    def _stored_balance(coin_address: CoinAddressType) -> float:
+        """Last balance written to the database for a coin address"""
+        stored = coin_address.get("balance", 0)
+        balance = to_decimal(stored)
+        if balance is None:
+            logger.error(f"Invalid balance format in database: {stored}")
+            return 0.0
+        balance = float(balance)
+
+        logger.warning(
+            f"Using stale balance for {coin_address['address']} "
+            f"({coin_address['coin_symbol']}): {balance}"
+        )
+        return balance
+
+    def _fetch_and_store_balance(self, coin_address: CoinAddressType) -> float:
+        """Query the blockchain for a balance and persist it (blocking)"""
+        balance = self._fetch_coin_balance(coin_address)
+        if balance is None:
+            raise ValueError(f"Unsupported coin {coin_address['coin_symbol']}")
+
+        db.coin_addresses.update_one(
+            {"_id": coin_address["_id"]}, WalletManager._balance_update(balance)
+        )
+        return balance
+
     async def refresh_wallet_balances(self, wallet_id: str) -> bool:
         """Refresh all coin balances in a wallet"""
         try:
             coin_addresses = self.get_wallet_coin_addresses(wallet_id)
+            result = await self.refresh_coin_balances(coin_addresses)
 
-            success_count = 0
-            for coin_address in coin_addresses:
-                if await self._refresh_coin_balance(coin_address):
-                    success_count += 1
+            if result["failed"]:
+                logger.warning(
+                    f"Balance refresh for wallet {wallet_id} incomplete: "
+                    f"{result['failed']}"
+                )
 
             # Return True if at least half of the balances were updated successfully
-            return success_count >= len(coin_addresses) // 2
+            return len(result["updated"]) >= len(coin_addresses) // 2
 
         except Exception as e:
             logger.error(f"Error refreshing wallet balances for {wallet_id}: {e}")
             return False
 
-    async def _refresh_coin_balance(self, coin_address: CoinAddressType) -> bool:
-        """Refresh balance for a specific coin address"""
-        try:
-            coin_symbol = coin_address["coin_symbol"]
-            address = coin_address["address"]
-            coin_config = self.SUPPORTED_COINS.get(coin_symbol)
+    async def refresh_coin_balances(
+        self, coin_addresses: List[CoinAddressType]
+    ) -> dict:
+        """
+        Fetch balances for several coin addresses concurrently and store them.
 
-            if not coin_config:
-                return False
+        Lookups run on worker threads, at most WALLET_REFRESH_CONCURRENCY at a
+        time and each bounded by WALLET_REFRESH_TIMEOUT. An address whose
+        lookup fails or times out keeps its stored balance; the rest are
+        written with a single bulk_write.
 
-            # Use real blockchain APIs instead of simulation
-            balance = 0.0
+        Returns:
+            dict: {"updated": {coin_symbol: balance}, "failed": {coin_symbol: reason}}
+        """
+        semaphore = asyncio.Semaphore(WALLET_REFRESH_CONCURRENCY)
 
-            try:
-                if coin_symbol == "SOL":
-                    # Use Solana balance checker
-                    from functions.scripts.solwalletbalance import (
-                        get_finalized_sol_balance,
+        async def bounded(func, *args):
+            async with semaphore:
+                return await asyncio.wait_for(
+                    run_blocking(func, *args), timeout=WALLET_REFRESH_TIMEOUT
+                )
+
+        # ETH and ERC-20 balances share one multicall, SOL and SPL tokens one
+        # getMultipleAccounts call, and each of BTC, LTC and DOGE one
+        # BlockCypher request; the rest go one by one
+        evm_addresses, solana_addresses, other_addresses = [], [], []
+        utxo_addresses: Dict[str, List[CoinAddressType]] = {}
+        for coin_address in coin_addresses:
+            coin_symbol = coin_address["coin_symbol"]
+            if WalletManager._uses_eth_rpc(coin_symbol):
+                evm_addresses.append(coin_address)
+            elif WalletManager._uses_solana_rpc(coin_symbol):
+                solana_addresses.append(coin_address)
+            elif coin_symbol in BLOCKCYPHER_CHAINS:
+                utxo_addresses.setdefault(coin_symbol, []).append(coin_address)
+            else:
+                other_addresses.append(coin_address)
+
+        tasks = [
+            bounded(self._fetch_coin_balance, coin_address)
+            for coin_address in other_addresses
+        ]
+        batches = [
+            (WalletManager._fetch_utxo_balances, group)
+            for group in utxo_addresses.values()
+        ]
+        if evm_addresses:
+            batches.append((WalletManager._fetch_evm_balances, evm_addresses))
+        if solana_addresses:
+            batches.append((WalletManager._fetch_solana_balances, solana_addresses))
+        tasks += [bounded(fetch, group) for fetch, group in batches]
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        ordered, balances = list(other_addresses), results[: len(other_addresses)]
+        for (_, group), group_balances in zip(batches, results[len(other_addresses) :]):
+            if isinstance(group_balances, BaseException):
+                group_balances = [group_balances] * len(group)
+            ordered += group
+            balances += group_balances
+
+        updated, failed, operations = {}, {}, []
+        for coin_address, balance in zip(ordered, balances):
+            coin_symbol = coin_address["coin_symbol"]
+            if isinstance(balance, (asyncio.TimeoutError, TimeoutError)):
+                failed[coin_symbol] = "timed out"
+            elif isinstance(balance, BaseException):
+                failed[coin_symbol] = str(balance) or type(balance).__name__
+            elif balance is None:
+                failed[coin_symbol] = "unsupported coin"
+            else:
+                updated[coin_symbol] = balance
+                balance_cache.set(coin_address["address"], coin_symbol, balance)
+                operations.append(
+                    UpdateOne(
+                        {"_id": coin_address["_id"]},
+                        WalletManager._balance_update(balance),
                     )
+                )
 
-                    result = get_finalized_sol_balance(address)
-                    if result and len(result) > 0 and "amount" in result[0]:
-                        balance = float(result[0]["amount"])
+        if operations:
+            db.coin_addresses.bulk_write(operations, ordered=False)
 
-                elif coin_symbol == "USDT" and coin_config.get("network") == "solana":
-                    # USDT on Solana
-                    from functions.scripts.solwalletbalance import (
-                        USDT_MINT_ADDRESS,
-                        get_finalized_sol_balance,
-                    )
+        return {"updated": updated, "failed": failed}
 
-                    result = get_finalized_sol_balance(address, USDT_MINT_ADDRESS)
-                    if result and len(result) > 0 and "amount" in result[0]:
-                        balance = float(result[0]["amount"])
-
-                elif coin_symbol in ["ETH"] or (
-                    coin_symbol == "USDT" and coin_config.get("network") == "ethereum"
-                ):
-                    # Ethereum mainnet balance checker
-                    from web3 import Web3
-
-                    # Determine the primary RPC URL from config, handling tokens
-                    primary_rpc_url = None
-                    if coin_config.get("is_token") and coin_config.get("parent_coin"):
-                        parent_config = self.SUPPORTED_COINS.get(
-                            coin_config["parent_coin"], {}
-                        )
-                        primary_rpc_url = parent_config.get("rpc_url")
-                    else:
-                        primary_rpc_url = coin_config.get("rpc_url")
-
-                    # Public fallbacks
-                    ETH_RPC_URLS = [
-                        "https://eth-mainnet.g.alchemy.com/v2/demo",  # Alchemy demo
-                        "https://cloudflare-eth.com",  # Cloudflare
-                        "https://rpc.ankr.com/eth",  # Ankr
-                    ]
-
-                    # Create a list of RPCs to try, prioritizing the one from config
-                    rpcs_to_try = []
-                    if primary_rpc_url and "YOUR_INFURA_KEY" not in primary_rpc_url:
-                        rpcs_to_try.append(primary_rpc_url)
-
-                    rpcs_to_try.extend(ETH_RPC_URLS)
-
-                    # Try multiple RPC endpoints for reliability
-                    web3 = None
-                    for rpc_url in rpcs_to_try:
-                        try:
-                            web3 = Web3(Web3.HTTPProvider(rpc_url))
-                            if web3.is_connected():
-                                logger.info(f"Connected to Ethereum RPC: {rpc_url}")
-                                break
-                        except Exception as rpc_error:
-                            logger.warning(
-                                f"Failed to connect to {rpc_url}: {rpc_error}"
-                            )
-                            web3 = None  # Ensure web3 is None if connection fails
-                            continue
-
-                    if not web3 or not web3.is_connected():
-                        logger.error("Could not connect to any Ethereum RPC")
-                        balance = 0.0
-                    else:
-                        if coin_symbol == "ETH":
-                            # ETH balance
-                            balance_wei = web3.eth.get_balance(
-                                Web3.to_checksum_address(address)
-                            )
-                            balance = float(web3.from_wei(balance_wei, "ether"))
-
-                        elif coin_symbol == "USDT":
-                            # USDT on Ethereum (correct contract address)
-                            ETHEREUM_USDT_CONTRACT = (
-                                "0xdAC17F958D2ee523a2206206994597C13D831ec7"
-                            )
-
-                            # ERC-20 ABI for balanceOf function
-                            ERC20_ABI = [
-                                {
-                                    "constant": True,
-                                    "inputs": [{"name": "_owner", "type": "address"}],
-                                    "name": "balanceOf",
-                                    "outputs": [{"name": "balance", "type": "uint256"}],
-                                    "payable": False,
-                                    "stateMutability": "view",
-                                    "type": "function",
-                                },
-                                {
-                                    "constant": True,
-                                    "inputs": [],
-                                    "name": "decimals",
-                                    "outputs": [{"name": "", "type": "uint8"}],
-                                    "payable": False,
-                                    "stateMutability": "view",
-                                    "type": "function",
-                                },
-                            ]
-
-                            contract = web3.eth.contract(
-                                address=Web3.to_checksum_address(
-                                    ETHEREUM_USDT_CONTRACT
-                                ),
-                                abi=ERC20_ABI,
-                            )
-
-                            try:
-                                # Get USDT balance (USDT has 6 decimals)
-                                balance_raw = contract.functions.balanceOf(
-                                    Web3.to_checksum_address(address)
-                                ).call()
-                                balance = balance_raw / (10**6)  # USDT has 6 decimals
-                            except Exception as contract_error:
-                                logger.error(
-                                    f"Error calling USDT contract: {contract_error}"
-                                )
-                                balance = 0.0
-
-                elif coin_symbol == "BNB":
-                    # BNB on BSC - use existing BSC script
-                    from functions.scripts.bsc_wallet_balance import (
-                        get_finalized_bsc_balance,
-                    )
+    @staticmethod
+    def _uses_eth_rpc(coin_symbol: str) -> bool:
+        """Whether the coin's balance is read from Ethereum mainnet JSON-RPC"""
+        coin_config = WalletManager.SUPPORTED_COINS.get(coin_symbol, {})
+        return coin_symbol == "ETH" or (
+            coin_symbol == "USDT" and coin_config.get("network") == "ethereum"
+        )
 
-                    result = get_finalized_bsc_balance(address)
-                    if result and len(result) > 0 and "amount" in result[0]:
-                        balance = float(result[0]["amount"])
+    @staticmethod
+    def _fetch_evm_balances(coin_addresses: List[CoinAddressType]) -> list:
+        """
+        Read ETH and ERC-20 balances for many coin addresses through batched
+        Multicall3 calls (blocking).
 
-                elif coin_symbol == "DOGE":
-                    # Dogecoin balance checker
-                    from functions.scripts.doge_transaction_checker import (
-                        dogeTransactionChecker,
+        Returns:
+            Balances in input order, with a ValueError in place of any
+            balance that couldn't be read
+        """
+        queries = [
+            (
+                coin_address["address"],
+                WalletManager.SUPPORTED_COINS[coin_address["coin_symbol"]].get(
+                    "contract_address"
+                ),
+            )
+            for coin_address in coin_addresses
+        ]
+        registry = WalletManager._get_eth_registry(WalletManager.SUPPORTED_COINS["ETH"])
+
+        balances = []
+        for coin_address, raw in zip(coin_addresses, read_balances(registry, queries)):
+            coin_config = WalletManager.SUPPORTED_COINS[coin_address["coin_symbol"]]
+            if raw is None:
+                balances.append(
+                    ValueError(
+                        f"Could not read {coin_config['symbol']} balance of "
+                        f"{coin_address['address']}"
                     )
+                )
+            else:
+                balances.append(raw / (10 ** coin_config["decimals"]))
+        return balances
 
-                    result = dogeTransactionChecker(address)
-                    if result and len(result) > 0 and "amount" in result[0]:
-                        balance = float(result[0]["amount"])
+    @staticmethod
+    def _uses_solana_rpc(coin_symbol: str) -> bool:
+        """Whether the coin's balance is read from Solana JSON-RPC"""
+        coin_config = WalletManager.SUPPORTED_COINS.get(coin_symbol, {})
+        return coin_symbol == "SOL" or (
+            coin_symbol == "USDT" and coin_config.get("network") == "solana"
+        )
 
-                elif coin_symbol == "LTC":
-                    # Litecoin balance checker
-                    from functions.scripts.ltc_transaction_checker import (
-                        ltcTransactionChecker,
-                    )
+    @staticmethod
+    def _fetch_solana_balances(coin_addresses: List[CoinAddressType]) -> list:
+        """
+        Read SOL and Solana USDT balances for many coin addresses through
+        batched getMultipleAccounts calls (blocking).
 
-                    result = ltcTransactionChecker(address)
-                    if result and len(result) > 0 and "amount" in result[0]:
-                        balance = float(result[0]["amount"])
+        Returns:
+            Balances in input order, with an exception in place of any
+            balance that couldn't be read
+        """
+        rpc = get_solana_rpc(WalletManager.SUPPORTED_COINS["SOL"]["rpc_url"])
+        readers = {
+            "SOL": rpc.get_sol_balances,
+            "USDT": lambda owners: rpc.get_token_balances(owners, USDT_MINT_ADDRESS),
+        }
+
+        by_coin: Dict[str, List[str]] = {}
+        for coin_address in coin_addresses:
+            by_coin.setdefault(coin_address["coin_symbol"], []).append(
+                coin_address["address"]
+            )
 
-                elif coin_symbol == "BTC":
-                    # Bitcoin balance checker - using similar API to LTC/DOGE
-                    import requests
+        fetched = {}
+        for coin_symbol, addresses in by_coin.items():
+            try:
+                fetched[coin_symbol] = readers[coin_symbol](addresses)
+            except Exception as e:
+                logger.error(f"Solana {coin_symbol} balance batch failed: {e}")
+                fetched[coin_symbol] = e
+
+        balances = []
+        for coin_address in coin_addresses:
+            coin_symbol, address = coin_address["coin_symbol"], coin_address["address"]
+            result = fetched[coin_symbol]
+            if isinstance(result, Exception):
+                balances.append(result)
+            elif address in result:
+                balances.append(result[address])
+            else:
+                balances.append(
+                    ValueError(f"Could not read {coin_symbol} balance of {address}")
+                )
+        return balances
 
-                    url = f"https://api.blockcypher.com/v1/btc/main/addrs/{address}/balance"
-                    response = requests.get(url)
-                    if response.status_code == 200:
-                        data = response.json()
-                        balance_satoshi = data.get("balance", 0)
-                        balance = balance_satoshi / 1e8  # Convert satoshi to BTC
+    @staticmethod
+    def _fetch_utxo_balances(coin_addresses: List[CoinAddressType]) -> list:
+        """
+        Read BTC, LTC and DOGE balances for many coin addresses through
+        batched BlockCypher requests, one per ``BLOCKCYPHER_BATCH_SIZE``
+        addresses of each chain (blocking).
 
-                else:
-                    logger.warning(
-                        f"No balance checker implemented for {coin_symbol}, using fallback"
-                    )
-                    # Fallback to simulate some balance for testing
-                    if coin_symbol == "BTC":
-                        balance = 0.001
-                    elif coin_symbol == "ETH":
-                        balance = 0.1
-                    elif coin_symbol == "USDT":
-                        balance = 100.0
+        Returns:
+            Balances in input order, with an exception in place of any
+            balance that couldn't be read
+        """
+        by_coin: Dict[str, List[str]] = {}
+        for coin_address in coin_addresses:
+            by_coin.setdefault(coin_address["coin_symbol"], []).append(
+                coin_address["address"]
+            )
 
-                logger.info(
-                    f"Retrieved balance for {coin_symbol} address {address}: {balance}"
+        fetched = {}
+        for coin_symbol, addresses in by_coin.items():
+            try:
+                fetched[coin_symbol] = blockcypher.get_balances(coin_symbol, addresses)
+            except Exception as e:
+                logger.error(f"{coin_symbol} balance batch failed: {e}")
+                fetched[coin_symbol] = e
+
+        balances = []
+        for coin_address in coin_addresses:
+            coin_symbol, address = coin_address["coin_symbol"], coin_address["address"]
+            result = fetched[coin_symbol]
+            if isinstance(result, Exception):
+                balances.append(result)
+            elif address in result:
+                balances.append(result[address])
+            else:
+                balances.append(
+                    ValueError(f"Could not read {coin_symbol} balance of {address}")
                 )
+        return balances
 
-            except Exception as api_error:
-                logger.error(
-                    f"Error calling blockchain API for {coin_symbol}: {api_error}"
+    @staticmethod
+    def _reconcile_balances(symbols: List[str], fetch, batch_size: int) -> dict:
+        """
+        Stream the coin addresses of ``symbols`` from the database, read each
+        batch with ``fetch`` and write it back with one bulk_write (blocking).
+
+        Returns:
+            dict: {"updated": int, "failed": int}
+        """
+        cursor = (
+            db.coin_addresses.find(
+                {"coin_symbol": {"$in": symbols}}, {"address": 1, "coin_symbol": 1}
+            )
+            .sort("coin_symbol", 1)
+            .batch_size(batch_size)
+        )
+
+        totals = {"updated": 0, "failed": 0}
+
+        def flush(batch):
+            try:
+                balances = fetch(batch)
+            except Exception as e:
+                logger.error(f"Balance batch of {len(batch)} failed: {e}")
+                totals["failed"] += len(batch)
+                return
+
+            operations = []
+            for coin_address, balance in zip(batch, balances):
+                if isinstance(balance, Exception):
+                    totals["failed"] += 1
+                    continue
+                balance_cache.set(
+                    coin_address["address"], coin_address["coin_symbol"], balance
                 )
-                # Fallback to current stored balance on API error
-                current_balance = coin_address.get("balance", "0")
-                try:
-                    balance = float(current_balance)
-                except ValueError:
-                    balance = 0.0
+                operations.append(
+                    UpdateOne(
+                        {"_id": coin_address["_id"]},
+                        WalletManager._balance_update(balance),
+                    )
+                )
+            if operations:
+                db.coin_addresses.bulk_write(operations, ordered=False)
+                totals["updated"] += len(operations)
+
+        batch = []
+        for coin_address in cursor:
+            batch.append(coin_address)
+            if len(batch) == batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+
+        return totals
+
+    @staticmethod
+    def reconcile_evm_balances(batch_size: int = EVM_BALANCE_BATCH_SIZE) -> dict:
+        """
+        Refresh every ETH and ERC-20 custody balance from the chain (blocking).
+
+        Coin addresses are streamed from the database; each batch is read
+        with one Multicall3 call and written back with one bulk_write. Meant
+        for scheduled reconciliation and maintenance scripts.
+
+        Returns:
+            dict: {"updated": int, "failed": int}
+        """
+        symbols = [
+            symbol
+            for symbol in WalletManager.SUPPORTED_COINS
+            if WalletManager._uses_eth_rpc(symbol)
+        ]
+        totals = WalletManager._reconcile_balances(
+            symbols, WalletManager._fetch_evm_balances, batch_size
+        )
+        logger.info(
+            f"EVM balance reconciliation: {totals['updated']} updated, "
+            f"{totals['failed']} failed"
+        )
+        return totals
+
+    @staticmethod
+    def reconcile_utxo_balances(batch_size: Optional[int] = None) -> dict:
+        """
+        Refresh every BTC, LTC and DOGE custody balance (blocking).
+
+        Coin addresses are streamed from the database grouped by coin, so a
+        batch of ``BLOCKCYPHER_BATCH_SIZE`` addresses usually costs a single
+        BlockCypher request, and each batch is written back with one
+        bulk_write. Run by a scheduled job (see main.py).
+
+        Returns:
+            dict: {"updated": int, "failed": int}
+        """
+        symbols = [s for s in WalletManager.SUPPORTED_COINS if s in BLOCKCYPHER_CHAINS]
+        totals = WalletManager._reconcile_balances(
+            symbols,
+            WalletManager._fetch_utxo_balances,
+            batch_size or blockcypher.batch_size,
+        )
+        logger.info(
+            f"UTXO balance reconciliation: {totals['updated']} updated, "
+            f"{totals['failed']} failed"
+        )
+        return totals
+
+    @staticmethod
+    def _balance_update(balance: float) -> dict:
+        """Update document storing a freshly fetched balance"""
+        return {
+            "$set": {
+                "balance": to_decimal128(balance),
+                "last_balance_update": datetime.now().isoformat(),
+            }
+        }
 
-            # Update balance in database
-            db.coin_addresses.update_one(
-                {"_id": coin_address["_id"]},
+    @staticmethod
+    def get_custody_totals() -> Dict[str, dict]:
+        """
+        Total custody balance per coin, summed by the database.
+
+        Balances not yet migrated to Decimal128 (strings) count as zero.
+
+        Returns:
+            dict: symbol -> {"balance": Decimal, "balance_usd": Decimal,
+                "addresses": int}
+        """
+        pipeline = [
+            {
+                "$group": {
+                    "_id": "$coin_symbol",
+                    "balance": {"$sum": "$balance"},
+                    "balance_usd": {"$sum": "$balance_usd"},
+                    "addresses": {"$sum": 1},
+                }
+            },
+            {"$sort": {"_id": 1}},
+        ]
+        return {
+            row["_id"]: {
+                "balance": to_decimal(row["balance"], Decimal(0)),
+                "balance_usd": to_decimal(row["balance_usd"], Decimal(0)),
+                "addresses": row["addresses"],
+            }
+            for row in db.coin_addresses.aggregate(pipeline)
+        }
+
+    @staticmethod
+    def get_wallets_above(
+        threshold, coin_symbol: Optional[str] = None, limit: int = 100
+    ) -> List[dict]:
+        """
+        Wallets holding at least ``threshold``, largest first, filtered by
+        the database.
+
+        Args:
+            threshold: Minimum balance in ``coin_symbol`` units, or in USD
+                (summed over the wallet's coins) when no coin is given
+            coin_symbol: Coin to compare balances in
+            limit: Maximum number of wallets returned
+
+        Returns:
+            list: [{"wallet_id": str, "balance": Decimal}]
+        """
+        minimum = to_decimal128(threshold)
+        if coin_symbol:
+            pipeline = [
+                {"$match": {"coin_symbol": coin_symbol, "balance": {"$gte": minimum}}},
+                {"$project": {"_id": 0, "wallet_id": 1, "balance": 1}},
+            ]
+        else:
+            pipeline = [
                 {
-                    "$set": {
-                        "balance": str(balance),
-                        "last_balance_update": datetime.now().isoformat(),
+                    "$group": {
+                        "_id": "$wallet_id",
+                        "balance": {"$sum": "$balance_usd"},
                     }
                 },
+                {"$match": {"balance": {"$gte": minimum}}},
+                {"$project": {"_id": 0, "wallet_id": "$_id", "balance": 1}},
+            ]
+        pipeline += [{"$sort": {"balance": -1}}, {"$limit": limit}]
+
+        return [
+            {"wallet_id": row["wallet_id"], "balance": to_decimal(row["balance"])}
+            for row in db.coin_addresses.aggregate(pipeline)
+        ]
+
+    def _fetch_coin_balance(self, coin_address: CoinAddressType) -> Optional[float]:
+        """
+        Query the blockchain for one address's balance (blocking).
+
+        Returns:
+            The balance, or None if the coin is not supported
+
+        Raises:
+            Any error from the underlying API client
+        """
+        coin_symbol = coin_address["coin_symbol"]
+        address = coin_address["address"]
+        coin_config = self.SUPPORTED_COINS.get(coin_symbol)
+
+        if not coin_config:
+            return None
+
+        # Use real blockchain APIs instead of simulation
+        balance = 0.0
+
+        if WalletManager._uses_solana_rpc(coin_symbol):
+            # SOL and USDT on Solana, through the pooled client for SOL_RPC_URL
+            balance = WalletManager._fetch_solana_balances([coin_address])[0]
+            if isinstance(balance, Exception):
+                raise balance
+
+        elif WalletManager._uses_eth_rpc(coin_symbol):
+            # Ethereum mainnet balance checker: one RPC on the best
+            # healthy provider, failing over only if it errors
+            from web3 import Web3
+
+            registry = WalletManager._get_eth_registry(coin_config)
+            checksum_address = Web3.to_checksum_address(address)
+
+            if coin_symbol == "ETH":
+                balance_wei = registry.call(
+                    lambda web3: web3.eth.get_balance(checksum_address)
+                )
+                balance = float(Web3.from_wei(balance_wei, "ether"))
+
+            else:
+                # ERC-20 token (USDT); the contract object is reused across calls
+                balance_raw = registry.call(
+                    lambda web3: token_contract(web3, coin_config["contract_address"])
+                    .functions.balanceOf(checksum_address)
+                    .call()
+                )
+                balance = balance_raw / (10 ** coin_config["decimals"])
+
+        elif coin_symbol == "BNB":
+            # BNB on BSC - use existing BSC script
+            from functions.scripts.bsc_wallet_balance import (
+                get_finalized_bsc_balance,
             )
-            return True
 
-        except Exception as e:
-            logger.error(
-                f"Error refreshing balance for coin {coin_address.get('coin_symbol', 'unknown')}: {e}"
+            result = get_finalized_bsc_balance(address)
+            if result and len(result) > 0 and "amount" in result[0]:
+                balance = float(result[0]["amount"])
+
+        elif coin_symbol in BLOCKCYPHER_CHAINS:
+            # BTC, LTC and DOGE: BlockCypher's lightweight balance endpoint
+            balance = blockcypher.get_balance(coin_symbol, address)
+
+        else:
+            logger.warning(
+                f"No balance checker implemented for {coin_symbol}, using fallback"
             )
-            return False
+            # Fallback to simulate some balance for testing
+            if coin_symbol == "BTC":
+                balance = 0.001
+            elif coin_symbol == "ETH":
+                balance = 0.1
+            elif coin_symbol == "USDT":
+                balance = 100.0
+
+        logger.info(f"Retrieved balance for {coin_symbol} address {address}: {balance}")
+        return balance
 
     @staticmethod
     def add_coin_to_wallet(wallet_id: str, coin_symbol: str) -> bool:
@@ -847,7 +1250,9 @@ class WalletManager:
             trade_id: Associated trade ID for tracking
 
         Returns:
-            bool: True if transfer successful, False otherwise
+            dict | bool: The recorded wallet transaction once broadcast, False
+                otherwise. On-chain sends are recorded as "pending"; the
+                receipt tracker moves them to "completed" or "failed".
         """
         try:
             logger.info(
@@ -870,8 +1275,9 @@ class WalletManager:
 
             # Check balance
             wallet_manager = WalletManager()
-            current_balance = wallet_manager.get_balance(
-                coin_address["address"], currency
+            # Spending needs the on-chain balance, not a cached one
+            current_balance = wallet_manager.get_balance_sync(
+                coin_address["address"], currency, max_age=0
             )
             if current_balance < amount:
                 logger.error(
@@ -918,9 +1324,10 @@ class WalletManager:
                     "transaction_type": "outgoing",
                     "tx_hash": tx_hash,
                     "trade_id": trade_id,
-                    "status": "completed",
+                    "status": transfer_result.get("status", "completed"),
                     "gas_used": gas_used,
                     "gas_fee_eth": gas_fee_eth,
+                    "nonce": transfer_result.get("nonce"),
                     "created_at": datetime.now().isoformat(),
                 }
 
@@ -937,7 +1344,7 @@ class WalletManager:
                         from_wallet_id, "ETH"
                     )
                     if eth_address:
-                        eth_balance = wallet_manager.get_balance(
+                        eth_balance = wallet_manager.get_balance_sync(
                             eth_address["address"], "ETH"
                         )
                         new_eth_balance = max(0, eth_balance - gas_fee_eth)
@@ -945,7 +1352,7 @@ class WalletManager:
                             {"_id": eth_address["_id"]},
                             {
                                 "$set": {
-                                    "balance": str(new_eth_balance),
+                                    "balance": to_decimal128(new_eth_balance),
                                     "updated_at": datetime.now().isoformat(),
                                 }
                             },
@@ -953,21 +1360,25 @@ class WalletManager:
                         logger.info(
                             f"Deducted {gas_fee_eth} ETH gas fee from ETH balance"
                         )
+                        balance_cache.invalidate(eth_address["address"], "ETH")
 
                 db.coin_addresses.update_one(
                     {"_id": coin_address["_id"]},
                     {
                         "$set": {
-                            "balance": str(new_balance),
+                            "balance": to_decimal128(new_balance),
                             "updated_at": datetime.now().isoformat(),
                         }
                     },
                 )
 
+                balance_cache.invalidate(coin_address["address"], currency)
+
                 logger.info(
-                    f"Transfer completed: {tx_hash}, Gas fee: {gas_fee_eth} ETH"
+                    f"Transfer {transaction_record['status']}: {tx_hash}, "
+                    f"Gas fee: {gas_fee_eth} ETH"
                 )
-                return True
+                return transaction_record
             else:
                 logger.error(f"Blockchain transfer failed for {amount} {currency}")
                 return False
@@ -1147,134 +1558,101 @@ class WalletManager:
             return False
 
     @staticmethod
-    def _get_web3_connection(coin_config: dict):
-        """Get a Web3 connection with fallback RPCs"""
-        try:
-            from web3 import Web3
-
-            # Primary RPC from config
-            primary_rpc_url = None
-            if coin_config.get("is_token") and coin_config.get("parent_coin"):
-                parent_config = WalletManager.SUPPORTED_COINS.get(
-                    coin_config["parent_coin"], {}
-                )
-                primary_rpc_url = parent_config.get("rpc_url")
-            else:
-                primary_rpc_url = coin_config.get("rpc_url")
-
-            # Fallback RPCs
-            fallback_rpcs = [
-                "https://eth.llamarpc.com",
-                "https://rpc.ankr.com/eth",
-                "https://ethereum.publicnode.com",
-                "https://eth-mainnet.g.alchemy.com/v2/demo",
-            ]
-
-            # Build list of RPCs to try
-            rpcs_to_try = []
-            if primary_rpc_url and "YOUR_INFURA_KEY" not in primary_rpc_url:
-                rpcs_to_try.append(primary_rpc_url)
-            rpcs_to_try.extend(fallback_rpcs)
+    def _get_eth_registry(coin_config: dict):
+        """Shared provider registry for an Ethereum coin or token config"""
+        from functions.web3_providers import get_eth_registry
+
+        # Tokens use their parent chain's RPC
+        if coin_config.get("is_token") and coin_config.get("parent_coin"):
+            coin_config = WalletManager.SUPPORTED_COINS.get(
+                coin_config["parent_coin"], {}
+            )
+        return get_eth_registry(coin_config.get("rpc_url"))
 
-            # Try each RPC until one works
-            for rpc_url in rpcs_to_try:
-                try:
-                    web3 = Web3(
-                        Web3.HTTPProvider(rpc_url, request_kwargs={"timeout": 15})
-                    )
-                    if web3.is_connected():
-                        logger.info(f"Connected to Ethereum RPC: {rpc_url}")
-                        return web3
-                except Exception as rpc_error:
-                    logger.warning(f"Failed to connect to {rpc_url}: {rpc_error}")
-                    continue
+    @staticmethod
+    def get_rpc_provider_stats() -> list:
+        """Health of the Ethereum RPC endpoints, best first"""
+        return WalletManager._get_eth_registry(
+            WalletManager.SUPPORTED_COINS["ETH"]
+        ).stats()
 
-            logger.error("Could not connect to any Ethereum RPC")
-            return None
+    @staticmethod
+    def _get_web3_connection(coin_config: dict):
+        """Get the best healthy pooled Web3 provider (no connectivity probe)"""
+        try:
+            web3 = WalletManager._get_eth_registry(coin_config).get_web3()
+            if not web3:
+                logger.error("No Ethereum RPC provider available")
+            return web3
 
         except Exception as e:
             logger.error(f"Error getting Web3 connection: {e}")
             return None
 
+    @staticmethod
+    def _eth_fee_fields(web3) -> tuple[dict, int]:
+        """EIP-1559 fee fields from the gas oracle, or a legacy gas price
+
+        Returns:
+            tuple: (transaction fee fields, expected wei paid per gas)
+        """
+        quote = gas_oracle.quote("normal")
+        if quote:
+            return {
+                "maxFeePerGas": quote["max_fee_per_gas"],
+                "maxPriorityFeePerGas": quote["max_priority_fee_per_gas"],
+            }, quote["gas_price"]
+        gas_price = web3.eth.gas_price
+        return {"gasPrice": gas_price}, gas_price
+
     @staticmethod
     def _execute_eth_transfer(
         web3, private_key: str, from_address: str, to_address: str, amount: float
     ) -> dict:
-        """Execute native ETH transfer"""
-        try:
-            from eth_account import Account
-            from web3 import Web3
+        """Broadcast a native ETH transfer without waiting for its receipt
 
+        Returns:
+            dict: {"success": bool, "tx_hash": str, "gas_used": int,
+                "gas_fee_eth": float, "status": "pending", "nonce": int}; gas
+                figures are estimates until the receipt tracker records the
+                real ones
+        """
+        try:
             # Convert amount to Wei
             amount_wei = web3.to_wei(amount, "ether")
+            fee_fields, expected_gas_price = WalletManager._eth_fee_fields(web3)
+
+            # chain_id is answered from the provider's request cache
+            with nonce_manager.reserve(web3, from_address) as nonce:
+                transaction = {
+                    "to": to_address,
+                    "value": amount_wei,
+                    "gas": 21000,  # Standard ETH transfer gas limit
+                    **fee_fields,
+                    "nonce": nonce,
+                    "chainId": web3.eth.chain_id,
+                }
+                signed_txn = web3.eth.account.sign_transaction(transaction, private_key)
+                tx_hash = web3.eth.send_raw_transaction(signed_txn.raw_transaction)
 
-            # Get nonce
-            nonce = web3.eth.get_transaction_count(from_address)
-
-            # Get current gas price
-            gas_price = web3.eth.gas_price
+            tx_hash_hex = Web3.to_hex(tx_hash)
+            logger.info(f"ETH transfer sent: {tx_hash_hex} (nonce {nonce})")
 
-            # Build transaction
-            transaction = {
-                "to": to_address,
-                "value": amount_wei,
-                "gas": 21000,  # Standard ETH transfer gas limit
-                "gasPrice": gas_price,
+            return {
+                "success": True,
+                "tx_hash": tx_hash_hex,
+                "gas_used": 21000,
+                "gas_fee_eth": float(
+                    web3.from_wei(21000 * expected_gas_price, "ether")
+                ),
+                "status": "pending",
                 "nonce": nonce,
-                "chainId": web3.eth.chain_id,
             }
 
-            # Sign transaction
-            signed_txn = web3.eth.account.sign_transaction(transaction, private_key)
-
-            # Send transaction
-            tx_hash = web3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            tx_hash_hex = tx_hash.hex()
-
-            logger.info(f"ETH transfer sent: {tx_hash_hex}")
-
-            # Wait for transaction receipt (with timeout)
-            try:
-                receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
-                gas_used = receipt.gasUsed
-                gas_fee_eth = float(web3.from_wei(gas_used * gas_price, "ether"))
-
-                if receipt.status == 1:
-                    logger.info(
-                        f"ETH transfer confirmed: {tx_hash_hex}, Gas used: {gas_used}"
-                    )
-                    return {
-                        "success": True,
-                        "tx_hash": tx_hash_hex,
-                        "gas_used": gas_used,
-                        "gas_fee_eth": gas_fee_eth,
-                    }
-                else:
-                    logger.error(f"ETH transfer failed: {tx_hash_hex}")
-                    return {
-                        "success": False,
-                        "tx_hash": tx_hash_hex,
-                        "gas_used": gas_used,
-                        "gas_fee_eth": gas_fee_eth,
-                    }
-
-            except Exception as receipt_error:
-                logger.warning(
-                    f"Could not get receipt for {tx_hash_hex}: {receipt_error}"
-                )
-                # Transaction was sent, but we couldn't confirm
-                gas_fee_eth = float(
-                    web3.from_wei(21000 * gas_price, "ether")
-                )  # Estimated
-                return {
-                    "success": True,  # Assume success since transaction was sent
-                    "tx_hash": tx_hash_hex,
-                    "gas_used": 21000,
-                    "gas_fee_eth": gas_fee_eth,
-                }
-
         except Exception as e:
             logger.error(f"Error in ETH transfer: {e}")
+            # The broadcast may not have reached the node; re-read the nonce
+            nonce_manager.reset(from_address)
             return {
                 "success": False,
                 "tx_hash": None,
@@ -1291,36 +1669,9 @@ class WalletManager:
         amount: float,
         coin_config: dict,
     ) -> dict:
-        """Execute ERC-20 token transfer (USDT, etc.)"""
+        """Broadcast an ERC-20 token transfer (USDT, etc.) without waiting
+        for its receipt; returns the same dict as ``_execute_eth_transfer``"""
         try:
-            from eth_account import Account
-            from web3 import Web3
-
-            # ERC-20 ABI for transfer function
-            ERC20_ABI = [
-                {
-                    "constant": False,
-                    "inputs": [
-                        {"name": "_to", "type": "address"},
-                        {"name": "_value", "type": "uint256"},
-                    ],
-                    "name": "transfer",
-                    "outputs": [{"name": "", "type": "bool"}],
-                    "payable": False,
-                    "stateMutability": "nonpayable",
-                    "type": "function",
-                },
-                {
-                    "constant": True,
-                    "inputs": [],
-                    "name": "decimals",
-                    "outputs": [{"name": "", "type": "uint8"}],
-                    "payable": False,
-                    "stateMutability": "view",
-                    "type": "function",
-                },
-            ]
-
             # Get contract
             contract_address = coin_config.get("contract_address")
             if not contract_address:
@@ -1332,93 +1683,58 @@ class WalletManager:
                     "gas_fee_eth": 0.0,
                 }
 
-            contract = web3.eth.contract(
-                address=Web3.to_checksum_address(contract_address), abi=ERC20_ABI
-            )
+            contract = token_contract(web3, contract_address)
 
             # Convert amount to token units (considering decimals)
             decimals = coin_config.get("decimals", 18)
             amount_units = int(amount * (10**decimals))
 
-            # Get nonce
-            nonce = web3.eth.get_transaction_count(from_address)
-
-            # Get current gas price
-            gas_price = web3.eth.gas_price
+            fee_fields, expected_gas_price = WalletManager._eth_fee_fields(web3)
 
-            # Build transaction
-            transaction = contract.functions.transfer(
-                to_address, amount_units
-            ).build_transaction(
-                {
-                    "from": from_address,
-                    "gas": 100000,  # Estimate for ERC-20 transfer
-                    "gasPrice": gas_price,
-                    "nonce": nonce,
-                    "chainId": web3.eth.chain_id,
-                }
-            )
-
-            # Estimate gas more precisely
-            try:
-                estimated_gas = web3.eth.estimate_gas(transaction)
-                transaction["gas"] = int(estimated_gas * 1.2)  # Add 20% buffer
-            except Exception as gas_error:
-                logger.warning(f"Could not estimate gas, using default: {gas_error}")
-
-            # Sign transaction
-            signed_txn = web3.eth.account.sign_transaction(transaction, private_key)
-
-            # Send transaction
-            tx_hash = web3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            tx_hash_hex = tx_hash.hex()
+            with nonce_manager.reserve(web3, from_address) as nonce:
+                transaction = contract.functions.transfer(
+                    to_address, amount_units
+                ).build_transaction(
+                    {
+                        "from": from_address,
+                        "gas": 100000,  # Estimate for ERC-20 transfer
+                        **fee_fields,
+                        "nonce": nonce,
+                        "chainId": web3.eth.chain_id,
+                    }
+                )
 
-            logger.info(f"{coin_config['symbol']} transfer sent: {tx_hash_hex}")
+                # Estimate gas more precisely
+                try:
+                    estimated_gas = web3.eth.estimate_gas(transaction)
+                    transaction["gas"] = int(estimated_gas * 1.2)  # Add 20% buffer
+                except Exception as gas_error:
+                    logger.warning(
+                        f"Could not estimate gas, using default: {gas_error}"
+                    )
 
-            # Wait for transaction receipt
-            try:
-                receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
-                gas_used = receipt.gasUsed
-                gas_fee_eth = float(web3.from_wei(gas_used * gas_price, "ether"))
+                signed_txn = web3.eth.account.sign_transaction(transaction, private_key)
+                tx_hash = web3.eth.send_raw_transaction(signed_txn.raw_transaction)
 
-                if receipt.status == 1:
-                    logger.info(
-                        f"{coin_config['symbol']} transfer confirmed: {tx_hash_hex}, Gas used: {gas_used}"
-                    )
-                    return {
-                        "success": True,
-                        "tx_hash": tx_hash_hex,
-                        "gas_used": gas_used,
-                        "gas_fee_eth": gas_fee_eth,
-                    }
-                else:
-                    logger.error(
-                        f"{coin_config['symbol']} transfer failed: {tx_hash_hex}"
-                    )
-                    return {
-                        "success": False,
-                        "tx_hash": tx_hash_hex,
-                        "gas_used": gas_used,
-                        "gas_fee_eth": gas_fee_eth,
-                    }
+            tx_hash_hex = Web3.to_hex(tx_hash)
+            logger.info(
+                f"{coin_config['symbol']} transfer sent: {tx_hash_hex} (nonce {nonce})"
+            )
 
-            except Exception as receipt_error:
-                logger.warning(
-                    f"Could not get receipt for {tx_hash_hex}: {receipt_error}"
-                )
-                # Transaction was sent, but we couldn't confirm
-                gas_fee_eth = float(
-                    web3.from_wei(transaction["gas"] * gas_price, "ether")
-                )  # Estimated
-                return {
-                    "success": True,  # Assume success since transaction was sent
-                    "tx_hash": tx_hash_hex,
-                    "gas_used": transaction["gas"],
-                    "gas_fee_eth": gas_fee_eth,
-                }
+            return {
+                "success": True,
+                "tx_hash": tx_hash_hex,
+                "gas_used": transaction["gas"],
+                "gas_fee_eth": float(
+                    web3.from_wei(transaction["gas"] * expected_gas_price, "ether")
+                ),
+                "status": "pending",
+                "nonce": nonce,
+            }
 
         except Exception as e:
             logger.error(f"Error in {coin_config['symbol']} transfer: {e}")
+            nonce_manager.reset(from_address)
             return {
                 "success": False,
                 "tx_hash": None,
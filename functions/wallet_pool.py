@@ -0,0 +1,176 @@
+"""
+Pool of pre-generated wallets.
+
+Creating a wallet derives a fresh mnemonic and one address per default
+coin, which took seconds of CPU on the request path of ``/wallet create``.
+The pool keeps ``WALLET_POOL_SIZE`` of them derived in advance. They are
+stored in ``wallets`` with ``is_pooled: True``, no owner and
+``is_active: False``, so nothing that looks wallets up by user sees them.
+Handing one to a user is a single ``find_one_and_update``, which claims it
+atomically: two users asking at the same moment get different wallets.
+
+A scheduled job (see main.py) tops the pool up. Derivation runs in a
+process pool of ``WALLET_POOL_WORKERS`` processes so it doesn't compete
+with the event loop for the GIL. When the pool is empty, wallets are
+created inline as before.
+"""
+
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+from pymongo import ReturnDocument
+
+from config import WALLET_POOL_SIZE, WALLET_POOL_WORKERS, db
+
+from .async_client import run_blocking
+from .wallet import WalletManager
+
+logger = logging.getLogger(__name__)
+
+POOLED_QUERY = {"is_pooled": True, "user_id": None}
+
+
+def _derive_wallets(encryption_key: bytes, count: int) -> list:
+    """Derive ``count`` unassigned wallets (runs in a worker process)
+
+    The key is passed in rather than read in the worker, so every wallet is
+    encrypted with the parent's key even when that key is a DEBUG temporary.
+    """
+    from cryptography.fernet import Fernet
+
+    manager = WalletManager.__new__(WalletManager)
+    manager.encryption_key = encryption_key
+    manager.fernet = Fernet(encryption_key)
+    return [manager.build_wallet() for _ in range(count)]
+
+
+class WalletPool:
+    """
+    Keeps a buffer of unassigned wallets ready to hand out.
+
+    Args:
+        target: Number of pooled wallets to keep available
+        workers: Worker processes used to derive wallets; 0 derives them
+            in the calling thread
+    """
+
+    def __init__(
+        self, target: int = WALLET_POOL_SIZE, workers: int = WALLET_POOL_WORKERS
+    ):
+        self.target = target
+        self.workers = workers
+        self._lock = threading.Lock()
+        self.assigned = 0
+        self.misses = 0
+        self.generated = 0
+
+    def assign(self, user_id: str, wallet_name: str = "My Wallet") -> Optional[dict]:
+        """
+        Claim a pooled wallet for ``user_id``.
+
+        Returns:
+            The wallet, now active and owned by the user, or None when the
+            pool is empty or unreachable
+        """
+        now = datetime.now().isoformat()
+        try:
+            wallet = db.wallets.find_one_and_update(
+                POOLED_QUERY,
+                {
+                    "$set": {
+                        "user_id": user_id,
+                        "wallet_name": wallet_name,
+                        "is_pooled": False,
+                        "is_active": True,
+                        "created_at": now,
+                        "updated_at": now,
+                        "assigned_at": now,
+                    }
+                },
+                sort=[("created_at", 1)],
+                return_document=ReturnDocument.AFTER,
+            )
+        except Exception as e:
+            logger.error(f"Error assigning pooled wallet to user {user_id}: {e}")
+            return None
+
+        if not wallet:
+            self.misses += 1
+            logger.info(f"Wallet pool empty, creating wallet for {user_id} inline")
+            return None
+
+        self.assigned += 1
+        logger.info(f"Assigned pooled wallet {wallet['_id']} to user {user_id}")
+        return wallet
+
+    @staticmethod
+    def available() -> int:
+        """Number of wallets waiting in the pool"""
+        return db.wallets.count_documents(POOLED_QUERY)
+
+    def fill(self) -> int:
+        """
+        Derive and store wallets until the pool holds ``target``.
+
+        Returns:
+            int: Number of wallets added
+        """
+        with self._lock:
+            missing = self.target - self.available()
+            if missing <= 0:
+                return 0
+
+            key = WalletManager().encryption_key
+            if self.workers > 0:
+                # Split the work into one chunk per worker process
+                chunks = [
+                    missing // self.workers + (i < missing % self.workers)
+                    for i in range(min(self.workers, missing))
+                ]
+                with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+                    results = executor.map(_derive_wallets, [key] * len(chunks), chunks)
+                    built = [wallet for chunk in results for wallet in chunk]
+            else:
+                built = _derive_wallets(key, missing)
+
+            wallets = []
+            coin_addresses = []
+            for wallet, addresses in built:
+                wallet["is_pooled"] = True
+                wallets.append(wallet)
+                coin_addresses.extend(addresses)
+
+            # Addresses first, so a wallet is never claimable without them
+            if coin_addresses:
+                db.coin_addresses.insert_many(coin_addresses)
+            db.wallets.insert_many(wallets)
+
+            self.generated += len(wallets)
+            logger.info(f"Added {len(wallets)} wallets to the wallet pool")
+            return len(wallets)
+
+    async def tick(self) -> None:
+        """Scheduled refill (see main.py)"""
+        try:
+            await run_blocking(self.fill)
+        except Exception as e:
+            logger.error(f"Wallet pool refill failed: {e}")
+
+    def stats(self) -> dict:
+        try:
+            available = self.available()
+        except Exception:
+            available = None
+        return {
+            "available": available,
+            "target": self.target,
+            "assigned": self.assigned,
+            "misses": self.misses,
+            "generated": self.generated,
+        }
+
+
+wallet_pool = WalletPool()
@@ -0,0 +1,304 @@
+"""
+Process-wide registry of pooled, health-scored Web3 JSON-RPC providers.
+
+Each endpoint gets one long-lived ``Web3`` instance backed by a keep-alive
+``requests.Session``. Every RPC made through it feeds a rolling latency and
+error score, and a circuit breaker takes an endpoint out of rotation after
+repeated transport failures. Once the cooldown has passed the breaker is
+half-open and lets a single trial request through; other callers keep
+skipping the endpoint until the trial closes or re-opens it.
+
+``get_web3()`` therefore returns the best healthy provider without probing
+it first (no ``is_connected()`` round trip), and ``call()`` fails over to
+the next provider only when a request actually fails.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import (
+    ETH_FALLBACK_RPC_URLS,
+    WEB3_CIRCUIT_COOLDOWN,
+    WEB3_CIRCUIT_FAILURES,
+    WEB3_RPC_TIMEOUT,
+)
+
+try:
+    from web3 import HTTPProvider, Web3
+
+    WEB3_AVAILABLE = True
+except ImportError:
+    HTTPProvider = object
+    WEB3_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Keep-alive connections held per endpoint
+POOL_MAXSIZE = 10
+
+# Errors that mean the endpoint itself failed, as opposed to an RPC-level
+# error such as a reverted call
+TRANSPORT_ERRORS = (requests.RequestException, OSError, TimeoutError)
+
+
+class ProviderHealth:
+    """Rolling latency/error score and circuit breaker for one endpoint"""
+
+    def __init__(
+        self,
+        url: str,
+        failure_threshold: int = WEB3_CIRCUIT_FAILURES,
+        cooldown: float = WEB3_CIRCUIT_COOLDOWN,
+        alpha: float = 0.3,
+    ):
+        self.url = url
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.alpha = alpha
+
+        self.latency: Optional[float] = None  # EWMA, seconds
+        self.error_rate = 0.0  # EWMA of failures (0..1)
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_started_at: Optional[float] = None
+        self.requests = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self.requests += 1
+            self.latency = (
+                latency
+                if self.latency is None
+                else self.alpha * latency + (1 - self.alpha) * self.latency
+            )
+            self.error_rate *= 1 - self.alpha
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.trial_started_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.requests += 1
+            self.failures += 1
+            self.error_rate = self.alpha + (1 - self.alpha) * self.error_rate
+            self.consecutive_failures += 1
+            self.trial_started_at = None
+            # A failed half-open trial re-opens the breaker for another cooldown
+            if self.consecutive_failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.warning(f"Circuit opened for RPC endpoint {self.url}")
+                self.opened_at = time.monotonic()
+
+    def state(self, now: float | None = None) -> str:
+        """closed (healthy), open (skipped) or half_open (one trial allowed)"""
+        if self.opened_at is None:
+            return "closed"
+        now = time.monotonic() if now is None else now
+        return "open" if now - self.opened_at < self.cooldown else "half_open"
+
+    def _trial_running(self, now: float) -> bool:
+        # The trial's request reports back through record_success/failure; one
+        # that never does (no request was sent) stops blocking after a cooldown
+        return (
+            self.trial_started_at is not None
+            and now - self.trial_started_at < self.cooldown
+        )
+
+    def available(self, now: float | None = None) -> bool:
+        """Whether the endpoint can take a request: closed, or half-open with
+        no trial in flight"""
+        now = time.monotonic() if now is None else now
+        state = self.state(now)
+        return state == "closed" or (
+            state == "half_open" and not self._trial_running(now)
+        )
+
+    def claim(self, now: float | None = None) -> bool:
+        """
+        Take the endpoint for a request. Only fails for a half-open endpoint
+        whose trial request another caller already holds; otherwise a
+        half-open endpoint is marked as having its trial in flight.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self.state(now) != "half_open":
+                return True
+            if self._trial_running(now):
+                return False
+            self.trial_started_at = now
+            return True
+
+    def score(self) -> float:
+        """Lower is better; endpoints never measured score 0 so they get tried"""
+        return (self.latency or 0.0) * (1 + 4 * self.error_rate)
+
+    def stats(self) -> dict:
+        return {
+            "url": self.url,
+            "state": self.state(),
+            "latency_ms": None if self.latency is None else self.latency * 1000,
+            "error_rate": self.error_rate,
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+class ScoredHTTPProvider(HTTPProvider):
+    """HTTPProvider that reports every request's outcome to its ProviderHealth"""
+
+    def __init__(self, endpoint_uri: str, health: ProviderHealth, **kwargs):
+        super().__init__(endpoint_uri, **kwargs)
+        self.health = health
+
+    def make_request(self, method, params):
+        start = time.monotonic()
+        try:
+            response = super().make_request(method, params)
+        except TRANSPORT_ERRORS:
+            self.health.record_failure()
+            raise
+        self.health.record_success(time.monotonic() - start)
+        return response
+
+    def make_batch_request(self, requests_info):
+        start = time.monotonic()
+        try:
+            response = super().make_batch_request(requests_info)
+        except TRANSPORT_ERRORS:
+            self.health.record_failure()
+            raise
+        self.health.record_success(time.monotonic() - start)
+        return response
+
+
+class Web3ProviderRegistry:
+    """
+    Ranked pool of Web3 providers for one network.
+
+    Endpoints are listed in priority order; ties in score keep that order.
+    """
+
+    def __init__(
+        self,
+        urls: list,
+        timeout: float = WEB3_RPC_TIMEOUT,
+        failure_threshold: int = WEB3_CIRCUIT_FAILURES,
+        cooldown: float = WEB3_CIRCUIT_COOLDOWN,
+    ):
+        self.urls = list(dict.fromkeys(urls))
+        self.timeout = timeout
+        self.health = {
+            url: ProviderHealth(url, failure_threshold, cooldown) for url in self.urls
+        }
+        self._web3 = {}
+        self._lock = threading.Lock()
+
+    def _build(self, url: str):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        provider = ScoredHTTPProvider(
+            url,
+            self.health[url],
+            request_kwargs={"timeout": self.timeout},
+            session=session,
+            # Fail fast; the registry moves on to the next endpoint instead
+            exception_retry_configuration=None,
+            # web3's validation middleware asks for the chain id before every
+            # eth_call and transaction; it never changes for an endpoint
+            cache_allowed_requests=True,
+            cacheable_requests={"eth_chainId"},
+        )
+        return Web3(provider)
+
+    def _web3_for(self, url: str):
+        with self._lock:
+            if url not in self._web3:
+                self._web3[url] = self._build(url)
+            return self._web3[url]
+
+    def ranked(self) -> list:
+        """Usable endpoints, best first. Falls back to every endpoint when all
+        circuits are open, ordered by which breaker re-closes soonest."""
+        now = time.monotonic()
+        order = {url: i for i, url in enumerate(self.urls)}
+        usable = [u for u in self.urls if self.health[u].available(now)]
+        if usable:
+            return sorted(usable, key=lambda u: (self.health[u].score(), order[u]))
+        return sorted(self.urls, key=lambda u: self.health[u].opened_at or 0)
+
+    def get_web3(self):
+        """Best available provider, without a connectivity probe"""
+        if not WEB3_AVAILABLE or not self.urls:
+            return None
+        ranked = self.ranked()
+        url = next((u for u in ranked if self.health[u].claim()), ranked[0])
+        return self._web3_for(url)
+
+    def call(self, fn: Callable[[Any], Any], attempts: int | None = None) -> Any:
+        """
+        Run ``fn(web3)`` on the best provider, failing over on transport errors.
+
+        Args:
+            fn: Callable taking a Web3 instance
+            attempts: Maximum number of providers to try (default: all)
+
+        Raises:
+            The last transport error if every attempted provider failed;
+            RPC-level errors are raised immediately.
+        """
+        if not WEB3_AVAILABLE:
+            raise RuntimeError("web3 is not installed")
+
+        last_error = None
+        for url in self.ranked()[:attempts]:
+            if not self.health[url].claim():
+                continue
+            try:
+                return fn(self._web3_for(url))
+            except TRANSPORT_ERRORS as e:
+                logger.warning(f"RPC call via {url} failed: {e}")
+                last_error = e
+        raise last_error or RuntimeError("No RPC endpoint available")
+
+    def stats(self) -> list:
+        """Per-endpoint health, best first"""
+        ranked = self.ranked()
+        rest = [u for u in self.urls if u not in ranked]
+        return [self.health[u].stats() for u in ranked + rest]
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_provider_registry(urls: list) -> Web3ProviderRegistry:
+    """Process-wide registry for an endpoint list, created on first use"""
+    key = tuple(urls)
+    with _registries_lock:
+        if key not in _registries:
+            _registries[key] = Web3ProviderRegistry(urls)
+        return _registries[key]
+
+
+def get_eth_registry(primary_url: str | None = None) -> Web3ProviderRegistry:
+    """Registry for Ethereum mainnet: ``primary_url`` first, then the fallbacks"""
+    urls = []
+    if primary_url and "YOUR_INFURA_KEY" not in primary_url:
+        urls.append(primary_url)
+    urls.extend(ETH_FALLBACK_RPC_URLS)
+    return get_provider_registry(urls)
+
+
+def reset_registries() -> None:
+    """Drop every registry (tests, or after changing endpoint config)"""
+    with _registries_lock:
+        _registries.clear()
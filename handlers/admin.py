@@ -17,10 +17,16 @@ from telegram.ext import (
 )
 
 from config import *
+from database.numeric import to_decimal, to_decimal128
+from functions.async_client import AsyncClient, run_blocking
+from functions.custody_valuation import custody_valuation
+from functions.gas_oracle import gas_oracle
+from functions.price_oracle import price_oracle
 from functions.trade import TradeClient
 from functions.user import UserClient
 from functions.utils import generate_id
 from functions.wallet import WalletManager
+from functions.wallet_pool import wallet_pool
 from utils.enums import EmojiEnums, TradeTypeEnums
 
 logger = logging.getLogger(__name__)
@@ -636,19 +642,28 @@ class AdminWalletManager:
             wallet_manager = WalletManager()
             total_coins = len(coin_addresses)
             coins_with_balance = 0
+            total_usd = Decimal(0)
 
             coin_balances = []
             for coin_address in coin_addresses:
                 try:
-                    balance = float(coin_address.get("balance", 0))
+                    balance = float(
+                        to_decimal(coin_address.get("balance", 0), Decimal(0))
+                    )
                     if balance > 0:
                         coins_with_balance += 1
+                    # Valued by the custody valuation job, no price lookup here
+                    balance_usd = to_decimal(
+                        coin_address.get("balance_usd"), Decimal(0)
+                    )
+                    total_usd += balance_usd
 
                     coin_balances.append(
                         {
                             "symbol": coin_address["coin_symbol"],
                             "address": coin_address["address"],
                             "balance": balance,
+                            "balance_usd": float(balance_usd),
                             "private_key_encrypted": coin_address.get(
                                 "private_key_encrypted", ""
                             ),
@@ -675,6 +690,7 @@ class AdminWalletManager:
                 "stats": {
                     "total_coins": total_coins,
                     "coins_with_balance": coins_with_balance,
+                    "total_usd": float(total_usd),
                 },
             }
 
@@ -800,7 +816,7 @@ class AdminWalletManager:
             logger.info(f"Found coin address: {coin_address['address']}")
 
             # Get current balance - use database balance for consistency with wallet display
-            current_balance = Decimal(str(coin_address.get("balance", 0)))
+            current_balance = to_decimal(coin_address.get("balance", 0), Decimal(0))
             amount_decimal = Decimal(str(amount))
             network = coin_address.get("network", "")
 
@@ -817,7 +833,9 @@ class AdminWalletManager:
                     sender_wallet_id, coin_symbol
                 )
                 if coin_address:
-                    current_balance = Decimal(str(coin_address.get("balance", 0)))
+                    current_balance = to_decimal(
+                        coin_address.get("balance", 0), Decimal(0)
+                    )
                     logger.info(
                         f"Refreshed balance for {coin_symbol}: {current_balance}"
                     )
@@ -850,7 +868,7 @@ class AdminWalletManager:
                     return {"success": False, "error": error_msg}
 
                 # Use database balance for gas currency too
-                gas_balance = Decimal(str(gas_coin_address.get("balance", 0)))
+                gas_balance = to_decimal(gas_coin_address.get("balance", 0), Decimal(0))
                 logger.info(
                     f"Gas currency ({fee_currency}) database balance: {gas_balance}"
                 )
@@ -865,7 +883,9 @@ class AdminWalletManager:
                         sender_wallet_id, fee_currency
                     )
                     if gas_coin_address:
-                        gas_balance = Decimal(str(gas_coin_address.get("balance", 0)))
+                        gas_balance = to_decimal(
+                            gas_coin_address.get("balance", 0), Decimal(0)
+                        )
                         logger.info(
                             f"Refreshed gas balance for {fee_currency}: {gas_balance}"
                         )
@@ -1204,7 +1224,7 @@ class AdminWalletManager:
                             {"_id": coin_address["_id"]},
                             {
                                 "$set": {
-                                    "balance": str(new_token_balance),
+                                    "balance": to_decimal128(new_token_balance),
                                     "last_balance_update": datetime.now().isoformat(),
                                 }
                             },
@@ -1222,7 +1242,7 @@ class AdminWalletManager:
                             {"_id": coin_address["_id"]},
                             {
                                 "$set": {
-                                    "balance": str(new_balance),
+                                    "balance": to_decimal128(new_balance),
                                     "last_balance_update": datetime.now().isoformat(),
                                 }
                             },
@@ -1502,7 +1522,7 @@ async def admin_all_trades_handler(update: Update, context: ContextTypes.DEFAULT
     await query.answer()
 
     try:
-        active_trades = TradeClient.get_all_active_trades()
+        active_trades = await AsyncClient(TradeClient).get_all_active_trades()
 
         if not active_trades:
             await query.edit_message_text(
@@ -1582,8 +1602,8 @@ async def admin_system_status_handler(
 
     try:
         # Get basic system stats
-        total_users = db.wallets.count_documents({})
-        active_trades = len(TradeClient.get_all_active_trades())
+        total_users = db.wallets.count_documents({"is_pooled": {"$ne": True}})
+        active_trades = len(await AsyncClient(TradeClient).get_all_active_trades())
         total_trades = db.trades.count_documents({})
 
         status_text = f"🔧 <b>System Status</b>\n\n"
@@ -1601,6 +1621,60 @@ async def admin_system_status_handler(
         status_text += f"🗄️ <b>Database:</b> {db_status}\n"
         status_text += f"🤖 <b>Bot Status:</b> 🟢 Running\n"
 
+        for label, cache_stats in (
+            ("Trade Cache", TradeClient.get_cache_stats()),
+            ("User Cache", UserClient.get_cache_stats()),
+            ("Balance Cache", WalletManager.get_balance_cache_stats()),
+        ):
+            if cache_stats["enabled"]:
+                status_text += (
+                    f"⚡ <b>{label}:</b> {cache_stats['size']} entries, "
+                    f"{cache_stats['hit_rate'] * 100:.1f}% hit rate "
+                    f"({cache_stats['hits']} hits / "
+                    f"{cache_stats['misses']} misses)\n"
+                )
+            else:
+                status_text += f"⚡ <b>{label}:</b> disabled\n"
+
+        state_icons = {"closed": "🟢", "half_open": "🟡", "open": "🔴"}
+        for provider in WalletManager.get_rpc_provider_stats():
+            latency = provider["latency_ms"]
+            status_text += (
+                f"{state_icons[provider['state']]} <b>RPC</b> "
+                f"{provider['url'].split('//')[-1].split('/')[0]}: "
+                f"{'n/a' if latency is None else f'{latency:.0f} ms'}, "
+                f"{provider['failures']}/{provider['requests']} failed\n"
+            )
+
+        gas = gas_oracle.stats()
+        if gas["base_fee_gwei"] is None:
+            status_text += f"⛽ <b>Gas:</b> no fee data ({gas['failures']} failed)\n"
+        else:
+            tips = gas["priority_fees_gwei"]
+            status_text += (
+                f"⛽ <b>Gas:</b> base {gas['base_fee_gwei']:.2f} gwei, tip "
+                f"{tips['slow']:.2f}/{tips['normal']:.2f}/{tips['fast']:.2f} gwei "
+                f"(block {gas['block']}, {gas['age']:.0f}s old)\n"
+            )
+
+        prices = price_oracle.stats()
+        if prices["oldest_age"] is None:
+            status_text += (
+                f"💱 <b>Prices:</b> none cached ({prices['failures']} failed)\n"
+            )
+        else:
+            status_text += (
+                f"💱 <b>Prices:</b> {prices['symbols']} coins, oldest "
+                f"{prices['oldest_age']:.0f}s old ({prices['failures']} failed)\n"
+            )
+
+        if WALLET_POOL_ENABLED:
+            pool = wallet_pool.stats()
+            status_text += (
+                f"👛 <b>Wallet Pool:</b> {pool['available']}/{pool['target']} ready, "
+                f"{pool['assigned']} assigned, {pool['misses']} misses\n"
+            )
+
         await query.edit_message_text(
             status_text,
             parse_mode="HTML",
@@ -1641,7 +1715,7 @@ async def admin_platform_stats_handler(
 
     try:
         # Calculate platform statistics
-        total_wallets = db.wallets.count_documents({})
+        total_wallets = db.wallets.count_documents({"is_pooled": {"$ne": True}})
         total_trades = db.trades.count_documents({})
         completed_trades = db.trades.count_documents({"is_completed": True})
         active_trades = db.trades.count_documents({"is_active": True})
@@ -1667,6 +1741,23 @@ async def admin_platform_stats_handler(
         stats_text += f"💰 Crypto→Fiat: {crypto_fiat_trades}\n"
         stats_text += f"💱 Crypto→Crypto: {crypto_crypto_trades}\n\n"
 
+        # Custody value from the last valuation pass (one price snapshot)
+        valuation = custody_valuation.last or await run_blocking(custody_valuation.run)
+        if valuation:
+            stats_text += (
+                f"<b>Custody Value:</b> ${valuation['total_usd']:,.2f} "
+                f"({valuation['valued_at']:%H:%M})\n"
+            )
+            for symbol, coin in sorted(
+                valuation["coins"].items(), key=lambda item: -item[1]["usd"]
+            ):
+                if coin["usd"] > 0:
+                    stats_text += (
+                        f"• {symbol}: {coin['balance'].normalize():f} "
+                        f"(${coin['usd']:,.2f})\n"
+                    )
+            stats_text += "\n"
+
         # Most used currencies
         try:
             pipeline = [
@@ -1828,7 +1919,8 @@ async def handle_user_wallet_lookup(update: Update, context: ContextTypes.DEFAUL
 
         wallet_text += f"📊 <b>Statistics:</b>\n"
         wallet_text += f"• Total coins: {stats['total_coins']}\n"
-        wallet_text += f"• With balance: {stats['coins_with_balance']}\n\n"
+        wallet_text += f"• With balance: {stats['coins_with_balance']}\n"
+        wallet_text += f"• Value: ${stats['total_usd']:,.2f}\n\n"
 
         wallet_text += f"💰 <b>Balances:</b>\n"
         for coin in coin_balances:
@@ -1844,7 +1936,10 @@ async def handle_user_wallet_lookup(update: Update, context: ContextTypes.DEFAUL
                 "TRX": EmojiEnums.TRON.value,
             }.get(coin["symbol"], "🪙")
 
-            wallet_text += f"{status_icon} {coin_emoji} <b>{coin['symbol']}:</b> {coin['balance']}\n"
+            wallet_text += f"{status_icon} {coin_emoji} <b>{coin['symbol']}:</b> {coin['balance']}"
+            if coin["balance_usd"]:
+                wallet_text += f" (${coin['balance_usd']:,.2f})"
+            wallet_text += "\n"
             if coin["balance"] > 0:
                 display_address = f"{coin['address'][:12]}...{coin['address'][-8:]}"
                 wallet_text += f"   📍 <code>{display_address}</code>\n"
@@ -2146,7 +2241,7 @@ async def handle_send_crypto_step4(update: Update, context: ContextTypes.DEFAULT
             return
 
         # Get current balance - use database balance for consistency with wallet display
-        current_balance = Decimal(str(coin_address.get("balance", 0)))
+        current_balance = to_decimal(coin_address.get("balance", 0), Decimal(0))
         amount_decimal = Decimal(str(amount))
         network = coin_address.get("network", "")
 
@@ -2161,7 +2256,7 @@ async def handle_send_crypto_step4(update: Update, context: ContextTypes.DEFAULT
             # Get updated coin address after refresh
             coin_address = WalletManager.get_wallet_coin_address(wallet_id, coin)
             if coin_address:
-                current_balance = Decimal(str(coin_address.get("balance", 0)))
+                current_balance = to_decimal(coin_address.get("balance", 0), Decimal(0))
                 logger.info(
                     f"Refreshed balance for {coin} in confirmation: {current_balance}"
                 )
@@ -2213,7 +2308,7 @@ async def handle_send_crypto_step4(update: Update, context: ContextTypes.DEFAULT
                 wallet_id, fee_currency
             )
             if gas_coin_address:
-                gas_balance = Decimal(str(gas_coin_address.get("balance", 0)))
+                gas_balance = to_decimal(gas_coin_address.get("balance", 0), Decimal(0))
 
                 # If gas balance is zero, try to refresh it
                 if gas_balance == 0:
@@ -2227,7 +2322,9 @@ async def handle_send_crypto_step4(update: Update, context: ContextTypes.DEFAULT
                         wallet_id, fee_currency
                     )
                     if gas_coin_address:
-                        gas_balance = Decimal(str(gas_coin_address.get("balance", 0)))
+                        gas_balance = to_decimal(
+                            gas_coin_address.get("balance", 0), Decimal(0)
+                        )
                         logger.info(
                             f"Refreshed gas balance for {fee_currency} in confirmation: {gas_balance}"
                         )
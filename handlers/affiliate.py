@@ -46,7 +46,7 @@ async def start_affiliate(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     This is the handler to start affiliate options
     """
-    user = UserClient.get_user(update.message)
+    user = await AsyncClient(UserClient).get_user(update.message)
 
     #  WRTIE A PROCESS TO CHECK ADMIN AND SEND REQUEST TO PROCESS WITH USER
     username = update.message.from_user.username
@@ -4,6 +4,7 @@ from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import ContextTypes
 
 from config import ADMIN_ID
+from functions.async_client import AsyncClient
 from functions.broker import BrokerClient
 from functions.trade import TradeClient
 from functions.user import UserClient
@@ -19,7 +20,7 @@ async def broker_registration_handler(
     user_id = str(update.effective_user.id)
 
     # Check if user is already a broker
-    existing_broker = BrokerClient.get_broker(user_id)
+    existing_broker = await AsyncClient(BrokerClient).get_broker(user_id)
     if existing_broker:
         if existing_broker.get("is_verified"):
             status = (
@@ -30,7 +31,7 @@ async def broker_registration_handler(
         else:
             status = "⏳ Pending Verification"
 
-        stats = BrokerClient.get_broker_stats(existing_broker["_id"])
+        stats = await AsyncClient(BrokerClient).get_broker_stats(existing_broker["_id"])
 
         await update.message.reply_text(
             f"🤝 <b>Your Broker Profile</b>\n\n"
@@ -182,7 +183,7 @@ async def complete_broker_registration(update, context, registration_data):
     bio = registration_data.get("bio", "")
 
     # Register the broker
-    broker = BrokerClient.register_broker(
+    broker = await AsyncClient(BrokerClient).register_broker(
         user_id=user_id,
         broker_name=broker_name,
         bio=bio,
@@ -314,7 +315,7 @@ async def broker_callback_handler(update: Update, context: ContextTypes.DEFAULT_
         )
 
     elif data == "broker_settings":
-        broker = BrokerClient.get_broker(user_id)
+        broker = await AsyncClient(BrokerClient).get_broker(user_id)
         if not broker:
             await query.edit_message_text("❌ Broker profile not found.")
             return
@@ -334,10 +335,10 @@ async def broker_callback_handler(update: Update, context: ContextTypes.DEFAULT_
     # Admin broker verification callbacks
     elif data.startswith("verify_broker_") and user_id == str(ADMIN_ID):
         broker_id = data.replace("verify_broker_", "")
-        success = BrokerClient.verify_broker(broker_id, user_id)
+        success = await AsyncClient(BrokerClient).verify_broker(broker_id, user_id)
 
         if success:
-            broker = BrokerClient.get_broker_by_id(broker_id)
+            broker = await AsyncClient(BrokerClient).get_broker_by_id(broker_id)
 
             # Notify the broker
             try:
@@ -374,7 +375,7 @@ async def broker_callback_handler(update: Update, context: ContextTypes.DEFAULT_
 
     elif data.startswith("reject_broker_") and user_id == str(ADMIN_ID):
         broker_id = data.replace("reject_broker_", "")
-        broker = BrokerClient.get_broker_by_id(broker_id)
+        broker = await AsyncClient(BrokerClient).get_broker_by_id(broker_id)
 
         if broker:
             # Notify the broker
@@ -396,7 +397,7 @@ async def broker_callback_handler(update: Update, context: ContextTypes.DEFAULT_
                 logger.error(f"Failed to notify broker of rejection: {e}")
 
             # Deactivate the broker
-            BrokerClient.deactivate_broker(broker_id)
+            await AsyncClient(BrokerClient).deactivate_broker(broker_id)
 
             await query.edit_message_text(
                 f"❌ Broker application for {broker['broker_name']} has been rejected.",
@@ -75,7 +75,9 @@ async def handle_menu_callback(update: Update, context: ContextTypes.DEFAULT_TYP
                 return
 
             # Check if user is already involved in an active trade
-            active_trade = trades_db.get_active_trade_by_user_id(str(user_id))
+            active_trade = await AsyncClient(trades_db).get_active_trade_by_user_id(
+                str(user_id)
+            )
             if active_trade:
                 await query.edit_message_text(
                     Messages.active_trade_exists(active_trade["_id"]),
@@ -221,7 +223,7 @@ async def handle_deposit_check_callback(
         logger.info(f"Trade ID extracted: {trade_id}")
 
         # Get trade to determine type
-        trade = TradeClient.get_trade(trade_id)
+        trade = await AsyncClient(TradeClient).get_trade(trade_id)
         if not trade:
             logger.error(f"Trade {trade_id} not found")
             await query.bot.send_message(
@@ -263,7 +265,7 @@ async def handle_cancel_trade_callback(
         logger.info(f"Cancelling trade ID: {trade_id}")
 
         # Get trade to verify ownership
-        trade = TradeClient.get_trade(trade_id)
+        trade = await AsyncClient(TradeClient).get_trade(trade_id)
         if not trade:
             logger.error(f"Trade {trade_id} not found")
             await query.edit_message_text(
@@ -314,7 +316,7 @@ async def handle_confirm_cancel_callback(
 
         try:
             # Cancel the trade
-            success = TradeClient.cancel_trade(
+            success = await AsyncClient(TradeClient).cancel_trade(
                 trade_id=trade_id, user_id=str(query.from_user.id)
             )
 
@@ -364,7 +366,7 @@ async def handle_support_trade_callback(
         logger.info(f"Support requested for trade ID: {trade_id}")
 
         # Get trade to verify existence
-        trade = TradeClient.get_trade(trade_id)
+        trade = await AsyncClient(TradeClient).get_trade(trade_id)
         if not trade:
             await query.edit_message_text(
                 Messages.trade_not_found(trade_id), reply_markup=back_to_menu()
@@ -419,7 +421,7 @@ async def handle_trade_details_callback(
         logger.info(f"Trade details requested for trade ID: {trade_id}")
 
         # Get trade to verify existence and show details
-        trade = TradeClient.get_trade(trade_id)
+        trade = await AsyncClient(TradeClient).get_trade(trade_id)
         if not trade:
             await query.edit_message_text(
                 Messages.trade_not_found(trade_id), reply_markup=back_to_menu()
@@ -9,6 +9,7 @@ from telegram.ext import (
 
 from config import *
 from functions import *
+from functions.async_client import AsyncClient
 from functions.trade import TradeClient
 from utils import *
 
@@ -18,7 +19,7 @@ async def delete_trade_handler(update: Update, context: ContextTypes.DEFAULT_TYP
     user_id = str(update.effective_user.id)
 
     # Get user's active trades
-    active_trade = TradeClient.get_active_trade_by_user_id(user_id)
+    active_trade = await AsyncClient(TradeClient).get_active_trade_by_user_id(user_id)
     if not active_trade:
         await update.message.reply_text(
             "❌ You don't have any active trades to delete.",
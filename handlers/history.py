@@ -5,6 +5,8 @@ from telegram.ext import CallbackQueryHandler, CommandHandler, ContextTypes
 
 from config import *
 from functions import *
+from functions.async_client import AsyncClient
+from functions.stats import TradeStatsClient
 from functions.trade import TradeClient
 from functions.user import UserClient
 from utils import *
@@ -33,8 +35,13 @@ async def send_message_or_edit(
         raise
 
 
-async def history_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle the /history command"""
+async def history_handler(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    after: str | None = None,
+    before: str | None = None,
+):
+    """Handle the /history command and its next/prev page buttons"""
     try:
         user_id = str(update.effective_user.id)
         is_callback = bool(update.callback_query)
@@ -45,9 +52,12 @@ async def history_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         logger.info(f"User ID: {user_id}")
 
-        # Get user's trades
-        trades = trades_db.get_trades(user_id)
-        if not trades:
+        # Get one page of the user's trades
+        page = await AsyncClient(TradeClient).get_trades_page(
+            user_id, after=after, before=before
+        )
+        trades = page["trades"]
+        if not trades and not (after or before):
             await send_message_or_edit(
                 message,
                 f"{EmojiEnums.CROSS_MARK.value} You don't have any trade history yet.",
@@ -67,12 +77,7 @@ async def history_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         # Create keyboard with trade options
         keyboard = []
-        # Convert trades to list if it's not already
-        trades_list = list(trades) if not isinstance(trades, list) else trades
-        logger.info(f"Trades: {trades_list}")
-
-        for trade in trades_list[:5]:  # Limit to 5 most recent trades
-            logger.info(trade)
+        for trade in trades:
             try:
                 # Handle both dictionary and list formats
                 if isinstance(trade, dict):
@@ -105,6 +110,22 @@ async def history_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 logger.error(f"Error processing trade in history: {e}")
                 continue
 
+        nav_row = []
+        if page["prev_cursor"]:
+            nav_row.append(
+                InlineKeyboardButton(
+                    "⬅️ Newer", callback_data=f"history_prev_{page['prev_cursor']}"
+                )
+            )
+        if page["next_cursor"]:
+            nav_row.append(
+                InlineKeyboardButton(
+                    "Older ➡️", callback_data=f"history_next_{page['next_cursor']}"
+                )
+            )
+        if nav_row:
+            keyboard.append(nav_row)
+
         keyboard.append(
             [
                 InlineKeyboardButton(
@@ -114,9 +135,17 @@ async def history_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             ]
         )
 
+        stats = await AsyncClient(TradeStatsClient).get_user_stats(user_id)
+        summary = (
+            f"Trades: {stats['trades']} ({stats['sales']} sold, "
+            f"{stats['purchases']} bought)\n"
+            f"Completed: {stats['completed']} | Cancelled: {stats['cancelled']} | "
+            f"Disputed: {stats['disputed']}"
+        )
+
         await send_message_or_edit(
             message,
-            f"{EmojiEnums.CLIPBOARD.value} Your Trade History:\n\nSelect a trade to view details:",
+            f"{EmojiEnums.CLIPBOARD.value} Your Trade History:\n\n{summary}\n\nSelect a trade to view details:",
             InlineKeyboardMarkup(keyboard),
             is_callback,
         )
@@ -156,14 +185,29 @@ async def handle_trade_view_callback(
     """Handle trade view callback queries"""
     try:
         query = update.callback_query
-        await query.answer()
-
         data = query.data
 
+        if data == "history" or data.startswith("history_"):
+            # Return to history menu, or page through it (history_handler
+            # answers the callback itself)
+            if data.startswith("history_next_"):
+                await history_handler(
+                    update, context, after=data.replace("history_next_", "", 1)
+                )
+            elif data.startswith("history_prev_"):
+                await history_handler(
+                    update, context, before=data.replace("history_prev_", "", 1)
+                )
+            else:
+                await history_handler(update, context)
+            return
+
+        await query.answer()
+
         if data.startswith("view_trade_"):
             trade_id = data.replace("view_trade_", "")
             logger.info(f"Trade ID: {trade_id}")
-            trade = trades_db.get_trade(trade_id)
+            trade = await AsyncClient(trades_db).get_trade(trade_id)
 
             if not trade:
                 await query.message.edit_text(
@@ -233,10 +277,6 @@ async def handle_trade_view_callback(
                 details, parse_mode="html", reply_markup=InlineKeyboardMarkup(keyboard)
             )
 
-        elif data == "history":
-            # Return to history menu
-            await history_handler(update, context)
-
     except Exception as e:
         logger.error(f"Error in trade view callback: {e}")
         try:
@@ -19,6 +19,7 @@ from telegram.ext import (
 from config import *
 from config import db
 from functions import *
+from functions.async_client import AsyncClient
 from functions.trade import TradeClient
 from functions.user import UserClient
 from handlers.trade_flows import TradeFlowHandler
@@ -74,9 +75,9 @@ async def initiate_trade_handler(update: Update, context: ContextTypes.DEFAULT_T
         )
         return
 
-    user_obj = UserClient.get_user(update.message)
+    user_obj = await AsyncClient(UserClient).get_user(update.message)
     if user_obj:
-        active_trade = TradeClient.get_most_recent_trade(user_obj)
+        active_trade = await AsyncClient(TradeClient).get_most_recent_trade(user_obj)
 
         # Enhanced debug logging
         if active_trade:
@@ -97,7 +98,9 @@ async def initiate_trade_handler(update: Update, context: ContextTypes.DEFAULT_T
 
         if active_trade and active_trade.get("is_active", False):
             # Get all active trades for this user
-            all_active_trades = TradeClient.get_active_trades_for_user(str(user_id))
+            all_active_trades = await AsyncClient(
+                TradeClient
+            ).get_active_trades_for_user(str(user_id))
             trade_count = len(all_active_trades)
 
             # Log detailed debug info (not shown to user)
@@ -256,7 +259,7 @@ async def cancel_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # Get the message object correctly for both callback queries and regular messages
     message = update.callback_query.message if update.callback_query else update.message
-    user_obj = UserClient.get_user(message)
+    user_obj = await AsyncClient(UserClient).get_user(message)
 
     # Check for trade creation process
     has_trade_creation = "trade_creation" in context.user_data
@@ -267,7 +270,7 @@ async def cancel_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Check for active database trades
     active_trade = None
     if user_obj:
-        active_trade = TradeClient.get_most_recent_trade(user_obj)
+        active_trade = await AsyncClient(TradeClient).get_most_recent_trade(user_obj)
         if active_trade:
             logging.info(
                 f"DEBUG CANCEL: User {user_id} most recent trade: {active_trade.get('_id')}"
@@ -554,7 +557,7 @@ async def dispatch_to_flow(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def status_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show current user status - trades, creation process, etc."""
     user_id = str(update.effective_user.id)
-    user_obj = UserClient.get_user(update.message)
+    user_obj = await AsyncClient(UserClient).get_user(update.message)
 
     # Check trade creation process
     trade_creation = context.user_data.get("trade_creation")
@@ -562,7 +565,9 @@ async def status_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Check active trades - get all instead of just one
     active_trades = []
     if user_obj:
-        active_trades = TradeClient.get_active_trades_for_user(user_id)
+        active_trades = await AsyncClient(TradeClient).get_active_trades_for_user(
+            user_id
+        )
 
     # Build status message
     status_parts = [f"📊 <b>Your Current Status</b>\n"]
@@ -715,7 +720,7 @@ async def debug_user_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
         return
 
     # Get user object
-    user_obj = UserClient.get_user_by_id(target_user_id)
+    user_obj = await AsyncClient(UserClient).get_user_by_id(target_user_id)
     if not user_obj:
         await update.message.reply_text(
             f"❌ User {target_user_id} not found in database."
@@ -732,7 +737,7 @@ async def debug_user_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
     ]
 
     # Check for active trades
-    active_trade = TradeClient.get_most_recent_trade(user_obj)
+    active_trade = await AsyncClient(TradeClient).get_most_recent_trade(user_obj)
     if active_trade:
         is_really_active = active_trade.get("is_active", False)
         debug_parts.extend(
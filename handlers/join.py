@@ -11,6 +11,7 @@ from telegram.ext import (
 
 from config import *
 from functions import *
+from functions.async_client import AsyncClient
 from functions.trade import TradeClient
 from functions.user import UserClient
 from utils import *
@@ -134,7 +135,7 @@ async def handle_trade_id(update: Update, context: ContextTypes.DEFAULT_TYPE):
         context.user_data.pop("state", None)
 
         # Get trade details
-        trade = TradeClient.get_trade(trade_id)
+        trade = await AsyncClient(TradeClient).get_trade(trade_id)
         if not trade:
             await update.message.reply_text(
                 f"{EmojiEnums.CROSS_MARK.value} Trade not found. Please check the ID and try again.",
@@ -333,15 +334,9 @@ async def handle_join_callback(update: Update, context: ContextTypes.DEFAULT_TYP
             trade_id = data.replace("confirm_join_", "")
             user_id = query.from_user.id
 
-            # Join the trade
-            success = TradeClient.join_trade(trade_id, user_id)
-            if success:
-                # Get updated trade info
-                trade = TradeClient.get_trade(trade_id)
-
-                # Update trade status to "buyer_joined"
-                TradeClient.update_trade_status(trade_id, "buyer_joined")
-
+            # Join the trade; this also moves it to "buyer_joined"
+            trade = await AsyncClient(TradeClient).join_trade(trade_id, user_id)
+            if trade:
                 # Notify seller if trade exists
                 if trade and trade.get("seller_id"):
                     try:
@@ -442,7 +437,7 @@ async def handle_join_callback(update: Update, context: ContextTypes.DEFAULT_TYP
             user_id = query.from_user.id
 
             # Verify user is the buyer
-            trade = TradeClient.get_trade(trade_id)
+            trade = await AsyncClient(TradeClient).get_trade(trade_id)
             if not trade or str(trade.get("buyer_id")) != str(user_id):
                 await query.message.edit_text(
                     f"{EmojiEnums.CROSS_MARK.value} You are not authorized to submit proof for this trade.",
@@ -509,7 +504,7 @@ async def handle_join_callback(update: Update, context: ContextTypes.DEFAULT_TYP
             trade_id = data.replace("pay_", "")
             user_id = query.from_user.id
 
-            trade = TradeClient.get_trade(trade_id)
+            trade = await AsyncClient(TradeClient).get_trade(trade_id)
             if not trade:
                 await query.message.edit_text(
                     f"{EmojiEnums.CROSS_MARK.value} Trade not found.",
@@ -543,9 +538,27 @@ async def handle_join_callback(update: Update, context: ContextTypes.DEFAULT_TYP
                 )
                 return
 
-            # Mark fiat payment in DB
-            TradeClient.confirm_fiat_payment(trade_id)
-            TradeClient.update_trade_status(trade_id, "fiat_paid")
+            # Mark fiat payment in DB and move the trade to "fiat_paid". A
+            # repeated click no longer matches and must not notify again.
+            paid = await AsyncClient(TradeClient).confirm_fiat_payment(
+                trade_id, buyer_id=str(user_id)
+            )
+            if not paid:
+                await query.message.edit_text(
+                    f"{EmojiEnums.WARNING.value} This payment has already been "
+                    "confirmed or the trade is no longer awaiting payment.",
+                    reply_markup=InlineKeyboardMarkup(
+                        [
+                            [
+                                InlineKeyboardButton(
+                                    f"{EmojiEnums.BACK_ARROW.value} Back to Menu",
+                                    callback_data=CallbackDataEnums.MENU.value,
+                                )
+                            ]
+                        ]
+                    ),
+                )
+                return
 
             # Notify seller
             try:
@@ -616,7 +629,7 @@ async def handle_payment_proof_upload(
         user_id = update.effective_user.id
 
         # Verify trade and user authorization
-        trade = TradeClient.get_trade(trade_id)
+        trade = await AsyncClient(TradeClient).get_trade(trade_id)
         if not trade or str(trade.get("buyer_id")) != str(user_id):
             await update.message.reply_text(
                 f"{EmojiEnums.CROSS_MARK.value} You are not authorized to submit proof for this trade.",
@@ -717,13 +730,15 @@ async def handle_payment_proof_upload(
             return
 
         # Store payment proof in database
-        success = TradeClient.add_fiat_payment_proof(
+        success = await AsyncClient(TradeClient).add_fiat_payment_proof(
             trade_id, file_id, file_type, user_id
         )
 
         if success:
             # Update trade status
-            TradeClient.update_trade_status(trade_id, "proof_submitted")
+            await AsyncClient(TradeClient).update_trade_status(
+                trade_id, "proof_submitted"
+            )
 
             # Clear the awaiting state
             context.user_data.pop("awaiting_payment_proof", None)
@@ -892,7 +907,7 @@ async def handle_buyer_address_input(
             return
 
         # Save buyer address
-        success = TradeClient.set_buyer_address(trade_id, address)
+        success = await AsyncClient(TradeClient).set_buyer_address(trade_id, address)
         if not success:
             await update.message.reply_text(
                 f"{EmojiEnums.CROSS_MARK.value} Failed to save your address. Please try again or contact support.",
@@ -943,11 +958,44 @@ async def handle_buyer_address_input(
         )
 
         # Initiate crypto release
-        release_success = TradeClient.initiate_crypto_release(trade_id)
+        release_success = await AsyncClient(TradeClient).initiate_crypto_release(
+            trade_id
+        )
+        released = (
+            await AsyncClient(TradeClient).get_trade(trade_id)
+            if release_success
+            else None
+        )
 
-        if release_success:
+        if released and released.get("release_tx_status") == "pending":
+            # Broadcast only: the receipt tracker completes the trade and
+            # notifies both parties once the transaction is mined
+            await context.bot.send_message(
+                chat_id=user_id,
+                text=Messages.release_broadcast(
+                    released, address, released["release_tx_hash"]
+                ),
+                parse_mode="html",
+                reply_markup=InlineKeyboardMarkup(
+                    [
+                        [
+                            InlineKeyboardButton(
+                                "📊 Check Payment Status",
+                                callback_data=f"payment_status_{trade_id}",
+                            )
+                        ],
+                        [
+                            InlineKeyboardButton(
+                                f"{EmojiEnums.BACK_ARROW.value} Back to Menu",
+                                callback_data="menu",
+                            )
+                        ],
+                    ]
+                ),
+            )
+        elif release_success:
             # Complete the trade
-            TradeClient.complete_trade(trade_id)
+            await AsyncClient(TradeClient).complete_trade(trade_id)
 
             # Notify buyer of successful release
             await context.bot.send_message(
@@ -1134,7 +1182,7 @@ def _validate_crypto_address(address: str, currency: str) -> bool:
 async def handle_payment_status_callback(query, context, trade_id):
     """Handle payment status check callback"""
     try:
-        trade = TradeClient.get_trade(trade_id)
+        trade = await AsyncClient(TradeClient).get_trade(trade_id)
         if not trade:
             await query.message.edit_text(
                 "❌ Trade not found.",
@@ -1201,7 +1249,7 @@ async def handle_payment_status_callback(query, context, trade_id):
 async def handle_address_help_callback(query, context, trade_id):
     """Handle address help callback"""
     try:
-        trade = TradeClient.get_trade(trade_id)
+        trade = await AsyncClient(TradeClient).get_trade(trade_id)
         if not trade:
             await query.message.edit_text(
                 "❌ Trade not found.",
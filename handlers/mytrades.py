@@ -4,6 +4,7 @@ from datetime import datetime
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import CallbackQueryHandler, CommandHandler, ContextTypes
 
+from functions.async_client import AsyncClient
 from functions.trade import TradeClient
 from utils.enums import CallbackDataEnums, EmojiEnums
 from utils.messages import Messages
@@ -44,7 +45,9 @@ async def mytrades_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     try:
         # Get all active trades for this user
-        active_trades = TradeClient.get_active_trades_for_user(user_id)
+        active_trades = await AsyncClient(TradeClient).get_active_trades_for_user(
+            user_id
+        )
 
         if not active_trades:
             # No active trades found
@@ -186,7 +189,9 @@ async def mytrades_callback_handler(update: Update, context: ContextTypes.DEFAUL
     try:
         if callback_data == "my_trades":
             # Show all active trades (same as /mytrades command)
-            active_trades = TradeClient.get_active_trades_for_user(user_id)
+            active_trades = await AsyncClient(TradeClient).get_active_trades_for_user(
+                user_id
+            )
 
             if not active_trades:
                 message = (
@@ -298,7 +303,7 @@ async def mytrades_callback_handler(update: Update, context: ContextTypes.DEFAUL
         elif callback_data.startswith("mytrade_view_"):
             # View specific trade details
             trade_id = callback_data.replace("mytrade_view_", "")
-            trade = TradeClient.get_trade(trade_id)
+            trade = await AsyncClient(TradeClient).get_trade(trade_id)
 
             if not trade:
                 await query.edit_message_text(
@@ -1,12 +1,12 @@
 import logging
-from datetime import datetime
 
 from telegram import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import ContextTypes
 
-from config import BOT_FEE_PERCENTAGE, db
+from config import BOT_FEE_PERCENTAGE, DEPOSIT_BALANCE_MAX_AGE, db
 from database.types import UserType
-from functions.trade import TradeClient
+from functions.async_client import AsyncClient
+from functions.trade import WALLET_TRADE_CURRENCIES, TradeBuilder, TradeClient
 from functions.user import UserClient
 from functions.wallet import WalletManager
 from utils.enums import EmojiEnums, TradeTypeEnums
@@ -151,7 +151,9 @@ class CryptoFiatFlow:
             from functions.broker import BrokerClient
 
             trade_type = CryptoFiatFlow.FLOW_NAME
-            available_brokers = BrokerClient.get_verified_brokers(trade_type)
+            available_brokers = await AsyncClient(BrokerClient).get_verified_brokers(
+                trade_type
+            )
 
             if not available_brokers:
                 await query.message.edit_text(
@@ -263,7 +265,7 @@ class CryptoFiatFlow:
 
             from functions.broker import BrokerClient
 
-            broker = BrokerClient.get_broker_by_id(broker_id)
+            broker = await AsyncClient(BrokerClient).get_broker_by_id(broker_id)
 
             if not broker:
                 await query.message.edit_text(
@@ -338,7 +340,7 @@ class CryptoFiatFlow:
         description = message.text
         trade_data = context.user_data["trade_creation"]
 
-        user = UserClient.get_user(message)
+        user = await AsyncClient(UserClient).get_user(message)
         if not user:
             await message.reply_text(
                 "Error: Could not identify user. Please try /start."
@@ -358,15 +360,26 @@ class CryptoFiatFlow:
                 context.user_data.pop("trade_creation", None)
                 return False
 
-        trade = TradeClient.open_new_trade(
-            message,  # Pass the message object for user extraction by UserClient if needed
-            currency=trade_data["currency"],
-            trade_type=CryptoFiatFlow.FLOW_NAME,
+        # Terms, price, broker and deposit details go in with a single insert
+        builder = (
+            TradeBuilder(
+                user["_id"],
+                currency=trade_data["currency"],
+                trade_type=CryptoFiatFlow.FLOW_NAME,
+            )
+            .with_terms(description)
+            .with_price(trade_data["amount"])
+            .with_payment()
         )
+        if trade_data.get("use_broker") and trade_data.get("broker_id"):
+            builder.with_broker(trade_data["broker_id"])
+
+        trade = await AsyncClient(TradeClient).create_trade(builder)
 
         if not trade:
             await message.reply_text(
-                "❌ Failed to create trade in the database. Please try again.",
+                "❌ Failed to create trade or generate deposit details. "
+                "Please try again or contact admin.",
                 reply_markup=InlineKeyboardMarkup(
                     [[InlineKeyboardButton("🔙 Back to Menu", callback_data="menu")]]
                 ),
@@ -375,45 +388,24 @@ class CryptoFiatFlow:
 
         # Store trade_id in context for potential use in deposit check callback
         context.user_data["trade_creation"]["trade_id"] = trade["_id"]
-
-        TradeClient.add_terms(terms=description, trade_id=trade["_id"])
-        TradeClient.add_price(price=trade_data["amount"], trade_id=trade["_id"])
+        payment_url = builder.payment_url
 
         # Handle broker integration if selected
         broker_message = ""
-        if trade_data.get("use_broker") and trade_data.get("broker_id"):
-            from functions.broker import BrokerClient
-
-            broker_success = TradeClient.add_broker_to_trade(
-                trade["_id"], trade_data["broker_id"]
+        if builder.broker:
+            broker_message = f"\n\n🤝 <b>Broker:</b> {builder.broker['broker_name']} (Commission: {builder.broker.get('commission_rate', 1.0)}%)"
+            logger.info(
+                f"Broker {trade_data['broker_id']} added to trade {trade['_id']}"
             )
-            if broker_success:
-                broker = BrokerClient.get_broker_by_id(trade_data["broker_id"])
-                broker_message = f"\n\n🤝 <b>Broker:</b> {broker['broker_name']} (Commission: {broker.get('commission_rate', 1.0)}%)"
-                logger.info(
-                    f"Broker {trade_data['broker_id']} added to trade {trade['_id']}"
-                )
-            else:
-                logger.error(f"Failed to add broker to trade {trade['_id']}")
-                broker_message = "\n\n⚠️ <b>Note:</b> Broker could not be added to trade, proceeding without broker."
-
-        payment_url = TradeClient.get_invoice_url(trade)
-
-        if not payment_url:
-            await message.reply_text(
-                "❌ Failed to generate payment URL for crypto deposit. Please try again or contact admin.",
-                reply_markup=InlineKeyboardMarkup(
-                    [[InlineKeyboardButton("🔙 Back to Menu", callback_data="menu")]]
-                ),
-            )
-            # Potentially close or mark the trade as failed if invoice generation is critical
-            return False
+        elif builder.broker_id:
+            logger.error(f"Failed to add broker to trade {trade['_id']}")
+            broker_message = "\n\n⚠️ <b>Note:</b> Broker could not be added to trade, proceeding without broker."
 
         context.user_data["trade_creation"][
             "current_flow_step"
         ] = AWAITING_DEPOSIT_CONFIRMATION
         # Check if this is a wallet-based trade (ETH/USDT)
-        is_wallet_currency = trade_data["currency"] in ["ETH", "USDT"]
+        is_wallet_currency = trade_data["currency"] in WALLET_TRADE_CURRENCIES
 
         if is_wallet_currency:
             # Use wallet-based deposit instructions with address
@@ -521,7 +513,7 @@ class CryptoFiatFlow:
             return False
 
         # Fetch the trade using trade_id
-        trade = TradeClient.get_trade(trade_id)
+        trade = await AsyncClient(TradeClient).get_trade(trade_id)
         if not trade:
             logger.error(f"Trade {trade_id} not found in database")
             await context.bot.send_message(
@@ -564,7 +556,7 @@ class CryptoFiatFlow:
             receiving_address = trade.get("receiving_address")
 
             # Calculate the total deposit required including fees and gas
-            fee_data = TradeClient.calculate_trade_fee_with_gas(base_amount, currency)
+            fee_data = await AsyncClient(TradeClient).get_fee_quote(trade)
             expected_amount = fee_data["total_deposit_required"]
 
             logger.info(f"Checking wallet balance - Address: {receiving_address}")
@@ -575,8 +567,8 @@ class CryptoFiatFlow:
             if receiving_address and expected_amount > 0:
                 try:
                     # Get the current balance for this address and currency
-                    current_balance = wallet_manager.get_balance(
-                        receiving_address, currency
+                    current_balance = await wallet_manager.get_balance(
+                        receiving_address, currency, max_age=DEPOSIT_BALANCE_MAX_AGE
                     )
 
                     logger.info(f"Current balance: {current_balance} {currency}")
@@ -592,8 +584,10 @@ class CryptoFiatFlow:
                                 seller_wallet_id, "ETH"
                             )
                             if eth_coin_address:
-                                eth_balance = wallet_manager.get_balance(
-                                    eth_coin_address["address"], "ETH"
+                                eth_balance = await wallet_manager.get_balance(
+                                    eth_coin_address["address"],
+                                    "ETH",
+                                    max_age=DEPOSIT_BALANCE_MAX_AGE,
                                 )
                                 required_eth = fee_data["total_gas_fees"]
                                 logger.info(
@@ -642,40 +636,43 @@ class CryptoFiatFlow:
 
         else:
             # BTCPay invoice checking
-            status = TradeClient.get_invoice_status(trade)
+            status = await AsyncClient(TradeClient).get_invoice_status(trade)
             logger.info(f"BTCPay trade - invoice status: {status}")
 
         logger.info(f"Final status check - Status: {status}")
 
         if status and status.lower() in ["paid", "completed", "confirmed", "approved"]:
             logger.info("Deposit confirmed - proceeding with success flow")
-            # NEW: persist deposit confirmation in database
-            TradeClient.confirm_crypto_deposit(trade_id)
-            # Mark trade as active so buyers can join
-            db.trades.update_one(
-                {"_id": trade_id},
-                {
-                    "$set": {
-                        "is_active": True,
-                        "status": "deposited",
-                        "updated_at": datetime.now(),
-                    }
-                },
-            )
+            # Record the deposit and open the trade to buyers in one
+            # conditional write; only the caller that moves it notifies
+            deposited = await AsyncClient(TradeClient).mark_deposited(trade_id)
             # Clean up temporary state
             context.user_data.pop(
                 "trade_creation", None
             )  # Clean up trade creation state
             context.user_data.pop("active_trade_id_for_deposit_check", None)
 
+            if not deposited:
+                # Already confirmed by an earlier check or the deposit
+                # watcher, or the trade is no longer open
+                logger.info(f"Trade {trade_id} was not moved to deposited")
+                current = await AsyncClient(TradeClient).get_trade(trade_id)
+                if current and current.get("is_crypto_deposited"):
+                    await context.bot.send_message(
+                        chat_id,
+                        f"✅ The deposit for trade {trade_id} is already confirmed.",
+                    )
+                logger.info("=== DEPOSIT CHECK END (ALREADY HANDLED) ===")
+                return False
+
             # Send a new message instead of editing the existing one
             logger.info("Sending deposit confirmation message")
             await context.bot.send_message(
                 chat_id,
-                Messages.deposit_confirmed_seller(trade),  # Message for seller
+                Messages.deposit_confirmed_seller(deposited),  # Message for seller
                 parse_mode="HTML",
                 reply_markup=Messages.deposit_confirmed_seller_keyboard(
-                    trade
+                    deposited
                 ),  # Keyboard for seller
             )
 
@@ -698,9 +695,7 @@ class CryptoFiatFlow:
                 # Show the total deposit required including fees
                 base_amount = float(trade.get("price", 0))
                 currency = trade.get("currency")
-                fee_data = TradeClient.calculate_trade_fee_with_gas(
-                    base_amount, currency
-                )
+                fee_data = await AsyncClient(TradeClient).get_fee_quote(trade)
                 expected_total = fee_data["total_deposit_required"]
 
                 status_message += (
@@ -788,7 +783,7 @@ class CryptoFiatFlow:
                 trade_id = data.replace("review_proof_", "")
 
                 # Get trade and verify seller authorization
-                trade = TradeClient.get_trade(trade_id)
+                trade = await AsyncClient(TradeClient).get_trade(trade_id)
                 if not trade or str(trade.get("seller_id")) != user_id:
                     await query.message.edit_text(
                         f"{EmojiEnums.CROSS_MARK.value} You are not authorized to review this trade.",
@@ -917,11 +912,14 @@ class CryptoFiatFlow:
             elif data.startswith("approve_payment_"):
                 trade_id = data.replace("approve_payment_", "")
 
-                # Get trade and verify seller authorization
-                trade = TradeClient.get_trade(trade_id)
-                if not trade or str(trade.get("seller_id")) != user_id:
+                # Approve payment; the seller check and status precondition
+                # are part of the same write
+                trade = await AsyncClient(TradeClient).approve_fiat_payment(
+                    trade_id, user_id
+                )
+                if not trade:
                     await query.message.edit_text(
-                        f"{EmojiEnums.CROSS_MARK.value} You are not authorized to approve this trade.",
+                        f"{EmojiEnums.CROSS_MARK.value} You are not authorized to approve this trade, or it has already been reviewed.",
                         reply_markup=InlineKeyboardMarkup(
                             [
                                 [
@@ -935,117 +933,97 @@ class CryptoFiatFlow:
                     )
                     return False
 
-                # Approve payment and request buyer address
-                success = TradeClient.approve_fiat_payment(trade_id, user_id)
-                if success:
-                    # Request buyer address for crypto release
-                    TradeClient.request_buyer_address(trade_id)
-
-                    # Set context state for buyer address input
-                    # Note: We need to set this for the buyer, not the current user (seller)
-                    buyer_context_key = f"awaiting_buyer_address_{trade['buyer_id']}"
-                    # This will be handled by the message dispatcher
-
-                    # Calculate fee information to show seller
-                    original_amount = float(trade.get("price", 0))
-                    fee_amount, net_amount = TradeClient.calculate_trade_fee(
-                        original_amount
-                    )
+                # Request buyer address for crypto release
+                await AsyncClient(TradeClient).request_buyer_address(trade_id)
 
-                    # Notify buyer to provide address
-                    try:
-                        await context.bot.send_message(
-                            chat_id=trade["buyer_id"],
-                            text=(
-                                f"🎉 <b>Payment Approved!</b>\n\n"
-                                f"Trade ID: <code>{trade_id}</code>\n\n"
-                                f"Great news! The seller has approved your payment proof.\n\n"
-                                f"💰 <b>You will receive:</b> {original_amount} {trade['currency']}\n\n"
-                                f"<b>📍 Final Step:</b> Please provide your {trade['currency']} address where you want to receive the crypto.\n\n"
-                                f"<b>⚠️ Important:</b>\n"
-                                f"• Make sure the address is on the correct network\n"
-                                f"• Double-check your address before submitting\n"
-                                f"• This cannot be undone once sent\n\n"
-                                f"💬 <i>Please send your {trade['currency']} address now...</i>"
-                            ),
-                            parse_mode="html",
-                            reply_markup=InlineKeyboardMarkup(
-                                [
-                                    [
-                                        InlineKeyboardButton(
-                                            "📊 Check Payment Status",
-                                            callback_data=f"payment_status_{trade_id}",
-                                        )
-                                    ],
-                                    [
-                                        InlineKeyboardButton(
-                                            "❓ Need Help?",
-                                            callback_data=f"help_address_{trade_id}",
-                                        )
-                                    ],
-                                    [
-                                        InlineKeyboardButton(
-                                            f"{EmojiEnums.BACK_ARROW.value} Back to Menu",
-                                            callback_data="menu",
-                                        )
-                                    ],
-                                ]
-                            ),
-                        )
-                    except Exception as e:
-                        logger.error(
-                            f"Failed to notify buyer about address request: {e}"
-                        )
+                # Set context state for buyer address input
+                # Note: We need to set this for the buyer, not the current user (seller)
+                buyer_context_key = f"awaiting_buyer_address_{trade['buyer_id']}"
+                # This will be handled by the message dispatcher
 
-                    # Confirm to seller
-                    await query.message.edit_text(
-                        f"✅ <b>Payment Approved!</b>\n\n"
-                        f"Trade ID: <code>{trade_id}</code>\n\n"
-                        f"You have successfully approved the buyer's payment.\n\n"
-                        f"💰 <b>Buyer will receive:</b> {original_amount} {trade['currency']}\n\n"
-                        f"The buyer has been asked to provide their {trade['currency']} address.\n"
-                        f"Once they provide it, the crypto will be automatically released.\n\n"
-                        f"You will be notified when the transfer is completed.",
+                # Calculate fee information to show seller
+                original_amount = float(trade.get("price", 0))
+                fee_amount, net_amount = TradeClient.calculate_trade_fee(
+                    original_amount
+                )
+
+                # Notify buyer to provide address
+                try:
+                    await context.bot.send_message(
+                        chat_id=trade["buyer_id"],
+                        text=(
+                            f"🎉 <b>Payment Approved!</b>\n\n"
+                            f"Trade ID: <code>{trade_id}</code>\n\n"
+                            f"Great news! The seller has approved your payment proof.\n\n"
+                            f"💰 <b>You will receive:</b> {original_amount} {trade['currency']}\n\n"
+                            f"<b>📍 Final Step:</b> Please provide your {trade['currency']} address where you want to receive the crypto.\n\n"
+                            f"<b>⚠️ Important:</b>\n"
+                            f"• Make sure the address is on the correct network\n"
+                            f"• Double-check your address before submitting\n"
+                            f"• This cannot be undone once sent\n\n"
+                            f"💬 <i>Please send your {trade['currency']} address now...</i>"
+                        ),
                         parse_mode="html",
                         reply_markup=InlineKeyboardMarkup(
                             [
                                 [
                                     InlineKeyboardButton(
-                                        "📊 Trade History",
-                                        callback_data="trade_history",
+                                        "📊 Check Payment Status",
+                                        callback_data=f"payment_status_{trade_id}",
                                     )
                                 ],
                                 [
                                     InlineKeyboardButton(
-                                        f"{EmojiEnums.BACK_ARROW.value} Back to Menu",
-                                        callback_data="menu",
+                                        "❓ Need Help?",
+                                        callback_data=f"help_address_{trade_id}",
                                     )
                                 ],
-                            ]
-                        ),
-                    )
-                else:
-                    await query.message.edit_text(
-                        f"{EmojiEnums.CROSS_MARK.value} Failed to approve payment. Please try again or contact support.",
-                        reply_markup=InlineKeyboardMarkup(
-                            [
                                 [
                                     InlineKeyboardButton(
                                         f"{EmojiEnums.BACK_ARROW.value} Back to Menu",
                                         callback_data="menu",
                                     )
-                                ]
+                                ],
                             ]
                         ),
                     )
+                except Exception as e:
+                    logger.error(f"Failed to notify buyer about address request: {e}")
 
+                # Confirm to seller
+                await query.message.edit_text(
+                    f"✅ <b>Payment Approved!</b>\n\n"
+                    f"Trade ID: <code>{trade_id}</code>\n\n"
+                    f"You have successfully approved the buyer's payment.\n\n"
+                    f"💰 <b>Buyer will receive:</b> {original_amount} {trade['currency']}\n\n"
+                    f"The buyer has been asked to provide their {trade['currency']} address.\n"
+                    f"Once they provide it, the crypto will be automatically released.\n\n"
+                    f"You will be notified when the transfer is completed.",
+                    parse_mode="html",
+                    reply_markup=InlineKeyboardMarkup(
+                        [
+                            [
+                                InlineKeyboardButton(
+                                    "📊 Trade History",
+                                    callback_data="trade_history",
+                                )
+                            ],
+                            [
+                                InlineKeyboardButton(
+                                    f"{EmojiEnums.BACK_ARROW.value} Back to Menu",
+                                    callback_data="menu",
+                                )
+                            ],
+                        ]
+                    ),
+                )
                 return True
 
             elif data.startswith("reject_payment_"):
                 trade_id = data.replace("reject_payment_", "")
 
                 # Get trade and verify seller authorization
-                trade = TradeClient.get_trade(trade_id)
+                trade = await AsyncClient(TradeClient).get_trade(trade_id)
                 if not trade or str(trade.get("seller_id")) != user_id:
                     await query.message.edit_text(
                         f"{EmojiEnums.CROSS_MARK.value} You are not authorized to reject this trade.",
@@ -1146,11 +1124,14 @@ class CryptoFiatFlow:
                 )
                 return False
 
-            # Get trade and verify seller authorization
-            trade = TradeClient.get_trade(trade_id)
-            if not trade or str(trade.get("seller_id")) != user_id:
+            # Reject payment with reason; the seller check and status
+            # precondition are part of the same write
+            trade = await AsyncClient(TradeClient).reject_fiat_payment(
+                trade_id, user_id, reason
+            )
+            if not trade:
                 await update.message.reply_text(
-                    f"{EmojiEnums.CROSS_MARK.value} You are not authorized to reject this trade.",
+                    f"{EmojiEnums.CROSS_MARK.value} You are not authorized to reject this trade, or it has already been reviewed.",
                     reply_markup=InlineKeyboardMarkup(
                         [
                             [
@@ -1164,96 +1145,78 @@ class CryptoFiatFlow:
                 )
                 return False
 
-            # Reject payment with reason
-            success = TradeClient.reject_fiat_payment(trade_id, user_id, reason)
-            if success:
-                # Clear state
-                context.user_data.pop("rejecting_payment", None)
-
-                # Notify buyer about rejection
-                try:
-                    await context.bot.send_message(
-                        chat_id=trade["buyer_id"],
-                        text=(
-                            f"❌ <b>Payment Proof Rejected</b>\n\n"
-                            f"Trade ID: <code>{trade_id}</code>\n\n"
-                            f"Unfortunately, the seller has rejected your payment proof.\n\n"
-                            f"<b>Reason:</b> <i>{reason}</i>\n\n"
-                            f"<b>What you can do:</b>\n"
-                            f"• Review the seller's payment instructions again\n"
-                            f"• Make the correct payment if needed\n"
-                            f"• Submit new payment proof\n"
-                            f"• Contact support if you believe this is an error\n\n"
-                            f"The trade is still active - you can submit new proof."
-                        ),
-                        parse_mode="html",
-                        reply_markup=InlineKeyboardMarkup(
-                            [
-                                [
-                                    InlineKeyboardButton(
-                                        "📤 Submit New Proof",
-                                        callback_data=f"submit_proof_{trade_id}",
-                                    )
-                                ],
-                                [
-                                    InlineKeyboardButton(
-                                        "❓ Contact Support",
-                                        callback_data=f"support_trade_{trade_id}",
-                                    )
-                                ],
-                                [
-                                    InlineKeyboardButton(
-                                        f"{EmojiEnums.BACK_ARROW.value} Back to Menu",
-                                        callback_data="menu",
-                                    )
-                                ],
-                            ]
-                        ),
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to notify buyer about rejection: {e}")
+            # Clear state
+            context.user_data.pop("rejecting_payment", None)
 
-                # Confirm to seller
-                await update.message.reply_text(
-                    f"❌ <b>Payment Proof Rejected</b>\n\n"
-                    f"Trade ID: <code>{trade_id}</code>\n\n"
-                    f"You have rejected the buyer's payment proof.\n\n"
-                    f"<b>Reason provided:</b> <i>{reason}</i>\n\n"
-                    f"The buyer has been notified and can submit new proof.\n"
-                    f"You will be notified if they submit additional proof.",
+            # Notify buyer about rejection
+            try:
+                await context.bot.send_message(
+                    chat_id=trade["buyer_id"],
+                    text=(
+                        f"❌ <b>Payment Proof Rejected</b>\n\n"
+                        f"Trade ID: <code>{trade_id}</code>\n\n"
+                        f"Unfortunately, the seller has rejected your payment proof.\n\n"
+                        f"<b>Reason:</b> <i>{reason}</i>\n\n"
+                        f"<b>What you can do:</b>\n"
+                        f"• Review the seller's payment instructions again\n"
+                        f"• Make the correct payment if needed\n"
+                        f"• Submit new payment proof\n"
+                        f"• Contact support if you believe this is an error\n\n"
+                        f"The trade is still active - you can submit new proof."
+                    ),
                     parse_mode="html",
                     reply_markup=InlineKeyboardMarkup(
                         [
                             [
                                 InlineKeyboardButton(
-                                    "📊 Trade Details",
-                                    callback_data=f"view_trade_{trade_id}",
+                                    "📤 Submit New Proof",
+                                    callback_data=f"submit_proof_{trade_id}",
                                 )
                             ],
                             [
                                 InlineKeyboardButton(
-                                    f"{EmojiEnums.BACK_ARROW.value} Back to Menu",
-                                    callback_data="menu",
+                                    "❓ Contact Support",
+                                    callback_data=f"support_trade_{trade_id}",
                                 )
                             ],
-                        ]
-                    ),
-                )
-            else:
-                await update.message.reply_text(
-                    f"{EmojiEnums.CROSS_MARK.value} Failed to reject payment. Please try again or contact support.",
-                    reply_markup=InlineKeyboardMarkup(
-                        [
                             [
                                 InlineKeyboardButton(
                                     f"{EmojiEnums.BACK_ARROW.value} Back to Menu",
                                     callback_data="menu",
                                 )
-                            ]
+                            ],
                         ]
                     ),
                 )
+            except Exception as e:
+                logger.error(f"Failed to notify buyer about rejection: {e}")
 
+            # Confirm to seller
+            await update.message.reply_text(
+                f"❌ <b>Payment Proof Rejected</b>\n\n"
+                f"Trade ID: <code>{trade_id}</code>\n\n"
+                f"You have rejected the buyer's payment proof.\n\n"
+                f"<b>Reason provided:</b> <i>{reason}</i>\n\n"
+                f"The buyer has been notified and can submit new proof.\n"
+                f"You will be notified if they submit additional proof.",
+                parse_mode="html",
+                reply_markup=InlineKeyboardMarkup(
+                    [
+                        [
+                            InlineKeyboardButton(
+                                "📊 Trade Details",
+                                callback_data=f"view_trade_{trade_id}",
+                            )
+                        ],
+                        [
+                            InlineKeyboardButton(
+                                f"{EmojiEnums.BACK_ARROW.value} Back to Menu",
+                                callback_data="menu",
+                            )
+                        ],
+                    ]
+                ),
+            )
             return True
 
         except Exception as e:
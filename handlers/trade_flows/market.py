@@ -3,7 +3,8 @@ import logging
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import ContextTypes
 
-from functions.trade import TradeClient
+from functions.async_client import AsyncClient
+from functions.trade import TradeBuilder, TradeClient
 from functions.user import UserClient
 
 logger = logging.getLogger(__name__)
@@ -30,11 +31,15 @@ class MarketShopFlow:
         trade_data = context.user_data["trade_creation"]
 
         # Get user from database
-        user = UserClient.get_user(update.message)
+        user = await AsyncClient(UserClient).get_user(update.message)
 
-        # Create the market shop trade
-        trade = TradeClient.open_new_trade(
-            update.message, currency=trade_data["currency"], trade_type="MarketShop"
+        # Create the market shop with its description and starting price
+        trade = await AsyncClient(TradeClient).create_trade(
+            TradeBuilder(
+                user["_id"], currency=trade_data["currency"], trade_type="MarketShop"
+            )
+            .with_terms(description)
+            .with_price(trade_data["amount"])
         )
 
         if not trade:
@@ -46,10 +51,6 @@ class MarketShopFlow:
             )
             return False
 
-        # Update trade with description and amount using database user object
-        TradeClient.add_terms(user, description)
-        TradeClient.add_price(user, trade_data["amount"])
-
         # Create forward text for sharing
         forward_text = (
             f"🏪 New Market Shop\n"
@@ -86,7 +87,7 @@ class MarketShopFlow:
     async def handle_browse(update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle browsing available market shops"""
         # Get list of active market shops
-        active_shops = TradeClient.get_active_market_shops()
+        active_shops = await AsyncClient(TradeClient).get_active_market_shops()
 
         if not active_shops:
             await update.message.reply_text(
@@ -124,7 +125,7 @@ class MarketShopFlow:
         query = update.callback_query
         shop_id = query.data.replace("view_shop_", "")
 
-        shop = TradeClient.get_trade(shop_id)
+        shop = await AsyncClient(TradeClient).get_trade(shop_id)
         if not shop:
             await query.edit_message_text(
                 "❌ Shop not found. Please try again.",
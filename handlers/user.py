@@ -13,7 +13,7 @@ async def user_wallet(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await context.bot.send_chat_action(
         chat_id=update.message.from_user.id, action="typing"
     )
-    user = UserClient.get_user(update.message)
+    user = await AsyncClient(UserClient).get_user(update.message)
 
     await context.bot.send_message(
         chat_id=user["_id"],
@@ -29,7 +29,7 @@ async def update_user_wallet(update: Update, context: ContextTypes.DEFAULT_TYPE)
     await context.bot.send_chat_action(
         chat_id=update.message.from_user.id, action="typing"
     )
-    user = UserClient.get_user(update.message)
+    user = await AsyncClient(UserClient).get_user(update.message)
 
     await context.bot.send_message(
         chat_id=user["_id"],
@@ -45,9 +45,9 @@ async def update_wallet(update: Update, context: ContextTypes.DEFAULT_TYPE):
     Updates the user's wallet address
     """
     address = update.message.text
-    user = UserClient.get_user(update.message)
+    user = await AsyncClient(UserClient).get_user(update.message)
 
-    UserClient.set_wallet(user["_id"], address)
+    await AsyncClient(UserClient).set_wallet(user["_id"], address)
 
     await context.bot.send_message(
         chat_id=update.message.from_user.id,
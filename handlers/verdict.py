@@ -160,7 +160,7 @@ async def give_verdict_handler(update: Update, context: ContextTypes.DEFAULT_TYP
         # Complete the trade properly
         from functions.trade import TradeClient
 
-        TradeClient.complete_trade(trade_id)
+        await AsyncClient(TradeClient).complete_trade(trade_id)
 
         # Notify seller
         await context.bot.send_message(
@@ -180,7 +180,9 @@ async def give_verdict_handler(update: Update, context: ContextTypes.DEFAULT_TYP
 
     elif verdict == "dispute":
         # Update trade status
-        update_trade_status(trade_id, "disputed")
+        from functions.trade import TradeClient
+
+        await AsyncClient(TradeClient).update_trade_status(trade_id, "disputed")
 
         # Notify seller
         await context.bot.send_message(
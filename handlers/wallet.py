@@ -5,6 +5,7 @@ from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import CallbackQueryHandler, ContextTypes
 
 from config import *
+from database.numeric import to_decimal
 from functions import *
 from functions.wallet import WalletManager
 from utils import *
@@ -72,7 +73,7 @@ async def wallet_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
             for coin_address in coin_addresses:
                 coin_symbol = coin_address["coin_symbol"]
-                balance = float(coin_address.get("balance", 0))
+                balance = float(to_decimal(coin_address.get("balance", 0), 0))
 
                 coin_emoji = {
                     "BTC": EmojiEnums.BITCOIN.value,
@@ -98,7 +99,9 @@ async def wallet_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             for coin_info in coins_zero_balance:
                 wallet_text += f"  {coin_info}\n"
 
-            if not any(float(ca.get("balance", 0)) > 0 for ca in coin_addresses):
+            if not any(
+                float(to_decimal(ca.get("balance", 0), 0)) > 0 for ca in coin_addresses
+            ):
                 wallet_text += f"\n{EmojiEnums.WARNING.value} <i>All balances are zero. Start by receiving some crypto!</i>"
         else:
             wallet_text += (
@@ -341,7 +344,7 @@ async def wallet_balances_handler(update: Update, context: ContextTypes.DEFAULT_
 
             for coin_address in coin_addresses:
                 coin_symbol = coin_address["coin_symbol"]
-                balance = float(coin_address.get("balance", 0))
+                balance = float(to_decimal(coin_address.get("balance", 0), 0))
 
                 coin_emoji = {
                     "BTC": EmojiEnums.BITCOIN.value,
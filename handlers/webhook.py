@@ -14,13 +14,15 @@ async def handle_invoice_paid_webhook(data, bot: Bot):
     "Response to when the invoice has been paid"
     try:
         logger.info(f"Processing invoice paid webhook for invoice: {data['invoiceId']}")
-        trade = TradeClient.get_trade_by_invoice_id(data["invoiceId"])
+        trade = await AsyncClient(TradeClient).get_trade_by_invoice_id(
+            data["invoiceId"]
+        )
 
         if not trade:
             logger.error(f"No trade found for invoice ID: {data['invoiceId']}")
             return False
 
-        TradeClient.handle_invoice_paid(data["invoiceId"])
+        await AsyncClient(TradeClient).handle_invoice_paid(data["invoiceId"])
         logger.info(f"Trade {trade['_id']} marked as paid")
 
         # Convert IDs to integers and validate
@@ -97,7 +99,7 @@ async def handle_invoice_paid_webhook(data, bot: Bot):
 async def handle_payment_received_webhook(data, bot: Bot):
     "Give alert message on new trade alert"
     logger.info(f"Processing payment received webhook for invoice: {data['invoiceId']}")
-    trade = TradeClient.get_trade_by_invoice_id(data["invoiceId"])
+    trade = await AsyncClient(TradeClient).get_trade_by_invoice_id(data["invoiceId"])
     if not trade:
         logger.error(f"No trade found for invoice ID: {data['invoiceId']}")
         return
@@ -121,8 +123,8 @@ async def handle_payment_received_webhook(data, bot: Bot):
 async def handle_invoice_expired_webhook(data, bot: Bot):
     "Close trade when the payment url has expired (Send message to both parties)"
     logger.info(f"Processing invoice expired webhook for invoice: {data['invoiceId']}")
-    trade = TradeClient.get_trade_by_invoice_id(data["invoiceId"])
-    TradeClient.handle_invoice_expired(trade["invoice_id"])
+    trade = await AsyncClient(TradeClient).get_trade_by_invoice_id(data["invoiceId"])
+    await AsyncClient(TradeClient).handle_invoice_expired(trade["invoice_id"])
     logger.info(f"Trade {trade['_id']} marked as expired")
 
     if trade["buyer_id"] != None:
@@ -130,6 +130,15 @@ async def initialize_bot():
                 except Exception as e:
                     logger.error(f"Error in scheduled expiration warnings: {e}")
 
+            async def scheduled_utxo_reconciliation():
+                """Scheduled task to refresh every BTC, LTC and DOGE balance"""
+                from functions.wallet import WalletManager
+
+                try:
+                    await run_blocking(WalletManager.reconcile_utxo_balances)
+                except Exception as e:
+                    logger.error(f"Error in scheduled UTXO reconciliation: {e}")
+
             scheduler = AsyncIOScheduler()
 
             # Cleanup job: runs every 6 hours
@@ -150,11 +159,114 @@ async def initialize_bot():
                 replace_existing=True,
             )
 
+            # Deposit watcher: confirms wallet-trade deposits without a manual check
+            if DEPOSIT_WATCH_ENABLED:
+                from functions.deposit_watcher import DepositWatcher
+
+                deposit_watcher = DepositWatcher(bot=application.bot)
+                scheduler.add_job(
+                    deposit_watcher.tick,
+                    "interval",
+                    seconds=DEPOSIT_WATCH_INTERVAL,
+                    id="deposit_watcher",
+                    replace_existing=True,
+                    max_instances=1,
+                    coalesce=True,
+                )
+
+            # Receipt tracker: settles broadcast transfers and completes releases
+            from functions.receipt_tracker import ReceiptTracker
+
+            receipt_tracker = ReceiptTracker(bot=application.bot)
+            scheduler.add_job(
+                receipt_tracker.tick,
+                "interval",
+                seconds=TX_RECEIPT_POLL_INTERVAL,
+                id="receipt_tracker",
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True,
+            )
+
+            # Wallet pool: keeps pre-generated wallets ready for /wallet create
+            if WALLET_POOL_ENABLED:
+                from functions.wallet_pool import wallet_pool
+
+                scheduler.add_job(
+                    wallet_pool.tick,
+                    "interval",
+                    seconds=WALLET_POOL_REFILL_INTERVAL,
+                    id="wallet_pool",
+                    replace_existing=True,
+                    max_instances=1,
+                    coalesce=True,
+                    next_run_time=datetime.now(),
+                )
+
+            # Price oracle: one batched price request for every supported coin
+            from functions.price_oracle import price_oracle
+
+            scheduler.add_job(
+                price_oracle.tick,
+                "interval",
+                seconds=PRICE_REFRESH_INTERVAL,
+                id="price_oracle",
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True,
+            )
+
+            # Custody valuation: balance_usd and USD totals from one price snapshot
+            from functions.custody_valuation import custody_valuation
+
+            scheduler.add_job(
+                custody_valuation.tick,
+                "interval",
+                seconds=CUSTODY_VALUATION_INTERVAL,
+                id="custody_valuation",
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True,
+            )
+
+            # UTXO reconciliation: BTC/LTC/DOGE balances in batched BlockCypher calls
+            scheduler.add_job(
+                scheduled_utxo_reconciliation,
+                "interval",
+                seconds=UTXO_RECONCILE_INTERVAL,
+                id="utxo_reconciliation",
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True,
+            )
+
+            # Gas oracle: keeps fee quotes in memory, one feeHistory call per block
+            from functions.gas_oracle import gas_oracle
+
+            scheduler.add_job(
+                gas_oracle.tick,
+                "interval",
+                seconds=GAS_ORACLE_REFRESH_INTERVAL,
+                id="gas_oracle",
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True,
+            )
+
             scheduler.start()
             logger.info(
                 "Trade management schedulers initialized:\n"
                 "  - Cleanup (every 6 hours)\n"
-                "  - Expiration warnings (every hour)"
+                "  - Expiration warnings (every hour)\n"
+                f"  - Deposit watcher (every {DEPOSIT_WATCH_INTERVAL}s, "
+                f"{'enabled' if DEPOSIT_WATCH_ENABLED else 'disabled'})\n"
+                f"  - Gas oracle (every {GAS_ORACLE_REFRESH_INTERVAL}s)\n"
+                f"  - Price oracle (every {PRICE_REFRESH_INTERVAL}s)\n"
+                f"  - Custody valuation (every {CUSTODY_VALUATION_INTERVAL}s)\n"
+                f"  - UTXO reconciliation (every {UTXO_RECONCILE_INTERVAL}s)\n"
+                f"  - Receipt tracker (every {TX_RECEIPT_POLL_INTERVAL}s)\n"
+                f"  - Wallet pool refill (every {WALLET_POOL_REFILL_INTERVAL}s, "
+                f"{'enabled' if WALLET_POOL_ENABLED else 'disabled'})"
             )
         except Exception as cleanup_error:
             logger.error(
@@ -404,8 +516,27 @@ def run_polling():
     application.run_polling(drop_pending_updates=True)
 
 
+def apply_migrations():
+    """Bring MongoDB indexes up to date before serving; a failed migration
+    stops startup"""
+    if not RUN_MIGRATIONS:
+        logger.info("RUN_MIGRATIONS disabled, skipping index migrations")
+        return
+
+    from database.migrations import run_migrations
+
+    try:
+        run_migrations()
+    except Exception as e:
+        # Serving without the unique indexes would let duplicates pile up
+        logger.critical(f"Failed to apply MongoDB migrations, not starting: {e}")
+        raise
+
+
 # Don't run app.run() here since entrypoint.sh handles starting the server with hypercorn
 if __name__ == "__main__":
+    apply_migrations()
+
     if WEBHOOK_MODE == True:
         # Run in webhook mode (production/deployment)
         logger.info("Starting bot in webhook mode...")
@@ -63,6 +63,13 @@ def _patch_mongo(monkeypatch):
         if hasattr(module, "db") and getattr(module, "db") is getattr(config, "db"):
             monkeypatch.setattr(module, "db", mock_db)
 
+    # Cached documents from a previous test would shadow the fresh database.
+    from functions.trade import trade_cache
+    from functions.user import user_cache
+
+    trade_cache.clear()
+    user_cache.clear()
+
     yield
 
     # Nothing to cleanup – mongomock is in-memory and will be discarded.
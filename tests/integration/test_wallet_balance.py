@@ -50,7 +50,7 @@ async def test_get_balance_uses_refresh(mock_db, monkeypatch):
     with patch.object(wm, "get_balance", return_value=0.123) as mock_get_balance:
 
         # Test that get_balance can be called without database connection errors
-        value = wm.get_balance("test_address", "BTC")
+        value = await wm.get_balance("test_address", "BTC")
 
         # Verify the mock was called
         mock_get_balance.assert_called_once_with("test_address", "BTC")
@@ -106,7 +106,7 @@ class TestBuyerAddressCollectionFlow:
 
             # Step 1: Seller approves payment
             mock_get_trade.return_value = mock_trade
-            mock_approve.return_value = True
+            mock_approve.return_value = mock_trade
             mock_request_address.return_value = True
             mock_seller_update.callback_query.data = f"approve_payment_{test_trade_id}"
 
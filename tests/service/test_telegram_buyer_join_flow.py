@@ -82,7 +82,7 @@ async def test_buyer_joins_flow(mock_buyer_update, mock_context):
 
         # Setup mocks
         mock_get_trade.return_value = mock_trade
-        mock_join_trade.return_value = True
+        mock_join_trade.return_value = mock_trade
         mock_get_user.return_value = {"_id": "222", "username": "buyer"}
 
         # Step 1: Start join process
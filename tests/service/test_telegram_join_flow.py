@@ -79,6 +79,7 @@ async def test_seller_creates_trade_flow(mock_update, mock_context):
                 "status": "created",
             }
             db_mock.trades.update_one.return_value = MagicMock(modified_count=1)
+            db_mock.trades.find_one_and_update.return_value = None
             db_mock.users.find_one.return_value = {"_id": "111", "username": "seller"}
 
         # Mock other dependencies
@@ -87,14 +88,10 @@ async def test_seller_creates_trade_flow(mock_update, mock_context):
         ) as mock_get_user, patch(
             "handlers.initiate_trade.TradeClient.get_most_recent_trade"
         ) as mock_get_recent_trade, patch(
-            "handlers.trade_flows.fiat.TradeClient.open_new_trade"
-        ) as mock_open_trade, patch(
-            "handlers.trade_flows.fiat.TradeClient.get_invoice_url"
-        ) as mock_get_invoice_url, patch(
+            "handlers.trade_flows.fiat.TradeClient.create_trade"
+        ) as mock_create_trade, patch(
             "handlers.trade_flows.fiat.TradeClient.get_trade"
         ) as mock_get_trade, patch(
-            "handlers.trade_flows.fiat.TradeClient.add_terms"
-        ) as mock_add_terms, patch(
             "handlers.trade_flows.fiat.currency_menu"
         ) as mock_currency_menu, patch(
             "utils.keyboard.trade_type_menu"
@@ -105,7 +102,6 @@ async def test_seller_creates_trade_flow(mock_update, mock_context):
             mock_get_recent_trade.return_value = None
             mock_trade_type_menu.return_value = MagicMock()
             mock_currency_menu.return_value = MagicMock()
-            mock_get_invoice_url.return_value = "https://test.invoice.url"
             mock_get_trade.return_value = {
                 "_id": "test_trade_123",
                 "seller_id": "111",
@@ -113,8 +109,7 @@ async def test_seller_creates_trade_flow(mock_update, mock_context):
                 "price": 150,
                 "is_wallet_trade": True,
             }
-            mock_add_terms.return_value = True
-            mock_open_trade.return_value = {
+            mock_create_trade.return_value = {
                 "_id": "test_trade_123",
                 "seller_id": "111",
                 "currency": "USDT",
@@ -177,11 +172,9 @@ async def test_seller_creates_trade_flow(mock_update, mock_context):
 
             await CryptoFiatFlow.handle_description_input(mock_update, mock_context)
 
-            # Verify trade was created
-            mock_open_trade.assert_called_once()
-
-            # Verify terms were added
-            mock_add_terms.assert_called_once()
-
-            # Verify trade was stored in database (via the mock)
-            assert mock_open_trade.called
+            # Verify trade was created in one call with its terms and price
+            mock_create_trade.assert_called_once()
+            builder = mock_create_trade.call_args[0][0]
+            assert builder.terms == "Selling 150 USDT, pay 150 EUR via SEPA."
+            assert builder.price == 150.0
+            assert builder.include_payment
@@ -252,19 +252,30 @@ class TestWalletManager:
         mock_cursor = Mock()
         mock_cursor.sort.return_value = sample_coin_addresses
         mock_db.coin_addresses.find.return_value = mock_cursor
-        mock_db.coin_addresses.update_one.return_value = Mock(modified_count=1)
 
         # Create wallet manager and refresh balances
         wallet_manager = WalletManager()
-        success = await wallet_manager.refresh_wallet_balances("wallet_123")
+        with patch.object(
+            WalletManager, "_fetch_coin_balance", return_value=0.5
+        ), patch.object(
+            WalletManager,
+            "_fetch_evm_balances",
+            side_effect=lambda addresses: [0.5] * len(addresses),
+        ), patch.object(
+            WalletManager,
+            "_fetch_utxo_balances",
+            side_effect=lambda addresses: [0.5] * len(addresses),
+        ):
+            success = await wallet_manager.refresh_wallet_balances("wallet_123")
 
         # Should succeed
         assert success is True
 
-        # Should update each coin address
-        assert mock_db.coin_addresses.update_one.call_count == len(
-            sample_coin_addresses
-        )
+        # Should update every coin address in a single bulk write
+        mock_db.coin_addresses.bulk_write.assert_called_once()
+        operations = mock_db.coin_addresses.bulk_write.call_args[0][0]
+        assert len(operations) == len(sample_coin_addresses)
+        mock_db.coin_addresses.update_one.assert_not_called()
 
     @patch("functions.wallet.db")
     def test_add_coin_to_wallet_success(self, mock_db, sample_wallet):
@@ -0,0 +1,37 @@
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from functions.async_client import AsyncClient, run_blocking
+from functions.trade import TradeClient
+
+
+@pytest.mark.asyncio
+async def test_run_blocking_executes_off_the_event_loop():
+    """Blocking calls should run on a worker thread, not the loop thread"""
+    loop_thread = threading.get_ident()
+
+    worker_thread = await run_blocking(threading.get_ident)
+
+    assert worker_thread != loop_thread
+
+
+@pytest.mark.asyncio
+async def test_async_client_proxies_sync_methods():
+    """Wrapped client methods return awaitables with the sync result"""
+    with patch.object(TradeClient, "get_trade", return_value={"_id": "T1"}) as mock_get:
+        trade = await AsyncClient(TradeClient).get_trade("T1")
+
+    assert trade == {"_id": "T1"}
+    mock_get.assert_called_once_with("T1")
+
+
+@pytest.mark.asyncio
+async def test_async_client_passes_coroutines_through():
+    """Methods that are already async are awaited directly"""
+    client = MagicMock()
+    client.notify = AsyncMock(return_value=3)
+
+    assert await AsyncClient(client).notify("bot") == 3
+    client.notify.assert_awaited_once_with("bot")
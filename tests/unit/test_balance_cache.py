@@ -0,0 +1,129 @@
+import asyncio
+import threading
+import time
+
+import mongomock
+import pytest
+from bson.decimal128 import Decimal128
+
+import functions.wallet as wallet_module
+from functions.balance_cache import BalanceCache, balance_cache
+from functions.wallet import WalletManager
+
+
+@pytest.fixture
+def wallet_db(monkeypatch):
+    """In-memory database with one ETH address and an empty shared cache"""
+    db = mongomock.MongoClient()["escrowbot_test"]
+    monkeypatch.setattr(wallet_module, "db", db)
+    db.coin_addresses.insert_one(
+        {"_id": "CA1", "coin_symbol": "ETH", "address": "0xabc", "balance": "0.5"}
+    )
+    balance_cache.clear()
+    yield db
+    balance_cache.clear()
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(WalletManager, "__init__", lambda self: None)
+    return WalletManager()
+
+
+def test_max_age_is_chosen_per_lookup(monkeypatch):
+    """A balance can be fresh enough for one caller and too old for another"""
+    cache = BalanceCache(ttl=60)
+    cache.set("0xabc", "ETH", 1.5)
+
+    later = time.monotonic() + 10
+    monkeypatch.setattr("functions.balance_cache.time.monotonic", lambda: later)
+
+    assert cache.get("0xabc", "ETH", max_age=30) == 1.5
+    assert cache.get("0xabc", "ETH", max_age=5) is None
+    assert cache.get("0xabc", "BTC") is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_fetch():
+    """Coroutines and threads missing on the same key trigger a single lookup"""
+    cache = BalanceCache()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        return 2.0
+
+    thread_result = []
+    thread = threading.Thread(
+        target=lambda: thread_result.append(
+            cache.get_or_fetch_sync("0xabc", "ETH", fetch)
+        )
+    )
+    thread.start()
+    await asyncio.sleep(0.02)
+
+    results = await asyncio.gather(
+        *(cache.get_or_fetch("0xabc", "ETH", fetch) for _ in range(5))
+    )
+    thread.join()
+
+    assert results == [2.0] * 5
+    assert thread_result == [2.0]
+    assert len(calls) == 1
+    assert cache.get("0xabc", "ETH") == 2.0
+
+
+@pytest.mark.asyncio
+async def test_fetch_errors_reach_every_waiter_and_are_not_cached():
+    cache = BalanceCache()
+
+    def fetch():
+        time.sleep(0.05)
+        raise ConnectionError("rpc down")
+
+    results = await asyncio.gather(
+        *(cache.get_or_fetch("0xabc", "ETH", fetch) for _ in range(3)),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(r, ConnectionError) for r in results)
+    assert cache.get("0xabc", "ETH") is None
+    assert cache.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_get_balance_fetches_once_then_serves_cache(
+    wallet_db, manager, monkeypatch
+):
+    """The first call hits the chain and the DB; the next is served from cache"""
+    calls = []
+
+    def fetch(self, coin_address):
+        calls.append(coin_address["address"])
+        return 1.25
+
+    monkeypatch.setattr(WalletManager, "_fetch_coin_balance", fetch)
+
+    assert await manager.get_balance("0xabc", "ETH") == 1.25
+    assert wallet_db.coin_addresses.find_one({"_id": "CA1"})["balance"] == Decimal128(
+        "1.25"
+    )
+
+    monkeypatch.setattr(wallet_module, "db", None)  # a cache hit needs no DB
+    assert await manager.get_balance("0xabc", "ETH", max_age=30) == 1.25
+    assert calls == ["0xabc"]
+
+
+@pytest.mark.asyncio
+async def test_get_balance_falls_back_to_stored_balance(
+    wallet_db, manager, monkeypatch
+):
+    def failing_fetch(self, coin_address):
+        raise ConnectionError("rpc down")
+
+    monkeypatch.setattr(WalletManager, "_fetch_coin_balance", failing_fetch)
+
+    assert await manager.get_balance("0xabc", "ETH") == 0.5
+    assert manager.get_balance_sync("0xabc", "ETH") == 0.5
+    assert await manager.get_balance("0xunknown", "ETH") == 0.0
@@ -84,6 +84,8 @@ class TestBuyerAddressInput:
         ) as mock_release, patch(
             "handlers.join.TradeClient.complete_trade"
         ) as mock_complete, patch(
+            "handlers.join.TradeClient.get_trade", return_value=mock_trade
+        ), patch(
             "handlers.join.TradeClient.calculate_trade_fee"
         ) as mock_fee:
 
@@ -108,6 +110,39 @@ class TestBuyerAddressInput:
             assert "Address Confirmed!" in args[0]
             assert valid_usdt_address in args[0]
 
+    @pytest.mark.asyncio
+    async def test_pending_release_returns_after_broadcast(
+        self, mock_buyer_update, mock_context, mock_trade
+    ):
+        """A broadcast release is left for the receipt tracker to complete"""
+        address = "0x742d35cc6e3f4dc5bf5b123456789abcdef12345"
+        mock_buyer_update.message.text = address
+        mock_context.bot.send_message = AsyncMock()
+        released = {
+            **mock_trade,
+            "status": "crypto_released",
+            "release_tx_hash": "0xabc",
+            "release_tx_status": "pending",
+        }
+
+        with patch("handlers.join.db") as mock_db, patch(
+            "handlers.join.TradeClient.set_buyer_address"
+        ), patch(
+            "handlers.join.TradeClient.initiate_crypto_release", return_value=True
+        ), patch(
+            "handlers.join.TradeClient.get_trade", return_value=released
+        ), patch(
+            "handlers.join.TradeClient.complete_trade"
+        ) as mock_complete:
+            mock_db.trades.find_one.return_value = mock_trade
+
+            await handle_buyer_address_input(mock_buyer_update, mock_context)
+
+            mock_complete.assert_not_called()
+            text = mock_context.bot.send_message.call_args.kwargs["text"]
+            assert "Crypto Sent!" in text
+            assert "0xabc" in text
+
     @pytest.mark.asyncio
     async def test_invalid_address_input(
         self, mock_buyer_update, mock_context, mock_trade
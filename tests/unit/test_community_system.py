@@ -35,9 +35,14 @@ def test_market_data_fetcher_returns_structure(monkeypatch):
         "tether": {"usd": 1.0, "usd_24h_change": 0.0},
     }
 
+    import functions.price_oracle as price_oracle_module
+
     monkeypatch.setattr(
-        cg, "requests", type("R", (), {"get": lambda *a, **k: DummyResp(payload)})
+        price_oracle_module,
+        "requests",
+        type("R", (), {"get": lambda *a, **k: DummyResp(payload)}),
     )
+    monkeypatch.setattr(cg, "price_oracle", price_oracle_module.PriceOracle())
 
     fetcher = cg.MarketDataFetcher()
     data = run(fetcher.get_market_data())
@@ -0,0 +1,161 @@
+import asyncio
+from decimal import Decimal
+
+import mongomock
+import pytest
+from bson.decimal128 import Decimal128
+
+import config
+import functions.custody_valuation as valuation_module
+import functions.wallet as wallet_module
+from functions.custody_valuation import CustodyValuation, usd_values
+from functions.price_oracle import PriceOracle
+
+PRICES = {"ETH": 3000.0, "BTC": 60000.0, "USDT": 1.0}
+
+
+class CountingMock:
+    """Wraps a collection method and counts its calls"""
+
+    def __init__(self, func):
+        self.func = func
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self.func(*args, **kwargs)
+
+
+@pytest.fixture
+def custody_db(monkeypatch):
+    db = mongomock.MongoClient()["escrowbot_test"]
+    for module in (valuation_module, wallet_module, config):
+        monkeypatch.setattr(module, "db", db)
+
+    feed_calls = []
+
+    def feed(symbols):
+        feed_calls.append(symbols)
+        return {s: {"usd": PRICES[s]} for s in symbols if s in PRICES}
+
+    monkeypatch.setattr(valuation_module, "price_oracle", PriceOracle(fetcher=feed))
+    db.coin_addresses.insert_many(
+        [
+            {
+                "_id": "A1",
+                "address": "A1",
+                "wallet_id": "W1",
+                "coin_symbol": "ETH",
+                "balance": "0.5",
+            },
+            {
+                "_id": "A2",
+                "address": "A2",
+                "wallet_id": "W1",
+                "coin_symbol": "USDT",
+                "balance": "20",
+            },
+            {
+                "_id": "A3",
+                "address": "A3",
+                "wallet_id": "W2",
+                "coin_symbol": "ETH",
+                "balance": "1.25",
+            },
+            {
+                "_id": "A4",
+                "address": "A4",
+                "wallet_id": "W2",
+                "coin_symbol": "BTC",
+                "balance": "0",
+            },
+            {
+                "_id": "A5",
+                "address": "A5",
+                "wallet_id": "W2",
+                "coin_symbol": "DOGE",
+                "balance": "9",
+            },
+            {
+                "_id": "A6",
+                "address": "A6",
+                "wallet_id": "W3",
+                "coin_symbol": "ETH",
+                "balance": "oops",
+                "balance_usd": "1.00",
+            },
+        ]
+    )
+    return db, feed_calls
+
+
+def test_usd_values_use_decimal_arithmetic():
+    prices = {"ETH": Decimal("3000.10")}
+
+    assert usd_values(["0.1", 2, "x", "1"], ["ETH", "ETH", "ETH", "SOL"], prices) == [
+        Decimal("300.01"),
+        Decimal("6000.20"),
+        None,
+        None,
+    ]
+
+
+def test_run_values_every_address_against_one_snapshot(custody_db):
+    db, feed_calls = custody_db
+    valuation = CustodyValuation(batch_size=2)
+    bulk_write = CountingMock(db.coin_addresses.bulk_write)
+    db.coin_addresses.bulk_write = bulk_write
+
+    result = valuation.run()
+
+    assert len(feed_calls) == 1
+    assert bulk_write.calls == 2
+    assert db.coin_addresses.find_one({"_id": "A1"})["balance_usd"] == Decimal128(
+        "1500.00"
+    )
+    assert db.coin_addresses.find_one({"_id": "A3"})["balance_usd"] == Decimal128(
+        "3750.00"
+    )
+    assert db.coin_addresses.find_one({"_id": "A4"})["balance_usd"] == Decimal128(
+        "0.00"
+    )
+    # Unpriced coins and unreadable balances keep their previous value
+    assert "balance_usd" not in db.coin_addresses.find_one({"_id": "A5"})
+    assert db.coin_addresses.find_one({"_id": "A6"})["balance_usd"] == "1.00"
+
+    assert result["addresses"] == 6
+    assert result["updated"] == 4
+    assert result["unpriced"] == 2
+    assert result["total_usd"] == Decimal("5270.00")
+    assert result["coins"]["ETH"] == {
+        "balance": Decimal("1.75"),
+        "usd": Decimal("5250.00"),
+        "addresses": 2,
+    }
+    assert result["wallets"] == {"W1": Decimal("1520.00"), "W2": Decimal("3750.00")}
+    assert valuation.last is result
+
+
+def test_unchanged_values_are_not_rewritten(custody_db):
+    db, _ = custody_db
+    valuation = CustodyValuation()
+    valuation.run()
+
+    assert valuation.run()["updated"] == 0
+
+
+def test_admin_wallet_info_uses_stored_values(custody_db, monkeypatch):
+    from handlers.admin import AdminWalletManager
+
+    db, feed_calls = custody_db
+    db.wallets.insert_one({"_id": "W1", "user_id": "111", "is_active": True})
+    CustodyValuation().run()
+
+    info = asyncio.run(AdminWalletManager.get_user_wallet_info("111"))
+
+    assert info["stats"]["total_usd"] == 1520.0
+    assert {c["symbol"]: c["balance_usd"] for c in info["coin_addresses"]} == {
+        "ETH": 1500.0,
+        "USDT": 20.0,
+    }
+    assert len(feed_calls) == 1
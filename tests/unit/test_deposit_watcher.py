@@ -0,0 +1,392 @@
+from unittest.mock import AsyncMock
+
+import mongomock
+import pytest
+from eth_abi import decode, encode
+from web3 import Web3
+from web3.providers import BaseProvider
+
+import config
+import functions.deposit_watcher as watcher_module
+import functions.trade as trade_module
+import functions.wallet as wallet_module
+from functions.balance_cache import balance_cache
+from functions.deposit_watcher import TRANSFER_TOPIC, DepositWatcher
+from functions.solana_rpc import SolanaRPC
+from functions.trade import TradeClient
+from functions.wallet import WalletManager
+
+SELLER_ETH = "0x" + "11" * 20
+SELLER_USDT = "0x" + "22" * 20
+SELLER_GAS = "0x" + "33" * 20
+MULTICALL3 = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+
+class FakeChain(BaseProvider):
+    """Chain head, balances and Transfer logs held in memory"""
+
+    def __init__(self):
+        super().__init__()
+        self.head = 100
+        self.eth = {}
+        self.tokens = {}
+        self.transfers = []  # (block, recipient)
+        self.calls = []
+
+    def fund(self, address, wei=0, token=0, block=None):
+        address = Web3.to_checksum_address(address)
+        self.eth[address] = self.eth.get(address, 0) + wei
+        if token:
+            self.tokens[address] = self.tokens.get(address, 0) + token
+            self.transfers.append((block or self.head, address))
+
+    def make_request(self, method, params):
+        self.calls.append(method)
+        if method == "eth_chainId":
+            result = "0x1"
+        elif method == "eth_blockNumber":
+            result = hex(self.head)
+        elif method == "eth_getLogs":
+            result = self._logs(params[0])
+        else:
+            assert method == "eth_call"
+            result = self._multicall(params[0])
+        return {"jsonrpc": "2.0", "id": 1, "result": result}
+
+    def _logs(self, log_filter):
+        start = int(log_filter["fromBlock"], 16)
+        end = int(log_filter["toBlock"], 16)
+        wanted = {t.lower() for t in log_filter["topics"][2]}
+        token = log_filter["address"]
+        if isinstance(token, list):
+            (token,) = token
+        logs = []
+        for block, address in self.transfers:
+            topic = "0x" + "0" * 24 + address[2:].lower()
+            if start <= block <= end and topic in wanted:
+                logs.append(
+                    {
+                        "address": token,
+                        "topics": [TRANSFER_TOPIC, "0x" + "00" * 32, topic],
+                        "data": "0x" + "00" * 32,
+                        "blockNumber": hex(block),
+                        "blockHash": "0x" + "00" * 32,
+                        "transactionHash": "0x" + "00" * 32,
+                        "transactionIndex": "0x0",
+                        "logIndex": "0x0",
+                        "removed": False,
+                    }
+                )
+        return logs
+
+    def _multicall(self, tx):
+        assert Web3.to_checksum_address(tx["to"]) == MULTICALL3
+        (calls,) = decode(
+            ["(address,bool,bytes)[]"], Web3.to_bytes(hexstr=tx["data"])[4:]
+        )
+        results = []
+        for target, _, call_data in calls:
+            (owner,) = decode(["address"], call_data[4:])
+            source = self.eth if target.lower() == MULTICALL3.lower() else self.tokens
+            balance = source.get(Web3.to_checksum_address(owner), 0)
+            results.append((True, encode(["uint256"], [balance])))
+        return "0x" + encode(["(bool,bytes)[]"], [results]).hex()
+
+
+class DirectRegistry:
+    def __init__(self, web3):
+        self.web3 = web3
+
+    def call(self, fn):
+        return fn(self.web3)
+
+
+@pytest.fixture
+def chain(monkeypatch):
+    provider = FakeChain()
+    web3 = Web3(provider)
+    monkeypatch.setattr(
+        WalletManager,
+        "_get_eth_registry",
+        staticmethod(lambda cfg: DirectRegistry(web3)),
+    )
+    return provider
+
+
+@pytest.fixture
+def watcher_db(monkeypatch):
+    """Trades awaiting deposits on mongomock, with a fixed fee quote"""
+    db = mongomock.MongoClient()["escrowbot_test"]
+    for module in (watcher_module, trade_module, wallet_module, config):
+        monkeypatch.setattr(module, "db", db)
+    monkeypatch.setattr(
+        TradeClient,
+        "calculate_trade_fee_with_gas",
+        staticmethod(
+            lambda amount, currency: {
+                "total_deposit_required": amount * 1.01,
+                "total_gas_fees": 0.002,
+            }
+        ),
+    )
+    db.trades.insert_many(
+        [
+            {
+                "_id": "T_ETH",
+                "seller_id": "111",
+                "currency": "ETH",
+                "price": 1.0,
+                "receiving_address": SELLER_ETH,
+                "status": "created",
+            },
+            {
+                "_id": "T_USDT",
+                "seller_id": "222",
+                "seller_wallet_id": "W2",
+                "currency": "USDT",
+                "price": 100.0,
+                "receiving_address": SELLER_USDT,
+                "status": "created",
+            },
+        ]
+    )
+    db.coin_addresses.insert_one(
+        {"wallet_id": "W2", "coin_symbol": "ETH", "address": SELLER_GAS}
+    )
+    balance_cache.clear()
+    yield db
+    balance_cache.clear()
+
+
+@pytest.fixture
+def bot():
+    return AsyncMock()
+
+
+@pytest.mark.asyncio
+async def test_funded_eth_trade_is_confirmed_once_buried(chain, watcher_db, bot):
+    watcher = DepositWatcher(bot=bot, confirmations=3)
+
+    chain.fund(SELLER_ETH, wei=10**18)  # below the 1.01 ETH required
+    assert await watcher.tick() == {"watched": 2, "confirmed": 0}
+
+    chain.fund(SELLER_ETH, wei=2 * 10**16)
+    chain.head += 1
+    assert await watcher.tick() == {"watched": 2, "confirmed": 1}
+
+    trade = watcher_db.trades.find_one({"_id": "T_ETH"})
+    assert trade["status"] == "deposited"
+    assert trade["is_crypto_deposited"] is True
+    assert trade["is_active"] is True
+    assert balance_cache.get(SELLER_ETH, "ETH") == pytest.approx(1.02)
+
+    bot.send_message.assert_awaited_once()
+    assert bot.send_message.await_args.kwargs["chat_id"] == 111
+
+    assert await watcher.tick() == {"watched": 1, "confirmed": 0}
+
+
+@pytest.mark.asyncio
+async def test_usdt_balances_are_read_only_after_a_transfer(chain, watcher_db, bot):
+    watcher = DepositWatcher(bot=bot, confirmations=0)
+    await watcher.tick()
+    watches = watcher._watches
+    assert watches["T_USDT"]["gas_address"] == SELLER_GAS
+
+    # A new block without a Transfer re-reads ETH only
+    chain.head += 1
+    chain.calls.clear()
+    await watcher.tick()
+    assert "eth_getLogs" in chain.calls
+    assert watches["T_USDT"]["balance"] == 0
+
+    # Token deposit and gas arrive; the Transfer log triggers the read
+    chain.head += 1
+    chain.fund(SELLER_GAS, wei=3 * 10**15)
+    chain.fund(SELLER_USDT, token=101_000_000, block=chain.head)
+    assert (await watcher.tick())["confirmed"] == 1
+
+    trade = watcher_db.trades.find_one({"_id": "T_USDT"})
+    assert trade["status"] == "deposited"
+    assert bot.send_message.await_args.kwargs["chat_id"] == 222
+
+
+@pytest.mark.asyncio
+async def test_usdt_waits_for_gas_in_the_seller_wallet(chain, watcher_db, bot):
+    watcher = DepositWatcher(bot=bot, confirmations=0)
+    await watcher.tick()
+
+    chain.head += 1
+    chain.fund(SELLER_USDT, token=101_000_000, block=chain.head)
+    assert (await watcher.tick())["confirmed"] == 0
+
+    # The gas top-up leaves no token log but is picked up on the next block
+    chain.head += 1
+    chain.fund(SELLER_GAS, wei=3 * 10**15)
+    assert (await watcher.tick())["confirmed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_manual_confirmation_wins_the_race(chain, watcher_db, bot, monkeypatch):
+    """A deposit the seller confirmed first is not announced again"""
+    watcher = DepositWatcher(bot=bot, confirmations=0)
+    await watcher.tick()
+
+    mark_deposited = TradeClient.mark_deposited
+
+    def manual_check_lands_first(trade_id):
+        assert mark_deposited(trade_id)
+        return mark_deposited(trade_id)
+
+    monkeypatch.setattr(
+        TradeClient, "mark_deposited", staticmethod(manual_check_lands_first)
+    )
+    chain.fund(SELLER_ETH, wei=2 * 10**18)
+    chain.head += 1
+
+    assert (await watcher.tick())["confirmed"] == 0
+    assert watcher_db.trades.find_one({"_id": "T_ETH"})["status"] == "deposited"
+    assert "T_ETH" not in watcher._watches
+    bot.send_message.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_trade_cancelled_mid_tick_is_not_marked_deposited(
+    chain, watcher_db, bot, monkeypatch
+):
+    """A deposit landing on a trade cancelled since the watch list was read"""
+    watcher = DepositWatcher(bot=bot, confirmations=0)
+    await watcher.tick()
+
+    mark_deposited = TradeClient.mark_deposited
+
+    def cancelled_first(trade_id):
+        TradeClient.cancel_trade(trade_id, "111")
+        return mark_deposited(trade_id)
+
+    monkeypatch.setattr(TradeClient, "mark_deposited", staticmethod(cancelled_first))
+    chain.fund(SELLER_ETH, wei=2 * 10**18)
+    chain.head += 1
+
+    assert (await watcher.tick())["confirmed"] == 0
+    trade = watcher_db.trades.find_one({"_id": "T_ETH"})
+    assert trade["status"] == "cancelled"
+    assert "is_crypto_deposited" not in trade
+    bot.send_message.assert_not_awaited()
+
+
+class FakeBlockCypher:
+    def __init__(self, balances):
+        self.balances = balances
+        self.calls = []
+
+    def get_balances(self, coin_symbol, addresses, priority=False):
+        self.calls.append((coin_symbol, list(addresses)))
+        return {address: self.balances.get(address, 0.0) for address in addresses}
+
+
+@pytest.mark.asyncio
+async def test_utxo_trades_are_polled_in_one_batch_per_chain(
+    watcher_db, bot, monkeypatch
+):
+    watcher_db.trades.delete_many({})
+    watcher_db.trades.insert_many(
+        [
+            {
+                "_id": f"T_BTC{i}",
+                "seller_id": "333",
+                "currency": "BTC",
+                "price": 0.1,
+                "receiving_address": f"bc1qseller{i}",
+            }
+            for i in range(3)
+        ]
+    )
+    fake = FakeBlockCypher({"bc1qseller0": 0.2, "bc1qseller1": 0.05})
+    monkeypatch.setattr(watcher_module, "blockcypher", fake)
+
+    watcher = DepositWatcher(bot=bot)
+    assert await watcher.tick() == {"watched": 3, "confirmed": 1}
+    assert fake.calls == [("BTC", ["bc1qseller0", "bc1qseller1", "bc1qseller2"])]
+    assert watcher_db.trades.find_one({"_id": "T_BTC0"})["status"] == "deposited"
+    assert balance_cache.get("bc1qseller1", "BTC") == 0.05
+
+    # Balances still fresh in the cache are not fetched again
+    assert await watcher.tick() == {"watched": 2, "confirmed": 0}
+    assert len(fake.calls) == 1
+
+
+class FakeSolanaResponse:
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSolanaSession:
+    """Answers getMultipleAccounts with lamport balances"""
+
+    def __init__(self, lamports):
+        self.lamports = lamports
+        self.requests = []
+
+    def post(self, url, json=None, timeout=None):
+        self.requests.append(json["method"])
+        addresses = json["params"][0]
+        value = [
+            {"lamports": self.lamports[a]} if a in self.lamports else None
+            for a in addresses
+        ]
+        return FakeSolanaResponse({"result": {"context": {"slot": 1}, "value": value}})
+
+
+@pytest.mark.asyncio
+async def test_sol_trades_are_polled_in_one_rpc_request(watcher_db, bot, monkeypatch):
+    watcher_db.trades.delete_many({})
+    watcher_db.trades.insert_many(
+        [
+            {
+                "_id": f"T_SOL{i}",
+                "seller_id": "444",
+                "currency": "SOL",
+                "price": 1.0,
+                "receiving_address": f"solseller{i}",
+            }
+            for i in range(3)
+        ]
+    )
+    session = FakeSolanaSession({"solseller0": 2 * 10**9, "solseller1": 10**8})
+    rpc = SolanaRPC("http://sol", session=session)
+    monkeypatch.setattr(watcher_module, "get_solana_rpc", lambda url: rpc)
+
+    assert await DepositWatcher(bot=bot).tick() == {"watched": 3, "confirmed": 1}
+    assert session.requests == ["getMultipleAccounts"]
+    assert watcher_db.trades.find_one({"_id": "T_SOL0"})["status"] == "deposited"
+    assert balance_cache.get("solseller1", "SOL") == 0.1
+    assert balance_cache.get("solseller2", "SOL") == 0.0
+
+
+@pytest.mark.asyncio
+async def test_other_chains_are_polled_through_get_balance(
+    watcher_db, bot, monkeypatch
+):
+    watcher_db.trades.delete_many({})
+    watcher_db.trades.insert_one(
+        {
+            "_id": "T_BNB",
+            "seller_id": "333",
+            "currency": "BNB",
+            "price": 1.0,
+            "receiving_address": "bnbseller",
+        }
+    )
+    monkeypatch.setattr(WalletManager, "__init__", lambda self: None)
+    get_balance = AsyncMock(return_value=2.0)
+    monkeypatch.setattr(WalletManager, "get_balance", get_balance)
+
+    assert await DepositWatcher(bot=bot).tick() == {"watched": 1, "confirmed": 1}
+    assert get_balance.await_args.args == ("bnbseller", "BNB")
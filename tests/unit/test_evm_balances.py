@@ -0,0 +1,166 @@
+import mongomock
+import pytest
+from bson.decimal128 import Decimal128
+from eth_abi import decode, encode
+from web3 import Web3
+from web3.providers import BaseProvider
+
+import functions.wallet as wallet_module
+from functions.balance_cache import balance_cache
+from functions.evm_balances import read_balances, token_contract
+from functions.wallet import WalletManager
+
+TOKEN = "0xdAC17F958D2ee523a2206206994597C13D831ec7"
+ALICE = "0x" + "11" * 20
+BOB = "0x" + "22" * 20
+BROKE = "0x" + "33" * 20
+
+# Canonical Multicall3 deployment, pinned rather than read from the module
+MULTICALL3 = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+
+class FakeChainProvider(BaseProvider):
+    """Answers Multicall3 aggregate3 eth_calls from in-memory balances"""
+
+    def __init__(self, eth, tokens, failing=()):
+        super().__init__()
+        self.eth = {Web3.to_checksum_address(a): v for a, v in eth.items()}
+        self.tokens = {Web3.to_checksum_address(a): v for a, v in tokens.items()}
+        self.failing = {Web3.to_checksum_address(a) for a in failing}
+        self.calls = []
+
+    def make_request(self, method, params):
+        if method == "eth_chainId":
+            return {"jsonrpc": "2.0", "id": 1, "result": "0x1"}
+        self.calls.append(method)
+        assert method == "eth_call"
+        tx = params[0]
+        assert Web3.to_checksum_address(tx["to"]) == MULTICALL3
+
+        data = Web3.to_bytes(hexstr=tx["data"])
+        (calls,) = decode(["(address,bool,bytes)[]"], data[4:])
+        results = []
+        for target, _, call_data in calls:
+            (owner,) = decode(["address"], call_data[4:])
+            owner = Web3.to_checksum_address(owner)
+            source = (
+                self.eth
+                if target.lower() == MULTICALL3.lower()
+                else self.tokens
+            )
+            if owner in self.failing:
+                results.append((False, b""))
+            else:
+                results.append((True, encode(["uint256"], [source.get(owner, 0)])))
+
+        result = encode(["(bool,bytes)[]"], [results])
+        return {"jsonrpc": "2.0", "id": 1, "result": "0x" + result.hex()}
+
+
+class DirectRegistry:
+    def __init__(self, web3):
+        self.web3 = web3
+
+    def call(self, fn):
+        return fn(self.web3)
+
+
+@pytest.fixture
+def chain():
+    provider = FakeChainProvider(
+        eth={ALICE: 2 * 10**18, BOB: 5 * 10**17},
+        tokens={ALICE: 1_500_000, BOB: 0},
+        failing=[BROKE],
+    )
+    return provider, Web3(provider)
+
+
+def test_mixed_eth_and_token_balances_share_one_call(chain):
+    provider, web3 = chain
+    queries = [
+        (ALICE, None),
+        (ALICE, TOKEN),
+        (BOB, None),
+        (BROKE, TOKEN),
+        ("nope", None),
+    ]
+
+    balances = read_balances(DirectRegistry(web3), queries)
+
+    assert balances == [2 * 10**18, 1_500_000, 5 * 10**17, None, None]
+    assert provider.calls == ["eth_call"]
+
+
+def test_large_requests_are_split_into_batches(chain):
+    provider, web3 = chain
+    queries = [(ALICE, None)] * 5
+
+    balances = read_balances(DirectRegistry(web3), queries, batch_size=2)
+
+    assert balances == [2 * 10**18] * 5
+    assert provider.calls == ["eth_call"] * 3
+
+
+def test_token_contract_is_built_once_per_web3(chain):
+    _, web3 = chain
+    assert token_contract(web3, TOKEN) is token_contract(web3, TOKEN)
+
+
+@pytest.fixture
+def custody_db(monkeypatch, chain):
+    """Custody addresses on mongomock, read through the fake chain"""
+    _, web3 = chain
+    db = mongomock.MongoClient()["escrowbot_test"]
+    monkeypatch.setattr(wallet_module, "db", db)
+    monkeypatch.setattr(
+        WalletManager,
+        "_get_eth_registry",
+        staticmethod(lambda cfg: DirectRegistry(web3)),
+    )
+    db.coin_addresses.insert_many(
+        [
+            {"_id": "A_ETH", "coin_symbol": "ETH", "address": ALICE, "balance": "0"},
+            {"_id": "A_USDT", "coin_symbol": "USDT", "address": ALICE, "balance": "0"},
+            {"_id": "B_ETH", "coin_symbol": "ETH", "address": BOB, "balance": "0"},
+            {"_id": "X_USDT", "coin_symbol": "USDT", "address": BROKE, "balance": "9"},
+            {"_id": "A_BTC", "coin_symbol": "BTC", "address": "1abc", "balance": "1"},
+        ]
+    )
+    balance_cache.clear()
+    yield db
+    balance_cache.clear()
+
+
+def test_reconcile_updates_custody_balances_in_batches(custody_db, chain):
+    provider, _ = chain
+
+    totals = WalletManager.reconcile_evm_balances(batch_size=3)
+
+    assert totals == {"updated": 3, "failed": 1}
+    assert provider.calls == ["eth_call"] * 2
+    balances = {d["_id"]: d["balance"] for d in custody_db.coin_addresses.find()}
+    assert balances["A_ETH"] == Decimal128("2.0")
+    assert balances["A_USDT"] == Decimal128("1.5")
+    assert balances["B_ETH"] == Decimal128("0.5")
+    assert balances["X_USDT"] == "9"
+    assert balances["A_BTC"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_wallet_refresh_reads_eth_and_usdt_in_one_call(
+    custody_db, chain, monkeypatch
+):
+    provider, _ = chain
+    monkeypatch.setattr(WalletManager, "__init__", lambda self: None)
+    monkeypatch.setattr(
+        WalletManager,
+        "_fetch_utxo_balances",
+        staticmethod(lambda cas: [3.0] * len(cas)),
+    )
+
+    coin_addresses = list(custody_db.coin_addresses.find({"address": ALICE}))
+    coin_addresses.append(custody_db.coin_addresses.find_one({"_id": "A_BTC"}))
+    result = await WalletManager().refresh_coin_balances(coin_addresses)
+
+    assert result == {"updated": {"ETH": 2.0, "USDT": 1.5, "BTC": 3.0}, "failed": {}}
+    assert provider.calls == ["eth_call"]
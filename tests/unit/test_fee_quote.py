@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+
+import mongomock
+import pytest
+
+import config
+import functions.trade as trade_module
+from functions.trade import TradeClient
+
+
+@pytest.fixture
+def quote_db(monkeypatch):
+    """One unfunded ETH trade and a fee calculator that counts its calls"""
+    db = mongomock.MongoClient()["escrowbot_test"]
+    monkeypatch.setattr(trade_module, "db", db)
+    monkeypatch.setattr(config, "db", db)
+    db.trades.insert_one(
+        {"_id": "T1", "seller_id": "111", "currency": "ETH", "price": 1.0}
+    )
+    TradeClient.invalidate_trade()
+
+    calls = []
+
+    def calculate(amount, currency):
+        calls.append((amount, currency))
+        gas = 0.001 * len(calls)
+        return {
+            "bot_fee": amount * 0.025,
+            "total_gas_fees": gas,
+            "total_deposit_required": amount * 1.025 + gas,
+        }
+
+    monkeypatch.setattr(
+        TradeClient, "calculate_trade_fee_with_gas", staticmethod(calculate)
+    )
+    yield db, calls
+    TradeClient.invalidate_trade()
+
+
+def expire_quote(db):
+    db.trades.update_one(
+        {"_id": "T1"},
+        {"$set": {"fee_quote.expires_at": datetime.now() - timedelta(seconds=1)}},
+    )
+    TradeClient.invalidate_trade("T1")
+
+
+def test_quote_is_computed_once_and_reused(quote_db):
+    db, calls = quote_db
+
+    first = TradeClient.get_fee_quote("T1")
+    again = TradeClient.get_fee_quote(TradeClient.get_trade("T1"))
+
+    assert calls == [(1.0, "ETH")]
+    assert again["total_deposit_required"] == first["total_deposit_required"]
+    assert first["expires_at"] > datetime.now()
+    stored = db.trades.find_one({"_id": "T1"})["fee_quote"]
+    assert stored["total_deposit_required"] == pytest.approx(1.026)
+
+
+def test_expired_quote_is_replaced_until_deposit(quote_db):
+    db, calls = quote_db
+    TradeClient.get_fee_quote("T1")
+
+    expire_quote(db)
+    assert TradeClient.get_fee_quote("T1")["total_gas_fees"] == 0.002
+
+    # Once funded, the quote the seller paid against is kept for release
+    expire_quote(db)
+    TradeClient.confirm_crypto_deposit("T1")
+    assert TradeClient.get_fee_quote("T1")["total_gas_fees"] == 0.002
+    assert len(calls) == 2
+
+
+def test_changed_terms_or_refresh_requote(quote_db):
+    db, calls = quote_db
+    TradeClient.get_fee_quote("T1")
+
+    db.trades.update_one({"_id": "T1"}, {"$set": {"price": 2.0}})
+    TradeClient.invalidate_trade("T1")
+    assert TradeClient.get_fee_quote("T1")["amount"] == 2.0
+
+    TradeClient.get_fee_quote("T1", refresh=True)
+    assert calls == [(1.0, "ETH"), (2.0, "ETH"), (2.0, "ETH")]
+
+
+def test_concurrent_requotes_settle_on_one_stored_quote(quote_db):
+    """A re-quote that loses the write returns the winner's quote"""
+    db, calls = quote_db
+    TradeClient.get_fee_quote("T1")
+    expire_quote(db)
+
+    stale = TradeClient.get_trade("T1")
+    winner = TradeClient.get_fee_quote(stale)
+    loser = TradeClient.get_fee_quote(stale)
+
+    assert winner["total_gas_fees"] == 0.002
+    assert loser["total_gas_fees"] == 0.002
+    assert db.trades.find_one({"_id": "T1"})["fee_quote"]["total_gas_fees"] == 0.002
+
+
+def test_missing_trade_has_no_quote(quote_db):
+    assert TradeClient.get_fee_quote("nope") is None
@@ -0,0 +1,111 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import functions.gas_oracle as gas_oracle_module
+from functions.gas_oracle import GWEI, GasOracle
+from functions.trade import TradeClient
+
+FEE_HISTORY = {
+    "oldestBlock": 100,
+    "baseFeePerGas": [9 * GWEI, 10 * GWEI, 11 * GWEI, 12 * GWEI],
+    "gasUsedRatio": [0.4, 0.6, 0.7],
+    "reward": [
+        [1 * GWEI, 2 * GWEI, 5 * GWEI],
+        [1 * GWEI, 3 * GWEI, 8 * GWEI],
+        [2 * GWEI, 2 * GWEI, 4 * GWEI],
+    ],
+}
+
+
+class FakeRegistry:
+    """Answers fee_history from a canned response and counts calls"""
+
+    def __init__(self, history=FEE_HISTORY):
+        self.history = history
+        self.calls = 0
+
+    def call(self, fn):
+        self.calls += 1
+        if isinstance(self.history, Exception):
+            raise self.history
+        web3 = SimpleNamespace(
+            eth=SimpleNamespace(fee_history=lambda *args: self.history)
+        )
+        return fn(web3)
+
+
+@pytest.fixture
+def registry():
+    return FakeRegistry()
+
+
+def test_tiers_use_next_base_fee_and_median_tips(registry):
+    oracle = GasOracle(registry_factory=lambda: registry)
+
+    fast = oracle.quote("fast")
+    normal = oracle.quote()
+    slow = oracle.quote("slow")
+
+    assert normal["base_fee"] == 12 * GWEI
+    assert [slow, normal, fast] == sorted(
+        [slow, normal, fast], key=lambda q: q["max_priority_fee_per_gas"]
+    )
+    assert fast["max_priority_fee_per_gas"] == 5 * GWEI
+    assert normal["gas_price"] == 14 * GWEI
+    assert normal["max_fee_per_gas"] == 26 * GWEI
+    assert oracle.stats()["block"] == 102
+    assert registry.calls == 1
+
+
+def test_stale_snapshot_is_refreshed_once(registry, monkeypatch):
+    oracle = GasOracle(registry_factory=lambda: registry, max_age=30)
+    oracle.refresh()
+
+    later = time.monotonic() + 31
+    monkeypatch.setattr(gas_oracle_module.time, "monotonic", lambda: later)
+
+    assert oracle.quote(max_age=60)["age"] == pytest.approx(31, abs=1)
+    assert registry.calls == 1
+    assert oracle.quote() is not None
+    assert registry.calls == 2
+
+
+def test_failed_refresh_returns_none_and_backs_off():
+    registry = FakeRegistry(ConnectionError("rpc down"))
+    oracle = GasOracle(registry_factory=lambda: registry, retry_delay=10)
+
+    assert oracle.quote() is None
+    assert oracle.quote() is None
+    assert registry.calls == 1
+    assert oracle.stats()["failures"] == 1
+
+    with pytest.raises(ValueError):
+        oracle.quote("instant")
+
+
+def test_fee_quotes_need_no_rpc_call(registry, monkeypatch):
+    oracle = GasOracle(registry_factory=lambda: registry)
+    oracle.refresh()
+    monkeypatch.setattr(gas_oracle_module, "gas_oracle", oracle)
+
+    for _ in range(5):
+        fees = TradeClient._estimate_gas_fees("ETH")
+
+    # 21,000 gas at 14 gwei plus the 20% buffer
+    assert fees["user_payout"] == pytest.approx(21000 * 14e-9 * 1.2)
+    assert TradeClient._estimate_gas_fees("USDT")["bot_payout"] == pytest.approx(
+        65000 * 14e-9 * 1.2
+    )
+    assert registry.calls == 1
+
+
+def test_fee_quotes_fall_back_without_fee_data(monkeypatch):
+    oracle = GasOracle(registry_factory=lambda: FakeRegistry(TimeoutError("slow")))
+    monkeypatch.setattr(gas_oracle_module, "gas_oracle", oracle)
+
+    assert TradeClient._estimate_gas_fees("ETH") == {
+        "user_payout": 0.001,
+        "bot_payout": 0.001,
+    }
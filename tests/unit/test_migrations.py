@@ -0,0 +1,142 @@
+from unittest.mock import MagicMock
+
+import mongomock
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from database import migrations
+
+
+@pytest.fixture
+def migrations_db():
+    """Empty in-memory database"""
+    return mongomock.MongoClient()["escrowbot_test"]
+
+
+def test_run_migrations_creates_declared_indexes(migrations_db):
+    """Every declared index exists after migrating and versions are recorded"""
+    applied = migrations.run_migrations(migrations_db)
+
+    assert applied == [m["version"] for m in migrations.MIGRATIONS]
+    for collection, specs in migrations.get_index_specs().items():
+        existing = migrations_db[collection].index_information()
+        for spec in specs:
+            assert spec["name"] in existing, f"{collection}.{spec['name']}"
+
+
+def test_run_migrations_is_idempotent(migrations_db):
+    """A second run finds nothing pending"""
+    migrations.run_migrations(migrations_db)
+
+    assert migrations.run_migrations(migrations_db) == []
+    assert all(applied for _, _, applied in migrations.migration_status(migrations_db))
+
+
+def test_importing_config_does_not_create_indexes():
+    """Index creation is an explicit step, not an import side effect"""
+    import config
+
+    assert not hasattr(config, "_ensure_db_indexes")
+
+
+def test_explain_flags_collection_scans():
+    """Queries whose winning plan contains a COLLSCAN are flagged"""
+    indexed = {
+        "queryPlanner": {
+            "winningPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}
+        }
+    }
+    scanned = {
+        "queryPlanner": {
+            "winningPlan": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}
+        }
+    }
+
+    db = MagicMock()
+    cursor = db.__getitem__.return_value.find.return_value
+    cursor.sort.return_value = cursor
+    cursor.explain.side_effect = [indexed, scanned] + [indexed] * 100
+
+    results = migrations.explain_known_queries(db)
+
+    assert len(results) == len(migrations.KNOWN_QUERIES)
+    assert results[0]["collscan"] is False
+    assert results[0]["stages"] == ["FETCH", "IXSCAN"]
+    assert results[1]["collscan"] is True
+
+
+def test_wallet_address_lookups_are_indexed(migrations_db):
+    """Deposit checks hit an index and a wallet holds one address per coin"""
+    migrations.run_migrations(migrations_db)
+
+    coin_indexes = migrations_db.coin_addresses.index_information()
+    assert coin_indexes["coin_address_lookup_idx"]["key"] == [
+        ("address", 1),
+        ("coin_symbol", 1),
+    ]
+    assert migrations_db.wallets.index_information()["wallet_user_idx"]["key"] == [
+        ("user_id", 1),
+        ("is_active", 1),
+    ]
+
+    migrations_db.coin_addresses.insert_one(
+        {"wallet_id": "W1", "coin_symbol": "ETH", "address": "0xabc"}
+    )
+    with pytest.raises(DuplicateKeyError):
+        migrations_db.coin_addresses.insert_one(
+            {"wallet_id": "W1", "coin_symbol": "ETH", "address": "0xdef"}
+        )
+
+
+def test_duplicates_block_the_unique_index_migration(migrations_db):
+    """Clashing documents are reported and their migration stays pending"""
+    migrations_db.coin_addresses.insert_many(
+        [
+            {"_id": "A1", "wallet_id": "W1", "coin_symbol": "ETH"},
+            {"_id": "A2", "wallet_id": "W1", "coin_symbol": "ETH"},
+            {"_id": "A3", "wallet_id": "W1", "coin_symbol": "BTC"},
+        ]
+    )
+    with pytest.raises(migrations.DuplicateKeysError) as excinfo:
+        migrations.run_migrations(migrations_db)
+
+    assert excinfo.value.duplicates == [
+        {
+            "collection": "coin_addresses",
+            "index": "coin_wallet_symbol_unique",
+            "key": {"wallet_id": "W1", "coin_symbol": "ETH"},
+            "count": 2,
+            "ids": ["A1", "A2"],
+        }
+    ]
+    assert migrations.get_applied_versions(migrations_db) == {1, 2}
+    assert "coin_wallet_symbol_unique" not in (
+        migrations_db.coin_addresses.index_information()
+    )
+    assert len(migrations.pending_duplicates(migrations_db)) == 1
+
+    migrations_db.coin_addresses.delete_one({"_id": "A2"})
+    assert migrations.run_migrations(migrations_db) == [3, 4, 5, 6]
+
+
+def test_duplicate_check_respects_partial_filters(migrations_db):
+    """Trades without an invoice id are outside the partial unique index"""
+    (invoice_spec,) = [
+        spec
+        for spec in migrations.get_index_specs()["trades"]
+        if spec["name"] == "invoice_id_partial_unique"
+    ]
+    migrations_db.trades.insert_many(
+        [
+            {"_id": "T1"},
+            {"_id": "T2"},
+            {"_id": "T3", "invoice_id": "INV1"},
+            {"_id": "T4", "invoice_id": "INV1"},
+        ]
+    )
+
+    duplicates = migrations.find_duplicates(migrations_db.trades, invoice_spec)
+
+    assert duplicates == [
+        {"key": {"invoice_id": "INV1"}, "count": 2, "ids": ["T3", "T4"]}
+    ]
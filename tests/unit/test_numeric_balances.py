@@ -0,0 +1,119 @@
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import mongomock
+import pytest
+from bson.decimal128 import Decimal128
+
+import functions.wallet as wallet_module
+from database import migrations
+from database.numeric import to_decimal, to_decimal128
+from functions.wallet import WalletManager
+
+
+@pytest.fixture
+def balances_db(monkeypatch):
+    db = mongomock.MongoClient()["escrowbot_test"]
+    monkeypatch.setattr(wallet_module, "db", db)
+    db.coin_addresses.insert_many(
+        [
+            {"_id": "A1", "wallet_id": "W1", "coin_symbol": "ETH", "balance": "0.5"},
+            {
+                "_id": "A2",
+                "wallet_id": "W1",
+                "coin_symbol": "USDT",
+                "balance": "20",
+                "balance_usd": "20.00",
+            },
+            {"_id": "A3", "wallet_id": "W2", "coin_symbol": "ETH", "balance": "oops"},
+            {
+                "_id": "A4",
+                "wallet_id": "W2",
+                "coin_symbol": "ETH",
+                "balance": Decimal128("1.25"),
+            },
+        ]
+    )
+    return db
+
+
+def test_conversions_keep_decimal_values():
+    assert to_decimal128(0.1) == Decimal128("0.1")
+    assert to_decimal128(Decimal("12.345")) == Decimal128("12.345")
+    assert to_decimal(Decimal128("1.5")) == Decimal("1.5")
+    assert to_decimal("1.5") == Decimal("1.5")
+    assert to_decimal("NaN", Decimal(0)) == Decimal(0)
+    assert to_decimal(None) is None
+
+
+def test_migration_converts_strings_in_batches(balances_db):
+    result = migrations.migrate_numeric_balances(balances_db, batch_size=2)
+
+    assert result == {"converted": 3, "invalid": 1}
+    docs = {d["_id"]: d for d in balances_db.coin_addresses.find()}
+    assert docs["A1"]["balance"] == Decimal128("0.5")
+    assert docs["A2"]["balance"] == Decimal128("20")
+    assert docs["A2"]["balance_usd"] == Decimal128("20.00")
+    assert docs["A3"]["balance"] == Decimal128("0")
+    assert docs["A4"]["balance"] == Decimal128("1.25")
+
+    assert migrations.migrate_numeric_balances(balances_db) == {
+        "converted": 0,
+        "invalid": 0,
+    }
+
+
+def test_migration_skips_balances_written_meanwhile(balances_db):
+    real_find = balances_db.coin_addresses.find
+
+    def find_then_write(*args, **kwargs):
+        docs = list(real_find(*args, **kwargs))
+        balances_db.coin_addresses.update_one(
+            {"_id": "A1"}, {"$set": {"balance": Decimal128("3")}}
+        )
+        cursor = MagicMock()
+        cursor.batch_size.return_value = docs
+        return cursor
+
+    balances_db.coin_addresses.find = find_then_write
+
+    migrations.migrate_numeric_balances(balances_db)
+
+    assert real_find({"_id": "A1"})[0]["balance"] == Decimal128("3")
+
+
+def test_custody_totals_are_summed_by_the_database(balances_db):
+    migrations.migrate_numeric_balances(balances_db)
+
+    totals = WalletManager.get_custody_totals()
+
+    assert totals == {
+        "ETH": {"balance": Decimal("1.75"), "balance_usd": Decimal(0), "addresses": 3},
+        "USDT": {
+            "balance": Decimal("20"),
+            "balance_usd": Decimal("20.00"),
+            "addresses": 1,
+        },
+    }
+
+
+def test_wallets_above_filters_in_the_pipeline(monkeypatch):
+    db = MagicMock()
+    db.coin_addresses.aggregate.return_value = [
+        {"wallet_id": "W2", "balance": Decimal128("1.25")}
+    ]
+    monkeypatch.setattr(wallet_module, "db", db)
+
+    assert WalletManager.get_wallets_above("1", coin_symbol="ETH", limit=5) == [
+        {"wallet_id": "W2", "balance": Decimal("1.25")}
+    ]
+    pipeline = db.coin_addresses.aggregate.call_args[0][0]
+    assert pipeline[0] == {
+        "$match": {"coin_symbol": "ETH", "balance": {"$gte": Decimal128("1")}}
+    }
+    assert pipeline[-2:] == [{"$sort": {"balance": -1}}, {"$limit": 5}]
+
+    WalletManager.get_wallets_above(100)
+    pipeline = db.coin_addresses.aggregate.call_args[0][0]
+    assert pipeline[0]["$group"]["balance"] == {"$sum": "$balance_usd"}
+    assert pipeline[1] == {"$match": {"balance": {"$gte": Decimal128("100")}}}
@@ -0,0 +1,117 @@
+import time
+
+import pytest
+
+import functions.price_oracle as price_oracle_module
+from functions.price_oracle import PriceOracle
+from functions.scripts.utils import get_eth_price
+
+PRICES = {"BTC": 60000.0, "ETH": 3000.0, "USDT": 1.0, "SOL": 150.0}
+
+
+class FakeFeed:
+    """Serves canned quotes and records each batched request"""
+
+    def __init__(self, prices=PRICES):
+        self.prices = prices if isinstance(prices, Exception) else dict(prices)
+        self.requests = []
+
+    def __call__(self, symbols):
+        self.requests.append(list(symbols))
+        if isinstance(self.prices, Exception):
+            raise self.prices
+        return {
+            s: {"usd": self.prices[s], "usd_24h_change": 1.5, "usd_market_cap": None}
+            for s in symbols
+            if s in self.prices
+        }
+
+
+@pytest.fixture
+def feed():
+    return FakeFeed()
+
+
+def age_quotes(monkeypatch, seconds):
+    later = time.monotonic() + seconds
+    monkeypatch.setattr(price_oracle_module.time, "monotonic", lambda: later)
+
+
+def test_prices_are_fetched_in_one_batch_and_cached(feed):
+    oracle = PriceOracle(fetcher=feed)
+
+    assert oracle.get_prices(["btc", "ETH", "SOL"]) == {
+        "BTC": 60000.0,
+        "ETH": 3000.0,
+        "SOL": 150.0,
+    }
+    assert oracle.get_price("ETH") == 3000.0
+    assert oracle.get_quotes(["BTC"])["BTC"]["usd_24h_change"] == 1.5
+    assert feed.requests == [["BTC", "ETH", "SOL"]]
+
+
+def test_stale_quotes_are_served_while_revalidating(feed, monkeypatch):
+    oracle = PriceOracle(fetcher=feed, ttl=60, stale_ttl=600)
+    oracle.refresh()
+    feed.prices["ETH"] = 3100.0
+
+    revalidated = []
+    monkeypatch.setattr(oracle, "_revalidate", revalidated.append)
+    age_quotes(monkeypatch, 120)
+
+    assert oracle.get_price("ETH") == 3000.0
+    assert revalidated == [["ETH"]]
+    assert len(feed.requests) == 1
+
+
+def test_background_revalidation_updates_the_snapshot(feed, monkeypatch):
+    oracle = PriceOracle(fetcher=feed, ttl=0.05, stale_ttl=600)
+    oracle.refresh()
+    feed.prices["ETH"] = 3100.0
+    time.sleep(0.1)
+
+    assert oracle.get_price("ETH") == 3000.0
+    for _ in range(50):
+        if oracle.get_price("ETH") == 3100.0:
+            break
+        time.sleep(0.02)
+    assert oracle.get_price("ETH") == 3100.0
+
+
+def test_expired_quotes_are_refetched_inline(feed, monkeypatch):
+    oracle = PriceOracle(fetcher=feed, ttl=60, stale_ttl=600)
+    oracle.refresh()
+    feed.prices["ETH"] = 3100.0
+    age_quotes(monkeypatch, 601)
+
+    assert oracle.get_price("ETH") == 3100.0
+    assert feed.requests[-1] == ["ETH"]
+
+
+def test_failed_fetch_keeps_old_quotes_and_backs_off():
+    feed = FakeFeed(ConnectionError("api down"))
+    oracle = PriceOracle(fetcher=feed, retry_delay=30)
+
+    assert oracle.get_price("ETH") is None
+    assert oracle.get_price("BTC") is None
+    assert len(feed.requests) == 1
+    assert oracle.stats()["failures"] == 1
+
+
+def test_to_usd_converts_many_holdings_against_one_snapshot(feed):
+    oracle = PriceOracle(fetcher=feed)
+
+    values = oracle.to_usd(
+        [("0.5", "ETH"), (2, "usdt"), (1.0, "DOGE"), ("bad", "BTC"), (0.1, "BTC")]
+    )
+
+    assert values == [1500.0, 2.0, None, None, pytest.approx(6000.0)]
+    assert len(feed.requests) == 1
+
+
+def test_script_helpers_use_the_shared_oracle(feed, monkeypatch):
+    monkeypatch.setattr(price_oracle_module, "price_oracle", PriceOracle(fetcher=feed))
+
+    assert get_eth_price() == 3000.0
+    assert get_eth_price() == 3000.0
+    assert len(feed.requests) == 1
@@ -0,0 +1,317 @@
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+
+import mongomock
+import pytest
+from eth_account import Account
+from web3 import Web3
+from web3.providers import BaseProvider
+
+import config
+import functions.nonce_manager as nonce_module
+import functions.receipt_tracker as tracker_module
+import functions.trade as trade_module
+import functions.wallet as wallet_module
+from functions.nonce_manager import NonceManager
+from functions.receipt_tracker import ReceiptTracker
+from functions.trade import TradeClient
+from functions.wallet import WalletManager
+
+BUYER = "0x" + "44" * 20
+TX_HASH = "0x" + "ab" * 32
+
+
+class FakeNode(BaseProvider):
+    """Accepts raw transactions and serves receipts from memory"""
+
+    def __init__(self, pending_count=7, latest_count=0):
+        super().__init__()
+        self.pending_count = pending_count
+        self.latest_count = latest_count
+        self.receipts = {}
+        self.sent = []
+        self.calls = []
+
+    def make_request(self, method, params):
+        self.calls.append(method)
+        if method == "eth_chainId":
+            result = "0x1"
+        elif method == "eth_getTransactionCount":
+            count = self.latest_count if params[1] == "latest" else self.pending_count
+            result = hex(count)
+        elif method == "eth_sendRawTransaction":
+            self.sent.append(params[0])
+            result = "0x" + f"{len(self.sent):064x}"
+        elif method == "eth_getTransactionReceipt":
+            result = self.receipts.get(params[0])
+        else:
+            raise AssertionError(f"unexpected {method}")
+        return {"jsonrpc": "2.0", "id": 1, "result": result}
+
+    def mine(self, tx_hash, status=1, gas_used=21000, gas_price=10**10):
+        self.receipts[tx_hash] = {
+            "transactionHash": tx_hash,
+            "transactionIndex": "0x0",
+            "blockHash": "0x" + "00" * 32,
+            "blockNumber": "0x64",
+            "from": BUYER,
+            "to": BUYER,
+            "cumulativeGasUsed": hex(gas_used),
+            "gasUsed": hex(gas_used),
+            "effectiveGasPrice": hex(gas_price),
+            "contractAddress": None,
+            "logs": [],
+            "logsBloom": "0x" + "00" * 256,
+            "status": hex(status),
+            "type": "0x2",
+        }
+
+
+class DirectRegistry:
+    def __init__(self, web3):
+        self.web3 = web3
+
+    def call(self, fn):
+        return fn(self.web3)
+
+
+@pytest.fixture
+def node(monkeypatch):
+    provider = FakeNode()
+    web3 = Web3(provider)
+    monkeypatch.setattr(
+        WalletManager,
+        "_get_eth_registry",
+        staticmethod(lambda cfg: DirectRegistry(web3)),
+    )
+    return provider, web3
+
+
+def test_nonces_are_handed_out_without_refetching(node):
+    provider, web3 = node
+    manager = NonceManager(resync_interval=60)
+
+    nonces = []
+    for _ in range(3):
+        with manager.reserve(web3, BUYER) as nonce:
+            nonces.append(nonce)
+
+    assert nonces == [7, 8, 9]
+    assert provider.calls.count("eth_getTransactionCount") == 1
+
+
+def test_failed_send_releases_the_nonce_and_resyncs(node):
+    provider, web3 = node
+    manager = NonceManager(resync_interval=60)
+
+    with pytest.raises(ValueError):
+        with manager.reserve(web3, BUYER):
+            raise ValueError("nonce too low")
+
+    provider.pending_count = 9  # sent elsewhere meanwhile
+    with manager.reserve(web3, BUYER) as nonce:
+        assert nonce == 9
+    assert provider.calls.count("eth_getTransactionCount") == 2
+
+
+def test_nonce_gap_is_recovered_once_sends_go_quiet(node, monkeypatch):
+    """A nonce the node never saw stops blocking the counter after a quiet
+    interval, but a lagging pending count doesn't rewind busy sends"""
+    provider, web3 = node
+    clock = [0.0]
+    monkeypatch.setattr(nonce_module.time, "monotonic", lambda: clock[0])
+    manager = NonceManager(resync_interval=60)
+
+    for _ in range(2):
+        with manager.reserve(web3, BUYER):
+            pass
+
+    # The node never saw nonces 7 and 8, but sends are still going out
+    clock[0] = 30
+    with manager.reserve(web3, BUYER) as nonce:
+        assert nonce == 9
+    clock[0] = 61
+    with manager.reserve(web3, BUYER) as nonce:
+        assert nonce == 10
+
+    provider.pending_count = 8
+    clock[0] = 130
+    with manager.reserve(web3, BUYER) as nonce:
+        assert nonce == 8
+
+
+def test_eth_transfer_returns_after_broadcast(node, monkeypatch):
+    provider, web3 = node
+    monkeypatch.setattr(wallet_module, "nonce_manager", NonceManager())
+    monkeypatch.setattr(
+        wallet_module.gas_oracle,
+        "quote",
+        lambda tier="normal": {
+            "max_fee_per_gas": 3 * 10**10,
+            "max_priority_fee_per_gas": 10**9,
+            "gas_price": 2 * 10**10,
+        },
+    )
+    sender = Account.create()
+
+    results = [
+        WalletManager._execute_eth_transfer(
+            web3, sender.key.hex(), sender.address, BUYER, 0.1
+        )
+        for _ in range(2)
+    ]
+
+    assert [r["status"] for r in results] == ["pending", "pending"]
+    assert [r["nonce"] for r in results] == [7, 8]
+    assert results[0]["gas_fee_eth"] == pytest.approx(21000 * 2e-8)
+    assert len(provider.sent) == 2
+    assert provider.calls.count("eth_getTransactionCount") == 1
+    assert "eth_getTransactionReceipt" not in provider.calls
+
+
+@pytest.fixture
+def tracker_db(monkeypatch):
+    """A trade whose release was broadcast, with its pending transaction"""
+    db = mongomock.MongoClient()["escrowbot_test"]
+    for module in (tracker_module, trade_module, config):
+        monkeypatch.setattr(module, "db", db)
+    db.trades.insert_one(
+        {
+            "_id": "T1",
+            "seller_id": "111",
+            "buyer_id": "222",
+            "price": 0.1,
+            "currency": "ETH",
+            "status": "crypto_released",
+            "release_tx_hash": TX_HASH,
+            "release_tx_status": "pending",
+        }
+    )
+    db.wallet_transactions.insert_one(
+        {
+            "_id": "TX1",
+            "coin_symbol": "ETH",
+            "from_address": BUYER,
+            "to_address": BUYER,
+            "amount": 0.1,
+            "tx_hash": TX_HASH,
+            "trade_id": "T1",
+            "status": "pending",
+            "created_at": datetime.now().isoformat(),
+        }
+    )
+    TradeClient.invalidate_trade()
+    yield db
+    TradeClient.invalidate_trade()
+
+
+@pytest.mark.asyncio
+async def test_mined_release_completes_the_trade_once(node, tracker_db):
+    provider, _ = node
+    bot = AsyncMock()
+    tracker = ReceiptTracker(bot=bot)
+
+    assert (await tracker.tick())["completed"] == 0
+    assert tracker_db.wallet_transactions.find_one()["status"] == "pending"
+
+    provider.mine(TX_HASH)
+    assert (await tracker.tick())["completed"] == 1
+
+    tx = tracker_db.wallet_transactions.find_one()
+    assert tx["status"] == "completed"
+    assert tx["gas_fee_eth"] == pytest.approx(21000 * 1e-8)
+    trade = tracker_db.trades.find_one({"_id": "T1"})
+    assert trade["status"] == "completed"
+    assert trade["release_tx_status"] == "completed"
+    assert {c.kwargs["chat_id"] for c in bot.send_message.await_args_list} == {
+        111,
+        222,
+    }
+
+    assert await tracker.tick() == {
+        "pending": 0,
+        "completed": 0,
+        "failed": 0,
+        "dropped": 0,
+    }
+    assert bot.send_message.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_reverted_and_dropped_transactions(node, tracker_db, monkeypatch):
+    provider, _ = node
+    monkeypatch.setattr(tracker_module, "ADMIN_ID", 999)
+    bot = AsyncMock()
+    tracker = ReceiptTracker(bot=bot, timeout=600)
+
+    provider.mine(TX_HASH, status=0)
+    assert (await tracker.tick())["failed"] == 1
+    trade = tracker_db.trades.find_one({"_id": "T1"})
+    assert trade["status"] == "crypto_released"
+    assert trade["release_tx_status"] == "failed"
+    assert 999 in {c.kwargs["chat_id"] for c in bot.send_message.await_args_list}
+
+    old = (datetime.now() - timedelta(seconds=601)).isoformat()
+    tracker_db.wallet_transactions.insert_one(
+        {
+            "_id": "TX2",
+            "coin_symbol": "ETH",
+            "from_address": BUYER,
+            "to_address": BUYER,
+            "amount": 0.2,
+            "tx_hash": "0x" + "cd" * 32,
+            "status": "pending",
+            "created_at": old,
+        }
+    )
+    assert (await tracker.tick())["dropped"] == 1
+    assert tracker_db.wallet_transactions.find_one({"_id": "TX2"})["status"] == (
+        "dropped"
+    )
+
+
+@pytest.mark.asyncio
+async def test_slow_transaction_is_not_dropped_once_its_nonce_is_used(node, tracker_db):
+    """Past the timeout, a mined nonce means the receipt is just late"""
+    provider, _ = node
+    provider.latest_count = 6
+    old = (datetime.now() - timedelta(seconds=601)).isoformat()
+    tracker_db.wallet_transactions.update_one(
+        {"_id": "TX1"}, {"$set": {"nonce": 5, "created_at": old}}
+    )
+    tracker = ReceiptTracker(timeout=600)
+
+    assert (await tracker.tick())["dropped"] == 0
+    assert tracker_db.wallet_transactions.find_one()["status"] == "pending"
+
+    provider.mine(TX_HASH)
+    assert (await tracker.tick())["completed"] == 1
+    assert tracker_db.trades.find_one({"_id": "T1"})["status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_dropped_transaction_resets_nonce_and_settles_late(
+    node, tracker_db, monkeypatch
+):
+    """An unused nonce drops the transaction; a later receipt still counts"""
+    provider, _ = node
+    manager = NonceManager()
+    monkeypatch.setattr(tracker_module, "nonce_manager", manager)
+    manager._next[BUYER.lower()] = (9, 0.0, 0.0)
+    provider.latest_count = 5
+    old = (datetime.now() - timedelta(seconds=601)).isoformat()
+    tracker_db.wallet_transactions.update_one(
+        {"_id": "TX1"}, {"$set": {"nonce": 5, "created_at": old}}
+    )
+    tracker = ReceiptTracker(timeout=600)
+
+    assert (await tracker.tick())["dropped"] == 1
+    assert manager.stats() == {"addresses": 0}
+    assert tracker_db.trades.find_one({"_id": "T1"})["release_tx_status"] == "dropped"
+
+    provider.mine(TX_HASH)
+    assert (await tracker.tick())["completed"] == 1
+    assert tracker_db.wallet_transactions.find_one()["status"] == "completed"
+    trade = tracker_db.trades.find_one({"_id": "T1"})
+    assert trade["status"] == "completed"
+    assert trade["release_tx_status"] == "completed"
@@ -0,0 +1,143 @@
+import pytest
+
+import functions.solana_rpc as solana_module
+import functions.wallet as wallet_module
+from functions.solana_rpc import (
+    SolanaRPC,
+    SolanaRPCError,
+    get_solana_rpc,
+    reset_solana_clients,
+)
+from functions.wallet import WalletManager
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSolanaNode:
+    """Answers getMultipleAccounts and getLatestBlockhash from in-memory state"""
+
+    def __init__(self, accounts=None, blockhash="hash1"):
+        self.accounts = accounts or {}
+        self.blockhash = blockhash
+        self.calls = []
+
+    def post(self, url, json=None, timeout=None):
+        method, params = json["method"], json["params"]
+        self.calls.append((method, params))
+        if method == "getMultipleAccounts":
+            value = [self.accounts.get(address) for address in params[0]]
+            return FakeResponse({"result": {"context": {"slot": 1}, "value": value}})
+        if method == "getLatestBlockhash":
+            value = {"blockhash": self.blockhash, "lastValidBlockHeight": 100}
+            return FakeResponse({"result": {"context": {"slot": 1}, "value": value}})
+        return FakeResponse({"error": {"code": -32601, "message": "Method not found"}})
+
+
+def sol_account(lamports):
+    return {"lamports": lamports, "owner": "11111111111111111111111111111111"}
+
+
+def token_account(amount, decimals=6):
+    info = {"tokenAmount": {"amount": str(amount), "decimals": decimals}}
+    return {"lamports": 2039280, "data": {"parsed": {"info": info}}}
+
+
+@pytest.fixture(autouse=True)
+def fake_token_addresses(monkeypatch):
+    """Associated token accounts without deriving a real PDA"""
+    monkeypatch.setattr(
+        solana_module, "associated_token_address", lambda owner, mint: f"ata_{owner}"
+    )
+    reset_solana_clients()
+    yield
+    reset_solana_clients()
+
+
+def test_sol_balances_are_read_in_multiple_account_batches():
+    node = FakeSolanaNode({"a": sol_account(1_500_000_000), "b": sol_account(1)})
+    rpc = SolanaRPC("http://sol", batch_size=2, session=node)
+
+    balances = rpc.get_sol_balances(["a", "b", "a", "new"])
+
+    assert balances == {"a": 1.5, "b": 1e-9, "new": 0.0}
+    assert [method for method, _ in node.calls] == ["getMultipleAccounts"] * 2
+    assert node.calls[0][1] == [
+        ["a", "b"],
+        {"encoding": "jsonParsed", "commitment": "finalized"},
+    ]
+
+
+def test_token_balances_read_associated_accounts():
+    node = FakeSolanaNode({"ata_a": token_account(2_500_000), "ata_b": sol_account(5)})
+    rpc = SolanaRPC("http://sol", session=node)
+
+    balances = rpc.get_token_balances(["a", "b", "c"])
+
+    # "b" has no token account data, "c" no token account at all
+    assert balances == {"a": 2.5, "c": 0.0}
+    assert node.calls == [
+        (
+            "getMultipleAccounts",
+            [
+                ["ata_a", "ata_b", "ata_c"],
+                {"encoding": "jsonParsed", "commitment": "finalized"},
+            ],
+        )
+    ]
+
+
+def test_blockhash_is_reused_until_the_ttl_expires(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(solana_module.time, "monotonic", lambda: clock[0])
+    node = FakeSolanaNode()
+    rpc = SolanaRPC("http://sol", blockhash_ttl=20, session=node)
+
+    assert rpc.get_latest_blockhash() == "hash1"
+    node.blockhash = "hash2"
+    clock[0] = 19
+    assert rpc.get_latest_blockhash() == "hash1"
+    clock[0] = 21
+    assert rpc.get_latest_blockhash() == "hash2"
+    assert rpc.stats()["requests"] == 2
+    assert rpc.stats()["blockhash_hits"] == 1
+
+
+def test_rpc_errors_are_raised():
+    rpc = SolanaRPC("http://sol", session=FakeSolanaNode())
+
+    with pytest.raises(SolanaRPCError):
+        rpc.call("getNothing")
+
+
+def test_clients_are_pooled_per_endpoint(monkeypatch):
+    monkeypatch.setattr(solana_module, "SOL_RPC_URL", "http://default")
+
+    assert get_solana_rpc() is get_solana_rpc("http://default")
+    assert get_solana_rpc("http://other") is not get_solana_rpc()
+    assert get_solana_rpc().url == "http://default"
+
+
+def test_wallet_reads_sol_balances_in_one_call(monkeypatch):
+    node = FakeSolanaNode({"s1": sol_account(10**9), "s2": sol_account(0)})
+    rpc = SolanaRPC("http://sol", session=node)
+    monkeypatch.setattr(wallet_module, "get_solana_rpc", lambda url: rpc)
+
+    balances = WalletManager._fetch_solana_balances(
+        [
+            {"coin_symbol": "SOL", "address": "s1"},
+            {"coin_symbol": "SOL", "address": "s2"},
+            {"coin_symbol": "SOL", "address": "s3"},
+        ]
+    )
+
+    assert balances == [1.0, 0.0, 0.0]
+    assert len(node.calls) == 1
@@ -0,0 +1,104 @@
+from unittest.mock import MagicMock, patch
+
+import mongomock
+import pytest
+
+import config
+import functions.trade as trade_module
+from functions.trade import TradeBuilder, TradeClient
+
+
+@pytest.fixture
+def builder_db(monkeypatch):
+    """In-memory database shared by the trade and stats modules"""
+    db = mongomock.MongoClient()["escrowbot_test"]
+    monkeypatch.setattr(trade_module, "db", db)
+    monkeypatch.setattr(config, "db", db)
+    return db
+
+
+def test_create_trade_stores_full_document_in_one_insert(builder_db):
+    """Terms, price and broker fields are written by a single insert"""
+    broker = {"_id": "B1", "broker_name": "Bob", "commission_rate": 2.5}
+    spy = MagicMock(wraps=builder_db.trades)
+
+    with patch.object(trade_module, "db", MagicMock(trades=spy)), patch(
+        "functions.broker.BrokerClient.validate_broker_for_trade",
+        return_value={"valid": True, "broker": broker},
+    ):
+        builder = (
+            TradeBuilder("111", currency="USD", trade_type="CryptoToFiat")
+            .with_terms("Selling gift card")
+            .with_price(150)
+            .with_broker("B1")
+        )
+        trade = TradeClient.create_trade(builder)
+
+    spy.insert_one.assert_called_once()
+    spy.update_one.assert_not_called()
+
+    stored = builder_db.trades.find_one({"_id": trade["_id"]})
+    assert stored["terms"] == "Selling gift card"
+    assert stored["price"] == 150
+    assert stored["broker_enabled"] is True
+    assert stored["broker_commission"] == 2.5
+    assert builder.broker == broker
+
+
+def test_invalid_broker_is_dropped_not_fatal(builder_db):
+    """A broker that fails validation leaves the trade without a broker"""
+    with patch(
+        "functions.broker.BrokerClient.validate_broker_for_trade",
+        return_value={"valid": False, "reason": "Broker not verified"},
+    ):
+        builder = TradeBuilder("111").with_broker("B1")
+        trade = TradeClient.create_trade(builder)
+
+    assert trade["broker_enabled"] is False
+    assert builder.broker is None
+    assert builder.broker_error == "Broker not verified"
+
+
+def test_wallet_currency_resolves_receiving_address(builder_db):
+    """ETH/USDT trades carry the seller's receiving address from the start"""
+    wallet = {"_id": "W1"}
+    coin_address = {"address": "0xabc"}
+
+    with patch.object(
+        TradeClient,
+        "_get_seller_receiving_address",
+        return_value=(wallet, coin_address),
+    ):
+        builder = TradeBuilder("111", currency="USDT").with_price(10).with_payment()
+        trade = TradeClient.create_trade(builder)
+
+    assert builder.payment_url == "0xabc"
+    stored = builder_db.trades.find_one({"_id": trade["_id"]})
+    assert stored["receiving_address"] == "0xabc"
+    assert stored["seller_wallet_id"] == "W1"
+    assert stored["is_wallet_trade"] is True
+
+
+def test_invoice_currency_stores_invoice_id(builder_db):
+    """BTCPay trades are inserted with their invoice id already set"""
+    with patch.object(trade_module, "client") as mock_client:
+        mock_client.create_invoice.return_value = ("https://pay/i/INV1", "INV1")
+        builder = TradeBuilder("111", currency="BTC").with_price(10).with_payment()
+        trade = TradeClient.create_trade(builder)
+
+    assert builder.payment_url == "https://pay/i/INV1"
+    assert builder_db.trades.find_one({"_id": trade["_id"]})["invoice_id"] == "INV1"
+
+
+def test_payment_failure_writes_nothing(builder_db):
+    """No trade is stored when deposit details can't be resolved"""
+    with patch.object(
+        TradeClient, "_get_seller_receiving_address", return_value=(None, None)
+    ):
+        trade = TradeClient.create_trade(
+            TradeBuilder("111", currency="ETH").with_payment()
+        )
+
+    assert trade is None
+    assert builder_db.trades.count_documents({}) == 0
+    assert builder_db.user_trade_stats.count_documents({}) == 0
@@ -0,0 +1,113 @@
+from unittest.mock import MagicMock, patch
+
+from functions.cache import LRUCache
+from functions.trade import TradeClient, trade_cache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Oldest untouched entry is evicted once max_size is exceeded"""
+    cache = LRUCache("test", max_size=2)
+    cache.set("a", {"v": 1})
+    cache.set("b", {"v": 2})
+    cache.get("a")
+    cache.set("c", {"v": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_cache_returns_copies():
+    """Mutating a returned document must not change the cached copy"""
+    cache = LRUCache("test")
+    cache.set("a", {"status": "created"})
+
+    doc = cache.get("a")
+    doc["status"] = "completed"
+
+    assert cache.get("a") == {"status": "created"}
+
+
+@patch("functions.trade.db")
+def test_get_trade_reads_through_cache(mock_db):
+    """Repeated get_trade calls hit Mongo once"""
+    mock_db.trades.find_one.return_value = {"_id": "T1", "status": "created"}
+    trade_cache.reset_stats()
+
+    for _ in range(5):
+        assert TradeClient.get_trade("T1")["status"] == "created"
+
+    assert mock_db.trades.find_one.call_count == 1
+    stats = TradeClient.get_cache_stats()
+    assert stats["hits"] == 4
+    assert stats["misses"] == 1
+
+
+@patch("functions.trade.db")
+def test_mutation_invalidates_cached_trade(mock_db):
+    """Writes through TradeClient force the next read back to Mongo"""
+    mock_db.trades.find_one.return_value = {"_id": "T1", "status": "created"}
+    TradeClient.get_trade("T1")
+
+    mock_db.trades.find_one.return_value = {"_id": "T1", "status": "deposited"}
+    assert TradeClient.update_trade_status("T1", "deposited")
+
+    assert TradeClient.get_trade("T1")["status"] == "deposited"
+    assert mock_db.trades.find_one.call_count == 2
+
+
+@patch("functions.trade.db")
+def test_disabled_cache_always_queries(mock_db):
+    """The enabled switch turns the cache into a pass-through"""
+    mock_db.trades.find_one.return_value = {"_id": "T1"}
+    trade_cache.enabled = False
+    try:
+        TradeClient.get_trade("T1")
+        TradeClient.get_trade("T1")
+    finally:
+        trade_cache.enabled = True
+
+    assert mock_db.trades.find_one.call_count == 2
+
+
+def test_lru_cache_skips_sets_loaded_before_an_invalidation():
+    """A value read before the key was invalidated is not cached"""
+    cache = LRUCache("test", max_size=2)
+    generation = cache.generation("a")
+    cache.invalidate("a")
+    cache.set("a", {"v": "stale"}, generation=generation)
+    assert cache.get("a") is None
+
+    generation = cache.generation("a")
+    cache.clear()
+    cache.set("a", {"v": "stale"}, generation=generation)
+    assert cache.get("a") is None
+
+    # Pruned generations still reject loads that raced an invalidation
+    generation = cache.generation("a")
+    for key in ("a", "b", "c"):
+        cache.invalidate(key)
+    cache.set("a", {"v": "stale"}, generation=generation)
+    assert cache.get("a") is None
+
+    cache.set("a", {"v": "fresh"}, generation=cache.generation("a"))
+    assert cache.get("a") == {"v": "fresh"}
+
+
+@patch("functions.trade.db")
+def test_get_trade_does_not_cache_a_read_that_raced_a_write(mock_db):
+    """An update landing while get_trade reads Mongo wins over the stale read"""
+    trade_cache.invalidate("T2")
+
+    def read_then_concurrent_update(query):
+        # The update commits and invalidates after this read saw old data
+        mock_db.trades.find_one.side_effect = None
+        mock_db.trades.find_one.return_value = {"_id": "T2", "status": "deposited"}
+        TradeClient.invalidate_trade("T2")
+        return {"_id": "T2", "status": "created"}
+
+    mock_db.trades.find_one.side_effect = read_then_concurrent_update
+
+    assert TradeClient.get_trade("T2")["status"] == "created"
+    assert TradeClient.get_trade("T2")["status"] == "deposited"
+    assert mock_db.trades.find_one.call_count == 2
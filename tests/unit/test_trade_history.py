@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+import mongomock
+import pytest
+
+import functions.trade as trade_module
+from functions.trade import TradeClient
+
+
+@pytest.fixture
+def history_db(monkeypatch):
+    """Twelve trades for user 1, two of them sharing a created_at"""
+    db = mongomock.MongoClient()["escrowbot_test"]
+    monkeypatch.setattr(trade_module, "db", db)
+
+    base = datetime(2024, 1, 1, 12, 0, 0, 123000)
+    trades = []
+    for i in range(12):
+        role = "seller_id" if i % 2 else "buyer_id"
+        trades.append(
+            {
+                "_id": f"T{i:02d}",
+                role: "1",
+                "price": i,
+                "currency": "USDT",
+                "terms": "x" * 100,
+                "created_at": base + timedelta(minutes=i),
+            }
+        )
+    trades[5]["created_at"] = trades[4]["created_at"]
+    trades.append({"_id": "OTHER", "seller_id": "2", "created_at": base})
+    db.trades.insert_many(trades)
+    return db
+
+
+def _ids(page):
+    return [t["_id"] for t in page["trades"]]
+
+
+def test_first_page_is_newest_first_with_projection(history_db):
+    """First page holds the newest trades and only list-view fields"""
+    page = TradeClient.get_trades_page("1", limit=5)
+
+    assert _ids(page) == ["T11", "T10", "T09", "T08", "T07"]
+    assert page["prev_cursor"] is None
+    assert page["next_cursor"] is not None
+    assert "terms" not in page["trades"][0]
+
+
+def test_paging_forward_and_back_covers_every_trade_once(history_db):
+    """Next/prev cursors walk the history without gaps or duplicates"""
+    first = TradeClient.get_trades_page("1", limit=5)
+    second = TradeClient.get_trades_page("1", limit=5, after=first["next_cursor"])
+    third = TradeClient.get_trades_page("1", limit=5, after=second["next_cursor"])
+
+    assert _ids(second) == ["T06", "T05", "T04", "T03", "T02"]
+    assert _ids(third) == ["T01", "T00"]
+    assert third["next_cursor"] is None
+
+    back = TradeClient.get_trades_page("1", limit=5, before=second["prev_cursor"])
+    assert _ids(back) == _ids(first)
+    assert back["prev_cursor"] is None
+    assert back["next_cursor"] is not None
+
+
+def test_cursor_round_trip():
+    """Cursors decode back to the exact created_at and id"""
+    trade = {"_id": "AbC123xyZ9", "created_at": datetime(2024, 5, 6, 7, 8, 9, 1234)}
+
+    cursor = TradeClient.encode_history_cursor(trade)
+
+    assert TradeClient.decode_history_cursor(cursor) == (
+        trade["created_at"],
+        trade["_id"],
+    )
+    assert len(f"history_next_{cursor}") <= 64
@@ -0,0 +1,211 @@
+from unittest.mock import MagicMock
+
+import mongomock
+import pytest
+
+import config
+import functions.trade as trade_module
+from functions.trade import TradeClient
+from functions.trade_state import TRANSITIONS, can_transition, transition_filter
+
+
+@pytest.fixture
+def state_db(monkeypatch):
+    """In-memory database with one funded, active trade"""
+    db = mongomock.MongoClient()["escrowbot_test"]
+    monkeypatch.setattr(trade_module, "db", db)
+    monkeypatch.setattr(config, "db", db)
+    db.trades.insert_one(
+        {
+            "_id": "T1",
+            "seller_id": "111",
+            "buyer_id": "",
+            "is_active": True,
+            "status": "deposited",
+        }
+    )
+    return db
+
+
+def test_transition_table():
+    """Only the declared source statuses may enter a status"""
+    assert can_transition(None, "deposited")
+    assert can_transition("deposited", "buyer_joined")
+    assert can_transition("crypto_released", "completed")
+    assert can_transition("awaiting_buyer_address", "releasing")
+    assert not can_transition("awaiting_buyer_address", "crypto_released")
+    assert not can_transition("releasing", "cancelled")
+    assert not can_transition("completed", "cancelled")
+    assert not can_transition("cancelled", "buyer_joined")
+    assert not can_transition("deposited", "fiat_approved")
+    assert not can_transition("deposited", "no_such_status")
+
+    # Every terminal status is a dead end apart from release -> completed
+    for status in ("completed", "cancelled", "expired", "failed"):
+        assert all(status not in sources for sources in TRANSITIONS.values())
+
+    with pytest.raises(ValueError):
+        transition_filter("T1", "no_such_status")
+
+
+def test_join_returns_updated_trade_in_one_write(state_db, monkeypatch):
+    """The join is a single find_one_and_update returning the new document"""
+    spy = MagicMock(wraps=state_db.trades)
+    monkeypatch.setattr(trade_module, "db", MagicMock(trades=spy))
+
+    trade = TradeClient.join_trade("T1", 222)
+
+    assert trade["buyer_id"] == "222"
+    assert trade["status"] == "buyer_joined"
+    spy.find_one_and_update.assert_called_once()
+    spy.find_one.assert_not_called()
+    spy.update_one.assert_not_called()
+
+
+def test_double_join_is_rejected_by_the_filter(state_db):
+    """A second buyer, or the same buyer twice, no longer matches"""
+    assert TradeClient.join_trade("T1", "222")
+
+    assert TradeClient.join_trade("T1", "222") is None
+    assert TradeClient.join_trade("T1", "333") is None
+    assert state_db.trades.find_one({"_id": "T1"})["buyer_id"] == "222"
+
+
+def test_seller_cannot_join_own_trade(state_db):
+    """The seller id is part of the join precondition"""
+    assert TradeClient.join_trade("T1", "111") is None
+    assert state_db.trades.find_one({"_id": "T1"})["status"] == "deposited"
+
+
+def test_fiat_review_requires_seller_and_right_status(state_db):
+    """Approval checks the seller and happens at most once"""
+    TradeClient.join_trade("T1", "222")
+
+    # Nothing to review before the buyer has paid
+    assert TradeClient.approve_fiat_payment("T1", "111") is None
+
+    assert TradeClient.confirm_fiat_payment("T1", buyer_id="222")["is_fiat_paid"]
+    assert TradeClient.approve_fiat_payment("T1", "222") is None
+
+    trade = TradeClient.approve_fiat_payment("T1", "111")
+    assert trade["status"] == "fiat_approved"
+    assert TradeClient.reject_fiat_payment("T1", "111", "late") is None
+
+
+def test_cancel_is_participant_only_and_terminal(state_db):
+    """Outsiders can't cancel, and a cancelled trade can't be resumed"""
+    assert TradeClient.cancel_trade("T1", "999") is None
+
+    trade = TradeClient.cancel_trade("T1", "111")
+    assert trade["is_cancelled"] is True
+    assert trade["is_active"] is False
+    assert trade["status"] == "cancelled"
+
+    assert TradeClient.cancel_trade("T1", "111") is None
+    assert TradeClient.update_trade_status("T1", "buyer_joined") is None
+
+
+def test_deposit_is_recorded_only_with_its_transition(state_db):
+    """The deposit flags land with the "deposited" move, once, on open trades"""
+    state_db.trades.insert_many(
+        [
+            {"_id": "T2", "seller_id": "111", "status": "created"},
+            {"_id": "T3", "seller_id": "111", "status": "cancelled"},
+        ]
+    )
+
+    trade = TradeClient.mark_deposited("T2")
+    assert trade["status"] == "deposited"
+    assert trade["is_active"] is True
+    assert trade["is_crypto_deposited"] is True
+    assert trade["crypto_deposit_time"]
+
+    assert TradeClient.mark_deposited("T2") is None
+    assert TradeClient.mark_deposited("T3") is None
+    assert "is_crypto_deposited" not in state_db.trades.find_one({"_id": "T3"})
+
+
+def test_transition_refreshes_cached_trade(state_db):
+    """The returned document replaces the cached copy"""
+    TradeClient.get_trade("T1")
+
+    TradeClient.update_trade_status("T1", "disputed")
+
+    assert TradeClient.get_trade("T1")["status"] == "disputed"
+
+
+@pytest.fixture
+def release_db(state_db, monkeypatch):
+    """A wallet trade waiting to pay out to the buyer's address"""
+    state_db.trades.insert_one(
+        {
+            "_id": "R1",
+            "seller_id": "111",
+            "buyer_id": "222",
+            "price": 0.5,
+            "currency": "ETH",
+            "is_active": True,
+            "is_wallet_trade": True,
+            "seller_wallet_id": "W1",
+            "status": "awaiting_buyer_address",
+            "fiat_payment_approved": True,
+            "buyer_address": "0xbuyer",
+        }
+    )
+    monkeypatch.setattr(
+        TradeClient,
+        "get_fee_quote",
+        staticmethod(
+            lambda trade: {
+                "bot_fee": 0.01,
+                "total_gas_fees": 0.001,
+                "total_deposit_required": 0.511,
+                "gas_fee_user_payout": 0.0005,
+                "gas_fee_bot_payout": 0.0005,
+            }
+        ),
+    )
+    TradeClient.invalidate_trade()
+    yield state_db
+    TradeClient.invalidate_trade()
+
+
+def test_release_is_claimed_before_the_transfer(release_db, monkeypatch):
+    """A second release arriving mid-broadcast finds the trade claimed"""
+    from functions.wallet import WalletManager
+
+    transfers, nested = [], []
+
+    def transfer_crypto(**kwargs):
+        transfers.append(kwargs)
+        assert release_db.trades.find_one({"_id": "R1"})["status"] == "releasing"
+        assert TradeClient.set_buyer_address("R1", "0xother") is False
+        nested.append(TradeClient.initiate_crypto_release("R1"))
+        return {"tx_hash": "0xabc", "status": "pending"}
+
+    monkeypatch.setattr(WalletManager, "transfer_crypto", staticmethod(transfer_crypto))
+
+    assert TradeClient.initiate_crypto_release("R1") is True
+    assert TradeClient.initiate_crypto_release("R1") is False
+
+    assert len(transfers) == 1
+    assert transfers[0]["to_address"] == "0xbuyer"
+    assert nested == [False]
+    trade = release_db.trades.find_one({"_id": "R1"})
+    assert trade["status"] == "crypto_released"
+    assert trade["release_tx_status"] == "pending"
+    assert trade["buyer_address"] == "0xbuyer"
+
+
+def test_unsent_release_hands_the_trade_back(release_db, monkeypatch):
+    """A transfer that broadcast nothing can be retried"""
+    from functions.wallet import WalletManager
+
+    monkeypatch.setattr(
+        WalletManager, "transfer_crypto", staticmethod(lambda **kwargs: False)
+    )
+
+    assert TradeClient.initiate_crypto_release("R1") is False
+    trade = release_db.trades.find_one({"_id": "R1"})
+    assert trade["status"] == "awaiting_buyer_address"
+    assert TradeClient.set_buyer_address("R1", "0xnew") is True
@@ -0,0 +1,111 @@
+import mongomock
+import pytest
+
+import config
+import functions.trade as trade_module
+from functions.stats import TradeStatsClient
+from functions.trade import TradeClient
+
+
+class DummyUser:
+    id = 111
+    first_name = "Alice"
+
+
+class DummyChat:
+    id = 111
+
+
+class DummyMsg:
+    from_user = DummyUser()
+    chat = DummyChat()
+
+
+@pytest.fixture
+def stats_db(monkeypatch):
+    """Shared in-memory database for trade and stats modules"""
+    db = mongomock.MongoClient()["escrowbot_test"]
+    monkeypatch.setattr(trade_module, "db", db)
+    monkeypatch.setattr(config, "db", db)
+    monkeypatch.setattr(
+        trade_module.UserClient,
+        "get_user",
+        staticmethod(lambda msg: {"_id": str(msg.from_user.id)}),
+    )
+    return db
+
+
+def test_trade_lifecycle_updates_stats(stats_db):
+    """Counters follow create, join, pay and complete transitions"""
+    trade = TradeClient.open_new_trade(DummyMsg(), currency="USDT")
+    stats_db.trades.update_one({"_id": trade["_id"]}, {"$set": {"is_active": True}})
+    trade_module.trade_cache.clear()
+
+    assert TradeClient.join_trade(trade["_id"], "222")
+    assert TradeClient.confirm_fiat_payment(trade["_id"])
+    assert TradeClient.complete_trade(trade["_id"])
+
+    seller = TradeStatsClient.get_user_stats("111")
+    buyer = TradeStatsClient.get_user_stats("222")
+
+    assert (seller["sales"], seller["purchases"], seller["trades"]) == (1, 0, 1)
+    assert (buyer["sales"], buyer["purchases"], buyer["trades"]) == (0, 1, 1)
+    assert seller["paid"] == buyer["paid"] == 1
+    assert seller["completed"] == buyer["completed"] == 1
+
+
+def test_repeated_transition_is_counted_once(stats_db):
+    """Re-applying a status does not double count"""
+    trade = TradeClient.open_new_trade(DummyMsg(), currency="USDT")
+
+    TradeClient.complete_trade(trade["_id"])
+    TradeClient.update_trade_status(trade["_id"], "completed")
+
+    assert TradeStatsClient.get_user_stats("111")["completed"] == 1
+
+
+def test_rebuild_recomputes_from_trades(stats_db):
+    """Rebuild backfills counters and marks trades as counted"""
+    stats_db.trades.insert_many(
+        [
+            {"_id": "A", "seller_id": "1", "buyer_id": "2", "is_completed": True},
+            {"_id": "B", "seller_id": "1", "buyer_id": "", "is_cancelled": True},
+            {"_id": "C", "seller_id": "3", "buyer_id": "1", "status": "disputed"},
+        ]
+    )
+    stats_db.user_trade_stats.insert_one({"_id": "stale", "sales": 9})
+
+    assert TradeStatsClient.rebuild_user_stats() == 3
+
+    user = TradeStatsClient.get_user_stats("1")
+    assert (user["sales"], user["purchases"]) == (2, 1)
+    assert (user["completed"], user["cancelled"], user["disputed"]) == (1, 1, 1)
+    assert stats_db.user_trade_stats.find_one({"_id": "stale"}) is None
+    assert "completed" in stats_db.trades.find_one({"_id": "A"})["stats_events"]
+
+    # A transition already covered by the rebuild is not counted again
+    TradeClient.update_trade_status("A", "completed")
+    assert TradeStatsClient.get_user_stats("1")["completed"] == 1
+
+
+def test_partial_rebuild_leaves_shared_trades_for_a_full_rebuild(stats_db):
+    """Unrecorded events on a trade with other users are left untouched"""
+    stats_db.trades.insert_many(
+        [
+            {"_id": "A", "seller_id": "1", "buyer_id": "2", "is_completed": True},
+            {"_id": "B", "seller_id": "1", "buyer_id": "", "is_cancelled": True},
+        ]
+    )
+
+    assert TradeStatsClient.rebuild_user_stats(["1"]) == 1
+
+    user = TradeStatsClient.get_user_stats("1")
+    assert (user["sales"], user["completed"], user["cancelled"]) == (1, 0, 1)
+    assert "stats_events" not in stats_db.trades.find_one({"_id": "A"})
+    assert "cancelled" in stats_db.trades.find_one({"_id": "B"})["stats_events"]
+
+    # Rebuilding both participants repairs the shared trade for each of them
+    assert TradeStatsClient.rebuild_user_stats(["1", "2"]) == 2
+    assert TradeStatsClient.get_user_stats("1")["completed"] == 1
+    assert TradeStatsClient.get_user_stats("2")["completed"] == 1
+    assert "completed" in stats_db.trades.find_one({"_id": "A"})["stats_events"]
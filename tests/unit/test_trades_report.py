@@ -0,0 +1,48 @@
+import mongomock
+import pytest
+
+import functions.trade as trade_module
+from functions.trade import TradeClient
+
+
+@pytest.fixture
+def trades_db(monkeypatch):
+    """In-memory database bound to functions.trade"""
+    db = mongomock.MongoClient()["escrowbot_test"]
+    monkeypatch.setattr(trade_module, "db", db)
+
+    db.trades.insert_many(
+        [
+            {"_id": "S1", "seller_id": "1", "buyer_id": "2", "is_active": True},
+            {"_id": "S2", "seller_id": "1", "buyer_id": "", "is_active": False},
+            {"_id": "B1", "seller_id": "3", "buyer_id": "1", "is_active": True},
+            {"_id": "X1", "seller_id": "3", "buyer_id": "4", "is_active": True},
+        ]
+    )
+    db.disputes.insert_many(
+        [
+            {"_id": "D1", "trade_id": "S1"},
+            {"_id": "D2", "trade_id": "S1"},
+            {"_id": "D3", "trade_id": "B1"},
+            {"_id": "D4", "trade_id": "X1"},
+        ]
+    )
+    return db
+
+
+def test_get_trades_report_counts_disputes_in_one_query(trades_db):
+    """Dispute count covers every trade without a query per trade"""
+    sells = list(trades_db.trades.find({"seller_id": "1"}))
+    buys = list(trades_db.trades.find({"buyer_id": "1"}))
+
+    assert TradeClient.get_trades_report(sells, buys) == (1, 2, 3, 2, 3)
+
+
+def test_get_user_trades_report_matches_list_based_report(trades_db):
+    """The server-side aggregation returns the same figures"""
+    assert TradeClient.get_user_trades_report("1") == (1, 2, 3, 2, 3)
+
+
+def test_get_user_trades_report_for_user_without_trades(trades_db):
+    """Users with no trades get an all-zero report"""
+    assert TradeClient.get_user_trades_report("999") == (0, 0, 0, 0, 0)
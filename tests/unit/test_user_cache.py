@@ -0,0 +1,75 @@
+from unittest.mock import MagicMock
+
+import mongomock
+import pytest
+
+import functions.user as user_module
+from functions.user import UserClient, user_cache
+
+
+@pytest.fixture
+def users_db(monkeypatch):
+    """In-memory database bound to functions.user"""
+    db = mongomock.MongoClient()["escrowbot_test"]
+    monkeypatch.setattr(user_module, "db", db)
+    return db
+
+
+class DummyUser:
+    id = 555
+    first_name = "Bob"
+
+
+class DummyChat:
+    id = 555
+
+
+class DummyMsg:
+    from_user = DummyUser()
+    chat = DummyChat()
+
+
+def test_get_user_creates_new_user_in_one_round_trip(users_db):
+    """A first-time user is upserted with a single find_one_and_update"""
+    user_cache.reset_stats()
+    user = UserClient.get_user(DummyMsg())
+
+    assert user["_id"] == "555"
+    assert user["name"] == "Bob"
+    assert users_db.users.find_one({"_id": "555"})["chat"] == "555"
+    assert UserClient.get_cache_stats()["misses"] == 1
+
+
+def test_get_user_serves_returning_users_from_cache(users_db, monkeypatch):
+    """Returning users cost no database round trips"""
+    UserClient.get_user(DummyMsg())
+
+    mock_db = MagicMock()
+    monkeypatch.setattr(user_module, "db", mock_db)
+
+    user = UserClient.get_user(DummyMsg())
+
+    assert user["_id"] == "555"
+    mock_db.users.find_one_and_update.assert_not_called()
+    mock_db.users.find_one.assert_not_called()
+
+
+def test_existing_user_is_not_overwritten(users_db):
+    """The upsert must not reset fields of an existing profile"""
+    users_db.users.insert_one(
+        {"_id": "555", "name": "Bob", "wallet": "0xabc", "verified": True}
+    )
+
+    user = UserClient.get_user(DummyMsg())
+
+    assert user["wallet"] == "0xabc"
+    assert users_db.users.find_one({"_id": "555"})["verified"] is True
+
+
+def test_set_wallet_invalidates_cached_user(users_db):
+    """set_wallet drops the cached profile so the new address is visible"""
+    UserClient.get_user(DummyMsg())
+
+    UserClient.set_wallet("555", "0xnew")
+
+    assert UserClient.get_user_by_id("555")["wallet"] == "0xnew"
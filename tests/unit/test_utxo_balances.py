@@ -0,0 +1,206 @@
+import mongomock
+import pytest
+from bson.decimal128 import Decimal128
+
+import functions.utxo_balances as utxo_module
+import functions.wallet as wallet_module
+from functions.balance_cache import balance_cache
+from functions.utxo_balances import BlockCypherClient, QuotaExceeded, RateLimiter
+from functions.wallet import WalletManager
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, data=None, headers=None):
+        self.status_code = status_code
+        self._data = data
+        self.headers = headers or {}
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise ConnectionError(f"HTTP {self.status_code}")
+
+
+class FakeBlockCypher:
+    """Answers the batch balance endpoint from a table of satoshi balances"""
+
+    def __init__(self, balances, throttle=0):
+        self.balances = balances
+        self.throttle = throttle
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append((url, params))
+        if self.throttle:
+            self.throttle -= 1
+            return FakeResponse(429, headers={"Retry-After": "2"})
+
+        addresses = url.split("/addrs/")[1].removesuffix("/balance").split(";")
+        entries = [
+            (
+                {"address": a, "balance": self.balances[a], "final_balance": 0}
+                if a in self.balances
+                else {"error": f"Wallet {a} not found"}
+            )
+            for a in addresses
+        ]
+        return FakeResponse(data=entries if len(entries) > 1 else entries[0])
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(utxo_module.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(
+        utxo_module.time, "sleep", lambda s: now.__setitem__(0, now[0] + s)
+    )
+    return now
+
+
+@pytest.fixture
+def no_sleep(clock, monkeypatch):
+    """Sleeps are recorded and only advance the fake clock"""
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(utxo_module.time, "sleep", sleep)
+    return sleeps
+
+
+def test_addresses_are_batched_into_semicolon_requests(no_sleep):
+    session = FakeBlockCypher({"b1": 150_000_000, "b2": 0, "b3": 1})
+    client = BlockCypherClient(token="t", batch_size=2, session=session)
+
+    balances = client.get_balances("BTC", ["b1", "b2", "b3", "b1", "missing"])
+
+    assert balances == {"b1": 1.5, "b2": 0.0, "b3": 1e-8}
+    assert session.calls == [
+        ("https://api.blockcypher.com/v1/btc/main/addrs/b1;b2/balance", {"token": "t"}),
+        (
+            "https://api.blockcypher.com/v1/btc/main/addrs/b3;missing/balance",
+            {"token": "t"},
+        ),
+    ]
+
+
+def test_single_address_and_errors(no_sleep):
+    session = FakeBlockCypher({"L1": 250_000_000})
+    client = BlockCypherClient(token=None, session=session)
+
+    assert client.get_balance("LTC", "L1") == 2.5
+    assert session.calls[0][1] is None
+    with pytest.raises(ValueError):
+        client.get_balance("DOGE", "D1")
+    with pytest.raises(ValueError):
+        client.get_balances("ETH", ["0xabc"])
+
+
+def test_rate_limited_requests_are_retried_after_the_delay(no_sleep):
+    session = FakeBlockCypher({"D1": 100_000_000}, throttle=2)
+    client = BlockCypherClient(session=session, rate_limit=1000)
+
+    assert client.get_balance("DOGE", "D1") == 1.0
+    assert len(session.calls) == 3
+    assert no_sleep.count(2.0) == 2
+    stats = client.stats()
+    assert (stats["requests"], stats["throttled"]) == (3, 2)
+    assert stats["spent_last_hour"] == 3
+
+
+def test_rate_limiter_charges_every_batched_address(clock):
+    limiter = RateLimiter(rate=3)
+
+    assert limiter.acquire(3) == 0
+    assert limiter.acquire(3) == pytest.approx(1.0)
+    assert limiter.acquire(1) == pytest.approx(1 / 3)
+    # No request may cost more than the bucket holds
+    with pytest.raises(ValueError):
+        limiter.acquire(4)
+
+
+def test_priority_lookups_keep_a_share_of_the_bucket(clock, monkeypatch):
+    limiter = RateLimiter(rate=3, priority_share=1 / 3)
+    assert limiter.max_cost() == 2
+    assert limiter.max_cost(priority=True) == 3
+
+    assert limiter.acquire(2) == 0
+    # The token left over is held back for priority callers
+    assert limiter.acquire(1, priority=True) == 0
+
+    # Waiting happens outside the lock, so a priority caller can get in
+    def sleep(seconds):
+        assert not limiter._lock.locked()
+        clock[0] += seconds
+
+    monkeypatch.setattr(utxo_module.time, "sleep", sleep)
+    assert limiter.acquire(2) == pytest.approx(1.0)
+
+
+def test_hourly_quota_fails_fast_and_keeps_a_priority_share(clock):
+    limiter = RateLimiter(rate=1000, hourly_limit=10, priority_share=0.2)
+
+    limiter.acquire(8)
+    with pytest.raises(QuotaExceeded):
+        limiter.acquire(1)
+    limiter.acquire(2, priority=True)
+    with pytest.raises(QuotaExceeded):
+        limiter.acquire(1, priority=True)
+
+    clock[0] += 3600
+    assert limiter.acquire(8) == 0
+    assert limiter.stats()["spent_last_hour"] == 8
+
+
+def test_batches_are_split_to_fit_the_bucket(no_sleep):
+    session = FakeBlockCypher({"b1": 1, "b2": 2, "b3": 3})
+    client = BlockCypherClient(
+        batch_size=100, rate_limit=3, priority_share=0.2, session=session
+    )
+
+    assert client.get_balances("BTC", ["b1", "b2", "b3"]) == {
+        "b1": 1e-8,
+        "b2": 2e-8,
+        "b3": 3e-8,
+    }
+    assert [url.split("/addrs/")[1] for url, _ in session.calls] == [
+        "b1;b2/balance",
+        "b3/balance",
+    ]
+
+
+def test_reconciliation_costs_one_request_per_chain_batch(monkeypatch, no_sleep):
+    db = mongomock.MongoClient()["escrowbot_test"]
+    monkeypatch.setattr(wallet_module, "db", db)
+    balance_cache.clear()
+    addresses = {"BTC": ["b1", "b2", "b3"], "LTC": ["l1", "l2"], "DOGE": ["d1"]}
+    db.coin_addresses.insert_many(
+        [
+            {"_id": a, "coin_symbol": coin, "address": a, "balance": Decimal128("0")}
+            for coin, group in addresses.items()
+            for a in group
+        ]
+        + [{"_id": "e1", "coin_symbol": "ETH", "address": "e1", "balance": "7"}]
+    )
+    session = FakeBlockCypher({"b1": 10**8, "b2": 2 * 10**8, "l1": 5 * 10**7})
+    monkeypatch.setattr(
+        wallet_module,
+        "blockcypher",
+        BlockCypherClient(batch_size=3, rate_limit=1000, session=session),
+    )
+
+    totals = WalletManager.reconcile_utxo_balances()
+
+    assert totals == {"updated": 3, "failed": 3}
+    assert len(session.calls) == 3
+    docs = {d["_id"]: d["balance"] for d in db.coin_addresses.find()}
+    assert docs["b1"] == Decimal128("1.0")
+    assert docs["b2"] == Decimal128("2.0")
+    assert docs["l1"] == Decimal128("0.5")
+    assert docs["b3"] == docs["d1"] == Decimal128("0")
+    assert docs["e1"] == "7"
+    assert balance_cache.get("b2", "BTC") == 2.0
@@ -0,0 +1,54 @@
+import hashlib
+
+from eth_account import Account
+from mnemonic import Mnemonic
+
+from functions.wallet import DerivationContext, WalletManager
+
+MNEMONIC = " ".join(["abandon"] * 11 + ["about"])
+
+
+def test_context_matches_the_per_coin_derivation():
+    """Addresses derived from a shared context are the ones users already have"""
+    manager = WalletManager()
+    context = DerivationContext(MNEMONIC)
+
+    Account.enable_unaudited_hdwallet_features()
+    expected = Account.from_mnemonic(MNEMONIC, account_path="m/44'/60'/0'/0/0")
+    eth = manager._create_ethereum_address(context)
+    assert eth["address"] == expected.address
+    assert eth["private_key"] == expected.key.hex()
+
+    seed = Mnemonic("english").to_seed(MNEMONIC)
+    btc = manager._create_bitcoin_like_address("BTC", context)
+    assert btc["private_key"] == hashlib.sha256(seed + b"BTC").hexdigest()
+    assert manager._create_bitcoin_like_address("LTC", MNEMONIC) == (
+        manager._create_bitcoin_like_address("LTC", context)
+    )
+
+
+def test_seed_is_derived_once_per_wallet(monkeypatch):
+    calls = []
+    to_seed = Mnemonic.to_seed
+
+    def counting_to_seed(cls, *args, **kwargs):
+        calls.append(args)
+        return to_seed(*args, **kwargs)
+
+    monkeypatch.setattr(Mnemonic, "to_seed", classmethod(counting_to_seed))
+
+    wallet, coin_addresses = WalletManager().build_wallet()
+
+    assert len(coin_addresses) == len(WalletManager.DEFAULT_COINS)
+    assert len(calls) == 1
+
+
+def test_sibling_paths_share_parent_nodes():
+    context = DerivationContext(MNEMONIC)
+
+    first = context.private_key("m/44'/60'/0'/0/0")
+    second = context.private_key("m/44'/60'/0'/0/1")
+
+    assert first != second
+    # m, four shared parents and the two leaves
+    assert len(context._nodes) == 7
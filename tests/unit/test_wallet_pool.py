@@ -0,0 +1,82 @@
+import mongomock
+import pytest
+
+import config
+import functions.wallet as wallet_module
+import functions.wallet_pool as pool_module
+from functions.wallet import WalletManager
+from functions.wallet_pool import WalletPool
+
+
+@pytest.fixture
+def pool_db(monkeypatch):
+    db = mongomock.MongoClient()["escrowbot_test"]
+    for module in (wallet_module, pool_module, config):
+        monkeypatch.setattr(module, "db", db)
+    return db
+
+
+def test_fill_tops_the_pool_up_to_target(pool_db):
+    pool = WalletPool(target=2, workers=0)
+
+    assert pool.fill() == 2
+    assert pool.fill() == 0
+    assert pool.available() == 2
+
+    wallet = pool_db.wallets.find_one()
+    assert wallet["is_pooled"] is True
+    assert wallet["user_id"] is None
+    assert wallet["is_active"] is False
+    assert pool_db.coin_addresses.count_documents({"wallet_id": wallet["_id"]}) == len(
+        WalletManager.DEFAULT_COINS
+    )
+
+
+def test_wallets_derived_in_worker_processes_decrypt_here(pool_db):
+    pool = WalletPool(target=2, workers=2)
+
+    assert pool.fill() == 2
+
+    manager = WalletManager()
+    for wallet in pool_db.wallets.find():
+        assert len(manager._decrypt_data(wallet["mnemonic_encrypted"]).split()) == 12
+
+
+def test_each_user_claims_a_different_pooled_wallet(pool_db):
+    pool = WalletPool(target=2, workers=0)
+    pool.fill()
+    assert WalletManager.get_user_wallet("111") is None
+
+    first = pool.assign("111", "Main")
+    second = pool.assign("222")
+
+    assert first["_id"] != second["_id"]
+    assert first["user_id"] == "111"
+    assert first["wallet_name"] == "Main"
+    assert first["is_active"] is True
+    assert first["is_pooled"] is False
+    assert WalletManager.get_user_wallet("111")["_id"] == first["_id"]
+    assert len(WalletManager.get_wallet_coin_addresses(first["_id"])) == len(
+        WalletManager.DEFAULT_COINS
+    )
+
+    assert pool.assign("333") is None
+    assert pool.stats()["assigned"] == 2
+    assert pool.stats()["misses"] == 1
+
+
+def test_create_wallet_uses_the_pool_then_falls_back(pool_db, monkeypatch):
+    pool = WalletPool(target=1, workers=0)
+    pool.fill()
+    monkeypatch.setattr(pool_module, "wallet_pool", pool)
+    monkeypatch.setattr(wallet_module, "WALLET_POOL_ENABLED", True)
+
+    pooled = WalletManager.create_wallet_for_user("111")
+    inline = WalletManager.create_wallet_for_user("222")
+
+    assert pooled["assigned_at"]
+    assert "assigned_at" not in inline
+    assert inline["user_id"] == "222"
+    assert inline["is_active"] is True
+    assert pool_db.wallets.count_documents({"is_active": True}) == 2
+    assert WalletManager.create_wallet_for_user("111")["_id"] == pooled["_id"]
@@ -0,0 +1,138 @@
+import time
+from unittest.mock import MagicMock
+
+import mongomock
+import pytest
+from bson.decimal128 import Decimal128
+
+import functions.wallet as wallet_module
+from functions.wallet import WalletManager
+
+COINS = ["BTC", "LTC", "DOGE", "ETH", "SOL", "USDT"]
+
+
+@pytest.fixture
+def wallet_db(monkeypatch):
+    """In-memory database with one wallet holding every default coin"""
+    db = mongomock.MongoClient()["escrowbot_test"]
+    monkeypatch.setattr(wallet_module, "db", db)
+    db.coin_addresses.insert_many(
+        [
+            {
+                "_id": f"CA_{coin}",
+                "wallet_id": "W1",
+                "coin_symbol": coin,
+                "address": f"addr_{coin}",
+                "balance": "1.0",
+            }
+            for coin in COINS
+        ]
+    )
+    return db
+
+
+def batch_from(fetch):
+    """Route a batched balance read through the same per-coin fake"""
+
+    def fetch_batch(coin_addresses):
+        balances = []
+        for coin_address in coin_addresses:
+            try:
+                balances.append(fetch(None, coin_address))
+            except Exception as e:
+                balances.append(e)
+        return balances
+
+    return staticmethod(fetch_batch)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(WalletManager, "__init__", lambda self: None)
+    return WalletManager()
+
+
+@pytest.mark.asyncio
+async def test_coins_are_fetched_concurrently(wallet_db, manager, monkeypatch):
+    """Six slow lookups take roughly the time of the slowest batch, not the sum"""
+    monkeypatch.setattr(wallet_module, "WALLET_REFRESH_CONCURRENCY", 6)
+
+    def slow_fetch(self, coin_address):
+        time.sleep(0.2)
+        return 2.0
+
+    monkeypatch.setattr(WalletManager, "_fetch_coin_balance", slow_fetch)
+    monkeypatch.setattr(WalletManager, "_fetch_evm_balances", batch_from(slow_fetch))
+    monkeypatch.setattr(WalletManager, "_fetch_utxo_balances", batch_from(slow_fetch))
+    monkeypatch.setattr(WalletManager, "_fetch_solana_balances", batch_from(slow_fetch))
+
+    start = time.monotonic()
+    assert await manager.refresh_wallet_balances("W1") is True
+    assert time.monotonic() - start < 0.2 * len(COINS) / 2
+
+    assert {str(doc["balance"]) for doc in wallet_db.coin_addresses.find()} == {"2.0"}
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded(wallet_db, manager, monkeypatch):
+    """No more than WALLET_REFRESH_CONCURRENCY lookups run at once"""
+    monkeypatch.setattr(wallet_module, "WALLET_REFRESH_CONCURRENCY", 2)
+    running, peak = [], []
+
+    def tracked_fetch(self, coin_address):
+        running.append(coin_address["coin_symbol"])
+        peak.append(len(running))
+        time.sleep(0.05)
+        running.remove(coin_address["coin_symbol"])
+        return 0.0
+
+    monkeypatch.setattr(WalletManager, "_fetch_coin_balance", tracked_fetch)
+    monkeypatch.setattr(WalletManager, "_fetch_evm_balances", batch_from(tracked_fetch))
+    monkeypatch.setattr(
+        WalletManager, "_fetch_utxo_balances", batch_from(tracked_fetch)
+    )
+    monkeypatch.setattr(
+        WalletManager, "_fetch_solana_balances", batch_from(tracked_fetch)
+    )
+
+    await manager.refresh_coin_balances(manager.get_wallet_coin_addresses("W1"))
+
+    assert max(peak) == 2
+
+
+@pytest.mark.asyncio
+async def test_failures_and_timeouts_are_reported_and_not_written(
+    wallet_db, manager, monkeypatch
+):
+    """Failed coins keep their stored balance; the rest land in one bulk write"""
+    monkeypatch.setattr(wallet_module, "WALLET_REFRESH_TIMEOUT", 0.1)
+
+    def flaky_fetch(self, coin_address):
+        coin = coin_address["coin_symbol"]
+        if coin == "BTC":
+            raise ConnectionError("api down")
+        if coin == "LTC":
+            time.sleep(0.3)
+        return 5.0
+
+    monkeypatch.setattr(WalletManager, "_fetch_coin_balance", flaky_fetch)
+    monkeypatch.setattr(WalletManager, "_fetch_evm_balances", batch_from(flaky_fetch))
+    monkeypatch.setattr(WalletManager, "_fetch_utxo_balances", batch_from(flaky_fetch))
+    monkeypatch.setattr(
+        WalletManager, "_fetch_solana_balances", batch_from(flaky_fetch)
+    )
+    spy = MagicMock(wraps=wallet_db.coin_addresses)
+    monkeypatch.setattr(wallet_module, "db", MagicMock(coin_addresses=spy))
+
+    result = await manager.refresh_coin_balances(
+        manager.get_wallet_coin_addresses("W1")
+    )
+
+    assert result["failed"] == {"BTC": "api down", "LTC": "timed out"}
+    assert set(result["updated"]) == {"DOGE", "ETH", "SOL", "USDT"}
+    spy.bulk_write.assert_called_once()
+    spy.update_one.assert_not_called()
+
+    balances = {d["coin_symbol"]: d["balance"] for d in wallet_db.coin_addresses.find()}
+    assert balances["BTC"] == balances["LTC"] == "1.0"
+    assert balances["SOL"] == Decimal128("5.0")
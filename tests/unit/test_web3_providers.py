@@ -0,0 +1,182 @@
+import json
+from unittest.mock import patch
+
+import pytest
+import requests
+from web3._utils.http_session_manager import HTTPSessionManager
+
+from functions.web3_providers import (
+    ProviderHealth,
+    Web3ProviderRegistry,
+    get_eth_registry,
+    reset_registries,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_registries():
+    reset_registries()
+    yield
+    reset_registries()
+
+
+def test_circuit_opens_after_repeated_failures_and_half_opens():
+    """Consecutive failures open the breaker until the cooldown passes"""
+    health = ProviderHealth("http://a", failure_threshold=2, cooldown=30)
+
+    health.record_failure()
+    assert health.state() == "closed"
+    health.record_failure()
+    assert health.state() == "open"
+    assert health.state(now=health.opened_at + 31) == "half_open"
+
+    health.record_success(0.05)
+    assert health.state() == "closed"
+    assert health.consecutive_failures == 0
+
+
+def test_half_open_endpoint_admits_a_single_trial():
+    """Only one caller probes a half-open endpoint until the trial reports"""
+    health = ProviderHealth("http://a", failure_threshold=1, cooldown=30)
+    health.record_failure()
+    later = health.opened_at + 31
+
+    assert health.available(now=later)
+    assert health.claim(now=later)
+    assert not health.available(now=later)
+    assert not health.claim(now=later)
+
+    # The failed trial re-opens the breaker for another cooldown
+    health.record_failure()
+    assert health.state() == "open"
+    later = health.opened_at + 31
+    assert health.claim(now=later)
+
+    health.record_success(0.05)
+    assert health.state() == "closed"
+    assert health.claim() and health.claim()
+
+
+def test_call_skips_a_half_open_endpoint_during_its_trial():
+    registry = Web3ProviderRegistry(
+        ["http://a", "http://b"], failure_threshold=1, cooldown=30
+    )
+    health = registry.health["http://a"]
+    health.record_failure()
+    health.opened_at -= 31
+    assert health.claim()  # another caller's trial is in flight
+
+    seen = []
+
+    def fake_call(web3):
+        seen.append(web3.provider.endpoint_uri)
+        return 42
+
+    assert registry.ranked() == ["http://b"]
+    assert registry.call(fake_call) == 42
+    assert seen == ["http://b"]
+
+
+def test_ranked_prefers_fast_healthy_endpoints():
+    """Slow or failing endpoints drop down; open circuits are skipped"""
+    registry = Web3ProviderRegistry(
+        ["http://a", "http://b", "http://c"], failure_threshold=1, cooldown=30
+    )
+    assert registry.ranked() == ["http://a", "http://b", "http://c"]
+
+    registry.health["http://a"].record_success(0.5)
+    registry.health["http://b"].record_success(0.1)
+    registry.health["http://c"].record_failure()
+
+    assert registry.ranked() == ["http://b", "http://a"]
+    assert [s["state"] for s in registry.stats()] == ["closed", "closed", "open"]
+
+
+def test_all_circuits_open_still_returns_endpoints():
+    """With every breaker open the oldest one is tried first"""
+    registry = Web3ProviderRegistry(["http://a", "http://b"], failure_threshold=1)
+    registry.health["http://b"].record_failure()
+    registry.health["http://a"].record_failure()
+
+    assert registry.ranked() == ["http://b", "http://a"]
+
+
+def test_call_fails_over_on_transport_errors():
+    """A connection error moves the call to the next endpoint"""
+    registry = Web3ProviderRegistry(["http://a", "http://b"])
+    seen = []
+
+    def fake_call(web3):
+        url = web3.provider.endpoint_uri
+        seen.append(url)
+        if url == "http://a":
+            raise requests.ConnectionError("refused")
+        return 42
+
+    assert registry.call(fake_call) == 42
+    assert seen == ["http://a", "http://b"]
+
+
+def test_call_raises_rpc_errors_without_failover():
+    """Errors returned by a healthy node are not retried elsewhere"""
+    registry = Web3ProviderRegistry(["http://a", "http://b"])
+    seen = []
+
+    def fake_call(web3):
+        seen.append(web3.provider.endpoint_uri)
+        raise ValueError("execution reverted")
+
+    with pytest.raises(ValueError):
+        registry.call(fake_call)
+    assert seen == ["http://a"]
+
+
+def test_call_raises_last_error_when_every_endpoint_fails():
+    registry = Web3ProviderRegistry(["http://a", "http://b"])
+
+    def fake_call(web3):
+        raise requests.Timeout(web3.provider.endpoint_uri)
+
+    with pytest.raises(requests.Timeout, match="http://b"):
+        registry.call(fake_call)
+
+
+def test_get_web3_is_cached_and_does_not_probe():
+    """The same pooled instance is reused and no request is sent"""
+    registry = Web3ProviderRegistry(["http://a"])
+
+    with patch("requests.Session.post") as post:
+        first = registry.get_web3()
+        second = registry.get_web3()
+
+    assert first is second
+    post.assert_not_called()
+
+
+def test_eth_registry_skips_placeholder_url_and_is_shared():
+    """The unconfigured Infura URL is ignored and the registry is process-wide"""
+    registry = get_eth_registry("https://mainnet.infura.io/v3/YOUR_INFURA_KEY")
+
+    assert all("YOUR_INFURA_KEY" not in url for url in registry.urls)
+    assert get_eth_registry("https://mainnet.infura.io/v3/YOUR_INFURA_KEY") is registry
+    assert get_eth_registry("http://primary").urls[0] == "http://primary"
+
+
+def test_chain_id_is_fetched_once_per_endpoint():
+    """Repeated eth_calls don't each pay for a chain id lookup"""
+    seen = []
+
+    def fake_post(self, endpoint_uri, data, **kwargs):
+        body = json.loads(data)
+        seen.append(body["method"])
+        result = "0x1" if body["method"] == "eth_chainId" else "0x" + "00" * 32
+        response = {"jsonrpc": "2.0", "id": body["id"], "result": result}
+        return json.dumps(response).encode()
+
+    web3 = Web3ProviderRegistry(["http://a"]).get_web3()
+    with patch.object(HTTPSessionManager, "make_post_request", fake_post):
+        for _ in range(5):
+            web3.eth.call({"to": "0x" + "11" * 20, "data": "0x"})
+
+    assert seen.count("eth_call") == 5
+    assert seen.count("eth_chainId") <= 2
@@ -276,8 +276,10 @@ If you encounter any issues, please contact support.
         from functions.scripts.utils import get_eth_price
         from functions.trade import TradeClient
 
-        # Use new gas-inclusive fee calculation
-        fee_data = TradeClient.calculate_trade_fee_with_gas(amount, currency)
+        # Gas-inclusive fee quote, locked to the trade for later checks
+        fee_data = TradeClient.get_fee_quote(
+            trade_id
+        ) or TradeClient.calculate_trade_fee_with_gas(amount, currency)
         gas_info = TradeClient.get_gas_requirements_for_currency(currency)
 
         breakdown = fee_data["breakdown"]
@@ -413,6 +415,55 @@ We will notify you once the buyer joins and completes their payment.
             ]
         )
 
+    @staticmethod
+    def release_broadcast(trade: TradeType, address: str, tx_hash: str) -> str:
+        """Message to buyer once the release transaction has been broadcast."""
+        return f"""
+🚀 <b>Crypto Sent!</b>
+
+Trade ID: <code>{trade['_id']}</code>
+
+💰 <b>Amount:</b> {trade['price']} {trade['currency']}
+📍 <b>To address:</b> <code>{address}</code>
+🔗 <b>Transaction:</b> <code>{tx_hash}</code>
+
+The transfer is waiting for network confirmation. We will message you as soon as it is confirmed.
+        """
+
+    @staticmethod
+    def release_confirmed(trade: TradeType, tx: dict) -> str:
+        """Message to buyer and seller once the release transaction is mined."""
+        return f"""
+🎉 <b>Trade Completed Successfully!</b>
+
+Trade ID: <code>{trade['_id']}</code>
+
+💰 <b>Released:</b> {tx['amount']} {tx['coin_symbol']}
+📍 <b>Sent to:</b> <code>{tx['to_address']}</code>
+🔗 <b>Transaction:</b> <code>{tx['tx_hash']}</code>
+
+The transfer has been confirmed on the blockchain. Thank you for using our escrow service! 🚀
+        """
+
+    @staticmethod
+    def release_failed(trade: TradeType, tx: dict) -> str:
+        """Message to buyer and seller when the release transaction fails."""
+        reason = (
+            "was not confirmed in time"
+            if tx["status"] == "dropped"
+            else "failed on the blockchain"
+        )
+        return f"""
+❌ <b>Crypto Release Failed</b>
+
+Trade ID: <code>{trade['_id']}</code>
+
+The transfer of {tx['amount']} {tx['coin_symbol']} {reason}.
+🔗 <b>Transaction:</b> <code>{tx['tx_hash']}</code>
+
+Our team has been notified. Please contact support with your trade ID for assistance.
+        """
+
     @staticmethod
     def deposit_not_confirmed(trade_id: str, status: Optional[str]) -> str:
         """Message when crypto deposit is not yet confirmed."""